@@ -78,6 +78,7 @@ def build_executable():
         '--windowed',
         '--name=NetToolsSuite',
         '--add-data=oui_database.json;.',
+        '--add-data=asn_database.csv;.',
         '--add-data=tools;tools',
     ]
     
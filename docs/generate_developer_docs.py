@@ -610,7 +610,7 @@ FONT_SIZES = {"title": 24, "heading": 18, "body": 12}""")
     pdf.code_block("""~/.nettools/
 |-- config.json          # Haupt-Konfiguration
 |-- scans.json           # Scan-Verlauf
-|-- traceroutes.json     # Traceroute-Verlauf
+|-- traceroutes/         # Traceroute-Verlauf (eine Datei pro Trace)
 |-- dns_lookups.json     # DNS-Verlauf
 +-- port_scans.json      # Port-Scan-Verlauf""")
     
@@ -19,6 +19,9 @@ import re
 import sys
 import subprocess
 import socket
+import sqlite3
+import time
+from collections import deque
 
 # Import UI modules
 from ui.dashboard_ui import DashboardUI
@@ -83,7 +86,10 @@ from tools.scan_manager import ScanManager
 from tools.network_profile_manager import NetworkProfileManager
 from tools.history_manager import HistoryManager
 from tools.network_icon import NetworkIcon
-from tools.live_ping_monitor import LivePingMonitor
+from tools.live_ping_monitor import LivePingMonitor, HostData
+from tools.monitor_store import MonitorStore
+from tools.metrics_exporter import MetricsExporter
+from tools.host_specs import HostRange, parse_host_specs, count_hosts
 from tools.bandwidth_tester import BandwidthTester
 from tools.port_scanner import PortScanner
 from tools.dns_lookup import DNSLookup
@@ -148,6 +154,9 @@ class NetToolsApp(ctk.CTk):
         self.scanner = IPv4Scanner()
         self.scan_thread = None
         
+        # Optional Prometheus endpoint, started from the Live Ping Monitor
+        self.metrics_exporter = MetricsExporter(scanners=[self.scanner])
+        
         # Performance: Debounced updates
         self.update_buffer = []
         self.update_timer = None
@@ -4131,7 +4140,15 @@ Actions:
             text="⚖️ Compare",
             variant="primary"
         )
-        compare_btn.grid(row=0, column=2, rowspan=2, padx=20, pady=10)
+        compare_btn.grid(row=0, column=2, rowspan=2, padx=(20, 5), pady=10)
+        
+        # Timeline button
+        timeline_btn = StyledButton(
+            select_frame,
+            text="📅 Timeline",
+            variant="secondary"
+        )
+        timeline_btn.grid(row=0, column=3, rowspan=2, padx=(5, 20), pady=10)
         
         # Results area
         results_frame = ctk.CTkFrame(comp_window)
@@ -4201,6 +4218,7 @@ Actions:
             # Summary stats
             s = comparison["summary"]
             summary_text = f"🔄 Route Changes: {s['route_changes']}  |  "
+            summary_text += f"🔀 Load-balanced: {s.get('ecmp_hops', 0)}  |  "
             summary_text += f"📈 Improved: {s['latency_improved']}  |  "
             summary_text += f"📉 Degraded: {s['latency_degraded']}  |  "
             summary_text += f"⏱️ New Timeouts: {s['new_timeouts']}  |  "
@@ -4233,6 +4251,7 @@ Actions:
             status_colors = {
                 "unchanged": COLORS['text_secondary'],
                 "route_changed": COLORS['warning'],
+                "ecmp": COLORS['neon_cyan'],
                 "improved": COLORS['success'],
                 "degraded": COLORS['danger'],
                 "new_timeout": COLORS['danger'],
@@ -4244,6 +4263,7 @@ Actions:
             status_icons = {
                 "unchanged": "➖",
                 "route_changed": "🔀",
+                "ecmp": "⚖️",
                 "improved": "📈",
                 "degraded": "📉",
                 "new_timeout": "⏱️",
@@ -4302,7 +4322,90 @@ Actions:
             
             self.show_toast("Comparison complete", "success")
         
+        def show_timeline():
+            """Show every route change and latency shift for the baseline's target"""
+            trace = self.traceroute_manager.get_trace_by_id(trace1_var.get().split(" - ")[0])
+            if not trace:
+                messagebox.showerror("Error", "Could not load traceroute data.")
+                return
+            timeline = self.traceroute_manager.get_timeline(trace["target"])
+            
+            for widget in results_scroll.winfo_children():
+                widget.destroy()
+            
+            # Summary card
+            summary_frame = StyledCard(results_scroll, variant="elevated")
+            summary_frame.pack(fill="x", padx=5, pady=10)
+            
+            ctk.CTkLabel(
+                summary_frame,
+                text=f"📅 Route Timeline - {trace['target']}",
+                font=ctk.CTkFont(size=14, weight="bold")
+            ).pack(pady=(10, 5))
+            
+            events = [event for entry in timeline for event in entry["events"]]
+            routes = {entry["route"] for entry in timeline if entry["route"] is not None}
+            summary_text = f"🧭 Traces: {len(timeline)}  |  "
+            summary_text += f"🛤️ Routes: {len(routes)}  |  "
+            summary_text += f"🔄 Route Changes: {sum(1 for e in events if e['type'] == 'route_change')}  |  "
+            summary_text += f"⏱️ Latency Shifts: {sum(1 for e in events if e['type'] == 'latency_shift')}"
+            ctk.CTkLabel(
+                summary_frame,
+                text=summary_text,
+                font=ctk.CTkFont(size=11)
+            ).pack(pady=(5, 10))
+            
+            # Timeline table header
+            header_frame = ctk.CTkFrame(results_scroll, fg_color=COLORS['electric_violet'])
+            header_frame.pack(fill="x", padx=5, pady=(10, 2))
+            
+            header_inner = ctk.CTkFrame(header_frame, fg_color="transparent")
+            header_inner.pack(fill="x", padx=10, pady=8)
+            
+            for text, width in [("Time", 140), ("Route", 60), ("Latency (ms)", 100), ("Changes", 560)]:
+                ctk.CTkLabel(
+                    header_inner, text=text,
+                    font=ctk.CTkFont(size=11, weight="bold"),
+                    text_color="white", width=width, anchor="w"
+                ).pack(side="left", padx=3)
+            
+            # One row per trace, oldest first
+            for i, entry in enumerate(timeline):
+                row_color = ("gray90", "gray25") if i % 2 == 0 else ("gray85", "gray20")
+                row_frame = ctk.CTkFrame(results_scroll, fg_color=row_color, corner_radius=4)
+                row_frame.pack(fill="x", padx=5, pady=1)
+                
+                row_inner = ctk.CTkFrame(row_frame, fg_color="transparent")
+                row_inner.pack(fill="x", padx=10, pady=6)
+                
+                changes = []
+                for event in entry["events"]:
+                    if event["type"] == "route_change":
+                        hops = ", ".join(
+                            f"hop {h['hop']}: {h['before']} → {h['after']}" for h in event["hops"][:3]
+                        )
+                        more = f" (+{len(event['hops']) - 3} more)" if len(event["hops"]) > 3 else ""
+                        changes.append(f"🔀 Route {event['from_route']} → {event['to_route']}: {hops}{more}")
+                    else:
+                        icon = "📉" if event["delta_ms"] > 0 else "📈"
+                        changes.append(f"{icon} {event['before']} → {event['after']} ms ({event['delta_ms']:+.1f})")
+                route_changed = any(event["type"] == "route_change" for event in entry["events"])
+                
+                ctk.CTkLabel(row_inner, text=entry["timestamp"][:16].replace("T", " "), width=140, anchor="w",
+                            font=ctk.CTkFont(size=10)).pack(side="left", padx=3)
+                ctk.CTkLabel(row_inner, text=str(entry["route"] or "-"), width=60, anchor="w",
+                            font=ctk.CTkFont(size=10, weight="bold")).pack(side="left", padx=3)
+                ctk.CTkLabel(row_inner, text=str(entry["end_latency"] or "-"), width=100, anchor="w",
+                            font=ctk.CTkFont(size=10)).pack(side="left", padx=3)
+                change_color = COLORS['warning'] if route_changed else (
+                    COLORS['neon_cyan'] if changes else COLORS['text_secondary']
+                )
+                ctk.CTkLabel(row_inner, text="\n".join(changes) or "➖", width=560, anchor="w",
+                            justify="left", font=ctk.CTkFont(size=10),
+                            text_color=change_color).pack(side="left", padx=3)
+        
         compare_btn.configure(command=do_comparison)
+        timeline_btn.configure(command=show_timeline)
         
         # Close button
         close_btn = StyledButton(
@@ -4446,16 +4549,43 @@ Actions:
 class LivePingMonitorWindow(ctk.CTkToplevel):
     """Live Ping Monitor Window with real-time graphs"""
     
+    # Ranges are expanded lazily by the monitor, so the cap is only there
+    # to catch typos like /8 instead of /24
+    MAX_HOSTS_PER_INPUT = 65536
+    
+    # Seconds of Tk work per frame; remaining hosts are drawn in the next frame
+    FRAME_BUDGET = 0.03
+    
+    # Grouping choices: label -> (HostGroups mode, prefix)
+    GROUP_OPTIONS = {
+        "Subnet /24": ("subnet", 24),
+        "Subnet /16": ("subnet", 16),
+        "Tag": ("tag", None),
+        "None": ("none", None),
+    }
+    
     def __init__(self, parent):
         super().__init__(parent)
         
         self.title("Live Ping Monitor")
         self.geometry("1000x600")
         
-        # Monitor instance
-        self.monitor = LivePingMonitor()
-        self.host_widgets = {}  # {ip: {widgets}}
+        # Monitor instance; every sample is recorded for later replay
+        try:
+            self.store = MonitorStore()
+        except Exception as e:
+            print(f"Monitor session recording disabled: {e}")
+            self.store = None
+        self.monitor = LivePingMonitor(store=self.store)
+        
+        # Alert events arrive on the monitor thread and are drained by update_ui
+        self.alert_queue = queue.SimpleQueue()
+        self.active_alerts = {}  # {ip: set of rule names}
+        self.monitor.alerts.subscribe(self.alert_queue.put)
+        self.host_widgets = {}  # {ip: {widgets}}, only for visible hosts
+        self.group_rows = {}  # {group key: {widgets}}
         self.update_interval = 1000  # Update UI every 1 second
+        self._render_queue = deque()  # Hosts still to redraw in this refresh
         self.updating = False
         
         # Setup UI
@@ -4517,7 +4647,38 @@ class LivePingMonitorWindow(ctk.CTkToplevel):
             variant="neutral",
             state="disabled"
         )
-        self.export_btn.pack(side="left")
+        self.export_btn.pack(side="left", padx=(0, SPACING['sm']))
+        
+        self.replay_btn = StyledButton(
+            btn_frame,
+            text="🕘 Sessions",
+            command=self.open_replay,
+            size="small",
+            variant="neutral",
+            state="normal" if self.store else "disabled"
+        )
+        self.replay_btn.pack(side="left", padx=(0, SPACING['sm']))
+        
+        self.metrics_exporter = getattr(self.master, 'metrics_exporter', None)
+        self.metrics_btn = StyledButton(
+            btn_frame,
+            text="📈 Metrics",
+            command=self.toggle_metrics,
+            size="small",
+            variant="neutral",
+            state="normal" if self.metrics_exporter else "disabled"
+        )
+        self.metrics_btn.pack(side="left", padx=(0, SPACING['sm']))
+        
+        # Latest alert event and count of active alerts
+        self.alert_label = ctk.CTkLabel(
+            btn_frame,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color=COLORS['text_secondary'],
+            anchor="w"
+        )
+        self.alert_label.pack(side="left", fill="x", expand=True)
         
         # Latency legend on the right
         legend_frame = ctk.CTkFrame(header, fg_color="transparent")
@@ -4526,19 +4687,19 @@ class LivePingMonitorWindow(ctk.CTkToplevel):
         # Green indicator
         green_box = ctk.CTkFrame(legend_frame, fg_color="#00ff00", width=60, height=25, corner_radius=4)
         green_box.pack(side="top", pady=2)
-        green_label = ctk.CTkLabel(green_box, text="0-200 ms", font=ctk.CTkFont(size=9), text_color="black")
+        green_label = ctk.CTkLabel(green_box, text=f"0-{HostData.LATENCY_GOOD} ms", font=ctk.CTkFont(size=9), text_color="black")
         green_label.place(relx=0.5, rely=0.5, anchor="center")
         
         # Yellow indicator
         yellow_box = ctk.CTkFrame(legend_frame, fg_color="#ffff00", width=60, height=25, corner_radius=4)
         yellow_box.pack(side="top", pady=2)
-        yellow_label = ctk.CTkLabel(yellow_box, text="201-500 ms", font=ctk.CTkFont(size=9), text_color="black")
+        yellow_label = ctk.CTkLabel(yellow_box, text=f"{HostData.LATENCY_GOOD + 1}-{HostData.LATENCY_WARNING} ms", font=ctk.CTkFont(size=9), text_color="black")
         yellow_label.place(relx=0.5, rely=0.5, anchor="center")
         
         # Red indicator
         red_box = ctk.CTkFrame(legend_frame, fg_color="#ff0000", width=60, height=25, corner_radius=4)
         red_box.pack(side="top", pady=2)
-        red_label = ctk.CTkLabel(red_box, text="501+ ms", font=ctk.CTkFont(size=9), text_color="white")
+        red_label = ctk.CTkLabel(red_box, text=f"{HostData.LATENCY_WARNING + 1}+ ms", font=ctk.CTkFont(size=9), text_color="white")
         red_label.place(relx=0.5, rely=0.5, anchor="center")
         
         # Input section
@@ -4547,10 +4708,21 @@ class LivePingMonitorWindow(ctk.CTkToplevel):
         
         self.hosts_entry = StyledEntry(
             input_frame,
-            placeholder_text="IPs, CIDRs, Ranges: e.g., 192.168.1.0/24, 10.0.0.1-10.0.0.50, 8.8.8.8"
+            placeholder_text="IPs, CIDRs, Ranges, host:port (TCP), http(s):// URLs - e.g. 192.168.1.0/24, 10.0.0.5:443; tag with [web] ..."
         )
         self.hosts_entry.pack(side="left", fill="x", expand=True, padx=SPACING['sm'], pady=SPACING['sm'])
         
+        self.group_var = ctk.StringVar(value="Subnet /24")
+        self.group_menu = ctk.CTkOptionMenu(
+            input_frame,
+            variable=self.group_var,
+            values=list(self.GROUP_OPTIONS),
+            command=self.change_grouping,
+            width=110
+        )
+        self.group_menu.pack(side="right", padx=(0, SPACING['sm']), pady=SPACING['sm'])
+        ctk.CTkLabel(input_frame, text="Group by:").pack(side="right", padx=(SPACING['sm'], 4))
+        
         self.start_btn = StyledButton(
             input_frame,
             text="▶ Start",
@@ -4584,6 +4756,12 @@ class LivePingMonitorWindow(ctk.CTkToplevel):
         header_cur = ctk.CTkLabel(table_header, text="Current", font=ctk.CTkFont(size=10, weight="bold"), width=60, anchor="center")
         header_cur.pack(side="left", padx=4)
         
+        header_p95 = ctk.CTkLabel(table_header, text="P95", font=ctk.CTkFont(size=10, weight="bold"), width=50, anchor="center")
+        header_p95.pack(side="left", padx=4)
+        
+        header_jitter = ctk.CTkLabel(table_header, text="Jitter", font=ctk.CTkFont(size=10, weight="bold"), width=50, anchor="center")
+        header_jitter.pack(side="left", padx=4)
+        
         header_graph = ctk.CTkLabel(table_header, text="Graph", font=ctk.CTkFont(size=10, weight="bold"), anchor="center")
         header_graph.pack(side="left", fill="x", expand=True, padx=4)
         
@@ -4598,100 +4776,16 @@ class LivePingMonitorWindow(ctk.CTkToplevel):
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
     
     def parse_host_input(self, input_text):
-        """Parse various input formats: IPs, CIDRs, ranges, hostnames"""
-        hosts = []
-        
-        # Split by comma or space
-        parts = re.split(r'[,\s]+', input_text)
-        
-        for part in parts:
-            part = part.strip()
-            if not part:
-                continue
-            
-            try:
-                # Check if it's a CIDR notation (e.g., 192.168.1.0/24)
-                if '/' in part:
-                    try:
-                        network = ipaddress.ip_network(part, strict=False)
-                        # Limit to reasonable size to avoid memory issues
-                        if network.num_addresses > 1000:
-                            messagebox.showwarning(
-                                "Too Many Hosts",
-                                f"CIDR {part} contains {network.num_addresses} hosts.\n"
-                                f"Maximum 1000 hosts allowed per input.\n"
-                                f"Please use a smaller subnet."
-                            )
-                            continue
-                        # Add all hosts in the network
-                        for ip in network.hosts():
-                            hosts.append(str(ip))
-                        continue
-                    except ValueError:
-                        pass
-                
-                # Check if it's a range (e.g., 192.168.1.1-192.168.1.50)
-                if '-' in part:
-                    try:
-                        start_ip, end_ip = part.split('-', 1)
-                        start_ip = start_ip.strip()
-                        end_ip = end_ip.strip()
-                        
-                        # Handle partial end IP (e.g., 192.168.1.1-50)
-                        if '.' not in end_ip:
-                            # Extract prefix from start IP
-                            start_parts = start_ip.split('.')
-                            if len(start_parts) == 4:
-                                end_ip = '.'.join(start_parts[:3]) + '.' + end_ip
-                        
-                        # Convert to IP objects
-                        start = ipaddress.ip_address(start_ip)
-                        end = ipaddress.ip_address(end_ip)
-                        
-                        # Calculate range size
-                        range_size = int(end) - int(start) + 1
-                        
-                        if range_size > 1000:
-                            messagebox.showwarning(
-                                "Too Many Hosts",
-                                f"Range {part} contains {range_size} hosts.\n"
-                                f"Maximum 1000 hosts allowed per input.\n"
-                                f"Please use a smaller range."
-                            )
-                            continue
-                        
-                        if range_size < 1:
-                            messagebox.showwarning(
-                                "Invalid Range",
-                                f"Invalid range {part}: start IP must be less than or equal to end IP"
-                            )
-                            continue
-                        
-                        # Add all IPs in range
-                        current = start
-                        while current <= end:
-                            hosts.append(str(current))
-                            current += 1
-                        continue
-                    except (ValueError, IndexError):
-                        pass
-                
-                # Check if it's a single IP address
-                try:
-                    ip = ipaddress.ip_address(part)
-                    hosts.append(str(ip))
-                    continue
-                except ValueError:
-                    pass
-                
-                # Assume it's a hostname
-                hosts.append(part)
-                
-            except Exception as e:
-                messagebox.showerror("Parse Error", f"Error parsing '{part}':\n{str(e)}")
-                continue
+        """
+        Parse IPs, CIDRs, ranges, hostnames, host:port and URLs
         
-        return hosts
+        CIDRs and ranges stay compact HostRange specs; the monitor expands
+        them as it schedules probes.
+        """
+        specs, errors = parse_host_specs(input_text, self.MAX_HOSTS_PER_INPUT)
+        if errors:
+            messagebox.showwarning("Invalid Hosts", "\n".join(errors))
+        return specs
     
     def start_monitoring(self):
         """Start monitoring the hosts"""
@@ -4701,35 +4795,44 @@ class LivePingMonitorWindow(ctk.CTkToplevel):
             messagebox.showwarning("No Hosts", "Please enter at least one IP, CIDR, or range")
             return
         
-        # Parse hosts with support for CIDR, ranges, and individual IPs
-        hosts = self.parse_host_input(hosts_input)
+        # Parse hosts with support for CIDR, ranges, and individual IPs;
+        # "[tag] hosts; [tag] hosts" assigns tags for grouping
+        tagged_specs = []
+        for segment in hosts_input.split(';'):
+            match = re.match(r'\s*\[([^\]]+)\]\s*(.*)', segment)
+            tag, segment = (match.group(1).strip(), match.group(2)) if match else (None, segment)
+            tagged_specs.extend((spec, tag) for spec in self.parse_host_input(segment))
         
-        if not hosts:
+        if not tagged_specs:
             messagebox.showwarning("No Hosts", "No valid hosts found in input")
             return
         
         # Warn if too many hosts
-        if len(hosts) > 100:
+        host_count = count_hosts([spec for spec, _ in tagged_specs])
+        if host_count > 1000:
             result = messagebox.askyesno(
                 "Many Hosts",
-                f"You are about to monitor {len(hosts)} hosts.\n"
+                f"You are about to monitor {host_count} hosts.\n"
                 f"This may impact performance.\n\n"
                 f"Continue anyway?"
             )
             if not result:
                 return
         
-        # Add hosts to monitor
-        added_count = 0
-        for host in hosts:
-            ip = self.monitor.add_host(host)
-            if ip:
-                self.create_host_widget(ip)
-                added_count += 1
+        # Ranges are queued compactly and hostnames resolve in the background,
+        # so adding even a large input returns immediately
+        mode, prefix = self.GROUP_OPTIONS[self.group_var.get()]
+        self.monitor.groups.set_mode(mode, prefix, list(self.monitor.hosts.values()))
+        names = {}
+        for spec, tag in tagged_specs:
+            if isinstance(spec, HostRange):
+                self.monitor.add_range(spec, tag)
+            else:
+                names.setdefault(tag, []).append(spec)
+        for tag, targets in names.items():
+            self.monitor.add_targets(targets, tag)
         
-        if added_count == 0:
-            messagebox.showwarning("No Hosts", "Could not add any hosts to monitor")
-            return
+        self.build_rows()
         
         # Start monitoring
         self.monitor.start_monitoring()
@@ -4769,12 +4872,125 @@ class LivePingMonitorWindow(ctk.CTkToplevel):
         self.stop_btn.configure(state="disabled")
         self.hosts_entry.configure(state="normal")
     
-    def create_host_widget(self, ip):
+    def build_rows(self):
+        """Rebuild the table: collapsed group rows, or host rows when ungrouped"""
+        for widgets in list(self.group_rows.values()):
+            widgets['frame'].destroy()
+        for widgets in list(self.host_widgets.values()):
+            widgets['row'].destroy()
+        self.group_rows = {}
+        self.host_widgets = {}
+        self._render_queue.clear()
+        self.sync_rows()
+    
+    def sync_rows(self):
+        """Add rows for hosts and groups the monitor created since the last refresh"""
+        if self.monitor.groups.mode == "none":
+            for ip in list(self.monitor.hosts):
+                if ip not in self.host_widgets:
+                    self.create_host_widget(ip)
+        else:
+            groups = dict(self.monitor.groups.groups)
+            for key in sorted(set(groups) - set(self.group_rows), key=self._group_sort_key):
+                self.create_group_row(key)
+            # Members that appeared after a group was expanded
+            for key, widgets in self.group_rows.items():
+                group = groups.get(key)
+                if group is None or not widgets['expanded']:
+                    continue
+                for ip in list(group.members):
+                    if ip not in self.host_widgets and ip in self.monitor.hosts:
+                        self.create_host_widget(ip, parent=widgets['body'])
+        
+        pending = self.monitor.get_pending_count()
+        title = f"Live Ping Monitor - {len(self.monitor.hosts)} hosts"
+        self.title(f"{title} ({pending} pending)" if pending else title)
+    
+    @staticmethod
+    def _group_sort_key(key):
+        """Sort subnets numerically and tags alphabetically after them"""
+        try:
+            network = ipaddress.ip_network(key)
+            return (0, network.version, int(network.network_address), "")
+        except ValueError:
+            return (1, 0, 0, key)
+    
+    def change_grouping(self, choice):
+        """Regroup monitored hosts when the grouping selection changes"""
+        if not self.monitor.hosts:
+            return
+        mode, prefix = self.GROUP_OPTIONS[choice]
+        self.monitor.groups.set_mode(mode, prefix, list(self.monitor.hosts.values()))
+        self.build_rows()
+    
+    def create_group_row(self, key):
+        """Create a collapsed group row; host rows are built on expand"""
+        frame = ctk.CTkFrame(self.scroll_frame, fg_color="transparent")
+        frame.pack(fill="x", pady=1)
+        
+        header = ctk.CTkButton(
+            frame,
+            text=f"▶ {key}",
+            anchor="w",
+            height=30,
+            font=ctk.CTkFont(size=11, weight="bold"),
+            fg_color=("gray85", "gray25"),
+            hover_color=("gray80", "gray30"),
+            text_color=COLORS['text_primary'],
+            command=lambda: self.toggle_group(key)
+        )
+        header.pack(fill="x")
+        
+        body = ctk.CTkFrame(frame, fg_color="transparent")
+        
+        self.group_rows[key] = {
+            'frame': frame,
+            'header': header,
+            'body': body,
+            'expanded': False,
+            'version': -1  # HostGroup.version last drawn
+        }
+    
+    def toggle_group(self, key):
+        """Expand or collapse a group, creating or destroying its host rows"""
+        widgets = self.group_rows.get(key)
+        group = self.monitor.groups.groups.get(key)
+        if widgets is None or group is None:
+            return
+        
+        widgets['expanded'] = not widgets['expanded']
+        if widgets['expanded']:
+            widgets['body'].pack(fill="x", padx=(SPACING['md'], 0))
+            for ip in sorted(group.members, key=self._group_sort_key):
+                if ip in self.monitor.hosts:
+                    self.create_host_widget(ip, parent=widgets['body'])
+        else:
+            for ip in list(group.members):
+                host_widgets = self.host_widgets.pop(ip, None)
+                if host_widgets:
+                    host_widgets['row'].destroy()
+            widgets['body'].pack_forget()
+        widgets['version'] = -1
+        self.render_group(key, widgets, group)
+    
+    def render_group(self, key, widgets, group):
+        """Update a group header with its aggregates"""
+        widgets['version'] = group.version
+        summary = group.summary()
+        arrow = "▼" if widgets['expanded'] else "▶"
+        median = f"{summary['median']:.0f} ms" if summary['median'] is not None else "-"
+        worst = f"{summary['worst_p95']:.0f} ms" if summary['worst_p95'] is not None else "-"
+        widgets['header'].configure(
+            text=f"{arrow} {key}   {summary['up']}/{summary['hosts']} up ({summary['availability']:.0f}%)   "
+                 f"median {median}   worst p95 {worst}   loss {summary['loss']:.1f}%"
+        )
+    
+    def create_host_widget(self, ip, parent=None):
         """Create table row widget for a host"""
         host_data = self.monitor.hosts[ip]
         
         # Row container (reduced height for more compact display)
-        row = ctk.CTkFrame(self.scroll_frame, fg_color=("gray92", "gray20"), height=38)
+        row = ctk.CTkFrame(parent or self.scroll_frame, fg_color=("gray92", "gray20"), height=38)
         row.pack(fill="x", pady=1)
         row.pack_propagate(False)
         
@@ -4834,6 +5050,26 @@ class LivePingMonitorWindow(ctk.CTkToplevel):
         )
         cur_label.pack(side="left", padx=4)
         
+        # 95th percentile latency
+        p95_label = ctk.CTkLabel(
+            row,
+            text="0",
+            font=ctk.CTkFont(size=10),
+            width=50,
+            anchor="center"
+        )
+        p95_label.pack(side="left", padx=4)
+        
+        # Jitter
+        jitter_label = ctk.CTkLabel(
+            row,
+            text="0",
+            font=ctk.CTkFont(size=10),
+            width=50,
+            anchor="center"
+        )
+        jitter_label.pack(side="left", padx=4)
+        
         # Graph frame
         graph_frame = ctk.CTkFrame(row, fg_color="transparent")
         graph_frame.pack(side="left", fill="both", expand=True, padx=4)
@@ -4849,6 +5085,10 @@ class LivePingMonitorWindow(ctk.CTkToplevel):
         )
         canvas.pack(fill="both", expand=True)
         
+        # Graph items are created once and moved with coords() on refresh
+        line_item = canvas.create_line(0, 0, 0, 0, fill='#0066cc', width=1.5, state="hidden")
+        point_item = canvas.create_oval(0, 0, 0, 0, fill='#0066cc', outline='#0066cc', state="hidden")
+        
         # Store references
         self.host_widgets[ip] = {
             'row': row,
@@ -4858,115 +5098,155 @@ class LivePingMonitorWindow(ctk.CTkToplevel):
             'avg_label': avg_label,
             'min_label': min_label,
             'cur_label': cur_label,
+            'p95_label': p95_label,
+            'jitter_label': jitter_label,
             'canvas': canvas,
-            'min_value': float('inf'),
-            'max_y': 500  # Track max y for scaling
+            'line_item': line_item,
+            'point_item': point_item,
+            'max_y': 500,  # Track max y for scaling
+            'version': -1,  # HostData.version last drawn
+            'texts': {},  # Last text set on each label
+            'bar_color': None
         }
+        
+        if self.active_alerts.get(ip):
+            ip_label.configure(text_color="#ff4444")
     
     def update_ui(self):
-        """Update all host widgets with latest data"""
+        """Redraw hosts whose data changed, within a per-frame time budget"""
         if not self.updating:
             return
         
+        frame_start = time.perf_counter()
         try:
-            all_hosts = self.monitor.get_all_hosts_data()
+            self.process_alerts()
             
-            for ip, host_data in all_hosts.items():
-                if ip not in self.host_widgets:
-                    continue
+            if not self._render_queue:
+                self.sync_rows()
                 
-                widgets = self.host_widgets[ip]
-                recent_pings = host_data.get_recent_pings()
+                # Group headers are few; refresh the changed ones once per refresh
+                for key, widgets in list(self.group_rows.items()):
+                    group = self.monitor.groups.groups.get(key)
+                    if group is not None and widgets['version'] != group.version:
+                        self.render_group(key, widgets, group)
                 
-                # Get current latency (last ping)
-                current_latency = 0
-                if recent_pings:
-                    success, rtt = recent_pings[-1]
-                    current_latency = rtt if success else 0
-                
-                # Calculate stats
-                avg_latency = host_data.get_average_latency()
-                
-                # Track minimum
-                if current_latency > 0 and current_latency < widgets['min_value']:
-                    widgets['min_value'] = current_latency
-                min_latency = widgets['min_value'] if widgets['min_value'] != float('inf') else 0
-                
-                # Determine status bar color based on current latency
-                if current_latency == 0:
-                    bar_color = "#ff0000"  # Red - offline
-                elif current_latency <= 200:
-                    bar_color = "#00ff00"  # Green - good
-                elif current_latency <= 500:
-                    bar_color = "#ffff00"  # Yellow - moderate
-                else:
-                    bar_color = "#ff0000"  # Red - high latency
-                
-                # Update status bar
-                widgets['status_bar'].configure(fg_color=bar_color)
-                
-                # Update statistics labels
-                widgets['avg_label'].configure(text=f"{int(avg_latency)}")
-                widgets['min_label'].configure(text=f"{int(min_latency)}")
-                widgets['cur_label'].configure(text=f"{int(current_latency)}")
-                
-                # Update graph using Canvas
-                canvas = widgets['canvas']
-                canvas.delete("all")  # Clear previous drawing
-                
-                if not recent_pings:
-                    continue
-                
-                # Canvas dimensions
-                width = 260
-                height = 28
-                padding = 2
-                
-                # Prepare data
-                y_data = []
-                for success, rtt in recent_pings:
-                    if success:
-                        y_data.append(rtt)
-                    else:
-                        y_data.append(None)
-                
-                # Auto-scale y-axis
-                valid_y = [y for y in y_data if y is not None]
-                if not valid_y:
-                    continue
-                
-                max_y = max(valid_y)
-                widgets['max_y'] = max(500, max_y * 1.1)
-                
-                # Draw graph
-                points = []
-                x_step = (width - 2 * padding) / max(len(y_data) - 1, 1)
-                
-                for i, y in enumerate(y_data):
-                    if y is not None:
-                        x = padding + i * x_step
-                        # Invert y (canvas y=0 is top)
-                        y_scaled = height - padding - (y / widgets['max_y']) * (height - 2 * padding)
-                        points.append((x, y_scaled))
-                
-                # Draw line connecting points
-                if len(points) > 1:
-                    for i in range(len(points) - 1):
-                        x1, y1 = points[i]
-                        x2, y2 = points[i + 1]
-                        canvas.create_line(x1, y1, x2, y2, fill='#0066cc', width=1.5, smooth=True)
-                
-                # Draw points
-                for x, y in points:
-                    canvas.create_oval(x-2, y-2, x+2, y+2, fill='#0066cc', outline='#0066cc')
-            
-            # Schedule next update
-            self.after(self.update_interval, self.update_ui)
-            
+                # Only hosts with a visible row are checked
+                for ip, widgets in self.host_widgets.items():
+                    host_data = self.monitor.hosts.get(ip)
+                    if host_data is not None and widgets['version'] != host_data.version:
+                        self._render_queue.append(ip)
+            
+            while self._render_queue:
+                ip = self._render_queue.popleft()
+                host_data = self.monitor.hosts.get(ip)
+                if host_data is not None and ip in self.host_widgets:
+                    self.render_host(self.host_widgets[ip], host_data)
+                if time.perf_counter() - frame_start > self.FRAME_BUDGET:
+                    break
         except Exception as e:
             print(f"Error updating UI: {e}")
-            if self.updating:
-                self.after(self.update_interval, self.update_ui)
+            self._render_queue.clear()
+        
+        # Finish a partial refresh on the next frame, otherwise wait for new data
+        if self.updating:
+            self.after(1 if self._render_queue else self.update_interval, self.update_ui)
+    
+    def process_alerts(self):
+        """Apply alert events published since the last frame"""
+        latest = None
+        while True:
+            try:
+                event = self.alert_queue.get_nowait()
+            except queue.Empty:
+                break
+            latest = event
+            rules = self.active_alerts.setdefault(event['host'], set())
+            if event['type'] == "raised":
+                rules.add(event['rule'])
+            else:
+                rules.discard(event['rule'])
+            
+            widgets = self.host_widgets.get(event['host'])
+            if widgets:
+                alerting = bool(rules)
+                widgets['ip_label'].configure(text_color="#ff4444" if alerting else COLORS['text_primary'])
+        
+        if latest is None:
+            return
+        active = sum(len(rules) for rules in self.active_alerts.values())
+        stamp = datetime.fromtimestamp(latest['time']).strftime('%H:%M:%S')
+        verb = "⚠" if latest['type'] == "raised" else "✓ cleared:"
+        self.alert_label.configure(
+            text=f"{active} active alert(s) | {stamp} {verb} {latest['host']} {latest['message']}",
+            text_color="#ff4444" if active else COLORS['text_secondary']
+        )
+    
+    def _set_label(self, widgets, key, text):
+        """Configure a label only when its text changes"""
+        if widgets['texts'].get(key) != text:
+            widgets['texts'][key] = text
+            widgets[key].configure(text=text)
+    
+    def render_host(self, widgets, host_data):
+        """Update one host row in place"""
+        widgets['version'] = host_data.version
+        recent_pings = host_data.get_recent_pings()
+        
+        # Get current latency (last ping)
+        current_latency = 0
+        if recent_pings:
+            success, rtt = recent_pings[-1]
+            current_latency = rtt if success else 0
+        
+        # Session statistics are maintained incrementally by HostData
+        avg_latency = host_data.get_average_latency()
+        min_latency = host_data.get_min_latency()
+        p95_latency = host_data.get_percentiles((95,))[95] or 0
+        
+        # Status bar color uses the same thresholds as HostData status
+        bar_color = host_data.get_status_color()
+        
+        if widgets['bar_color'] != bar_color:
+            widgets['bar_color'] = bar_color
+            widgets['status_bar'].configure(fg_color=bar_color)
+        
+        # Update statistics labels
+        self._set_label(widgets, 'avg_label', f"{int(avg_latency)}")
+        self._set_label(widgets, 'min_label', f"{int(min_latency)}")
+        self._set_label(widgets, 'cur_label', f"{int(current_latency)}")
+        self._set_label(widgets, 'p95_label', f"{int(p95_latency)}")
+        self._set_label(widgets, 'jitter_label', f"{host_data.get_jitter():.1f}")
+        
+        # Update the persistent graph items instead of recreating them
+        canvas = widgets['canvas']
+        width = 260
+        height = 28
+        padding = 2
+        
+        valid_y = [rtt for success, rtt in recent_pings if success]
+        if valid_y:
+            widgets['max_y'] = max(500, max(valid_y) * 1.1)
+        
+        coords = []
+        x_step = (width - 2 * padding) / max(len(recent_pings) - 1, 1)
+        for i, (success, rtt) in enumerate(recent_pings):
+            if success:
+                x = padding + i * x_step
+                # Invert y (canvas y=0 is top)
+                coords.extend((x, height - padding - (rtt / widgets['max_y']) * (height - 2 * padding)))
+        
+        if len(coords) >= 4:
+            canvas.coords(widgets['line_item'], *coords)
+            canvas.itemconfigure(widgets['line_item'], state="normal")
+        else:
+            canvas.itemconfigure(widgets['line_item'], state="hidden")
+        
+        if coords:
+            x, y = coords[-2], coords[-1]
+            canvas.coords(widgets['point_item'], x - 2, y - 2, x + 2, y + 2)
+            canvas.itemconfigure(widgets['point_item'], state="normal")
+        else:
+            canvas.itemconfigure(widgets['point_item'], state="hidden")
     
     def export_data(self):
         """Export monitoring data to file"""
@@ -4992,13 +5272,255 @@ class LivePingMonitorWindow(ctk.CTkToplevel):
             except Exception as e:
                 messagebox.showerror("Export Error", f"Failed to export data:\n{str(e)}")
     
+    def toggle_metrics(self):
+        """Start or stop serving monitor metrics for Prometheus"""
+        exporter = self.metrics_exporter
+        if exporter.running and exporter.monitor is self.monitor:
+            exporter.stop()
+            exporter.monitor = None
+            self.metrics_btn.configure(text="📈 Metrics")
+            return
+        
+        exporter.monitor = self.monitor
+        try:
+            exporter.start()
+        except OSError as e:
+            exporter.monitor = None
+            messagebox.showerror("Metrics Error", f"Could not start metrics endpoint:\n{str(e)}")
+            return
+        self.metrics_btn.configure(text="📈 Metrics: on")
+        messagebox.showinfo("Metrics", f"Prometheus metrics are served at:\n{exporter.url}")
+    
+    def open_replay(self):
+        """Open the recorded sessions browser"""
+        if self.store:
+            MonitorReplayWindow(self, self.store)
+    
     def on_closing(self):
         """Handle window close"""
         self.updating = False
+        self.monitor.alerts.unsubscribe(self.alert_queue.put)
         self.monitor.stop_monitoring()
+        if self.metrics_exporter and self.metrics_exporter.monitor is self.monitor:
+            self.metrics_exporter.monitor = None
+        if self.store:
+            self.store.close()
         self.destroy()
 
 
+class MonitorReplayWindow(ctk.CTkToplevel):
+    """Browse recorded live monitor sessions one time window at a time"""
+    
+    WINDOW_OPTIONS = {"1 min": 60, "10 min": 600, "1 hour": 3600, "6 hours": 21600}
+    
+    # Samples per host drawn per window; longer windows are bucketed down
+    MAX_POINTS = 300
+    
+    # Host rows per page
+    PAGE_SIZE = 50
+    
+    def __init__(self, parent, store):
+        super().__init__(parent)
+        
+        self.title("Monitor Sessions")
+        self.geometry("1000x600")
+        
+        self.store = store
+        self.sessions = []
+        self.session = None
+        self.window_start = None
+        self.page = 0
+        self._generation = 0  # Window loads started; older results are dropped
+        
+        self.setup_ui()
+        self.load_sessions()
+        
+        self.lift()
+        self.focus_force()
+    
+    def setup_ui(self):
+        """Setup the replay window UI"""
+        controls = ctk.CTkFrame(self, fg_color=COLORS['bg_card'])
+        controls.pack(fill="x", padx=SPACING['md'], pady=SPACING['md'])
+        
+        ctk.CTkLabel(controls, text="Session:").pack(side="left", padx=(SPACING['sm'], 4))
+        self.session_var = ctk.StringVar(value="")
+        self.session_menu = ctk.CTkOptionMenu(
+            controls, variable=self.session_var, values=[""],
+            command=lambda _: self.select_session(), width=320
+        )
+        self.session_menu.pack(side="left", padx=(0, SPACING['sm']))
+        
+        ctk.CTkLabel(controls, text="Window:").pack(side="left", padx=(SPACING['sm'], 4))
+        self.window_var = ctk.StringVar(value="10 min")
+        ctk.CTkOptionMenu(
+            controls, variable=self.window_var, values=list(self.WINDOW_OPTIONS),
+            command=lambda _: self.show_window(), width=100
+        ).pack(side="left", padx=(0, SPACING['sm']))
+        
+        StyledButton(controls, text="◀", command=lambda: self.step(-1), size="small", variant="neutral").pack(side="left", padx=2)
+        StyledButton(controls, text="▶", command=lambda: self.step(1), size="small", variant="neutral").pack(side="left", padx=2)
+        StyledButton(controls, text="🗑 Delete", command=self.delete_session, size="small", variant="danger").pack(side="right", padx=SPACING['sm'])
+        
+        info = ctk.CTkFrame(self, fg_color="transparent")
+        info.pack(fill="x", padx=SPACING['md'])
+        self.range_label = ctk.CTkLabel(info, text="", anchor="w")
+        self.range_label.pack(side="left")
+        StyledButton(info, text="Next ▶", command=lambda: self.turn_page(1), size="small", variant="neutral").pack(side="right", padx=2)
+        self.page_label = ctk.CTkLabel(info, text="", width=120)
+        self.page_label.pack(side="right", padx=4)
+        StyledButton(info, text="◀ Prev", command=lambda: self.turn_page(-1), size="small", variant="neutral").pack(side="right", padx=2)
+        
+        self.scroll_frame = ctk.CTkScrollableFrame(self, fg_color="transparent")
+        self.scroll_frame.pack(fill="both", expand=True, padx=SPACING['md'], pady=(0, SPACING['md']))
+    
+    def load_sessions(self):
+        """Fill the session selector"""
+        self.sessions = [s for s in self.store.list_sessions() if s["ended"]]
+        labels = [self._session_label(s) for s in self.sessions] or ["No recorded sessions"]
+        self.session_menu.configure(values=labels)
+        self.session_var.set(labels[0])
+        self.select_session()
+    
+    def _session_label(self, session):
+        """Human-readable session label"""
+        started = datetime.fromtimestamp(session["started"]).strftime('%Y-%m-%d %H:%M:%S')
+        duration = int(session["ended"] - session["started"])
+        return f"#{session['id']}  {started}  ({duration // 60} min, {session['host_count']} hosts)"
+    
+    def select_session(self):
+        """Show the start of the selected session"""
+        labels = [self._session_label(s) for s in self.sessions]
+        if self.session_var.get() not in labels:
+            self.session = None
+            self.show_window()
+            return
+        self.session = self.sessions[labels.index(self.session_var.get())]
+        self.window_start = self.session["started"]
+        self.page = 0
+        self.show_window()
+    
+    def page_count(self):
+        """Number of host pages of the selected session"""
+        if not self.session:
+            return 0
+        return max(1, -(-self.session["host_count"] // self.PAGE_SIZE))
+    
+    def turn_page(self, direction):
+        """Show the previous or next page of hosts"""
+        if not self.session:
+            return
+        page = min(max(self.page + direction, 0), self.page_count() - 1)
+        if page != self.page:
+            self.page = page
+            self.show_window()
+    
+    def step(self, direction):
+        """Move one window back or forward within the session"""
+        if not self.session:
+            return
+        span = self.WINDOW_OPTIONS[self.window_var.get()]
+        latest = max(self.session["started"], self.session["ended"] - span)
+        self.window_start = min(max(self.window_start + direction * span, self.session["started"]), latest)
+        self.show_window()
+    
+    def delete_session(self):
+        """Delete the selected session"""
+        if not self.session:
+            return
+        if messagebox.askyesno("Delete Session", f"Delete session #{self.session['id']}?"):
+            self.store.delete_session(self.session["id"])
+            self.load_sessions()
+    
+    def show_window(self):
+        """Load the current page and time window in the background, then draw it"""
+        self._generation += 1
+        for child in self.scroll_frame.winfo_children():
+            child.destroy()
+        if not self.session:
+            self.range_label.configure(text="")
+            self.page_label.configure(text="")
+            return
+        
+        span = self.WINDOW_OPTIONS[self.window_var.get()]
+        start, end = self.window_start, self.window_start + span
+        self.range_label.configure(
+            text=f"{datetime.fromtimestamp(start).strftime('%H:%M:%S')} - "
+                 f"{datetime.fromtimestamp(end).strftime('%H:%M:%S')}"
+        )
+        self.page_label.configure(text=f"Page {self.page + 1} / {self.page_count()}")
+        ctk.CTkLabel(self.scroll_frame, text="Loading...").pack(pady=SPACING['md'])
+        
+        threading.Thread(
+            target=self._load_window,
+            args=(self._generation, self.session["id"], self.page, start, end),
+            daemon=True
+        ).start()
+    
+    def _load_window(self, generation, session_id, page, start, end):
+        """Worker: fetch one page of hosts and their aggregated window"""
+        try:
+            hosts = self.store.session_hosts(session_id, page * self.PAGE_SIZE, self.PAGE_SIZE)
+            summary = self.store.window_summary(session_id, start, end, hosts, self.MAX_POINTS)
+            self.after(0, self._draw_window, generation, hosts, summary)
+        except sqlite3.Error as e:
+            self.after(0, self._draw_error, generation, str(e))
+    
+    def _draw_window(self, generation, hosts, summary):
+        """Draw a loaded page unless a newer load was started meanwhile"""
+        if generation != self._generation:
+            return
+        for child in self.scroll_frame.winfo_children():
+            child.destroy()
+        for ip in hosts:
+            self.draw_host(ip, summary.get(ip))
+    
+    def _draw_error(self, generation, message):
+        """Show a failed load"""
+        if generation != self._generation:
+            return
+        for child in self.scroll_frame.winfo_children():
+            child.destroy()
+        ctk.CTkLabel(
+            self.scroll_frame, text=f"Could not load session: {message}", text_color=COLORS['danger']
+        ).pack(pady=SPACING['md'])
+    
+    def draw_host(self, ip, summary):
+        """Draw one host row: stats and an average latency graph with loss marks"""
+        row = ctk.CTkFrame(self.scroll_frame, fg_color=COLORS['bg_card'], height=36)
+        row.pack(fill="x", pady=1)
+        
+        if summary:
+            loss = summary["lost"] / summary["count"] * 100
+            stats = (f"avg {summary['avg'] or 0:.0f} ms  max {summary['max'] or 0:.0f} ms  "
+                     f"loss {loss:.0f}%")
+        else:
+            stats = "no samples"
+        
+        ctk.CTkLabel(row, text=ip, width=140, anchor="w", font=ctk.CTkFont(size=10)).pack(side="left", padx=4)
+        ctk.CTkLabel(row, text=stats, width=260, anchor="w", font=ctk.CTkFont(size=10)).pack(side="left", padx=4)
+        
+        width, height, padding = 520, 30, 2
+        canvas = ctk.CTkCanvas(row, width=width, height=height, bg="white", highlightthickness=0)
+        canvas.pack(side="left", padx=4, pady=2)
+        if not summary:
+            return
+        
+        # Buckets come aggregated from the store, so drawing cost does not grow with the window
+        max_y = max(500, (summary["max"] or 0) * 1.1)
+        x_scale = (width - 2 * padding) / self.MAX_POINTS
+        line = []
+        for index, avg in summary["buckets"]:
+            x = padding + index * x_scale
+            if avg is None:
+                canvas.create_line(x, 0, x, height, fill="#ff0000")
+                continue
+            y = height - padding - (avg / max_y) * (height - 2 * padding)
+            line.extend((x, y))
+        if len(line) >= 4:
+            canvas.create_line(*line, fill='#0066cc', width=1.5)
+
+
 if __name__ == "__main__":
     app = NetToolsApp()
     app.mainloop()
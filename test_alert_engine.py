@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for the monitor alert engine
+"""
+
+from tools.alert_engine import (
+    AlertEngine, ConsecutiveFailureRule, PacketLossRule, LatencyPercentileRule
+)
+from tools.live_ping_monitor import HostData
+
+
+def test_consecutive_failures_with_hysteresis():
+    """Raised after N losses, cleared only after enough good samples"""
+    events = []
+    engine = AlertEngine(rules=[ConsecutiveFailureRule(failures=3, clear_count=2)])
+    engine.subscribe(events.append)
+
+    for rtt in [10, None, None, 10, None, None, None, 10, None, 10, 10]:
+        engine.process("10.0.0.1", 0, rtt)
+
+    # Two passing samples in a row clear it; isolated losses never raise it
+    assert [e["type"] for e in events] == ["raised", "cleared"]
+    assert events[0]["severity"] == "critical"
+    assert engine.get_active() == []
+    print("✓ Consecutive failure rule OK")
+
+
+def test_loss_and_percentile_rules():
+    """Sliding-window loss and percentile breaches"""
+    engine = AlertEngine(rules=[
+        PacketLossRule(max_loss=20, window=10, clear_count=5),
+        LatencyPercentileRule(percentile=95, threshold=100, window=10, trigger_count=2, clear_count=3),
+    ])
+    raised = []
+    engine.subscribe(lambda e: raised.append(e["rule"]) if e["type"] == "raised" else None)
+
+    for i in range(10):
+        engine.process("h", i, None if i < 3 else 10)
+    assert raised == ["Loss > 20% over 10 probes"]
+
+    for i in range(3):
+        engine.process("h", i, 400)
+    assert raised[-1] == "p95 > 100 ms"
+    assert len(engine.get_active("h")) == 2
+
+    engine.forget("h")
+    assert engine.get_active() == []
+    print("✓ Loss and percentile rules OK")
+
+
+def test_status_thresholds():
+    """HostData status follows the shared latency thresholds"""
+    host = HostData("10.0.0.1")
+    for rtt, status in [(150, "online"), (300, "warning"), (800, "critical")]:
+        host.add_ping_result(True, rtt)
+        assert host.current_status == status
+    host.add_ping_result(False, None)
+    assert host.get_status_color() == "#ff0000"
+    print("✓ Status thresholds OK")
+
+
+if __name__ == "__main__":
+    test_consecutive_failures_with_hysteresis()
+    test_loss_and_percentile_rules()
+    test_status_thresholds()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline IP-to-ASN table
+"""
+
+import bisect
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from tools.asn_lookup import ASNLookup
+
+
+PREFIXES = """\
+# comment
+prefix,asn,country,organisation
+8.0.0.0/9,3356,US,Level 3 Parent LLC
+8.8.8.0/24,AS15169,US,"Google LLC"
+8.8.4.0/24,15169,US,Google LLC
+not-an-ip,1,US,Broken row
+"""
+
+IPTOASN = "1.0.0.0\t1.0.0.255\t13335\tUS\tCLOUDFLARENET\n1.0.1.0\t1.0.3.255\t0\tNone\tNot routed\n"
+
+
+def test_nested_prefixes():
+    """The most specific prefix wins and unknown addresses return None"""
+    table = ASNLookup.from_rows(ASNLookup.parse_rows(PREFIXES.splitlines()))
+    assert table.lookup("8.8.8.8")["asn"] == 15169
+    assert table.lookup("8.8.8.8")["org"] == "Google LLC"
+    assert table.lookup("8.8.9.1")["asn"] == 3356
+    assert table.lookup("8.0.0.0")["asn"] == 3356
+    assert table.lookup("8.127.255.255")["asn"] == 3356
+    assert table.lookup("8.128.0.0") is None
+    assert table.lookup("10.0.0.1") is None
+    assert table.lookup("not an ip") is None
+    # 8/9 is split around the two /24s
+    assert list(table.starts) == sorted(table.starts)
+    assert all(end < start for end, start in zip(table.ends, table.starts[1:]))
+    assert len(table.owners) == 2
+    print("✓ Nested prefixes OK")
+
+
+def test_range_rows_and_override():
+    """iptoasn-style ranges load, not-routed rows are skipped and later rows win"""
+    rows = list(ASNLookup.parse_rows(IPTOASN.splitlines()))
+    assert len(rows) == 1
+    override = list(ASNLookup.parse_rows(["1.0.0.0/24,64500,DE,Example"]))
+    table = ASNLookup.from_rows(rows + override)
+    assert table.lookup("1.0.0.1")["asn"] == 64500
+    assert ASNLookup.describe(table.lookup("1.0.0.1")) == "AS64500 Example"
+    print("✓ Range rows and override OK")
+
+
+def test_save_load_and_update():
+    """The binary table round-trips and update() merges into the shared table"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with mock.patch.object(Path, "home", return_value=Path(tmp)):
+            ASNLookup._default = None
+            base = ASNLookup.default()  # The bundled seed table
+            assert base.lookup("8.8.8.8")["asn"] == 15169
+
+            source = Path(tmp) / "update.tsv"
+            source.write_text(IPTOASN.replace("13335", "64501"))
+            table = ASNLookup.update(source)
+            assert ASNLookup.default() is table
+            assert table.lookup("1.0.0.1")["asn"] == 64501
+            assert table.lookup("8.8.8.8")["asn"] == 15169  # Merged
+
+            ASNLookup._default = None
+            reloaded = ASNLookup.default()
+            assert list(reloaded.starts) == list(table.starts)
+            assert reloaded.lookup("1.0.0.1")["asn"] == 64501
+        ASNLookup._default = None
+    print("✓ Save, load and update OK")
+
+
+def test_annotate_and_as_path():
+    """Hops get asn/org and consecutive hops of one AS merge"""
+    table = ASNLookup.from_rows(ASNLookup.parse_rows(PREFIXES.splitlines()))
+    hops = [
+        {"hop": 1, "ip": "192.168.1.1"},
+        {"hop": 2, "ip": "8.1.0.1"},
+        {"hop": 3, "ip": "8.2.0.1"},
+        {"hop": 4, "ip": "*"},
+        {"hop": 5, "ip": "8.8.8.8"},
+    ]
+    table.annotate(hops)
+    assert "asn" not in hops[0] and hops[1]["asn"] == 3356
+    assert ASNLookup.as_path(hops) == [
+        {"asn": 3356, "org": "Level 3 Parent LLC", "first_hop": 2, "last_hop": 3},
+        {"asn": 15169, "org": "Google LLC", "first_hop": 5, "last_hop": 5},
+    ]
+    print("✓ Annotation and AS path OK")
+
+
+def test_lookup_speed():
+    """Large tables are flat sorted arrays searched with one bisection per lookup"""
+    rows = [((n << 12), (n << 12) + 4095, 64512 + n % 1000, "", f"Org {n % 1000}") for n in range(200000)]
+    table = ASNLookup.from_rows(rows)
+    assert len(table) == 200000 and len(table.owners) == 1000
+    assert table.starts.typecode == table.ends.typecode == table.owner_ids.typecode == "I"
+    assert all(a < b for a, b in zip(table.starts, table.starts[1:]))
+
+    addresses = [f"{n % 200}.{n % 256}.{(n * 7) % 256}.1" for n in range(20000)]
+    with mock.patch("bisect.bisect_right", wraps=bisect.bisect_right) as bisect_right:
+        for address in addresses[:100]:
+            table.lookup(address)
+    assert bisect_right.call_count == 100
+
+    # Timing is reported only; it depends on the machine
+    start = time.perf_counter()
+    for address in addresses:
+        table.lookup(address)
+    per_lookup = (time.perf_counter() - start) / len(addresses)
+    print(f"✓ Lookup speed OK ({per_lookup * 1e6:.1f} µs per lookup)")
+
+if __name__ == "__main__":
+    test_nested_prefixes()
+    test_range_rows_and_override()
+    test_save_load_and_update()
+    test_annotate_and_as_path()
+    test_lookup_speed()
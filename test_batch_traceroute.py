@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for batch traceroute, the shared hop cache and the topology graph
+"""
+
+import json
+import socket
+import time
+import xml.etree.ElementTree as ET
+
+from tools.batch_traceroute import BatchTraceroute, TopologyGraph
+from tools.traceroute_engine import TracerouteEngine
+
+
+class _SimulatedEngine(TracerouteEngine):
+    """Engine that answers probes from a table of paths instead of the network"""
+
+    def __init__(self, paths, **kwargs):
+        super().__init__(**kwargs)
+        self.paths = paths
+        self.sent = []
+        self._replies = []
+
+    def open(self, dst_ip=None):
+        self._a, self._b = socket.socketpair()
+        self._b.send(b"x")  # Always readable
+
+    def close(self):
+        self._a.close()
+        self._b.close()
+
+    def _sockets(self):
+        return [self._a]
+
+    def _send_probe(self, ttl, dst_ip=None):
+        self._counter += 1
+        self.sent.append((dst_ip, ttl))
+        path = self.paths[dst_ip]
+        if ttl <= len(path):
+            self._replies.append((dst_ip, self._counter, path[ttl - 1], ttl == len(path),
+                                  time.perf_counter() + 0.001))
+        return self._counter
+
+    def _receive(self):
+        replies, self._replies = self._replies, []
+        return replies
+
+
+def _simulated_batch(paths, **kwargs):
+    batch = BatchTraceroute(max_hops=10, timeout=0.2, rate=0, **kwargs)
+    batch.engine = _SimulatedEngine(paths, max_hops=10, timeout=0.2, probes=1, resolve=False)
+    return batch
+
+
+def test_shared_prefix_is_not_reprobed():
+    """After the warm-up traces, upstream hops come from the cache"""
+    paths = {
+        f"192.0.2.{n}": ["10.0.0.1", "10.0.1.1", f"198.51.100.{n}", f"192.0.2.{n}"]
+        for n in range(1, 21)
+    }
+    batch = _simulated_batch(paths)
+    results = batch.trace(list(paths))
+
+    assert len(results) == 20
+    for target, result in results.items():
+        assert result["reached"]
+        assert [hop["ip"] for hop in result["hops"]] == paths[target]
+
+    assert [hop["ip"] for hop in batch.prefix] == ["10.0.0.1", "10.0.1.1"]
+    # Only the two warm-up traces probed TTL 1
+    assert sum(1 for _, ttl in batch.engine.sent if ttl == 1) == 2
+    assert batch.stats["probes_saved"] > 0
+    assert results["192.0.2.20"]["hops"][0]["cached"]
+    print("✓ Shared prefix cache OK")
+
+
+def test_diverging_path_is_probed_fully():
+    """A destination that leaves the shared path gets its own first hops"""
+    paths = {
+        "192.0.2.1": ["10.0.0.1", "10.0.1.1", "192.0.2.1"],
+        "192.0.2.2": ["10.0.0.1", "10.0.1.1", "192.0.2.2"],
+        "203.0.113.5": ["10.0.0.9", "10.9.9.9", "203.0.113.5"],
+    }
+    batch = _simulated_batch(paths)
+    results = batch.trace(list(paths))
+
+    hops = results["203.0.113.5"]["hops"]
+    assert [hop["ip"] for hop in hops] == paths["203.0.113.5"]
+    assert not any(hop.get("cached") for hop in hops)
+    print("✓ Diverging path OK")
+
+
+def test_topology_graph_export():
+    """Paths merge into deduplicated nodes and edges"""
+    graph = TopologyGraph()
+    hop = TracerouteEngine._make_hop
+    graph.add_path("a", [hop(1, [1.0], ["10.0.0.1"], False), hop(2, [None], [None], False),
+                         hop(3, [5.0], ["192.0.2.1"], True)])
+    graph.add_path("b", [hop(1, [3.0], ["10.0.0.1"], False), hop(2, [4.0], ["192.0.2.2"], True)])
+
+    data = graph.to_dict()
+    assert {node["id"] for node in data["nodes"]} == {"local", "10.0.0.1", "192.0.2.1", "192.0.2.2"}
+    edges = {(edge["source"], edge["target"]): edge for edge in data["edges"]}
+    assert edges[("local", "10.0.0.1")]["traces"] == 2
+    assert edges[("local", "10.0.0.1")]["rtt_ms"] == 2.0
+    # The edge across the silent hop spans two hops and carries its loss
+    assert edges[("10.0.0.1", "192.0.2.1")]["hops"] == 2
+    assert edges[("10.0.0.1", "192.0.2.1")]["loss"] == 50.0
+
+    assert json.loads(graph.to_json())["edges"]
+    root = ET.fromstring(graph.to_graphml())
+    ns = {"g": "http://graphml.graphdrawing.org/xmlns"}
+    assert len(root.findall("g:graph/g:node", ns)) == 4
+    assert len(root.findall("g:graph/g:edge", ns)) == 3
+    print("✓ Topology graph export OK")
+
+
+def test_loopback_batch():
+    """Several real destinations share one socket set"""
+    if not TracerouteEngine.is_available():
+        print("⚠ Raw sockets not available (needs root) - skipping loopback batch")
+        return
+    batch = BatchTraceroute(timeout=1.0)
+    results = batch.trace(["127.0.0.1", "127.0.0.2", "127.0.0.3", "no-such-host.invalid"])
+    for target in ("127.0.0.1", "127.0.0.2", "127.0.0.3"):
+        assert results[target]["reached"]
+        assert results[target]["hops"][-1]["ip"] == target
+    assert results["no-such-host.invalid"]["error"] == "Unknown host"
+    print("✓ Loopback batch OK")
+
+
+if __name__ == "__main__":
+    test_shared_prefix_is_not_reprobed()
+    test_diverging_path_is_probed_fully()
+    test_topology_graph_export()
+    test_loopback_batch()
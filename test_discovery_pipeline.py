@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the chained discover-then-port-scan pipeline
+"""
+
+import csv
+import socket
+import tempfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from tools.discovery_pipeline import DiscoveryPipeline
+
+
+def test_iter_targets():
+    """Test lazy target expansion"""
+    ips, total = DiscoveryPipeline.iter_targets("10.0.0.0/16")
+    assert total == 65534
+    assert next(ips) == "10.0.0.1"
+
+    ips, total = DiscoveryPipeline.iter_targets("10.0.0.5")
+    assert (list(ips), total) == (["10.0.0.5"], 1)
+
+    ips, total = DiscoveryPipeline.iter_targets(["1.1.1.1", "8.8.8.8"])
+    assert (list(ips), total) == (["1.1.1.1", "8.8.8.8"], 2)
+    print("✓ Target expansion OK")
+
+
+def test_pipeline_loopback():
+    """Test that online hosts are port scanned and merged into one record"""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(5)
+    open_port = listener.getsockname()[1]
+
+    finished = []
+    pipeline = DiscoveryPipeline()
+    pipeline.host_callback = finished.append
+    pipeline.complete_callback = lambda results, message: finished.append(message)
+
+    try:
+        pipeline.run(["127.0.0.1"], [open_port, 1], max_workers=4, resolve_dns=False)
+    finally:
+        listener.close()
+
+    assert finished[-1] == "Scan completed"
+    assert len(pipeline.results) == 1
+    record = pipeline.results[0]
+    if record["status"] != "Online":
+        print("⚠ ICMP not permitted here - port stage skipped")
+        return
+    assert [p["port"] for p in record["open_ports"]] == [open_port]
+    assert finished[0] is record
+    print(f"✓ Pipeline OK: {record}")
+
+
+def test_exports_keep_open_ports():
+    """Every scanner export format writes the chained scan's open ports"""
+    from ui.scanner_ui import ScannerUI
+
+    scanner_ui = ScannerUI.__new__(ScannerUI)  # The exporters need no widgets
+    scanner_ui.app = object()
+    results = [
+        {"ip": "10.0.0.1", "hostname": "gw", "status": "Online", "rtt": "1.2",
+         "open_ports": [{"port": 22, "service": "ssh"}, {"port": 8443, "service": None}]},
+        {"ip": "10.0.0.2", "hostname": "", "status": "Offline", "rtt": "", "open_ports": []},
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        scanner_ui._export_as_csv(tmp / "scan.csv", results)
+        with open(tmp / "scan.csv", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert [row["Open Ports"] for row in rows] == ["22/ssh, 8443", ""]
+
+        scanner_ui._export_as_xml(tmp / "scan.xml", results)
+        hosts = ET.parse(tmp / "scan.xml").getroot().find("hosts")
+        ports = hosts[0].find("open_ports")
+        assert [(p.get("number"), p.get("service")) for p in ports] == [("22", "ssh"), ("8443", "")]
+        assert hosts[1].find("open_ports") is None
+
+        for name, export in (("scan.html", scanner_ui._export_as_html), ("scan.txt", scanner_ui._export_as_txt)):
+            export(tmp / name, results)
+            text = (tmp / name).read_text(encoding="utf-8")
+            assert "Open Ports" in text and "22/ssh, 8443" in text, name
+    print("✓ Exports keep open ports OK")
+
+
+if __name__ == "__main__":
+    test_iter_targets()
+    test_pipeline_loopback()
+    test_exports_keep_open_ports()
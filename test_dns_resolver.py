@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Test script for the built-in DNS resolver
+
+Runs a small fake DNS server on 127.0.0.1 (UDP and TCP on one port).
+"""
+
+import socket
+import struct
+import threading
+from unittest import mock
+
+from tools.dns_lookup import DNSLookup, SRV_SERVICES
+from tools.dns_resolver import (
+    DNSResolver, RECORD_TYPES, build_query, encode_name, format_record_data, parse_response
+)
+
+
+def _record(rtype, ttl, rdata):
+    """Answer record owned by the question name (compression pointer to offset 12)"""
+    return b"\xc0\x0c" + struct.pack("!HHIH", RECORD_TYPES[rtype], 1, ttl, len(rdata)) + rdata
+
+
+ZONE = {
+    ("example.test", "A"): [_record("A", 300, socket.inet_aton("192.0.2.10"))],
+    ("example.test", "AAAA"): [_record("AAAA", 120, socket.inet_pton(socket.AF_INET6, "2001:db8::10"))],
+    ("example.test", "MX"): [_record("MX", 60, struct.pack("!H", 10) + encode_name("mail.example.test"))],
+    ("example.test", "TXT"): [_record("TXT", 60, b"\x06v=spf1\x05 -all")],
+    ("example.test", "SOA"): [_record("SOA", 60, encode_name("ns1.example.test") + b"\xc0\x0c"
+                                      + struct.pack("!IIIII", 2024010101, 7200, 900, 1209600, 300))],
+    ("example.test", "CAA"): [_record("CAA", 60, b"\x00\x05issueletsencrypt.org")],
+    ("_sip._tcp.example.test", "SRV"): [_record("SRV", 60, struct.pack("!HHH", 10, 5, 5060)
+                                                + encode_name("sip.example.test"))],
+    ("10.2.0.192.in-addr.arpa", "PTR"): [_record("PTR", 3600, encode_name("host.example.test"))],
+    ("big.example.test", "TXT"): [_record("TXT", 60, bytes([200]) + b"x" * 200)] * 10,
+}
+
+
+class FakeDNSServer:
+    """Answers from ZONE; big answers are truncated over UDP"""
+
+    def __init__(self, hold=0):
+        self.udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp.bind(("127.0.0.1", 0))
+        self.port = self.udp.getsockname()[1]
+        self.tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.tcp.bind(("127.0.0.1", self.port))
+        self.tcp.listen()
+        self.hold = hold  # Queries collected before answering them in reverse order
+        self.queries = []
+        self.tcp_queries = 0
+        self.drop_first = set()
+        threading.Thread(target=self._serve_udp, daemon=True).start()
+        threading.Thread(target=self._serve_tcp, daemon=True).start()
+
+    def answer(self, query, limit=512):
+        parsed = parse_response(query)
+        name, rtype = parsed["question"]
+        records = ZONE.get((name.rstrip("."), rtype), [])
+        rcode = 0 if any(key[0] == name.rstrip(".") for key in ZONE) else 3
+        question_end = 12 + len(encode_name(name)) + 4
+        body = b"".join(records)
+        flags = 0x8180 | rcode
+        if question_end + len(body) > limit:
+            flags |= 0x0200
+            records, body = [], b""
+        header = struct.pack("!HHHHHH", parsed["id"], flags, 1, len(records), 0, 0)
+        return header + query[12:question_end] + body
+
+    def _serve_udp(self):
+        held = []
+        while True:
+            try:
+                query, address = self.udp.recvfrom(4096)
+            except OSError:
+                return
+            question = parse_response(query)["question"]
+            self.queries.append(question)
+            if question in self.drop_first:
+                self.drop_first.discard(question)
+                continue
+            held.append((query, address))
+            if len(held) < self.hold:
+                continue
+            for query, address in reversed(held):
+                # A stray answer with a wrong ID comes first and must be ignored
+                stray = bytearray(self.answer(query))
+                stray[0:2] = struct.pack("!H", (struct.unpack("!H", query[:2])[0] + 1) % 65536)
+                self.udp.sendto(bytes(stray), address)
+                self.udp.sendto(self.answer(query), address)
+            held = []
+
+    def _serve_tcp(self):
+        while True:
+            try:
+                conn, _ = self.tcp.accept()
+            except OSError:
+                return
+            with conn:
+                length = struct.unpack("!H", conn.recv(2))[0]
+                query = conn.recv(length)
+                self.tcp_queries += 1
+                reply = self.answer(query, limit=65535)
+                conn.sendall(struct.pack("!H", len(reply)) + reply)
+
+    def close(self):
+        self.udp.close()
+        self.tcp.close()
+
+
+def test_message_encoding():
+    """Queries carry EDNS0 and every record type decodes"""
+    query = build_query(0x1234, "example.test", "MX")
+    header = struct.unpack("!HHHHHH", query[:12])
+    assert header == (0x1234, 0x0100, 1, 0, 0, 1)
+    assert query.endswith(b"\x00" + struct.pack("!HHIH", 41, 1232, 0, 0))
+    assert len(build_query(1, "example.test", "A", edns_payload=0)) == 12 + 14 + 4
+
+    server = FakeDNSServer()
+    try:
+        expected = {
+            "MX": "10 mail.example.test.",
+            "TXT": '"v=spf1 -all"',
+            "SOA": "ns1.example.test. example.test. 2024010101 7200 900 1209600 300",
+            "CAA": '0 issue "letsencrypt.org"',
+        }
+        for record_type, text in expected.items():
+            reply = server.answer(build_query(7, "example.test", record_type))
+            record = parse_response(reply)["answers"][0]
+            assert record["ttl"] == 60 and format_record_data(record) == text, record
+        srv = parse_response(server.answer(build_query(7, "_sip._tcp.example.test", "SRV")))["answers"][0]
+        assert srv["data"] == {"priority": 10, "weight": 5, "port": 5060, "target": "sip.example.test."}
+    finally:
+        server.close()
+
+    try:
+        parse_response(b"\x00\x01\x81\x80\x00\x01\x00\x00\x00\x00\x00\x00\xc0\x0c")
+        assert False, "Pointer loop accepted"
+    except ValueError:
+        pass
+    print("✓ Message encoding OK")
+
+
+def test_demultiplexing_and_retry():
+    """Answers arriving out of order and after stray replies reach the right question"""
+    server = FakeDNSServer(hold=3)
+    try:
+        with DNSResolver("127.0.0.1", port=server.port, timeout=0.5) as resolver:
+            questions = [("example.test", "A"), ("example.test", "AAAA"), ("example.test", "MX")]
+            seen = []
+            results = resolver.query_many(questions, on_response=lambda q, r: seen.append(q))
+            assert sorted(seen) == sorted(questions)
+            assert results[("example.test", "A")]["answers"][0]["data"] == "192.0.2.10"
+            assert results[("example.test", "AAAA")]["answers"][0]["data"] == "2001:db8::10"
+            assert results[("example.test", "MX")]["answers"][0]["data"]["exchange"] == "mail.example.test."
+
+        # A lost datagram is resent; the socket is reused between calls
+        server.hold = 1
+        server.queries.clear()
+        server.drop_first = {("example.test.", "A")}
+        resolver = DNSResolver("127.0.0.1", port=server.port, timeout=0.3)
+        assert resolver.query("example.test", "A")["answers"][0]["ttl"] == 300
+        sock = resolver._sock
+        assert resolver.query("example.test", "CAA")["answers"]
+        assert resolver._sock is sock
+        assert server.queries.count(("example.test.", "A")) == 2
+        resolver.close()
+    finally:
+        server.close()
+    print("✓ Demultiplexing and retry OK")
+
+
+def test_tcp_fallback_and_timeout():
+    """Truncated answers are fetched over TCP; silence raises TimeoutError"""
+    server = FakeDNSServer()
+    try:
+        resolver = DNSResolver("127.0.0.1", port=server.port, timeout=0.5)
+        response = resolver.query("big.example.test", "TXT")
+        assert server.tcp_queries == 1
+        assert len(response["answers"]) == 10 and not response["truncated"]
+        assert response["answers"][0]["data"] == "x" * 200
+        resolver.close()
+    finally:
+        server.close()
+
+    silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    silent.bind(("127.0.0.1", 0))
+    try:
+        resolver = DNSResolver("127.0.0.1", port=silent.getsockname()[1], timeout=0.1, retries=1)
+        try:
+            resolver.query("example.test", "A")
+            assert False, "No timeout"
+        except TimeoutError:
+            pass
+        resolver.close()
+    finally:
+        silent.close()
+    print("✓ TCP fallback and timeout OK")
+
+
+def test_dns_lookup_uses_resolver():
+    """Custom-server lookups go through the resolver and keep their result format"""
+    server = FakeDNSServer()
+    try:
+        DNSResolver._shared[("127.0.0.1", 53)] = DNSResolver("127.0.0.1", port=server.port, timeout=0.5)
+        forward = DNSLookup.lookup("example.test", "127.0.0.1")
+        assert forward["success"] and forward["result"] == ["192.0.2.10", "2001:db8::10"]
+        assert forward["ttl"] == 120 and forward["dns_server"] == "127.0.0.1 (127.0.0.1)"
+
+        reverse = DNSLookup.lookup("192.0.2.10", "127.0.0.1")
+        assert reverse["success"] and reverse["result"] == "host.example.test"
+        assert reverse["ttl"] == 3600
+
+        missing = DNSLookup.lookup("nowhere.invalid", "127.0.0.1")
+        assert not missing["success"] and missing["result"] == "Hostname not found"
+    finally:
+        DNSResolver._shared.pop(("127.0.0.1", 53)).close()
+        server.close()
+    print("✓ DNSLookup uses the resolver OK")
+
+
+def test_all_records_concurrently():
+    """Every record type is asked at once and merged as answers arrive"""
+    first_round = 8 + len(SRV_SERVICES)  # Types other than SRV/PTR, plus one SRV per service
+    server = FakeDNSServer(hold=first_round)  # Answers nothing until all questions are in
+    try:
+        DNSResolver._shared[("127.0.0.1", 53)] = DNSResolver("127.0.0.1", port=server.port, timeout=2.0)
+        updates = []
+
+        def on_update(results):
+            updates.append(list(results["pending"]))
+            server.hold = 1  # The PTR round answers at once
+
+        results = DNSLookup.get_all_records("example.test", "127.0.0.1", on_update=on_update)
+        assert len(server.queries) == first_round + 2  # PTR of the A and the AAAA address
+        assert "PTR" in updates[0] and len(updates[0]) > 1  # Partial results come first
+        assert all(set(later) <= set(earlier) for earlier, later in zip(updates, updates[1:]))
+        assert updates[-1] == [] and results["pending"] == []
+        records = results["records"]
+        assert records["A"] == ["192.0.2.10"] and records["AAAA"] == ["2001:db8::10"]
+        assert records["SRV"] == ["_sip._tcp.example.test. 10 5 5060 sip.example.test."]
+        assert records["CAA"] == ['0 issue "letsencrypt.org"']
+        assert records["SOA"][0].startswith("ns1.example.test.")
+        assert records["PTR"] == ["192.0.2.10 → host.example.test."]
+        assert "CNAME" not in records and "NS" not in records
+        assert results["details"]["A"][0]["ttl"] == 300
+
+        reverse = DNSLookup.get_all_records("192.0.2.10", "127.0.0.1")
+        assert reverse["records"] == {"PTR": ["host.example.test."]}
+    finally:
+        DNSResolver._shared.pop(("127.0.0.1", 53)).close()
+        server.close()
+    print("✓ Concurrent all-records lookup OK")
+
+
+def test_all_records_without_server():
+    """Without any DNS server the caller still gets one final update"""
+    updates = []
+    with mock.patch("tools.dns_lookup.system_nameservers", return_value=[]):
+        results = DNSLookup.get_all_records("example.test", "system", on_update=updates.append)
+    assert results["errors"] == {"all": "No DNS server configured"} and results["pending"] == []
+    assert updates == [results]
+    print("✓ All-records lookup without server OK")
+
+
+if __name__ == "__main__":
+    test_message_encoding()
+    test_demultiplexing_and_retry()
+    test_tcp_fallback_and_timeout()
+    test_dns_lookup_uses_resolver()
+    test_all_records_concurrently()
+    test_all_records_without_server()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental host group aggregates
+"""
+
+from tools.live_ping_monitor import LivePingMonitor
+
+
+def test_subnet_aggregates():
+    """Aggregates follow samples without rescanning members"""
+    monitor = LivePingMonitor()
+    for ip in ["10.0.1.1", "10.0.1.2", "10.0.2.1"]:
+        monitor.add_host(ip)
+
+    groups = monitor.groups.groups
+    assert sorted(groups) == ["10.0.1.0/24", "10.0.2.0/24"]
+
+    for _ in range(20):
+        monitor.hosts["10.0.1.1"].add_ping_result(True, 10.0)
+        monitor.hosts["10.0.1.2"].add_ping_result(True, 100.0)
+    monitor.hosts["10.0.1.2"].add_ping_result(False, None)
+    monitor.hosts["10.0.2.1"].add_ping_result(True, 5.0)
+
+    summary = groups["10.0.1.0/24"].summary()
+    assert summary["hosts"] == 2 and summary["up"] == 1
+    assert summary["availability"] == 50.0
+    assert abs(summary["loss"] - 100 / 41) < 1e-9
+    assert abs(summary["worst_p95"] - 100.0) / 100 < 0.02
+    assert 9.8 < summary["median"] < 10.2
+
+    # Removing the worst host lowers the worst p95
+    monitor.remove_host("10.0.1.2")
+    summary = groups["10.0.1.0/24"].summary()
+    assert summary["hosts"] == 1 and summary["loss"] == 0.0
+    assert abs(summary["worst_p95"] - 10.0) / 10 < 0.02
+    print("✓ Subnet aggregates OK")
+
+
+def test_tags_and_regrouping():
+    """Hosts can be grouped by tag and regrouped from existing data"""
+    monitor = LivePingMonitor()
+    monitor.groups.set_mode("tag")
+    monitor.add_host("10.0.0.1", tag="web")
+    monitor.add_host("10.0.0.2", tag="web")
+    monitor.add_host("10.0.0.3")
+    monitor.hosts["10.0.0.1"].add_ping_result(True, 20.0)
+
+    assert sorted(monitor.groups.groups) == ["Untagged", "web"]
+    assert monitor.groups.groups["web"].success_count == 1
+
+    monitor.groups.set_mode("subnet", 16, monitor.hosts.values())
+    assert list(monitor.groups.groups) == ["10.0.0.0/16"]
+    assert monitor.groups.groups["10.0.0.0/16"].success_count == 1
+    print("✓ Tag grouping OK")
+
+
+if __name__ == "__main__":
+    test_subnet_aggregates()
+    test_tags_and_regrouping()
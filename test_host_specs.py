@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for lazy host specs in the live monitor
+"""
+
+import ipaddress
+import threading
+import time
+from unittest import mock
+
+from tools import live_ping_monitor
+from tools.host_specs import HostRange, parse_host_specs, count_hosts
+from tools.live_ping_monitor import LivePingMonitor
+
+
+def test_parse_specs_stay_compact():
+    """CIDRs and ranges parse to ranges matching ipaddress semantics"""
+    specs, errors = parse_host_specs("10.20.0.0/20, 192.168.1.10-20 8.8.8.8 example.com 10.0.0.1:443")
+    assert errors == []
+    assert isinstance(specs[0], HostRange) and len(specs[0]) == 4094
+    assert list(specs[0])[:2] == ["10.20.0.1", "10.20.0.2"]
+    assert list(specs[1]) == [f"192.168.1.{i}" for i in range(10, 21)]
+    assert list(specs[2]) == ["8.8.8.8"]
+    assert specs[3:] == ["example.com", "10.0.0.1:443"]
+    assert count_hosts(specs) == 4094 + 11 + 1 + 2
+
+    network = ipaddress.ip_network("10.0.0.0/30")
+    assert list(HostRange.from_network(network)) == [str(ip) for ip in network.hosts()]
+
+    specs, errors = parse_host_specs("10.0.0.0/8 10.0.0.9-10.0.0.1", max_hosts=65536)
+    assert specs == [] and len(errors) == 2
+    print("✓ Host spec parsing OK")
+
+
+def test_monitor_materializes_lazily():
+    """Adding a /20 creates no hosts; they appear only when scheduled"""
+    monitor = LivePingMonitor()
+    specs, _ = parse_host_specs("10.20.0.0/20")
+    monitor.add_range(specs[0])
+    assert monitor.hosts == {}
+    assert monitor.get_pending_count() == 4094
+
+    assert monitor._materialize(1000) == 1000
+    assert len(monitor.hosts) == 1000 and monitor.get_pending_count() == 3094
+    while monitor._materialize(1000):
+        pass
+    assert len(monitor.hosts) == 4094 and monitor.get_pending_count() == 0
+    assert len(monitor.groups.groups) == 16
+    print("✓ Lazy materialization OK")
+
+
+def test_background_resolution():
+    """Hostnames resolve in the background"""
+    monitor = LivePingMonitor()
+    monitor.add_targets(["localhost", "127.0.0.1:80"])
+    deadline = time.time() + 5
+    while monitor.get_pending_count() and time.time() < deadline:
+        time.sleep(0.01)
+    assert sorted(monitor.hosts) == ["127.0.0.1", "127.0.0.1:80"]
+    print("✓ Background resolution OK")
+
+
+def test_concurrent_adds_register_once():
+    """Resolver threads and range materialization adding one address create one host"""
+
+    class SlowHostData(live_ping_monitor.HostData):
+        def __init__(self, *args, **kwargs):
+            time.sleep(0.01)  # Widens the gap between the membership check and the insert
+            super().__init__(*args, **kwargs)
+
+    monitor = LivePingMonitor()
+    added = []
+    with mock.patch.object(live_ping_monitor, "HostData", SlowHostData):
+        monitor.add_range(parse_host_specs("10.0.0.1-10.0.0.1")[0][0])
+        threads = [threading.Thread(target=lambda: added.append(monitor.add_host("10.0.0.1")))
+                   for _ in range(8)]
+        threads.append(threading.Thread(target=monitor._materialize, args=(10,)))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(monitor.hosts) == 1
+    assert added.count("10.0.0.1") <= 1
+    group = monitor.groups.groups["10.0.0.0/24"]
+    assert group.members["10.0.0.1"] is monitor.hosts["10.0.0.1"]
+
+    removers = [threading.Thread(target=monitor.remove_host, args=("10.0.0.1",)) for _ in range(4)]
+    for thread in removers:
+        thread.start()
+    for thread in removers:
+        thread.join()
+    assert monitor.hosts == {} and monitor.groups.groups == {}
+    print("✓ Concurrent adds register once OK")
+
+
+if __name__ == "__main__":
+    test_parse_specs_stay_compact()
+    test_monitor_materializes_lazily()
+    test_background_resolution()
+    test_concurrent_adds_register_once()
@@ -3,8 +3,13 @@
 Test script for Live Ping Monitor functionality
 """
 
+import threading
 import time
+from unittest import mock
+
+from tools import live_ping_monitor
 from tools.live_ping_monitor import LivePingMonitor
+from tools.icmp import build_echo_request, parse_icmp, ICMP_ECHO_REQUEST
 
 def test_monitor_basic():
     """Test basic monitor functionality"""
@@ -77,8 +82,79 @@ def test_monitor_basic():
     print("\n" + "=" * 60)
     print("✓ All tests completed successfully!")
 
+def test_echo_packet():
+    """Test ICMP echo request encoding and parsing"""
+    packet = build_echo_request(0x1234, 7, b"nettools")
+    message = parse_icmp(packet)
+    assert message["type"] == ICMP_ECHO_REQUEST
+    assert (message["id"], message["seq"]) == (0x1234, 7)
+    print("✓ ICMP echo packet OK")
+
+def test_single_scheduler_thread():
+    """Many hosts must be probed by one scheduler thread"""
+    monitor = LivePingMonitor()
+    for i in range(1, 501):
+        monitor.add_host(f"127.0.{i // 250}.{i % 250 + 1}")
+    
+    threads_before = threading.active_count()
+    monitor.start_monitoring()
+    time.sleep(2.5)
+    threads_during = threading.active_count()
+    
+    start = time.time()
+    monitor.stop_monitoring()
+    stop_time = time.time() - start
+    
+    # pythonping fallback adds a small pool, never one thread per host
+    assert threads_during - threads_before <= 33
+    assert stop_time < 1.0
+    probed = sum(1 for h in monitor.hosts.values() if h.get_total_pings() > 0)
+    assert probed == len(monitor.hosts)
+    print(f"✓ {len(monitor.hosts)} hosts probed, stop took {stop_time:.3f}s")
+
+def test_fallback_skips_hosts_still_in_flight():
+    """Without raw sockets, a host whose ping outlasts the interval is not queued again"""
+    running = {}
+    overlaps = []
+    calls = []
+    lock = threading.Lock()
+    
+    class FakeResponse:
+        rtt_avg_ms = 1.0
+        
+        def success(self):
+            return True
+    
+    def slow_ping(address, **kwargs):
+        with lock:
+            calls.append(address)
+            running[address] = running.get(address, 0) + 1
+            if running[address] > 1:
+                overlaps.append(address)
+        time.sleep(0.35)  # Longer than the interval
+        with lock:
+            running[address] -= 1
+        return FakeResponse()
+    
+    monitor = LivePingMonitor(interval=0.1, timeout=0.35)
+    for i in range(1, 5):
+        monitor.add_host(f"127.0.0.{i}")
+    with mock.patch.object(live_ping_monitor, "IcmpSocket", side_effect=OSError), \
+            mock.patch.object(live_ping_monitor, "ping", side_effect=slow_ping):
+        monitor.start_monitoring()
+        time.sleep(1.0)
+        monitor.stop_monitoring()
+    
+    assert not overlaps
+    # About 1.0 / 0.35 pings per host instead of one per 0.1 s tick
+    assert 4 <= len(calls) <= 4 * 4, len(calls)
+    print(f"✓ Fallback in-flight guard OK ({len(calls)} pings)")
+
 if __name__ == "__main__":
     try:
+        test_echo_packet()
+        test_single_scheduler_thread()
+        test_fallback_skips_hosts_still_in_flight()
         test_monitor_basic()
     except KeyboardInterrupt:
         print("\n\nTest interrupted by user")
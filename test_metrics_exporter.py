@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Test script for the Prometheus metrics exporter
+"""
+
+import urllib.request
+
+from tools.live_ping_monitor import LivePingMonitor
+from tools.metrics_exporter import MetricsExporter
+from tools.scanner import IPv4Scanner
+
+
+def test_render_and_serve():
+    """Metrics are rendered from counters and served over HTTP"""
+    monitor = LivePingMonitor()
+    monitor.add_host("127.0.0.1")
+    host = monitor.hosts["127.0.0.1"]
+    for rtt in (0.5, 3.0, 30.0, 700.0):
+        host.add_ping_result(True, rtt)
+    host.add_ping_result(False, None)
+
+    scanner = IPv4Scanner()
+    scanner.scan_ip_list([], aggression='Medium')
+    exporter = MetricsExporter(monitor, [scanner], port=0)
+    text = exporter.render()
+
+    assert 'nettools_monitor_up{target="127.0.0.1",probe="icmp"} 0' in text
+    assert 'nettools_monitor_probes_total{target="127.0.0.1",probe="icmp",result="lost"} 1' in text
+    assert 'nettools_monitor_rtt_milliseconds_bucket{target="127.0.0.1",probe="icmp",le="5"} 2' in text
+    assert 'nettools_monitor_rtt_milliseconds_bucket{target="127.0.0.1",probe="icmp",le="+Inf"} 4' in text
+    assert 'nettools_monitor_rtt_milliseconds_count{target="127.0.0.1",probe="icmp"} 4' in text
+    assert "nettools_scan_runs_total 1" in text
+
+    exporter.start()
+    try:
+        with urllib.request.urlopen(exporter.url, timeout=5) as response:
+            assert response.status == 200
+            assert "nettools_scan_last_hosts_per_second" in response.read().decode()
+    finally:
+        exporter.stop()
+    print("✓ Metrics exporter OK")
+
+
+if __name__ == "__main__":
+    test_render_and_serve()
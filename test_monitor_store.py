@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for persistent monitor session storage and replay
+"""
+
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from tools.live_ping_monitor import LivePingMonitor
+from tools.monitor_store import MonitorStore
+
+
+@contextmanager
+def _database_locked(db_path):
+    """Hold an exclusive lock so the store's writer cannot commit; yields the locking connection"""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("BEGIN EXCLUSIVE")
+    try:
+        yield conn
+    finally:
+        conn.execute("ROLLBACK")
+        conn.close()
+
+
+def test_batched_writes_and_window_replay():
+    """Samples are written in the background and replayed by window"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "sessions.db"
+        store = MonitorStore(db_path, flush_interval=0.05)
+        session_id = store.start_session(["10.0.0.1", "10.0.0.2"], interval=1.0)
+
+        # record() returns while the writer cannot reach the disk
+        with _database_locked(db_path) as conn:
+            for i in range(10000):
+                store.record(session_id, "10.0.0.1", 1000 + i, None if i % 100 == 0 else 5.0)
+                store.record(session_id, "10.0.0.2", 1000 + i, 20.0)
+            assert conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0] == 0
+
+        store.end_session(session_id)
+
+        sessions = store.list_sessions()
+        assert [s["id"] for s in sessions] == [session_id]
+        assert sessions[0]["host_count"] == 2
+        assert store.session_hosts(session_id) == ["10.0.0.1", "10.0.0.2"]
+        assert store.session_hosts(session_id, offset=1, limit=5) == ["10.0.0.2"]
+
+        window = store.load_window(session_id, 1100, 1199)
+        assert len(window["10.0.0.1"]) == 100
+        assert window["10.0.0.1"][0] == (1100, None)
+        assert window["10.0.0.2"][-1] == (1199, 20.0)
+
+        samples = list(store.iter_samples(session_id, hosts=["10.0.0.2"], batch_size=7))
+        assert len(samples) == 10000
+
+        # Aggregated in SQL: 1000 samples in 10 buckets of 100
+        summary = store.window_summary(session_id, 1000, 1999, ["10.0.0.1", "10.0.0.9"], 10)
+        assert list(summary) == ["10.0.0.1"]
+        assert summary["10.0.0.1"]["count"] == 1000 and summary["10.0.0.1"]["lost"] == 10
+        assert summary["10.0.0.1"]["avg"] == 5.0 and summary["10.0.0.1"]["max"] == 5.0
+        assert [index for index, _ in summary["10.0.0.1"]["buckets"]] == list(range(10))
+
+        store.delete_session(session_id)
+        assert store.list_sessions() == []
+        store.close()
+        print("✓ Monitor store OK")
+
+
+def test_monitor_records_session():
+    """The monitor opens a session on start and closes it on stop"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MonitorStore(Path(tmp) / "sessions.db", flush_interval=0.05)
+        monitor = LivePingMonitor(store=store)
+        monitor.add_host("127.0.0.1")
+        monitor.start_monitoring()
+        session_id = monitor.session_id
+        monitor.hosts["127.0.0.1"].add_ping_result(True, 1.5)
+        monitor.stop_monitoring()
+
+        assert monitor.session_id is None
+        window = store.load_window(session_id, 0, time.time() + 1)
+        assert (True, 1.5) in [(rtt is not None, rtt) for _, rtt in window["127.0.0.1"]]
+        store.close()
+        print("✓ Monitor session recording OK")
+
+
+def test_session_hosts_are_queued():
+    """Hosts added to a running session go through the writer, never the caller"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "sessions.db"
+        store = MonitorStore(db_path, flush_interval=0.05)
+        session_id = store.start_session(["10.0.0.1"], interval=1.0)
+
+        with _database_locked(db_path) as conn:
+            for block in range(32):
+                store.add_session_hosts(session_id, [f"10.1.{block}.{n}" for n in range(256)])
+            store.add_session_hosts(session_id, ["10.0.0.1", "10.1.0.0"])  # Already known
+            assert conn.execute("SELECT COUNT(*) FROM session_hosts").fetchone()[0] == 1
+
+        store.end_session(session_id)
+        assert store.list_sessions()[0]["host_count"] == 1 + 32 * 256
+        hosts = store.session_hosts(session_id, limit=50)
+        assert len(hosts) == 50
+        assert hosts[:3] == ["10.0.0.1", "10.1.0.0", "10.1.0.1"]
+        store.close()
+        print("✓ Session hosts queued OK")
+
+
+if __name__ == "__main__":
+    test_batched_writes_and_window_replay()
+    test_monitor_records_session()
+    test_session_hosts_are_queued()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for Paris-style multipath (ECMP) discovery
+"""
+
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from tools.multipath import MultipathTracer, find_diamonds, probes_needed
+from tools.traceroute_engine import TracerouteEngine
+from tools.traceroute_manager import TracerouteManager
+
+
+class _SimulatedTracer(MultipathTracer):
+    """Tracer whose probes are answered by a per-flow load balancer table"""
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path  # One list of interfaces per hop, chosen by flow hash
+        self.rounds = []
+
+    def open(self, dst_ip=None):
+        pass
+
+    def close(self):
+        pass
+
+    def _run_round(self, probes, cancel_check=None):
+        self.rounds.append(len(probes))
+        self.probes_sent += len(probes)
+        answers = {}
+        for flow, ttl in probes:
+            if ttl <= len(self.path):
+                interfaces = self.path[ttl - 1]
+                answers[(flow, ttl)] = (interfaces[flow % len(interfaces)], 1.0, ttl == len(self.path))
+        return answers
+
+
+def test_stopping_rule():
+    """Flow counts follow the MDA table at 95% confidence"""
+    assert [probes_needed(k) for k in (1, 2, 3, 4)] == [6, 11, 16, 21]
+    assert probes_needed(0) == probes_needed(1)
+    assert probes_needed(1, confidence=0.99) > probes_needed(1)
+    print("✓ Stopping rule OK")
+
+
+def test_find_diamonds():
+    """A fan-out between two single interfaces is one diamond"""
+    hops = [
+        {"hop": 1, "ip": "10.0.0.1"},
+        {"hop": 2, "ip": "10.1.0.1", "responders": ["10.1.0.1", "10.1.0.2"]},
+        {"hop": 3, "ip": "*"},
+        {"hop": 4, "ip": "10.2.0.1", "responders": ["10.2.0.1", "10.2.0.2", "10.2.0.3"]},
+        {"hop": 5, "ip": "10.3.0.1"},
+        {"hop": 6, "ip": "192.0.2.1"},
+    ]
+    assert find_diamonds(hops) == [{
+        "start": 1, "end": 5, "divergence": "10.0.0.1", "convergence": "10.3.0.1", "width": 3,
+    }]
+    assert find_diamonds(hops[:1] + hops[4:]) == []
+    print("✓ Diamond detection OK")
+
+
+def test_discovers_every_branch():
+    """Flows are added only where new interfaces keep appearing"""
+    path = [
+        ["10.0.0.1"],
+        ["10.1.0.1", "10.1.0.2"],
+        ["10.2.0.1", "10.2.0.2", "10.2.0.3"],
+        ["10.3.0.1"],
+        ["192.0.2.1"],
+    ]
+    tracer = _SimulatedTracer(path, max_hops=10)
+    result = tracer.discover("192.0.2.1")
+
+    assert result["reached"]
+    assert [sorted(hop["responders"]) for hop in result["hops"]] == [sorted(p) for p in path]
+    assert result["diamonds"][0]["start"] == 1 and result["diamonds"][0]["end"] == 4
+    assert result["diamonds"][0]["width"] == 3
+    # Links come from flows keeping their path: each hop 2 interface reaches every hop 3 one
+    assert len(result["hops"][1]["next"]) == 6
+    assert result["hops"][2]["next"] == [[ip, "10.3.0.1"] for ip in path[2]]
+    # One probe per TTL first, then only up to the stopping rule (16 flows at 3 interfaces)
+    assert tracer.rounds[0] == 10
+    assert result["probes"] <= 10 + 16 * 4
+    assert "load-balanced" in MultipathTracer.format_output(result)
+    print("✓ Branch discovery OK")
+
+
+def test_compare_reports_ecmp():
+    """Another branch of a load-balanced hop is not a route change"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with mock.patch.object(Path, "home", return_value=Path(tmp)):
+            manager = TracerouteManager()
+        ids = []
+        for ip, responders in (("10.1.0.1", ["10.1.0.1", "10.1.0.2"]), ("10.1.0.2", None)):
+            trace = manager.start_trace("192.0.2.1")
+            manager.add_hop(trace, {"hop": 1, "ip": "10.0.0.1", "latency_ms": 1.0})
+            manager.add_hop(trace, {"hop": 2, "ip": ip, "latency_ms": 2.0, "responders": responders})
+            manager.add_hop(trace, {"hop": 3, "ip": "10.3.0.1", "latency_ms": 3.0})
+            manager.finish_trace(trace, "", True)
+            ids.append(trace["id"])
+
+        assert len(manager.get_trace_by_id(ids[0])["diamonds"]) == 1
+        comparison = manager.compare_traces(ids[0], ids[1])
+        assert comparison["hops"][1]["status"] == "ecmp"
+        assert comparison["summary"]["ecmp_hops"] == 1
+        assert comparison["summary"]["route_changes"] == 0
+    print("✓ ECMP comparison OK")
+
+
+def test_parse_multiple_responders():
+    """Linux traceroute lines with several responders keep all of them"""
+    hop = TracerouteManager.parse_hop_line(
+        " 3  10.2.0.1 (10.2.0.1)  5.1 ms 10.2.0.2 (10.2.0.2)  5.3 ms 10.2.0.1 (10.2.0.1)  5.0 ms"
+    )
+    assert hop["ip"] == "10.2.0.1"
+    assert hop["responders"] == ["10.2.0.1", "10.2.0.2"]
+    print("✓ Multiple responders OK")
+
+
+def test_loopback_discover():
+    """A loopback target is a single path reached at hop 1"""
+    if not TracerouteEngine.is_available("udp"):
+        print("⚠ Raw sockets not available (needs root) - skipping loopback multipath")
+        return
+    result = MultipathTracer(max_hops=5, timeout=1.0).discover("127.0.0.1")
+    assert result["reached"]
+    assert [hop["responders"] for hop in result["hops"]] == [["127.0.0.1"]]
+    assert result["diamonds"] == []
+    print("✓ Loopback multipath OK")
+
+
+if __name__ == "__main__":
+    test_stopping_rule()
+    test_find_diamonds()
+    test_discovers_every_branch()
+    test_compare_reports_ecmp()
+    test_parse_multiple_responders()
+    test_loopback_discover()
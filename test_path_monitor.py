@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for continuous MTR-style path statistics
+"""
+
+import time
+
+from tools.path_monitor import HopStats, PathMonitor
+from tools.traceroute_engine import TracerouteEngine
+
+
+def _hop(ttl, ip, rtt, reached=False):
+    return TracerouteEngine._make_hop(ttl, [rtt], [ip if rtt is not None else None], reached)
+
+
+def test_hop_stats():
+    """Loss and best/avg/worst follow the probes"""
+    stats = HopStats(3)
+    for rtt in (10.0, None, 30.0, 20.0):
+        stats.add("10.0.0.3" if rtt else None, rtt)
+    summary = stats.summary()
+    assert summary["sent"] == 4 and summary["received"] == 3
+    assert summary["loss"] == 25.0
+    assert summary["best"] == 10.0 and summary["worst"] == 30.0
+    assert summary["avg"] == 20.0 and summary["last"] == 20.0
+    assert abs(summary["stdev"] - 10.0) < 1e-9
+    print("✓ Hop statistics OK")
+
+
+def test_cycles_accumulate():
+    """Each cycle adds one probe per hop and stops at the destination"""
+    monitor = PathMonitor("192.0.2.10", max_hops=10)
+    cycles = [
+        [_hop(1, "10.0.0.1", 1.0), _hop(2, None, None), _hop(3, "192.0.2.10", 9.0, True)],
+        [_hop(1, "10.0.0.1", 2.0), _hop(2, "10.0.0.2", 5.0), _hop(3, "192.0.2.10", 11.0, True)],
+    ]
+    probed = []
+
+    def fake_probe_hops(max_ttl=None, cancel_check=None):
+        probed.append(max_ttl)
+        return iter(cycles[len(probed) - 1])
+
+    monitor.engine.probe_hops = fake_probe_hops
+    monitor.run_cycle()
+    monitor.run_cycle()
+
+    # The second cycle only probes up to the destination's TTL
+    assert probed == [10, 3]
+    hops = monitor.snapshot()
+    assert [hop["hop"] for hop in hops] == [1, 2, 3]
+    assert hops[1]["loss"] == 50.0 and hops[1]["ip"] == "10.0.0.2"
+    assert hops[2]["avg"] == 10.0
+    assert monitor.cycles == 2
+    assert "192.0.2.10" in monitor.report()
+    print("✓ Cycles accumulate OK")
+
+
+def test_loopback_monitor():
+    """A background session keeps one socket set across cycles"""
+    if not TracerouteEngine.is_available("icmp"):
+        print("⚠ Raw sockets not available (needs root) - skipping loopback monitor")
+        return
+    monitor = PathMonitor("127.0.0.1", interval=0.1)
+    monitor.start()
+    sock = monitor.engine._icmp
+    time.sleep(0.55)
+    assert monitor.engine._icmp is sock
+    monitor.stop()
+
+    hops = monitor.snapshot()
+    assert monitor.cycles >= 3
+    assert len(hops) == 1 and hops[0]["ip"] == "127.0.0.1"
+    assert hops[0]["sent"] == monitor.cycles and hops[0]["loss"] == 0.0
+    assert monitor.engine._icmp is None  # Closed on stop
+    print("✓ Loopback monitor OK")
+
+
+if __name__ == "__main__":
+    test_hop_stats()
+    test_cycles_accumulate()
+    test_loopback_monitor()
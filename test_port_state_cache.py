@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent port state cache
+"""
+
+import tempfile
+from pathlib import Path
+
+from tools.port_state_cache import PortStateCache
+
+
+def test_plan_and_deltas():
+    """Test freshness planning and change detection"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PortStateCache(Path(tmp) / "ports.db", freshness=3600)
+
+        deltas = cache.record("10.0.0.1", [
+            {"port": 22, "status": "Open", "service": "SSH"},
+            {"port": 80, "status": "Closed", "service": ""},
+            {"port": 443, "status": "Closed", "service": ""},
+        ], now=1000)
+        assert [d["old_state"] for d in deltas] == [None, None, None]
+
+        # Fresh: closed ports answered from cache, open port re-verified
+        probe, fresh = cache.plan("10.0.0.1", [22, 80, 443, 8080], now=2000)
+        assert probe == [8080, 22]
+        assert sorted(fresh) == [80, 443]
+
+        # 443 re-verified later, so 80 is the oldest stale entry
+        cache.record("10.0.0.1", [{"port": 443, "status": "Closed"}], now=3000)
+        probe, fresh = cache.plan("10.0.0.1", [22, 80, 443], verify_open=False, now=5000)
+        assert probe == [22, 80]
+        assert list(fresh) == [443]
+
+        deltas = cache.record("10.0.0.1", [
+            {"port": 22, "status": "Closed", "service": ""},
+            {"port": 80, "status": "Closed", "service": ""},
+        ], now=5000)
+        assert deltas == [{"port": 22, "old_state": "Open", "new_state": "Closed"}]
+
+        entries = cache.get_host("10.0.0.1")
+        assert entries[22]["last_changed"] == 5000
+        assert entries[80]["last_changed"] == 1000
+        assert entries[80]["last_verified"] == 5000
+
+        # Protocols are cached separately
+        assert cache.get_host("10.0.0.1", "udp") == {}
+        print("✓ Port state cache OK")
+
+
+def test_states_across_scan_methods():
+    """A connect scan's "Closed" is no change from a SYN scan's "Filtered" (and back)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PortStateCache(Path(tmp) / "ports.db")
+
+        cache.record("10.0.0.1", [
+            {"port": 22, "status": "Open", "service": "SSH"},
+            {"port": 80, "status": "Filtered"},
+            {"port": 443, "status": "Closed"},
+        ], method="syn", now=1000)
+
+        deltas = cache.record("10.0.0.1", [
+            {"port": 22, "status": "Closed"},
+            {"port": 80, "status": "Closed"},
+            {"port": 443, "status": "Closed"},
+        ], method="socket", now=2000)
+        assert deltas == [{"port": 22, "old_state": "Open", "new_state": "Closed"}]
+        assert cache.get_host("10.0.0.1")[80]["last_changed"] == 1000
+
+        deltas = cache.record("10.0.0.1", [{"port": 443, "status": "Filtered"}], method="syn", now=3000)
+        assert deltas == []
+
+        # The same method still reports every state change
+        deltas = cache.record("10.0.0.1", [{"port": 443, "status": "Closed"}], method="syn", now=4000)
+        assert deltas == [{"port": 443, "old_state": "Filtered", "new_state": "Closed"}]
+        print("✓ States across scan methods OK")
+
+
+if __name__ == "__main__":
+    test_plan_and_deltas()
+    test_states_across_scan_methods()
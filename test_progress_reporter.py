@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Test script for coalesced port scan progress reporting
+"""
+
+from tools.progress_reporter import ProgressReporter
+
+
+def test_progress_is_coalesced():
+    """65k port results must produce a bounded number of UI updates"""
+    snapshots = []
+    total = 65535
+    reporter = ProgressReporter(snapshots.append, total, interval=3600)
+
+    for port in range(1, total + 1):
+        reporter.update({"port": port, "is_open": port in (22, 80, 443)})
+    reporter.flush()
+
+    # First update, one per 1% and the final one
+    assert len(snapshots) <= 102, len(snapshots)
+    assert snapshots[-1]["completed"] == total
+    assert snapshots[-1]["open_count"] == 3
+
+    # Every open port is delivered exactly once across the batches
+    delivered = [r["port"] for s in snapshots for r in s["new_open"]]
+    assert delivered == [22, 80, 443]
+    print(f"✓ {total} results coalesced into {len(snapshots)} updates")
+
+
+def test_flush_reports_remainder():
+    """Flush sends progress that has not been reported yet"""
+    snapshots = []
+    reporter = ProgressReporter(snapshots.append, 1000, interval=3600, count_interval=500)
+    for port in range(1, 11):
+        reporter.update({"port": port, "is_open": port == 5})
+    assert len(snapshots) == 1  # first update is always sent
+
+    reporter.flush()
+    assert snapshots[-1]["completed"] == 10
+    reporter.flush()
+    assert len(snapshots) == 2
+    print("✓ Flush OK")
+
+
+if __name__ == "__main__":
+    test_progress_is_coalesced()
+    test_flush_reports_remainder()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test script for TCP-connect and HTTP monitor probes
+"""
+
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tools.live_ping_monitor import LivePingMonitor
+from tools.service_probes import HttpProbe, parse_target
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_parse_target():
+    """Targets select their probe type"""
+    assert parse_target("8.8.8.8")["probe"] == "icmp"
+    assert parse_target("10.0.0.1:443") == {"probe": "tcp", "host": "10.0.0.1", "port": 443, "url": None}
+    assert parse_target("tcp://example.com:22")["port"] == 22
+    assert parse_target("https://example.com/health")["port"] == 443
+    assert parse_target("fe80::1")["probe"] == "icmp"
+    print("✓ Target parsing OK")
+
+
+def test_http_keep_alive():
+    """Repeated HTTP probes reuse one connection"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        probe = HttpProbe(timeout=2)
+        url = f"http://127.0.0.1:{server.server_port}/health"
+        results = [probe.probe(url) for _ in range(20)]
+        assert all(r is not None and r >= 0 for r in results)
+        assert probe.connects == 1, probe.connects
+        probe.close()
+        print("✓ HTTP keep-alive OK")
+    finally:
+        server.shutdown()
+
+
+def test_monitor_tcp_and_http_targets():
+    """TCP and HTTP targets run on the monitor scheduler"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+
+    try:
+        monitor = LivePingMonitor(interval=0.2, timeout=0.5)
+        open_key = monitor.add_host(f"127.0.0.1:{server.server_port}")
+        closed_key = monitor.add_host(f"127.0.0.1:{closed_port}")
+        http_key = monitor.add_host(f"http://127.0.0.1:{server.server_port}/")
+        monitor.start_monitoring()
+        time.sleep(1.2)
+        monitor.stop_monitoring()
+
+        assert monitor.hosts[open_key].success_count >= 3
+        assert monitor.hosts[closed_key].success_count == 0
+        assert monitor.hosts[closed_key].fail_count >= 3
+        assert monitor.hosts[http_key].success_count >= 3
+        assert monitor.hosts[http_key].probe == "http"
+        print("✓ Monitor TCP/HTTP targets OK")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_parse_target()
+    test_http_keep_alive()
+    test_monitor_tcp_and_http_targets()
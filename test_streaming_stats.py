@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming latency statistics
+"""
+
+import random
+import statistics
+
+from tools.streaming_stats import RunningStats
+
+
+def test_running_stats_match_exact():
+    """Running statistics agree with exact computation"""
+    rng = random.Random(7)
+    values = [rng.lognormvariate(3, 0.6) for _ in range(20000)]
+
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+
+    assert abs(stats.mean - statistics.fmean(values)) < 1e-6
+    assert abs(stats.stddev - statistics.stdev(values)) < 1e-6
+    assert stats.min == min(values) and stats.max == max(values)
+
+    exact = sorted(values)
+    for p, value in stats.percentiles((50, 95, 99)).items():
+        true_value = exact[int(p / 100 * (len(exact) - 1))]
+        assert abs(value - true_value) / true_value < 0.011, (p, value, true_value)
+    print("✓ Running stats OK")
+
+
+def test_jitter():
+    """Jitter follows RFC 3550 smoothing and is zero for constant latency"""
+    stats = RunningStats()
+    for _ in range(100):
+        stats.add(10.0)
+    assert stats.jitter == 0.0
+
+    stats = RunningStats()
+    for i in range(2000):
+        stats.add(10.0 if i % 2 else 14.0)
+    assert abs(stats.jitter - 4.0) < 1e-6
+    assert RunningStats().percentiles() == {50: None, 95: None, 99: None}
+    print("✓ Jitter OK")
+
+
+if __name__ == "__main__":
+    test_running_stats_match_exact()
+    test_jitter()
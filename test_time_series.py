@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the ring-buffer host time series
+"""
+
+from tools.time_series import HostTimeSeries
+
+
+def test_raw_ring_wraps():
+    """Raw ring keeps only the newest samples and their loss bits"""
+    series = HostTimeSeries(raw_capacity=10)
+    for i in range(25):
+        series.add(1000 + i, None if i % 5 == 0 else float(i))
+
+    recent = series.recent(100)
+    assert len(recent) == 10
+    assert [t for t, _ in recent] == list(range(1015, 1025))
+    assert recent[0] == (1015, None)
+    assert recent[-1] == (1024, 24.0)
+    assert len(series.raw.values) == 10
+    print("✓ Raw ring wrap OK")
+
+
+def test_rollup_and_bounded_memory():
+    """Tiers roll samples up and never grow past their capacity"""
+    series = HostTimeSeries(raw_capacity=60, minute_capacity=30, hour_capacity=4)
+    start = 3600 * 100
+    # 3 hours at 1 Hz; every 10th probe lost
+    for i in range(3 * 3600):
+        series.add(start + i, None if i % 10 == 0 else 10.0 + i % 60)
+
+    minute, hour = series.tiers
+    assert len(minute.slots) == 30
+    assert len(hour.slots) == 2  # third hour still accumulating
+
+    bucket = hour.buckets()[0]
+    assert bucket["time"] == start
+    assert bucket["min"] == 11.0 and bucket["max"] == 69.0
+    assert abs(bucket["loss"] - 10.0) < 1e-6
+
+    # Last minute comes from raw samples, 20 minutes from 1-minute buckets
+    end = start + 3 * 3600
+    resolution, points = series.query(end - 30)
+    assert resolution == 0 and len(points) == 30
+    resolution, points = series.query(end - 20 * 60)
+    assert resolution == 60 and len(points) == 20
+    resolution, points = series.query(start)
+    assert resolution == 3600 and len(points) == 3
+
+    # The hour still being filled is the newest point
+    assert points[-1]["time"] == start + 2 * 3600
+    assert points[-1]["min"] == 11.0 and abs(points[-1]["loss"] - 10.0) < 1e-6
+    assert len(hour.buckets(include_current=False)) == 2
+    print("✓ Rollup and bounded memory OK")
+
+
+def test_partial_bucket_all_lost():
+    """A partial bucket with only lost probes reports full loss"""
+    series = HostTimeSeries()
+    series.add(600, None)
+    series.add(601, None)
+    assert series.tiers[0].buckets() == [{"time": 600, "min": None, "avg": None, "max": None, "loss": 100.0}]
+    print("✓ Partial bucket loss OK")
+
+
+if __name__ == "__main__":
+    test_raw_ring_wraps()
+    test_rollup_and_bounded_memory()
+    test_partial_bucket_all_lost()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for the unified trace output parser
+
+Parses the captured outputs in tests/trace_corpus and benchmarks the
+parser over the whole corpus.
+"""
+
+import time
+from pathlib import Path
+
+from tools.trace_parser import TraceParser
+from tools.traceroute import Traceroute
+from tools.traceroute_manager import TracerouteManager
+
+
+CORPUS = Path(__file__).parent / "tests" / "trace_corpus"
+
+
+def _parse(name):
+    return TraceParser.parse((CORPUS / name).read_text(encoding="utf-8"))
+
+
+def _summary(parser):
+    return [(hop["hop"], hop["ip"], hop["timeout"]) for hop in parser.hops]
+
+
+def test_windows_tracert():
+    """English and German tracert give the same hop model"""
+    english = _parse("tracert_en.txt")
+    assert english.format == "tracert" and english.complete
+    assert (english.target, english.target_ip) == ("example.com", "93.184.216.34")
+    assert _summary(english)[2] == (3, "*", True)
+    assert english.hops[0]["hostname"] == "router.lan" and english.hops[0]["latency_ms"] == 1.0
+    assert english.hops[3]["rtts"] == [12.0, None, 14.0] and english.hops[3]["latency_ms"] == 13.0
+
+    german = _parse("tracert_de.txt")
+    assert german.format == "tracert" and german.complete
+    assert german.target_ip == "93.184.216.34"
+    assert _summary(german) == [
+        (1, "192.168.178.1", False), (2, "62.155.1.1", False), (3, "*", True),
+        (4, "62.157.250.38", False), (5, "93.184.216.34", False),
+    ]
+    assert german.hops[1]["hostname"] == "p3e9bf001.dip0.t-ipconnect.de"
+    print("✓ Windows tracert OK")
+
+
+def test_pathping_statistics():
+    """The statistics section adds loss and latency to the route section's hops"""
+    for name, hops in (("pathping_en.txt", 3), ("pathping_de.txt", 2)):
+        parser = _parse(name)
+        assert parser.format == "pathping" and parser.complete
+        assert len(parser.hops) == hops  # Hop 0 (the local machine) is left out
+        assert parser.hops[1]["loss"] in (2.0, 1.0) and parser.hops[1]["sent"] == 100
+    english = _parse("pathping_en.txt")
+    assert english.hops[0]["hostname"] == "gw.corp.local" and english.hops[0]["latency_ms"] == 1.0
+    assert english.hops[2]["timeout"] and english.hops[2]["loss"] == 100.0
+    print("✓ pathping statistics OK")
+
+
+def test_linux_traceroute():
+    """Every responder of a hop is kept, with names, annotations and partial answers"""
+    parser = _parse("traceroute_linux.txt")
+    assert parser.format == "traceroute"
+    hops = parser.hops
+    assert hops[0]["hostname"] == "_gateway" and hops[0]["latency_ms"] == 0.49
+    assert hops[1]["hostname"] is None  # Name equal to the address
+    assert hops[2]["timeout"] and hops[2]["rtts"] == [None, None, None]
+    assert hops[3]["responders"] == ["62.115.0.1", "62.115.0.5"]
+    assert hops[4]["ip"] == "198.51.100.7" and hops[4]["rtts"] == [None, 18.4, None]
+    assert hops[5]["flags"] == ["!H"]
+
+    numeric = _parse("traceroute_numeric.txt")
+    assert numeric.hops[1]["responders"] == ["100.64.0.1", "100.64.0.2"]
+    assert numeric.hops[-1]["ip"] == "8.8.8.8"
+    print("✓ Linux traceroute OK")
+
+
+def test_mtr_report_and_json():
+    """mtr text and JSON reports give the same hops"""
+    report = _parse("mtr_report.txt")
+    assert report.format == "mtr"
+    assert report.hops[2]["timeout"] and report.hops[2]["loss"] == 100.0
+    assert report.hops[3]["responders"] == ["62.115.0.1", "62.115.0.5"]
+    assert report.hops[3]["loss"] == 10.0 and report.hops[3]["latency_ms"] == 12.9
+
+    as_json = _parse("mtr.json")
+    assert as_json.target == "example.com"
+    assert _summary(as_json) == [
+        (1, "192.168.1.1", False), (2, "10.64.0.1", False), (3, "*", True), (4, "93.184.216.34", False),
+    ]
+    assert as_json.hops[1]["sent"] == 10
+    print("✓ mtr report and JSON OK")
+
+
+def test_streaming_and_wrappers():
+    """Lines fed one by one give the same hops; the old entry points use the parser"""
+    text = (CORPUS / "pathping_en.txt").read_text(encoding="utf-8")
+    parser = TraceParser()
+    first_seen = []
+    for line in text.splitlines():
+        hop = parser.feed(line)
+        if hop and hop["hop"] not in first_seen:
+            first_seen.append(hop["hop"])
+    assert first_seen == [1, 2, 3]
+    assert _summary(parser) == _summary(TraceParser.parse(text))
+
+    assert TracerouteManager.parse_hop_line("Tracing route to example.com [93.184.216.34]") is None
+    assert [hop["number"] for hop in Traceroute.parse_traceroute_output(text)] == [1, 2, 3]
+    print("✓ Streaming and wrappers OK")
+
+
+def test_corpus_benchmark():
+    """Single-pass parsing of the whole corpus (throughput printed, not asserted)"""
+    texts = [path.read_text(encoding="utf-8") for path in sorted(CORPUS.iterdir())]
+    lines = sum(len(text.splitlines()) for text in texts)
+    rounds = 200
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            TraceParser.parse(text)
+    elapsed = time.perf_counter() - start
+    # Reported only: throughput depends on the machine
+    rate = lines * rounds / elapsed
+    print(f"✓ Corpus benchmark OK ({len(texts)} files, {rate:,.0f} lines/s)")
+
+
+if __name__ == "__main__":
+    test_windows_tracert()
+    test_pathping_statistics()
+    test_linux_traceroute()
+    test_mtr_report_and_json()
+    test_streaming_and_wrappers()
+    test_corpus_benchmark()
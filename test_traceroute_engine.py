@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the built-in parallel-TTL traceroute engine
+"""
+
+import socket
+import struct
+
+from tools.icmp import ICMP_TIME_EXCEEDED, build_echo_request
+from tools.traceroute import Traceroute
+from tools.traceroute_engine import TracerouteEngine, parse_quoted
+
+
+def _ip_header(dst_ip, proto):
+    """Minimal IPv4 header as quoted in ICMP errors"""
+    return struct.pack("!BBHHHBBH4s4s", 0x45, 0, 0, 0, 0, 1, proto, 0,
+                       socket.inet_aton("10.0.0.2"), socket.inet_aton(dst_ip))
+
+
+def test_match_time_exceeded():
+    """Time-exceeded replies are matched to the probe they quote"""
+    engine = TracerouteEngine(method="udp")
+    engine._destinations = {"192.0.2.10"}
+    engine._src_port = 40000
+
+    quoted = _ip_header("192.0.2.10", socket.IPPROTO_UDP) + struct.pack("!HHHH", 40000, 33440, 20, 0)
+    assert parse_quoted(quoted)["dst_ip"] == "192.0.2.10"
+    message = {"type": ICMP_TIME_EXCEEDED, "code": 0, "id": 0, "seq": 0, "quoted": quoted}
+    assert engine._match_icmp("10.0.0.1", message) == ("192.0.2.10", 33440, False)
+
+    # Another process's probe (different source port) is ignored
+    other = _ip_header("192.0.2.10", socket.IPPROTO_UDP) + struct.pack("!HHHH", 40001, 33440, 20, 0)
+    assert engine._match_icmp("10.0.0.1", dict(message, quoted=other)) is None
+
+    engine = TracerouteEngine(method="icmp")
+    engine._destinations = {"192.0.2.10"}
+    quoted = _ip_header("192.0.2.10", socket.IPPROTO_ICMP) + build_echo_request(engine._identifier, 7)
+    message = {"type": ICMP_TIME_EXCEEDED, "code": 0, "id": 0, "seq": 0, "quoted": quoted}
+    assert engine._match_icmp("10.0.0.1", message) == ("192.0.2.10", 7, False)
+    print("✓ Time-exceeded matching OK")
+
+
+def test_format_output():
+    """Traces are formatted like tracert so existing parsers understand them"""
+    hops = [
+        TracerouteEngine._make_hop(1, [0.5, 1.4, 2.0], ["10.0.0.1"] * 3, False),
+        TracerouteEngine._make_hop(2, [None, None, None], [None] * 3, False),
+        TracerouteEngine._make_hop(3, [12.0, None, 14.0], ["192.0.2.10", None, "192.0.2.10"], True),
+    ]
+    assert hops[1]["timeout"] and hops[1]["ip"] == "*"
+    assert hops[2]["latency_ms"] == 13.0
+    result = {"target": "example", "ip": "192.0.2.10", "hops": hops, "reached": True}
+    output = TracerouteEngine.format_output(result, 30)
+    assert "<1 ms" in output and "Request timed out." in output and "Trace complete." in output
+    parsed = Traceroute.parse_traceroute_output(output)
+    assert [hop["number"] for hop in parsed] == [1, 2, 3]
+    print("✓ Output formatting OK")
+
+
+def test_loopback_trace():
+    """A trace to localhost ends at hop 1 for every probe method"""
+    if not TracerouteEngine.is_available():
+        print("⚠ Raw sockets not available (needs root) - skipping loopback trace")
+        return
+    for method in ("udp", "icmp", "tcp"):
+        if not TracerouteEngine.is_available(method):
+            continue
+        result = TracerouteEngine(max_hops=10, timeout=1.0, method=method, resolve=False).trace("127.0.0.1")
+        assert result["reached"], method
+        assert len(result["hops"]) == 1
+        assert result["hops"][0]["ip"] == "127.0.0.1"
+        assert all(rtt is not None for rtt in result["hops"][0]["rtts"])
+        # Stops on the destination's reply instead of waiting for the timeout
+        assert result["duration"] < 0.5, result["duration"]
+    print("✓ Loopback trace OK")
+
+
+if __name__ == "__main__":
+    test_match_time_exceeded()
+    test_format_output()
+    test_loopback_trace()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script for the indexed traceroute history and route-change timeline
+"""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from tools.traceroute_manager import TracerouteManager
+
+
+def _record(manager, target, ips, latency, timestamp):
+    """Save a trace whose last hop has the given latency"""
+    trace = manager.start_trace(target)
+    trace["timestamp"] = timestamp
+    for number, ip in enumerate(ips, 1):
+        manager.add_hop(trace, {
+            "hop": number,
+            "ip": ip,
+            "latency_ms": None if ip == "*" else (latency if number == len(ips) else 1.0),
+            "timeout": ip == "*",
+        })
+    return manager.finish_trace(trace, "", True)
+
+
+def _manager(tmp):
+    with mock.patch.object(Path, "home", return_value=Path(tmp)):
+        return TracerouteManager()
+
+
+ROUTE_A = ["10.0.0.1", "10.1.0.1", "192.0.2.1"]
+ROUTE_B = ["10.0.0.1", "10.2.0.1", "192.0.2.1"]
+
+
+def test_timeline_detects_changes():
+    """Route flips, flips back and latency shifts are recorded as traces arrive"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _manager(tmp)
+        history = [
+            (ROUTE_A, 20.0), (ROUTE_A, 21.0), (["10.0.0.1", "*", "192.0.2.1"], 20.0),
+            (ROUTE_B, 35.0), (ROUTE_B, 36.0), (ROUTE_A, 20.0), (ROUTE_A, 45.0),
+        ]
+        for n, (ips, latency) in enumerate(history):
+            _record(manager, "dc.example", ips, latency, f"2026-01-01T10:0{n}:00")
+        _record(manager, "other.example", ROUTE_A, 5.0, "2026-01-01T10:00:30")
+
+        timeline = manager.get_timeline("DC.example")
+        assert [entry["route"] for entry in timeline] == [1, 1, 1, 2, 2, 1, 1]
+        # A silent hop is not a route change
+        assert timeline[2]["events"] == []
+        change = timeline[3]["events"][0]
+        assert change["type"] == "route_change" and (change["from_route"], change["to_route"]) == (1, 2)
+        assert change["hops"] == [{"hop": 2, "before": "10.1.0.1", "after": "10.2.0.1"}]
+        assert timeline[5]["events"][0]["to_route"] == 1
+        # A new route starts a new baseline, so 36 ms after 35 ms is no shift
+        assert timeline[4]["events"] == []
+        shift = timeline[6]["events"][0]
+        assert shift["type"] == "latency_shift" and shift["before"] == 20.0 and shift["delta_ms"] == 25.0
+
+        changes = manager.get_timeline("dc.example", changes_only=True)
+        assert [entry["timestamp"][11:16] for entry in changes] == ["10:03", "10:05", "10:06"]
+        window = manager.get_timeline("dc.example", start="2026-01-01T10:02", end="2026-01-01T10:04:00")
+        assert len(window) == 3
+        assert manager.get_targets() == ["dc.example", "other.example"]
+        assert len(manager.get_traces("dc.example")) == 7
+    print("✓ Timeline change detection OK")
+
+
+def test_index_survives_reload_and_pruning():
+    """IDs stay unique, lookups are indexed and old traces leave the index"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _manager(tmp)
+        ids = [_record(manager, "dc.example", ROUTE_A, 20.0, f"2026-01-01T10:0{n}:00") for n in range(3)]
+        assert len(set(ids)) == 3  # Created within the same second
+        manager.max_traces = 3
+        ids += [_record(manager, "dc.example", ROUTE_A, 20.0, f"2026-01-01T10:0{n}:00") for n in (3, 4)]
+
+        assert manager.get_trace_by_id(ids[0]) is None
+        assert manager.get_trace_by_id(ids[-1])["id"] == ids[-1]
+        assert len(manager.get_timeline("dc.example")) == 3
+
+        reloaded = _manager(tmp)
+        assert [entry["id"] for entry in reloaded.get_timeline("dc.example")] == ids[2:]
+        reloaded.delete_trace(ids[2])
+        assert reloaded.get_trace_by_id(ids[2]) is None
+        assert len(reloaded.get_timeline("dc.example")) == 2
+        reloaded.clear_all_traces()
+        assert reloaded.get_targets() == []
+    print("✓ Index reload and pruning OK")
+
+
+def test_traces_saved_one_file_each():
+    """Saving a trace writes only its own file; the old single-file history is migrated"""
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = [{"id": "20250101_090000", "target": "dc.example", "timestamp": "2025-01-01T09:00:00",
+                   "success": True, "hops": [{"hop": 1, "ip": "10.0.0.1", "latency_ms": 1.0}]}]
+        (Path(tmp) / ".nettools").mkdir()
+        (Path(tmp) / ".nettools" / "traceroutes.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+        manager = _manager(tmp)
+        assert not manager.traces_file.exists()
+        assert manager.get_trace_by_id("20250101_090000")["target"] == "dc.example"
+
+        first = _record(manager, "dc.example", ROUTE_A, 20.0, "2026-01-01T10:00:00")
+        mtime = (manager.traces_dir / f"{first}.json").stat().st_mtime_ns
+        second = _record(manager, "dc.example", ROUTE_A, 21.0, "2026-01-01T10:01:00")
+        assert (manager.traces_dir / f"{first}.json").stat().st_mtime_ns == mtime
+        assert sorted(p.stem for p in manager.traces_dir.iterdir()) == sorted(
+            ["20250101_090000", first, second])
+
+        manager.delete_trace(first)
+        assert not (manager.traces_dir / f"{first}.json").exists()
+        reloaded = _manager(tmp)
+        assert [t["id"] for t in reloaded.get_traces()] == [second, "20250101_090000"]
+        reloaded.clear_all_traces()
+        assert list(reloaded.traces_dir.iterdir()) == []
+    print("✓ One file per trace OK")
+
+
+def test_delete_recomputes_later_events():
+    """Deleting a trace re-derives the route changes of the traces after it, on disk too"""
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = _manager(tmp)
+        first = _record(manager, "dc.example", ROUTE_A, 20.0, "2026-01-01T10:00:00")
+        middle = _record(manager, "dc.example", ROUTE_B, 20.0, "2026-01-01T10:01:00")
+        last = _record(manager, "dc.example", ROUTE_A, 20.0, "2026-01-01T10:02:00")
+        assert manager.get_trace_by_id(last)["events"][0]["type"] == "route_change"
+
+        manager.delete_trace(middle)
+        assert [entry["route"] for entry in manager.get_timeline("dc.example")] == [1, 1]
+        assert manager.get_trace_by_id(last)["events"] == []
+
+        saved = json.loads((manager.traces_dir / f"{last}.json").read_text(encoding="utf-8"))
+        assert saved["events"] == [] and saved["route"] == 1
+        reloaded = _manager(tmp)
+        assert reloaded.get_timeline("dc.example") == manager.get_timeline("dc.example")
+        assert reloaded.get_trace_by_id(first)["events"] == []
+    print("✓ Delete recomputes later events OK")
+
+
+if __name__ == "__main__":
+    test_timeline_detects_changes()
+    test_index_survives_reload_and_pruning()
+    test_traces_saved_one_file_each()
+    test_delete_recomputes_later_events()
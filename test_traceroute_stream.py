@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming hop-by-hop traceroute results
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+from tools.traceroute import Traceroute, TraceStream
+from tools.traceroute_manager import TracerouteManager
+
+
+# Prints a tracert-style trace slowly, like a real tool waiting on timeouts
+FAKE_TRACERT = r"""
+import sys, time
+print("Tracing route to example.com [192.0.2.10]", flush=True)
+print("over a maximum of 30 hops:", flush=True)
+print("", flush=True)
+for hop in range(1, 6):
+    print(f"  {hop}     {hop} ms     {hop} ms     {hop} ms  10.0.0.{hop}", flush=True)
+    time.sleep(0.3)
+print("Trace complete.", flush=True)
+"""
+
+
+def _fake_command(target, max_hops=30, tool="tracert"):
+    return [sys.executable, "-c", FAKE_TRACERT]
+
+
+def test_hops_stream_before_exit():
+    """Hops arrive while the process is still running"""
+    with mock.patch.object(Traceroute, "build_command", staticmethod(_fake_command)):
+        lines = []
+        stream = TraceStream("example.com", tool="tracert", on_line=lines.append)
+        start = time.monotonic()
+        arrivals = []
+        for hop in stream:
+            arrivals.append((hop["hop"], time.monotonic() - start))
+
+    assert [number for number, _ in arrivals] == [1, 2, 3, 4, 5]
+    # The first hop is seen long before the process finishes
+    assert arrivals[0][1] < arrivals[-1][1] - 0.8
+    assert stream.success and stream.return_code == 0
+    assert lines[0].startswith("Tracing route") and "Trace complete." in stream.output
+    print("✓ Hops streamed before exit OK")
+
+
+def test_cancel_kills_process():
+    """Cancelling ends the iteration and kills the tool at once"""
+    with mock.patch.object(Traceroute, "build_command", staticmethod(_fake_command)):
+        stream = TraceStream("example.com", tool="tracert")
+        hops = []
+        for hop in stream:
+            hops.append(hop)
+            if len(hops) == 2:
+                threading.Thread(target=stream.cancel).start()
+                cancelled_at = time.monotonic()
+
+    assert time.monotonic() - cancelled_at < 0.5
+    assert len(hops) < 5
+    assert stream.cancelled and not stream.success
+    assert stream._process.poll() is not None
+    print("✓ Cancel kills process OK")
+
+
+def test_manager_records_streamed_hops():
+    """TracerouteManager builds a trace from streamed hops"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with mock.patch.object(Path, "home", return_value=Path(tmp)):
+            manager = TracerouteManager()
+        with mock.patch.object(Traceroute, "build_command", staticmethod(_fake_command)):
+            stream = TraceStream("example.com", tool="tracert")
+            trace = manager.start_trace("example.com")
+            for hop in stream:
+                manager.add_hop(trace, hop)
+        trace_id = manager.finish_trace(trace, stream.output, stream.success)
+
+        saved = manager.get_trace_by_id(trace_id)
+        assert [hop["ip"] for hop in saved["hops"]] == [f"10.0.0.{n}" for n in range(1, 6)]
+        assert saved["summary"]["total_hops"] == 5
+        assert saved["summary"]["avg_latency"] == 3.0
+        assert os.path.exists(manager.traces_dir / f"{trace_id}.json")
+    print("✓ Manager records streamed hops OK")
+
+
+def test_pathping_statistics_reach_history():
+    """Loss and latency from pathping's statistics section end up in the saved trace"""
+    corpus = Path(__file__).parent / "tests" / "trace_corpus" / "pathping_en.txt"
+
+    def pathping_command(target, max_hops=30, tool="pathping"):
+        return [sys.executable, "-c", f"print(open({str(corpus)!r}, encoding='utf-8').read(), end='')"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with mock.patch.object(Path, "home", return_value=Path(tmp)):
+            manager = TracerouteManager()
+        with mock.patch.object(Traceroute, "build_command", staticmethod(pathping_command)):
+            stream = TraceStream("example.com", tool="pathping")
+            trace = manager.start_trace("example.com")
+            for hop in stream:
+                manager.add_hop(trace, hop)
+        manager.sync_hops(trace, stream.hops)
+        trace_id = manager.finish_trace(trace, stream.output, stream.success)
+
+        saved = manager.get_trace_by_id(trace_id)["hops"]
+        assert [hop.get("loss") for hop in saved] == [0.0, 2.0, 100.0]
+        assert [hop["latency_ms"] for hop in saved[:2]] == [1.0, 4.0]
+    print("✓ pathping statistics reach history OK")
+
+
+if __name__ == "__main__":
+    test_hops_stream_before_exit()
+    test_cancel_kills_process()
+    test_manager_records_streamed_hops()
+    test_pathping_statistics_reach_history()
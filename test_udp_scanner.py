@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script for the UDP port scanner
+"""
+
+import errno
+import socket
+import threading
+import time
+from unittest import mock
+
+from tools.port_scanner import PortScanner
+from tools.rate_limiter import RateLimiter
+from tools.udp_scanner import UDPScanner
+
+
+def _free_udp_port():
+    """Find a UDP port with nothing listening on it"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_payloads():
+    """Test that well-known ports get protocol-specific payloads"""
+    assert len(UDPScanner.get_payload(123)) == 48
+    assert UDPScanner.get_payload(123)[0] == 0x1b
+    assert UDPScanner.get_payload(161)[0] == 0x30
+    assert UDPScanner.get_payload(53)[4:6] == b"\x00\x01"
+    assert UDPScanner.get_payload(40000) == b""
+    print("✓ UDP payloads OK")
+
+
+def test_udp_scan_loopback():
+    """Test open, closed and silent UDP ports on loopback"""
+    echo = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    echo.bind(("127.0.0.1", 0))
+    echo.settimeout(0.2)
+    open_port = echo.getsockname()[1]
+
+    silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    silent.bind(("127.0.0.1", 0))
+    silent_port = silent.getsockname()[1]
+
+    closed_port = _free_udp_port()
+    running = True
+
+    def serve():
+        while running:
+            try:
+                data, addr = echo.recvfrom(4096)
+                echo.sendto(b"pong", addr)
+            except socket.timeout:
+                continue
+
+    server = threading.Thread(target=serve, daemon=True)
+    server.start()
+
+    try:
+        scanner = UDPScanner(timeout=0.3, retries=1, rate=0)
+        results = scanner.scan("127.0.0.1", [open_port, closed_port, silent_port])
+    finally:
+        running = False
+        server.join()
+        echo.close()
+        silent.close()
+
+    by_port = {r["port"]: r for r in results}
+    assert by_port[open_port]["status"] == "Open"
+    assert by_port[open_port]["is_open"] is True
+    assert by_port[closed_port]["status"] == "Closed"
+    assert by_port[silent_port]["status"] == "Open|Filtered"
+    assert by_port[silent_port]["is_open"] is False
+    print("✓ Loopback UDP scan OK")
+
+
+def test_connect_error_fails_only_its_port():
+    """A port whose connect() fails is reported and its socket closed; the scan goes on"""
+    closed_port = _free_udp_port()
+    created = []
+
+    class FailingSocket(socket.socket):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self)
+
+        def connect(self, address):
+            if address[1] == 9:
+                raise OSError(errno.EACCES, "Permission denied")
+            return super().connect(address)
+
+    scanner = UDPScanner(timeout=0.2, retries=0, rate=0)
+    with mock.patch("tools.udp_scanner.socket.socket", FailingSocket):
+        results = scanner.scan("127.0.0.1", [9, closed_port])
+
+    by_port = {r["port"]: r["status"] for r in results}
+    assert by_port == {9: "Filtered", closed_port: "Closed"}
+    assert all(sock.fileno() == -1 for sock in created)
+    print("✓ Connect error handled per port OK")
+
+
+def test_rate_limiter():
+    """Test token bucket pacing"""
+    limiter = RateLimiter(100, burst=5)
+    start = time.monotonic()
+    for _ in range(25):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+    assert elapsed >= 0.15, elapsed
+
+    assert RateLimiter(0).try_acquire() == 0.0
+    print(f"✓ Rate limiter OK ({elapsed:.2f}s for 25 tokens at 100/s)")
+
+
+def test_refused_retransmit_waits_for_budget():
+    """A retransmit refused by the limiter is retried when a token is due, not in a spin"""
+    silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    silent.bind(("127.0.0.1", 0))
+
+    class StingyLimiter:
+        """Allows the first probe, then makes every retransmit wait 0.2 s"""
+        calls = 0
+
+        def try_acquire(self, tokens=1):
+            self.calls += 1
+            return 0.0 if self.calls == 1 else 0.2
+
+    limiter = StingyLimiter()
+    scanner = UDPScanner(timeout=0.05, retries=1, rate_limiter=limiter)
+    deadline = time.monotonic() + 0.5
+    try:
+        scanner.scan("127.0.0.1", [silent.getsockname()[1]],
+                     cancel_check=lambda: time.monotonic() > deadline)
+    finally:
+        silent.close()
+    # One call per 0.2 s wait, instead of one per loop pass
+    assert limiter.calls <= 5, limiter.calls
+    print(f"✓ Refused retransmit waits ({limiter.calls} limiter calls)")
+
+
+def test_port_scanner_shares_one_limiter():
+    """Every PortScanner SYN/UDP scan draws from the same process-wide budget"""
+    with mock.patch.object(UDPScanner, "scan", autospec=True, return_value=[]) as scan:
+        PortScanner.scan_ports("127.0.0.1", [53], method="udp")
+        PortScanner.scan_ports("127.0.0.1", [161], method="udp")
+    engines = [call.args[0] for call in scan.call_args_list]
+    assert all(engine.rate_limiter is PortScanner.RATE_LIMITER for engine in engines)
+    print("✓ Shared rate limiter OK")
+
+
+if __name__ == "__main__":
+    test_payloads()
+    test_udp_scan_loopback()
+    test_connect_error_fails_only_its_port()
+    test_rate_limiter()
+    test_refused_retransmit_waits_for_budget()
+    test_port_scanner_shares_one_limiter()
@@ -12,10 +12,20 @@ from .scan_manager import ScanManager
 from .network_profile_manager import NetworkProfileManager
 from .history_manager import HistoryManager
 from .network_icon import NetworkIcon
+from .port_state_cache import PortStateCache
+from .monitor_store import MonitorStore
+from .alert_engine import AlertEngine
+from .host_groups import HostGroups
+from .metrics_exporter import MetricsExporter
+from .asn_lookup import ASNLookup
 
 # Tool modules
 from .port_scanner import PortScanner
+from .syn_scanner import SYNScanner
+from .udp_scanner import UDPScanner
+from .discovery_pipeline import DiscoveryPipeline
 from .dns_lookup import DNSLookup
+from .dns_resolver import DNSResolver
 from .subnet_calculator import SubnetCalculator
 from .traceroute import Traceroute
 from .phpipam_tool import PHPIPAMTool
@@ -30,9 +40,19 @@ __all__ = [
     'NetworkProfileManager',
     'HistoryManager',
     'NetworkIcon',
+    'PortStateCache',
+    'MonitorStore',
+    'AlertEngine',
+    'HostGroups',
+    'MetricsExporter',
+    'ASNLookup',
     # Tools
     'PortScanner',
+    'SYNScanner',
+    'UDPScanner',
+    'DiscoveryPipeline',
     'DNSLookup',
+    'DNSResolver',
     'SubnetCalculator',
     'Traceroute',
     'PHPIPAMTool',
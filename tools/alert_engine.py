@@ -0,0 +1,272 @@
+"""
+Alert Engine Module
+Threshold rules evaluated incrementally on every monitor sample, with
+hysteresis, raising events to subscribers and an optional local webhook
+"""
+
+import bisect
+import json
+import queue
+import threading
+import urllib.request
+from collections import deque
+
+
+class AlertRule:
+    """Base class for per-host alert rules
+
+    Subclasses keep whatever per-host state they need and implement
+    check(), which is called once per sample and must be O(1) or O(window).
+    Hysteresis is applied by the engine: a rule must breach trigger_count
+    samples in a row to raise, and pass clear_count samples in a row to clear.
+    """
+
+    def __init__(self, name, severity="warning", trigger_count=1, clear_count=3):
+        """
+        Initialize rule
+
+        Args:
+            name (str): Rule name shown in events
+            severity (str): "warning" or "critical"
+            trigger_count (int): Consecutive breaching samples to raise
+            clear_count (int): Consecutive passing samples to clear
+        """
+        self.name = name
+        self.severity = severity
+        self.trigger_count = trigger_count
+        self.clear_count = clear_count
+
+    def check(self, host, rtt):
+        """
+        Update state with one sample
+
+        Args:
+            host (str): Host IP
+            rtt (float): Round-trip time in ms, or None for a lost probe
+
+        Returns:
+            tuple: (breached, current value, message)
+        """
+        raise NotImplementedError
+
+    def forget(self, host):
+        """Drop state kept for a host"""
+
+
+class ConsecutiveFailureRule(AlertRule):
+    """Breach after N lost probes in a row"""
+
+    def __init__(self, failures=3, **kwargs):
+        kwargs.setdefault("severity", "critical")
+        kwargs.setdefault("clear_count", 2)
+        super().__init__(f"{failures} consecutive failures", **kwargs)
+        self.failures = failures
+        self._streaks = {}
+
+    def check(self, host, rtt):
+        streak = self._streaks.get(host, 0) + 1 if rtt is None else 0
+        self._streaks[host] = streak
+        return streak >= self.failures, streak, f"{streak} probes lost in a row"
+
+    def forget(self, host):
+        self._streaks.pop(host, None)
+
+
+class PacketLossRule(AlertRule):
+    """Breach when loss over the last N samples exceeds a percentage"""
+
+    def __init__(self, max_loss=20.0, window=20, **kwargs):
+        kwargs.setdefault("clear_count", window // 2)
+        super().__init__(f"Loss > {max_loss:g}% over {window} probes", **kwargs)
+        self.max_loss = max_loss
+        self.window = window
+        self._windows = {}  # {host: [deque of lost flags, lost count]}
+
+    def check(self, host, rtt):
+        state = self._windows.setdefault(host, [deque(), 0])
+        samples = state[0]
+        lost = rtt is None
+        samples.append(lost)
+        state[1] += lost
+        if len(samples) > self.window:
+            state[1] -= samples.popleft()
+        loss = state[1] / len(samples) * 100
+        # Judge only full windows so a single early loss is not 100%
+        breached = len(samples) == self.window and loss > self.max_loss
+        return breached, loss, f"{loss:.0f}% loss over last {len(samples)} probes"
+
+    def forget(self, host):
+        self._windows.pop(host, None)
+
+
+class LatencyPercentileRule(AlertRule):
+    """Breach when a latency percentile over the last N replies exceeds a limit"""
+
+    def __init__(self, percentile=95, threshold=500.0, window=30, **kwargs):
+        kwargs.setdefault("trigger_count", 3)
+        kwargs.setdefault("clear_count", 5)
+        super().__init__(f"p{percentile} > {threshold:g} ms", **kwargs)
+        self.percentile = percentile
+        self.threshold = threshold
+        self.window = window
+        self._windows = {}  # {host: (deque in arrival order, sorted list)}
+
+    def check(self, host, rtt):
+        arrival, ordered = self._windows.setdefault(host, (deque(), []))
+        if rtt is not None:
+            arrival.append(rtt)
+            bisect.insort(ordered, rtt)
+            if len(arrival) > self.window:
+                del ordered[bisect.bisect_left(ordered, arrival.popleft())]
+        if not ordered:
+            return False, None, "no replies"
+        value = ordered[int(self.percentile / 100 * (len(ordered) - 1))]
+        return value > self.threshold, value, f"p{self.percentile} latency {value:.0f} ms"
+
+    def forget(self, host):
+        self._windows.pop(host, None)
+
+
+class AlertEngine:
+    """Evaluates alert rules per sample and publishes raise/clear events
+
+    Events are dicts with type ("raised" or "cleared"), rule, severity,
+    host, value, message and time. Subscribers are called on the thread
+    that delivered the sample, so UI code should hand events to its own
+    thread.
+    """
+
+    def __init__(self, rules=None, webhook_url=None):
+        """
+        Initialize alert engine
+
+        Args:
+            rules (list): AlertRule instances (default_rules() if None)
+            webhook_url (str): Optional URL that receives each event as a JSON POST
+        """
+        self.rules = self.default_rules() if rules is None else rules
+        self.webhook_url = webhook_url
+        self._subscribers = []
+        self._states = {}  # {(rule index, host): [active, breach streak, pass streak]}
+        self._lock = threading.Lock()
+        self._webhook_queue = None
+
+    @staticmethod
+    def default_rules():
+        """Rules used when none are given"""
+        return [
+            ConsecutiveFailureRule(failures=3),
+            PacketLossRule(max_loss=20.0, window=20),
+            LatencyPercentileRule(percentile=95, threshold=500.0, window=30),
+        ]
+
+    def subscribe(self, callback):
+        """Register callback(event)"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Remove a registered callback"""
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def process(self, host, t, rtt):
+        """
+        Evaluate every rule for one sample
+
+        Args:
+            host (str): Host IP
+            t (float): Sample time (epoch seconds)
+            rtt (float): Round-trip time in ms, or None for a lost probe
+
+        Returns:
+            list: Events raised or cleared by this sample
+        """
+        events = []
+        with self._lock:
+            for index, rule in enumerate(self.rules):
+                breached, value, message = rule.check(host, rtt)
+                state = self._states.setdefault((index, host), [False, 0, 0])
+                if breached:
+                    state[1] += 1
+                    state[2] = 0
+                else:
+                    state[2] += 1
+                    state[1] = 0
+
+                if not state[0] and state[1] >= rule.trigger_count:
+                    state[0] = True
+                    events.append(self._event("raised", rule, host, value, message, t))
+                elif state[0] and state[2] >= rule.clear_count:
+                    state[0] = False
+                    events.append(self._event("cleared", rule, host, value, message, t))
+
+        for event in events:
+            self._publish(event)
+        return events
+
+    def get_active(self, host=None):
+        """
+        Get currently raised alerts
+
+        Args:
+            host (str): Only this host (all if None)
+
+        Returns:
+            list: (host, rule name, severity) tuples
+        """
+        with self._lock:
+            return [
+                (state_host, self.rules[index].name, self.rules[index].severity)
+                for (index, state_host), state in self._states.items()
+                if state[0] and (host is None or state_host == host)
+            ]
+
+    def forget(self, host):
+        """Drop all state for a host (e.g. when it is removed)"""
+        with self._lock:
+            for rule in self.rules:
+                rule.forget(host)
+            for key in [key for key in self._states if key[1] == host]:
+                del self._states[key]
+
+    def _event(self, event_type, rule, host, value, message, t):
+        """Build an event dict"""
+        return {
+            "type": event_type,
+            "rule": rule.name,
+            "severity": rule.severity,
+            "host": host,
+            "value": value,
+            "message": message,
+            "time": t,
+        }
+
+    def _publish(self, event):
+        """Deliver an event to subscribers and the webhook"""
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in alert subscriber: {e}")
+
+        if self.webhook_url:
+            with self._lock:
+                if self._webhook_queue is None:
+                    self._webhook_queue = queue.SimpleQueue()
+                    threading.Thread(target=self._run_webhook, daemon=True).start()
+            self._webhook_queue.put(event)
+
+    def _run_webhook(self):
+        """Post events to the webhook without blocking the monitor loop"""
+        while True:
+            event = self._webhook_queue.get()
+            try:
+                request = urllib.request.Request(
+                    self.webhook_url,
+                    data=json.dumps(event).encode(),
+                    headers={"Content-Type": "application/json"},
+                    method="POST"
+                )
+                urllib.request.urlopen(request, timeout=5).close()
+            except Exception as e:
+                print(f"Error posting alert to webhook: {e}")
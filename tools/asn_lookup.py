@@ -0,0 +1,357 @@
+"""
+ASN Lookup Module
+Offline IP-to-ASN/organisation lookup from a local prefix table
+"""
+
+import bisect
+import ipaddress
+import json
+import socket
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+
+class ASNLookup:
+    """IPv4 address ownership lookup without network traffic
+
+    The table is three parallel sorted uint32 arrays (range start, range
+    end, owner index) over non-overlapping ranges, so a lookup is one
+    binary search. Owners (ASN, country, organisation) are stored once
+    and shared by all their ranges. Nested prefixes are flattened when
+    the table is built: the most specific prefix wins, and of equal
+    prefixes the one loaded last, so an update file overrides the
+    bundled table.
+    """
+
+    MAGIC = b"NTASN1"
+
+    _default = None
+
+    def __init__(self, starts=None, ends=None, owner_ids=None, owners=None):
+        """
+        Initialize table
+
+        Args:
+            starts (array): First address of each range, ascending
+            ends (array): Last address of each range
+            owner_ids (array): Index into owners of each range
+            owners (list): (asn, country, organisation) tuples
+        """
+        self.starts = starts if starts is not None else array("I")
+        self.ends = ends if ends is not None else array("I")
+        self.owner_ids = owner_ids if owner_ids is not None else array("I")
+        self.owners = owners if owners is not None else []
+
+    def __len__(self):
+        return len(self.starts)
+
+    @staticmethod
+    def user_table_path():
+        """Location of the table imported by the user"""
+        return Path.home() / ".nettools" / "asn_table.bin"
+
+    @staticmethod
+    def bundled_table_path():
+        """Location of the table shipped with NetTools"""
+        if getattr(sys, 'frozen', False):
+            # Running as compiled executable
+            bundle_dir = Path(sys._MEIPASS)
+        else:
+            # Running as script
+            bundle_dir = Path(__file__).parent.parent
+        return bundle_dir / "asn_database.csv"
+
+    @classmethod
+    def default(cls):
+        """
+        Shared table: the user's imported table, or the bundled one
+
+        Returns:
+            ASNLookup: Loaded table (empty if neither can be read)
+        """
+        if cls._default is None:
+            table = None
+            try:
+                if cls.user_table_path().exists():
+                    table = cls.load(cls.user_table_path())
+                elif cls.bundled_table_path().exists():
+                    table = cls.from_file(cls.bundled_table_path())
+            except (OSError, ValueError) as e:
+                print(f"Could not load ASN table: {e}")
+            cls._default = table if table is not None else cls()
+        return cls._default
+
+    @classmethod
+    def update(cls, path, merge=True):
+        """
+        Import a CSV/TSV prefix list as the user's table
+
+        Args:
+            path (str): File to import (see from_file for the format)
+            merge (bool): Keep the current entries, overridden by the new file
+
+        Returns:
+            ASNLookup: New shared table
+
+        Raises:
+            OSError: If the file cannot be read or the table cannot be saved
+            ValueError: If the file contains no usable rows
+        """
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            rows = list(cls.parse_rows(f))
+        if not rows:
+            raise ValueError(f"No prefix rows found in {path}")
+        if merge:
+            rows = list(cls.default().rows()) + rows
+        table = cls.from_rows(rows)
+        table.save(cls.user_table_path())
+        cls._default = table
+        return table
+
+    @staticmethod
+    def parse_rows(lines):
+        """
+        Parse prefix list lines
+
+        Each line is a range followed by ASN, country and organisation,
+        separated by tabs or commas. The range is either a CIDR prefix or a
+        first and last address (the iptoasn.com TSV layout). The ASN may
+        carry an "AS" prefix. Comments (#), headers and unparsable lines
+        are skipped, as are ASN 0 ("not routed") ranges.
+
+        Args:
+            lines (iterable): Text lines
+
+        Yields:
+            tuple: (start, end, asn, country, organisation) with integer addresses
+        """
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = [field.strip().strip('"') for field in line.split('\t' if '\t' in line else ',')]
+            try:
+                if '/' in fields[0]:
+                    network = ipaddress.IPv4Network(fields[0], strict=False)
+                    start, end = int(network.network_address), int(network.broadcast_address)
+                    rest = fields[1:]
+                else:
+                    start = int(ipaddress.IPv4Address(fields[0]))
+                    end = int(ipaddress.IPv4Address(fields[1]))
+                    rest = fields[2:]
+                asn = int(rest[0].upper().removeprefix("AS"))
+            except (ValueError, IndexError):
+                continue
+            if asn == 0 or end < start:
+                continue
+            country = rest[1] if len(rest) > 1 else ""
+            # Organisation names may contain the delimiter
+            organisation = ",".join(rest[2:]) if len(rest) > 2 else ""
+            yield start, end, asn, country, organisation
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Build a table from a CSV/TSV prefix list
+
+        Args:
+            path (str): File to read (see parse_rows for the format)
+
+        Returns:
+            ASNLookup: New table
+        """
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return cls.from_rows(cls.parse_rows(f))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a table from (start, end, asn, country, organisation) rows
+
+        Args:
+            rows (iterable): Ranges in any order, possibly nested
+
+        Returns:
+            ASNLookup: New table with non-overlapping ranges
+        """
+        owners = []
+        owner_index = {}
+        ranges = []
+        for order, (start, end, asn, country, organisation) in enumerate(rows):
+            owner = (asn, country, organisation)
+            if owner not in owner_index:
+                owner_index[owner] = len(owners)
+                owners.append(owner)
+            ranges.append((start, -end, order, owner_index[owner]))
+
+        # Outer ranges sort before the ranges nested in them; of identical
+        # ranges the later row sorts last and wins
+        ranges.sort()
+        starts, ends, owner_ids = array("I"), array("I"), array("I")
+
+        def emit(first, last, owner):
+            if first > last:
+                return
+            if owner_ids and owner_ids[-1] == owner and ends[-1] + 1 == first:
+                ends[-1] = last  # Merge adjacent ranges of one owner
+                return
+            starts.append(first)
+            ends.append(last)
+            owner_ids.append(owner)
+
+        open_ranges = []  # (end, owner), innermost last
+        position = 0
+        for start, negative_end, _, owner in ranges:
+            while open_ranges and open_ranges[-1][0] < start:
+                end, enclosing = open_ranges.pop()
+                emit(position, end, enclosing)
+                position = max(position, end + 1)
+            if open_ranges:
+                emit(position, start - 1, open_ranges[-1][1])
+            open_ranges.append((-negative_end, owner))
+            position = start
+        while open_ranges:
+            end, enclosing = open_ranges.pop()
+            emit(position, end, enclosing)
+            position = max(position, end + 1)
+        return cls(starts, ends, owner_ids, owners)
+
+    def rows(self):
+        """
+        Ranges of the table as rows for from_rows
+
+        Yields:
+            tuple: (start, end, asn, country, organisation)
+        """
+        for start, end, owner in zip(self.starts, self.ends, self.owner_ids):
+            yield (start, end) + tuple(self.owners[owner])
+
+    def lookup(self, ip):
+        """
+        Find the owner of an address
+
+        Args:
+            ip (str): IPv4 address
+
+        Returns:
+            dict: asn, country, org and range ("first - last"), or None if
+                  the address is not in the table or is not IPv4
+        """
+        try:
+            address = struct.unpack("!I", socket.inet_aton(ip))[0]
+        except (OSError, TypeError):
+            return None
+        index = bisect.bisect_right(self.starts, address) - 1
+        if index < 0 or address > self.ends[index]:
+            return None
+        asn, country, organisation = self.owners[self.owner_ids[index]]
+        return {
+            "asn": asn,
+            "country": country,
+            "org": organisation,
+            "range": f"{ipaddress.IPv4Address(self.starts[index])} - {ipaddress.IPv4Address(self.ends[index])}",
+        }
+
+    def annotate(self, items, key="ip"):
+        """
+        Add asn and org to every dict whose address is in the table
+
+        Args:
+            items (list): Hop or host dicts
+            key (str): Field holding the address
+
+        Returns:
+            list: The same dicts
+        """
+        for item in items:
+            owner = self.lookup(item.get(key) or "")
+            if owner:
+                item["asn"] = owner["asn"]
+                item["org"] = owner["org"]
+        return items
+
+    @staticmethod
+    def as_path(hops):
+        """
+        Autonomous systems a trace passes through, in order
+
+        Args:
+            hops (list): Hop dicts annotated by annotate()
+
+        Returns:
+            list: {asn, org, first_hop, last_hop} dicts, consecutive hops
+                  of one AS merged; unannotated hops are skipped
+        """
+        path = []
+        for hop in hops:
+            if "asn" not in hop:
+                continue
+            if path and path[-1]["asn"] == hop["asn"]:
+                path[-1]["last_hop"] = hop["hop"]
+            else:
+                path.append({"asn": hop["asn"], "org": hop.get("org", ""),
+                             "first_hop": hop["hop"], "last_hop": hop["hop"]})
+        return path
+
+    @staticmethod
+    def describe(owner):
+        """Short label for a lookup result, e.g. "AS15169 Google LLC" """
+        if not owner:
+            return ""
+        return f"AS{owner['asn']} {owner['org']}".strip()
+
+    def save(self, path):
+        """
+        Write the table in its compact binary form
+
+        Args:
+            path (str): Destination file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        owners = json.dumps(self.owners).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(struct.pack("<II", len(self.starts), len(owners)))
+            for values in (self.starts, self.ends, self.owner_ids):
+                if sys.byteorder == "big":
+                    values = array("I", values)
+                    values.byteswap()
+                f.write(values.tobytes())
+            f.write(owners)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a table written by save
+
+        Args:
+            path (str): Table file
+
+        Returns:
+            ASNLookup: Loaded table
+
+        Raises:
+            ValueError: If the file is not a valid table
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(cls.MAGIC):
+            raise ValueError(f"{path} is not an ASN table")
+        offset = len(cls.MAGIC)
+        count, owners_size = struct.unpack_from("<II", data, offset)
+        offset += 8
+        arrays = []
+        for _ in range(3):
+            values = array("I")
+            values.frombytes(data[offset:offset + count * 4])
+            if sys.byteorder == "big":
+                values.byteswap()
+            arrays.append(values)
+            offset += count * 4
+        owners = [tuple(owner) for owner in json.loads(data[offset:offset + owners_size])]
+        if any(len(values) != count for values in arrays):
+            raise ValueError(f"{path} is truncated")
+        return cls(*arrays, owners)
@@ -0,0 +1,407 @@
+"""
+Batch Traceroute Module
+Traces many destinations concurrently over one socket set, reuses the
+upstream hops they share and merges the paths into a topology graph
+"""
+
+import json
+import select
+import socket
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .rate_limiter import RateLimiter
+from .traceroute_engine import METHOD_UDP, TracerouteEngine
+
+
+class TopologyGraph:
+    """Deduplicated graph of traced paths
+
+    Nodes are hop addresses (plus the local source), edges join consecutive
+    responding hops. Unanswered hops do not become nodes; the edge across
+    them records how many hops it spans. Edges carry the RTT to their far
+    end and the share of probes lost on the way.
+    """
+
+    SOURCE = "local"
+
+    def __init__(self):
+        """Initialize empty graph"""
+        self.nodes = {self.SOURCE: {"ttl": 0, "targets": set(), "rtt_sum": 0.0, "rtt_count": 0}}
+        self.edges = {}  # {(from, to): dict}
+
+    def add_path(self, target, hops):
+        """
+        Merge one traced path
+
+        Args:
+            target (str): Destination the path leads to
+            hops (list): Hop dicts in order (hop, ip, rtts; cached hops
+                         only add structure, not samples)
+        """
+        self.nodes[self.SOURCE]["targets"].add(target)
+        previous, previous_ttl = self.SOURCE, 0
+        probes = lost = 0
+        for hop in hops:
+            cached = hop.get("cached", False)
+            if not cached:
+                probes += len(hop["rtts"])
+                lost += sum(1 for rtt in hop["rtts"] if rtt is None)
+            if hop["ip"] == "*":
+                continue
+
+            node = self.nodes.get(hop["ip"])
+            if node is None:
+                node = self.nodes[hop["ip"]] = {"ttl": hop["hop"], "targets": set(), "rtt_sum": 0.0, "rtt_count": 0}
+            node["ttl"] = min(node["ttl"], hop["hop"])
+            node["targets"].add(target)
+            answered = [rtt for rtt in hop["rtts"] if rtt is not None] if not cached else []
+            node["rtt_sum"] += sum(answered)
+            node["rtt_count"] += len(answered)
+
+            edge = self.edges.get((previous, hop["ip"]))
+            if edge is None:
+                edge = self.edges[(previous, hop["ip"])] = {
+                    "traces": 0, "hops": hop["hop"] - previous_ttl,
+                    "rtt_sum": 0.0, "rtt_count": 0, "probes": 0, "lost": 0,
+                }
+            edge["traces"] += 1
+            edge["hops"] = min(edge["hops"], hop["hop"] - previous_ttl)
+            edge["rtt_sum"] += sum(answered)
+            edge["rtt_count"] += len(answered)
+            edge["probes"] += probes
+            edge["lost"] += lost
+            previous, previous_ttl = hop["ip"], hop["hop"]
+            probes = lost = 0
+
+    def to_dict(self):
+        """
+        Get the graph as plain data
+
+        Returns:
+            dict: nodes (id, ttl, targets, rtt_ms) and edges (source,
+                  target, traces, hops, rtt_ms, loss)
+        """
+        nodes = []
+        for node_id, node in self.nodes.items():
+            nodes.append({
+                "id": node_id,
+                "ttl": node["ttl"],
+                "targets": len(node["targets"]),
+                "rtt_ms": round(node["rtt_sum"] / node["rtt_count"], 2) if node["rtt_count"] else None,
+            })
+        edges = []
+        for (source, target), edge in self.edges.items():
+            edges.append({
+                "source": source,
+                "target": target,
+                "traces": edge["traces"],
+                "hops": edge["hops"],
+                "rtt_ms": round(edge["rtt_sum"] / edge["rtt_count"], 2) if edge["rtt_count"] else None,
+                "loss": round(edge["lost"] / edge["probes"] * 100, 1) if edge["probes"] else 0.0,
+            })
+        return {"nodes": nodes, "edges": edges}
+
+    def to_json(self, path=None):
+        """
+        Export as JSON
+
+        Args:
+            path (str): Optional file to write
+
+        Returns:
+            str: JSON text
+        """
+        text = json.dumps(self.to_dict(), indent=2)
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
+
+    def to_graphml(self, path=None):
+        """
+        Export as GraphML (readable by yEd, Gephi, networkx)
+
+        Args:
+            path (str): Optional file to write
+
+        Returns:
+            str: GraphML text
+        """
+        data = self.to_dict()
+        root = ET.Element("graphml", xmlns="http://graphml.graphdrawing.org/xmlns")
+        attributes = (
+            ("node", "ttl", "int"), ("node", "targets", "int"), ("node", "rtt_ms", "double"),
+            ("edge", "traces", "int"), ("edge", "hops", "int"), ("edge", "rtt_ms", "double"),
+            ("edge", "loss", "double"),
+        )
+        for scope, name, attr_type in attributes:
+            ET.SubElement(root, "key", {"id": f"{scope[0]}_{name}", "for": scope,
+                                        "attr.name": name, "attr.type": attr_type})
+        graph = ET.SubElement(root, "graph", id="traceroute", edgedefault="directed")
+
+        def add_data(element, scope, item, names):
+            for name in names:
+                if item[name] is not None:
+                    ET.SubElement(element, "data", key=f"{scope}_{name}").text = str(item[name])
+
+        for node in data["nodes"]:
+            add_data(ET.SubElement(graph, "node", id=node["id"]), "n", node, ("ttl", "targets", "rtt_ms"))
+        for edge in data["edges"]:
+            element = ET.SubElement(graph, "edge", source=edge["source"], target=edge["target"])
+            add_data(element, "e", edge, ("traces", "hops", "rtt_ms", "loss"))
+
+        text = '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(root, encoding="unicode")
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
+
+
+class BatchTraceroute:
+    """Concurrent traceroute of many destinations with a shared-prefix cache
+
+    All destinations share one TracerouteEngine socket set; replies are told
+    apart by the destination quoted in them. Once the first WARMUP traces
+    agree on their first hops (the local gateway and upstream routers),
+    later destinations skip those TTLs and only probe the last shared hop
+    again to confirm the path still goes through it. If it does not, the
+    skipped hops are probed after all.
+    """
+
+    WARMUP = 2  # Full traces compared before upstream hops are shared
+
+    def __init__(self, max_hops=30, timeout=2.0, method=METHOD_UDP, probes=1,
+                 concurrency=64, rate=500, share_prefix=True):
+        """
+        Initialize batch tracer
+
+        Args:
+            max_hops (int): Highest TTL probed
+            timeout (float): Seconds to wait for each probe's reply
+            method (str): "udp", "icmp" or "tcp"
+            probes (int): Probes per hop
+            concurrency (int): Destinations traced at the same time
+            rate (int): Maximum probes per second (0 for unlimited)
+            share_prefix (bool): Reuse shared upstream hops between destinations
+        """
+        self.engine = TracerouteEngine(max_hops=max_hops, timeout=timeout, method=method,
+                                       probes=probes, resolve=False)
+        self.concurrency = concurrency
+        self.rate_limiter = RateLimiter(rate)
+        self.share_prefix = share_prefix
+        self.prefix = None  # Shared hop dicts for TTL 1..len(prefix)
+        self.graph = TopologyGraph()
+        self.stats = {"probes_sent": 0, "probes_saved": 0}
+
+    def _new_state(self, dst_ip, targets):
+        """Tracing state of one destination"""
+        engine = self.engine
+        state = {
+            "ip": dst_ip,
+            "targets": targets,
+            "rtts": {},
+            "ips": {},
+            "outstanding": {},
+            "reached": set(),
+            "to_send": deque(),
+            "skip": 0,  # TTLs taken from the prefix cache
+        }
+        first = 1
+        if self.prefix:
+            # Probe from the last shared hop on; it confirms the shared part
+            first = len(self.prefix)
+            state["skip"] = first - 1
+            self.stats["probes_saved"] += state["skip"] * engine.probes
+        self._queue_ttls(state, range(first, engine.max_hops + 1))
+        return state
+
+    def _queue_ttls(self, state, ttls):
+        """Schedule probes for some TTLs of a destination"""
+        probes = self.engine.probes
+        for ttl in ttls:
+            state["rtts"][ttl] = [None] * probes
+            state["ips"][ttl] = [None] * probes
+            state["outstanding"][ttl] = probes
+        for index in range(probes):
+            for ttl in ttls:
+                state["to_send"].append((ttl, index))
+
+    def _is_complete(self, state):
+        """True when every probed TTL up to the destination is resolved"""
+        last = min(state["reached"]) if state["reached"] else self.engine.max_hops
+        return all(count == 0 for ttl, count in state["outstanding"].items() if ttl <= last)
+
+    def _verify_prefix(self, state):
+        """
+        Check a destination that skipped the shared hops
+
+        Returns:
+            bool: True if its path goes through the last shared hop
+        """
+        check = len(self.prefix)
+        return check not in state["reached"] and self.prefix[-1]["ip"] in state["ips"][check]
+
+    def _build_hops(self, state):
+        """Hop dicts of a finished destination"""
+        last = min(state["reached"]) if state["reached"] else self.engine.max_hops
+        hops = []
+        for ttl in range(1, last + 1):
+            if ttl <= state["skip"]:
+                hops.append(dict(self.prefix[ttl - 1], cached=True))
+            elif ttl in state["rtts"]:
+                hops.append(self.engine._make_hop(ttl, state["rtts"][ttl], state["ips"][ttl], ttl in state["reached"]))
+        # Trailing unanswered hops of an unreached destination carry no information
+        if not state["reached"]:
+            while hops and hops[-1]["timeout"]:
+                hops.pop()
+        return hops
+
+    def _learn_prefix(self, paths):
+        """Shared leading hops of the warm-up traces"""
+        prefix = []
+        for hops in zip(*paths):
+            first = hops[0]
+            if (first["ip"] == "*" or first["reached"]
+                    or any(hop["ip"] != first["ip"] or hop["reached"] for hop in hops)):
+                break
+            prefix.append(first)
+        return prefix or None
+
+    def trace(self, targets, progress_callback=None, cancel_check=None):
+        """
+        Trace many targets
+
+        Args:
+            targets (list): Hostnames or IPv4 addresses
+            progress_callback (callable): Optional callback(completed, total, result)
+            cancel_check (callable): Optional callable returning True to stop early
+
+        Returns:
+            dict: {target: {target, ip, hops, reached, error}}
+
+        Raises:
+            PermissionError: If raw sockets are not permitted
+        """
+        targets = list(dict.fromkeys(t.strip() for t in targets if t.strip()))
+        results = {}
+        total = len(targets)
+
+        def finish(target, result):
+            results[target] = result
+            if progress_callback:
+                progress_callback(len(results), total, result)
+
+        # Resolve concurrently; targets sharing an address are traced once
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            resolved = list(executor.map(self._resolve, targets))
+        by_ip = {}
+        for target, ip in zip(targets, resolved):
+            if ip is None:
+                finish(target, {"target": target, "ip": None, "hops": [], "reached": False,
+                                "error": "Unknown host"})
+            else:
+                by_ip.setdefault(ip, []).append(target)
+
+        queue = deque(by_ip.items())
+        active = {}
+        pending = {}  # {(destination, key): (ttl, index, send_time)}
+        warmup = []
+        engine = self.engine
+        engine.open()
+        try:
+            while queue or active:
+                if cancel_check and cancel_check():
+                    break
+
+                # Until the warm-up traces are in, only they run
+                limit = self.concurrency
+                if self.share_prefix and self.prefix is None and len(warmup) < self.WARMUP:
+                    limit = self.WARMUP - len(warmup)
+                while queue and len(active) < limit:
+                    dst_ip, names = queue.popleft()
+                    engine.add_destination(dst_ip)
+                    active[dst_ip] = self._new_state(dst_ip, names)
+
+                # Send round-robin across destinations as the rate allows
+                send_wait = 0.0
+                sending = True
+                while sending:
+                    sending = False
+                    for state in active.values():
+                        last = min(state["reached"]) if state["reached"] else engine.max_hops
+                        while state["to_send"] and state["to_send"][0][0] > last:
+                            # Beyond the destination: never sent
+                            ttl, _ = state["to_send"].popleft()
+                            state["outstanding"][ttl] -= 1
+                            self.stats["probes_saved"] += 1
+                        if not state["to_send"]:
+                            continue
+                        send_wait = self.rate_limiter.try_acquire()
+                        if send_wait:
+                            break
+                        ttl, index = state["to_send"].popleft()
+                        key = engine._send_probe(ttl, state["ip"])
+                        if key is None:
+                            state["outstanding"][ttl] -= 1
+                        else:
+                            pending[(state["ip"], key)] = (ttl, index, time.perf_counter())
+                            self.stats["probes_sent"] += 1
+                        sending = True
+                    if send_wait:
+                        break
+
+                readable, _, _ = select.select(engine._sockets(), [], [], min(send_wait or 0.05, 0.05))
+                if readable:
+                    for dst_ip, key, source, from_destination, received in engine._receive():
+                        probe = pending.pop((dst_ip, key), None)
+                        state = active.get(dst_ip)
+                        if probe is None or state is None:
+                            continue
+                        ttl, index, sent = probe
+                        state["rtts"][ttl][index] = (received - sent) * 1000
+                        state["ips"][ttl][index] = source
+                        state["outstanding"][ttl] -= 1
+                        if from_destination:
+                            state["reached"].add(ttl)
+
+                now = time.perf_counter()
+                for pending_key in [k for k, (_, _, sent) in pending.items() if now - sent >= engine.timeout]:
+                    ttl, _, _ = pending.pop(pending_key)
+                    state = active.get(pending_key[0])
+                    if state is not None:
+                        state["outstanding"][ttl] -= 1
+
+                for dst_ip in [ip for ip, state in active.items() if not state["to_send"] and self._is_complete(state)]:
+                    state = active[dst_ip]
+                    if state["skip"] and not self._verify_prefix(state):
+                        # The path does not go through the shared hops: probe them too
+                        self.stats["probes_saved"] -= state["skip"] * engine.probes
+                        self._queue_ttls(state, range(1, state["skip"] + 1))
+                        state["skip"] = 0
+                        continue
+
+                    del active[dst_ip]
+                    engine.remove_destination(dst_ip)
+                    hops = self._build_hops(state)
+                    if self.share_prefix and self.prefix is None and len(warmup) < self.WARMUP:
+                        warmup.append(hops)
+                        if len(warmup) == self.WARMUP:
+                            self.prefix = self._learn_prefix(warmup)
+                    for target in state["targets"]:
+                        self.graph.add_path(target, hops)
+                        finish(target, {"target": target, "ip": dst_ip, "hops": hops,
+                                        "reached": bool(state["reached"]), "error": None})
+        finally:
+            engine.close()
+        return results
+
+    @staticmethod
+    def _resolve(target):
+        """Resolve a target (None if unknown)"""
+        try:
+            return socket.gethostbyname(target)
+        except (socket.gaierror, UnicodeError):
+            return None
@@ -0,0 +1,209 @@
+"""
+Discovery Pipeline Module
+Chained "discover then port-scan" job: every host found online is fed into
+the port-scan stage immediately, while the ping sweep continues
+"""
+
+import ipaddress
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .scanner import IPv4Scanner
+from .port_scanner import PortScanner
+from .rate_limiter import RateLimiter
+
+
+class DiscoveryPipeline:
+    """Ping sweep and port scan stages sharing one worker pool and rate budget"""
+
+    def __init__(self, scanner=None):
+        """
+        Initialize discovery pipeline
+
+        Args:
+            scanner (IPv4Scanner): Scanner used for the ping stage (new one if None)
+        """
+        self.scanner = scanner or IPv4Scanner()
+        self.scanning = False
+        self.cancel_flag = False
+        self.results = []
+        self.progress_callback = None
+        self.complete_callback = None
+        self.host_callback = None  # Called with each finished host record
+
+        # Performance settings (same throttling as IPv4Scanner)
+        self._last_progress_time = 0
+        self._progress_interval = 0.15
+        self._progress_count_interval = 20
+
+    @staticmethod
+    def iter_targets(cidr_or_list):
+        """
+        Iterate host IPs lazily from a CIDR string or an IP list
+
+        Args:
+            cidr_or_list: CIDR string (e.g. "10.0.0.0/16") or iterable of IPs
+
+        Returns:
+            tuple: (iterator of IP strings, total count)
+        """
+        if isinstance(cidr_or_list, str):
+            network = ipaddress.ip_network(cidr_or_list, strict=False)
+            if network.prefixlen == 32:
+                return iter([str(network.network_address)]), 1
+            if network.prefixlen == 31:
+                return (str(ip) for ip in network), 2
+            return (str(ip) for ip in network.hosts()), network.num_addresses - 2
+        ip_list = list(cidr_or_list)
+        return iter(ip_list), len(ip_list)
+
+    def _should_update_progress(self, completed):
+        """Determine if we should fire a progress update (throttled)"""
+        current_time = time.time()
+        if (current_time - self._last_progress_time >= self._progress_interval
+                or completed % self._progress_count_interval == 0):
+            self._last_progress_time = current_time
+            return True
+        return False
+
+    def _ping(self, ip, timeout_ms, resolve_dns):
+        """Ping stage task"""
+        self._limiter.acquire(cancel_check=lambda: self.cancel_flag)
+        return self.scanner.ping_host(ip, timeout_ms, resolve_dns)
+
+    def _probe(self, ip, port, method, timeout):
+        """Port-scan stage task"""
+        self._limiter.acquire(cancel_check=lambda: self.cancel_flag)
+        return PortScanner.scan_port(ip, port, method, timeout)
+
+    def run(self, targets, ports, method="socket", aggression='Medium', max_workers=None,
+            rate=1000, port_timeout=1, resolve_dns=True):
+        """
+        Run the chained sweep and port scan
+
+        Port-scan tasks of hosts already found online are always scheduled
+        before further ping tasks, so both stages overlap and draw from the
+        same pool of workers and the same rate limiter.
+
+        Args:
+            targets: CIDR string or list of IPs
+            ports (list): Ports to scan on every online host
+            method (str): PortScanner method for the port stage
+            aggression (str): IPv4Scanner aggression level for the ping stage
+            max_workers (int): Concurrency budget shared by both stages
+            rate (int): Probes per second shared by both stages (0 for unlimited)
+            port_timeout (float): Timeout per port probe in seconds
+            resolve_dns (bool): Resolve hostnames of online hosts
+        """
+        self.scanning = True
+        self.cancel_flag = False
+        self.results = []
+        self._last_progress_time = 0
+        self._limiter = RateLimiter(rate)
+
+        timeout_map = {
+            'Gentle (longer timeout)': 600,
+            'Medium': 300,
+            'Aggressive (short timeout)': 150
+        }
+        timeout_ms = int(timeout_map.get(aggression, 300))
+
+        worker_map = {
+            'Gentle (longer timeout)': 50,
+            'Medium': 100,
+            'Aggressive (short timeout)': 150
+        }
+        if max_workers is None:
+            max_workers = int(worker_map.get(aggression, 100))
+
+        try:
+            ip_iter, total = self.iter_targets(targets)
+            if total == 0:
+                if self.complete_callback:
+                    self.complete_callback([], "No hosts in range")
+                return
+
+            records = {}  # {ip: host record} for hosts still being port scanned
+            remaining = {}  # {ip: ports not yet answered}
+            port_jobs = deque()  # (ip, port) waiting for a worker
+            in_flight = {}  # {future: (kind, ip, port)}
+            completed = 0
+            sweep_done = False
+
+            def finish_host(record):
+                nonlocal completed
+                completed += 1
+                self.results.append(record)
+                if self.host_callback:
+                    self.host_callback(record)
+                if self.progress_callback and (self._should_update_progress(completed) or completed == total):
+                    self.progress_callback(completed, total, record)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                while True:
+                    if self.cancel_flag:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        if self.complete_callback:
+                            self.complete_callback(self.results, "Scan cancelled")
+                        return
+
+                    # Fill free workers, port-scan work first
+                    while len(in_flight) < max_workers:
+                        if port_jobs:
+                            ip, port = port_jobs.popleft()
+                            future = executor.submit(self._probe, ip, port, method, port_timeout)
+                            in_flight[future] = ("port", ip, port)
+                        elif not sweep_done:
+                            ip = next(ip_iter, None)
+                            if ip is None:
+                                sweep_done = True
+                                break
+                            future = executor.submit(self._ping, ip, timeout_ms, resolve_dns)
+                            in_flight[future] = ("ping", ip, None)
+                        else:
+                            break
+
+                    if not in_flight:
+                        break
+
+                    done, _ = wait(list(in_flight), timeout=0.25, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        kind, ip, port = in_flight.pop(future)
+                        result = future.result()
+
+                        if kind == "ping":
+                            record = dict(result, open_ports=[])
+                            if record['status'] != 'Online' or not ports:
+                                finish_host(record)
+                                continue
+                            records[ip] = record
+                            remaining[ip] = len(ports)
+                            port_jobs.extend((ip, p) for p in ports)
+                            continue
+
+                        record = records[ip]
+                        if result["is_open"]:
+                            record['open_ports'].append({
+                                "port": port,
+                                "service": result["service"]
+                            })
+                        remaining[ip] -= 1
+                        if remaining[ip] == 0:
+                            del remaining[ip]
+                            del records[ip]
+                            record['open_ports'].sort(key=lambda p: p["port"])
+                            finish_host(record)
+
+            if self.complete_callback:
+                self.complete_callback(self.results, "Scan completed")
+
+        except Exception as e:
+            if self.complete_callback:
+                self.complete_callback([], f"Error: {str(e)}")
+        finally:
+            self.scanning = False
+
+    def cancel_scan(self):
+        """Cancel ongoing pipeline"""
+        self.cancel_flag = True
@@ -5,8 +5,8 @@ Performs DNS lookups (forward and reverse) with custom DNS server support
 
 import socket
 import ipaddress
-import subprocess
-import platform
+
+from .dns_resolver import DNSResolver, RCODE_NXDOMAIN, format_record_data, system_nameservers
 
 
 # Common DNS servers for quick selection
@@ -21,6 +21,15 @@ COMMON_DNS_SERVERS = {
     "opendns_secondary": ("OpenDNS Secondary", "208.67.220.220"),
 }
 
+# Record types queried by DNSLookup.get_all_records, in display order
+ALL_RECORD_TYPES = ['A', 'AAAA', 'CNAME', 'MX', 'NS', 'TXT', 'SOA', 'SRV', 'CAA', 'PTR']
+
+# Services whose SRV records DNSLookup.get_all_records looks for
+SRV_SERVICES = [
+    '_sip._tcp', '_sip._udp', '_sips._tcp', '_xmpp-client._tcp', '_xmpp-server._tcp',
+    '_ldap._tcp', '_kerberos._udp', '_autodiscover._tcp', '_submission._tcp', '_imaps._tcp',
+]
+
 
 class DNSLookup:
     """DNS lookup utility for forward and reverse queries"""
@@ -112,60 +121,36 @@ class DNSLookup:
     @staticmethod
     def _reverse_lookup_custom(ip, dns_server_ip, dns_name):
         """Reverse lookup using custom DNS server"""
+        server = f"{dns_name} ({dns_server_ip})"
         try:
-            if platform.system() == "Windows":
-                cmd = ['nslookup', ip, dns_server_ip]
-            else:
-                cmd = ['dig', f'@{dns_server_ip}', '-x', ip, '+short']
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=10,
-                encoding='utf-8',
-                errors='ignore'
+            response = DNSResolver.for_server(dns_server_ip).query(
+                ipaddress.ip_address(ip).reverse_pointer, "PTR"
             )
-            
-            hostname = None
-            if platform.system() == "Windows":
-                # Parse nslookup output for PTR
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if 'Name:' in line or 'name =' in line.lower():
-                        if 'Name:' in line:
-                            hostname = line.split('Name:')[1].strip()
-                        else:
-                            hostname = line.split('=')[1].strip().rstrip('.')
-                        break
-            else:
-                # Parse dig output
-                output = result.stdout.strip()
-                if output:
-                    hostname = output.split('\n')[0].rstrip('.')
-            
-            if hostname:
+            records = [record for record in response["answers"] if record["type"] == "PTR"]
+            if records:
                 return {
                     "type": "Reverse Lookup (PTR)",
                     "query": ip,
-                    "result": hostname,
-                    "dns_server": f"{dns_name} ({dns_server_ip})",
-                    "success": True
+                    "result": records[0]["data"].rstrip('.'),
+                    "dns_server": server,
+                    "success": True,
+                    "ttl": records[0]["ttl"],
+                    "records": records
                 }
             else:
                 return {
                     "type": "Reverse Lookup (PTR)",
                     "query": ip,
                     "result": "No hostname found",
-                    "dns_server": f"{dns_name} ({dns_server_ip})",
+                    "dns_server": server,
                     "success": False
                 }
-        except subprocess.TimeoutExpired:
+        except TimeoutError:
             return {
                 "type": "Reverse Lookup (PTR)",
                 "query": ip,
                 "result": "DNS query timed out",
-                "dns_server": f"{dns_name} ({dns_server_ip})",
+                "dns_server": server,
                 "success": False
             }
         except Exception as e:
@@ -173,7 +158,7 @@ class DNSLookup:
                 "type": "Reverse Lookup (PTR)",
                 "query": ip,
                 "result": f"Error: {str(e)}",
-                "dns_server": f"{dns_name} ({dns_server_ip})",
+                "dns_server": server,
                 "success": False
             }
     
@@ -225,7 +210,9 @@ class DNSLookup:
     @staticmethod
     def _forward_lookup_custom(hostname, dns_server_ip, dns_name):
         """
-        Lookup using custom DNS server via nslookup/dig
+        Lookup using custom DNS server
+        
+        A and AAAA are asked together over the resolver's shared socket.
         
         Args:
             hostname (str): Hostname to resolve
@@ -233,92 +220,54 @@ class DNSLookup:
             dns_name (str): Display name for DNS server
             
         Returns:
-            dict: Lookup results
+            dict: Lookup results; on success also the address records with
+                  their TTLs ("records") and the lowest TTL ("ttl")
         """
+        server = f"{dns_name} ({dns_server_ip})"
         try:
-            if platform.system() == "Windows":
-                cmd = ['nslookup', hostname, dns_server_ip]
-            else:
-                cmd = ['dig', f'@{dns_server_ip}', hostname, '+short']
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=10,
-                encoding='utf-8',
-                errors='ignore'
-            )
+            questions = [(hostname, "A"), (hostname, "AAAA")]
+            responses = DNSResolver.for_server(dns_server_ip).query_many(questions)
             
-            ips = []
-            if platform.system() == "Windows":
-                # Parse nslookup output
-                lines = result.stdout.split('\n')
-                in_answer_section = False
-                for line in lines:
-                    # Skip the DNS server's own address
-                    if 'Server:' in line or 'Address:' in line and dns_server_ip in line:
-                        continue
-                    # Look for answer section
-                    if 'Name:' in line and hostname.lower() in line.lower():
-                        in_answer_section = True
-                        continue
-                    if in_answer_section and 'Address:' in line:
-                        ip = line.split('Address:')[1].strip()
-                        if ip and ip != dns_server_ip:
-                            # Handle IPv6 and IPv4
-                            ip = ip.split('%')[0]  # Remove scope ID if present
-                            ips.append(ip)
-                    elif in_answer_section and 'Addresses:' in line:
-                        # Multiple addresses on same line
-                        addrs = line.split('Addresses:')[1].strip()
-                        for ip in addrs.split(','):
-                            ip = ip.strip().split('%')[0]
-                            if ip and ip != dns_server_ip:
-                                ips.append(ip)
-                
-                # Fallback: look for any Address lines after the server info
-                if not ips:
-                    found_server = False
-                    for line in lines:
-                        if 'Server:' in line:
-                            found_server = True
-                            continue
-                        if found_server and 'Address:' in line:
-                            if dns_server_ip in line:
-                                continue  # Skip server's address
-                            ip = line.split('Address:')[1].strip().split('%')[0]
-                            if ip:
-                                ips.append(ip)
-            else:
-                # Parse dig output
-                for line in result.stdout.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith(';'):
-                        ips.append(line)
+            records = []
+            failures = []
+            for question in questions:
+                response = responses[question]
+                if isinstance(response, Exception):
+                    failures.append(response)
+                    continue
+                # CNAME chains end in the address records of the canonical name
+                records.extend(record for record in response["answers"] if record["type"] == question[1])
             
-            if ips:
+            if records:
                 return {
                     "type": "Forward Lookup (A/AAAA)",
                     "query": hostname,
-                    "result": ips,
-                    "dns_server": f"{dns_name} ({dns_server_ip})",
-                    "success": True
+                    "result": list(dict.fromkeys(record["data"] for record in records)),
+                    "dns_server": server,
+                    "success": True,
+                    "ttl": min(record["ttl"] for record in records),
+                    "records": records
                 }
+            if len(failures) == len(questions):
+                raise failures[0]
+            if any(not isinstance(response, Exception) and response["rcode"] == RCODE_NXDOMAIN
+                   for response in responses.values()):
+                message = "Hostname not found"
             else:
-                return {
-                    "type": "Forward Lookup (A)",
-                    "query": hostname,
-                    "result": "No IP addresses found",
-                    "dns_server": f"{dns_name} ({dns_server_ip})",
-                    "success": False
-                }
-        except subprocess.TimeoutExpired:
+                message = "No IP addresses found"
+            return {
+                "type": "Forward Lookup (A)",
+                "query": hostname,
+                "result": message,
+                "dns_server": server,
+                "success": False
+            }
+        except TimeoutError:
             return {
                 "type": "Forward Lookup (A)",
                 "query": hostname,
                 "result": "DNS query timed out",
-                "dns_server": f"{dns_name} ({dns_server_ip})",
+                "dns_server": server,
                 "success": False
             }
         except Exception as e:
@@ -326,99 +275,115 @@ class DNSLookup:
                 "type": "Forward Lookup (A)",
                 "query": hostname,
                 "result": f"Error: {str(e)}",
-                "dns_server": f"{dns_name} ({dns_server_ip})",
+                "dns_server": server,
                 "success": False
             }
     
     @staticmethod
-    def get_all_records(hostname, dns_server="system"):
+    def get_all_records(hostname, dns_server="system", on_update=None):
         """
         Get multiple record types for a hostname
         
+        All types are asked at once over the server's shared resolver
+        socket and merged into the result as their answers arrive. SRV
+        records are looked up for the services in SRV_SERVICES (or for the
+        name itself if it already is a service name); PTR records for an IP
+        address, or for the addresses the A and AAAA answers return.
+        
         Args:
-            hostname (str): Hostname to query
+            hostname (str): Hostname or IP address to query
             dns_server (str): DNS server to use
+            on_update (callable): Optional callback(results) called from the
+                                  calling thread after every merged answer
             
         Returns:
-            dict: Results with multiple record types
+            dict: hostname, dns_server, records ({type: [text]}), details
+                  ({type: [record dicts with TTLs]}), pending (types still
+                  waiting, empty when done) and errors ({type: message})
         """
         dns_name, dns_ip = DNSLookup._get_dns_server_info(dns_server)
-        server_to_use = dns_ip if dns_ip else None
+        server_to_use = dns_ip
+        if not server_to_use:
+            system_servers = system_nameservers()
+            server_to_use = system_servers[0] if system_servers else None
         
         results = {
             "hostname": hostname,
-            "dns_server": f"{dns_name}" + (f" ({dns_ip})" if dns_ip else ""),
-            "records": {}
+            "dns_server": f"{dns_name}" + (f" ({server_to_use})" if server_to_use else ""),
+            "records": {},
+            "details": {},
+            "pending": [],
+            "errors": {}
         }
+        if not server_to_use:
+            results["errors"]["all"] = "No DNS server configured"
+            if on_update:
+                on_update(results)
+            return results
         
-        record_types = ['A', 'AAAA', 'MX', 'NS', 'TXT', 'CNAME']
+        try:
+            reverse_name = ipaddress.ip_address(hostname).reverse_pointer
+        except ValueError:
+            reverse_name = None
         
-        for record_type in record_types:
-            try:
-                records = DNSLookup._query_record_type(hostname, record_type, server_to_use)
-                if records:
-                    results["records"][record_type] = records
-            except Exception:
-                pass
+        if reverse_name:
+            questions = [(reverse_name, "PTR")]
+        else:
+            questions = [(hostname, record_type) for record_type in ALL_RECORD_TYPES
+                         if record_type not in ("SRV", "PTR")]
+            if hostname.startswith("_"):
+                questions.append((hostname, "SRV"))
+            else:
+                questions.extend((f"{service}.{hostname}", "SRV") for service in SRV_SERVICES)
         
-        return results
-    
-    @staticmethod
-    def _query_record_type(hostname, record_type, dns_server_ip=None):
-        """Query specific DNS record type"""
-        try:
-            if platform.system() == "Windows":
-                if dns_server_ip:
-                    cmd = ['nslookup', '-type=' + record_type, hostname, dns_server_ip]
-                else:
-                    cmd = ['nslookup', '-type=' + record_type, hostname]
+        waiting = {}
+        for _, record_type in questions:
+            waiting[record_type] = waiting.get(record_type, 0) + 1
+        if not reverse_name:
+            waiting["PTR"] = 1  # Asked once the addresses are known
+        results["pending"] = [record_type for record_type in ALL_RECORD_TYPES if record_type in waiting]
+        addresses = {}  # {reverse name: address}
+        
+        def merge(question, response):
+            record_type = question[1]
+            if isinstance(response, Exception):
+                if record_type not in results["records"]:
+                    results["errors"][record_type] = (
+                        "DNS query timed out" if isinstance(response, TimeoutError) else str(response)
+                    )
             else:
-                if dns_server_ip:
-                    cmd = ['dig', f'@{dns_server_ip}', hostname, record_type, '+short']
-                else:
-                    cmd = ['dig', hostname, record_type, '+short']
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                encoding='utf-8',
-                errors='ignore'
-            )
-            
-            records = []
-            if platform.system() == "Windows":
-                # Parse Windows nslookup output
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    # Skip server info
-                    if 'Server:' in line or (dns_server_ip and dns_server_ip in line):
-                        continue
-                    # Extract record data based on type
-                    if record_type == 'MX' and 'mail exchanger' in line.lower():
-                        records.append(line)
-                    elif record_type == 'NS' and 'nameserver' in line.lower():
-                        records.append(line.split('=')[-1].strip())
-                    elif record_type == 'TXT' and 'text' in line.lower():
-                        records.append(line.split('=')[-1].strip().strip('"'))
-                    elif record_type in ['A', 'AAAA'] and 'Address:' in line:
-                        addr = line.split('Address:')[1].strip()
-                        if addr and (dns_server_ip is None or addr != dns_server_ip):
-                            records.append(addr)
+                for record in response["answers"]:
+                    if record["type"] != record_type:
+                        continue  # CNAMEs leading to the answer
+                    text = format_record_data(record)
+                    if record_type == "SRV":
+                        text = f"{record['name']} {text}"
+                    elif record_type == "PTR" and question[0] in addresses:
+                        text = f"{addresses[question[0]]} → {text}"
+                    elif record_type in ("A", "AAAA"):
+                        addresses[ipaddress.ip_address(record["data"]).reverse_pointer] = record["data"]
+                    if text not in results["records"].setdefault(record_type, []):
+                        results["records"][record_type].append(text)
+                        results["details"].setdefault(record_type, []).append(record)
+                        results["errors"].pop(record_type, None)
+            waiting[record_type] -= 1
+            if not waiting[record_type]:
+                results["pending"].remove(record_type)
+            if on_update:
+                on_update(results)
+        
+        resolver = DNSResolver.for_server(server_to_use)
+        resolver.query_many(questions, merge)
+        if not reverse_name:
+            if addresses:
+                waiting["PTR"] = len(addresses)
+                resolver.query_many([(name, "PTR") for name in addresses], merge)
             else:
-                # Parse dig output
-                for line in result.stdout.split('\n'):
-                    line = line.strip()
-                    if line and not line.startswith(';'):
-                        records.append(line)
-            
-            return records
-        except Exception:
-            return []
+                results["pending"].remove("PTR")
+                if on_update:
+                    on_update(results)
+        
+        return results
     
     @staticmethod
     def validate_query(query):
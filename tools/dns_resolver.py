@@ -0,0 +1,494 @@
+"""
+DNS Resolver Module
+Minimal DNS wire-protocol client (RFC 1035) over UDP with TCP fallback
+"""
+
+import ipaddress
+import platform
+import random
+import select
+import socket
+import struct
+import threading
+import time
+
+
+# Record types by name and number
+RECORD_TYPES = {
+    "A": 1, "NS": 2, "CNAME": 5, "SOA": 6, "PTR": 12, "MX": 15, "TXT": 16,
+    "AAAA": 28, "SRV": 33, "OPT": 41, "CAA": 257,
+}
+RECORD_NAMES = {number: name for name, number in RECORD_TYPES.items()}
+
+# Response codes
+RCODE_NOERROR = 0
+RCODE_FORMERR = 1
+RCODE_SERVFAIL = 2
+RCODE_NXDOMAIN = 3
+RCODE_NAMES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+
+CLASS_IN = 1
+FLAG_TC = 0x0200
+FLAG_RD = 0x0100
+
+_ids = random.SystemRandom()
+
+
+def encode_name(name):
+    """
+    Encode a domain name as DNS labels
+
+    Args:
+        name (str): Domain name, with or without the trailing dot
+
+    Returns:
+        bytes: Wire form
+
+    Raises:
+        ValueError: If a label is empty or longer than 63 bytes
+    """
+    encoded = b""
+    name = name.rstrip(".")
+    if name:
+        for label in name.split("."):
+            raw = label.encode("idna") if not label.isascii() else label.encode("ascii")
+            if not 0 < len(raw) < 64:
+                raise ValueError(f"Invalid label in {name!r}")
+            encoded += bytes([len(raw)]) + raw
+    return encoded + b"\x00"
+
+
+def build_query(query_id, name, record_type, edns_payload=1232):
+    """
+    Build a recursive query for one name and type
+
+    Args:
+        query_id (int): 16-bit message ID
+        name (str): Domain name
+        record_type (str): Record type name, e.g. "MX"
+        edns_payload (int): Advertised UDP payload size, or 0 for no EDNS0
+
+    Returns:
+        bytes: Query message
+    """
+    header = struct.pack("!HHHHHH", query_id, FLAG_RD, 1, 0, 0, 1 if edns_payload else 0)
+    question = encode_name(name) + struct.pack("!HH", RECORD_TYPES[record_type], CLASS_IN)
+    if not edns_payload:
+        return header + question
+    # OPT pseudo-record: root name, type 41, class = payload size, no extended flags
+    opt = b"\x00" + struct.pack("!HHIH", RECORD_TYPES["OPT"], edns_payload, 0, 0)
+    return header + question + opt
+
+
+def _read_name(data, offset):
+    """
+    Read a possibly compressed name
+
+    Returns:
+        tuple: (name, offset after the name in the original position)
+    """
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Name runs past the end of the message")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(data):
+                raise ValueError("Truncated compression pointer")
+            if end is None:
+                end = offset + 2
+            jumps += 1
+            if jumps > 64:
+                raise ValueError("Compression pointer loop")
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset:offset + length].decode("ascii", errors="replace"))
+        offset += length
+    return ".".join(labels) + ".", end if end is not None else offset
+
+
+def _parse_rdata(data, offset, length, record_type):
+    """Decode the data of one record into a value of its type"""
+    rdata = data[offset:offset + length]
+    if record_type == "A" and length == 4:
+        return socket.inet_ntoa(rdata)
+    if record_type == "AAAA" and length == 16:
+        return str(ipaddress.IPv6Address(rdata))
+    if record_type in ("CNAME", "NS", "PTR"):
+        return _read_name(data, offset)[0]
+    if record_type == "MX":
+        return {"preference": struct.unpack_from("!H", data, offset)[0],
+                "exchange": _read_name(data, offset + 2)[0]}
+    if record_type == "TXT":
+        strings = []
+        position = 0
+        while position < length:
+            size = rdata[position]
+            strings.append(rdata[position + 1:position + 1 + size].decode("utf-8", errors="replace"))
+            position += 1 + size
+        return "".join(strings)
+    if record_type == "SOA":
+        mname, position = _read_name(data, offset)
+        rname, position = _read_name(data, position)
+        serial, refresh, retry, expire, minimum = struct.unpack_from("!IIIII", data, position)
+        return {"mname": mname, "rname": rname, "serial": serial, "refresh": refresh,
+                "retry": retry, "expire": expire, "minimum": minimum}
+    if record_type == "SRV":
+        priority, weight, port = struct.unpack_from("!HHH", data, offset)
+        return {"priority": priority, "weight": weight, "port": port,
+                "target": _read_name(data, offset + 6)[0]}
+    if record_type == "CAA" and length >= 2:
+        tag_length = rdata[1]
+        return {"flags": rdata[0], "tag": rdata[2:2 + tag_length].decode("ascii", errors="replace"),
+                "value": rdata[2 + tag_length:].decode("utf-8", errors="replace")}
+    return rdata.hex()
+
+
+def parse_response(data):
+    """
+    Decode a response message
+
+    Args:
+        data (bytes): Message
+
+    Returns:
+        dict: id, truncated, rcode, question ((name, type) or None), and
+              answers, authority and additional lists of
+              {name, type, ttl, data} records (OPT records are left out)
+
+    Raises:
+        ValueError: If the message is malformed
+    """
+    if len(data) < 12:
+        raise ValueError("Message shorter than a DNS header")
+    query_id, flags, qdcount, ancount, nscount, arcount = struct.unpack_from("!HHHHHH", data)
+    offset = 12
+    question = None
+    try:
+        for _ in range(qdcount):
+            name, offset = _read_name(data, offset)
+            qtype, _ = struct.unpack_from("!HH", data, offset)
+            offset += 4
+            question = (name, RECORD_NAMES.get(qtype, str(qtype)))
+
+        sections = []
+        for count in (ancount, nscount, arcount):
+            records = []
+            for _ in range(count):
+                name, offset = _read_name(data, offset)
+                rtype, rclass, ttl, length = struct.unpack_from("!HHIH", data, offset)
+                offset += 10
+                if offset + length > len(data):
+                    raise ValueError("Record runs past the end of the message")
+                type_name = RECORD_NAMES.get(rtype, str(rtype))
+                if type_name != "OPT":
+                    records.append({
+                        "name": name,
+                        "type": type_name,
+                        "ttl": ttl,
+                        "data": _parse_rdata(data, offset, length, type_name),
+                    })
+                offset += length
+            sections.append(records)
+    except struct.error as e:
+        raise ValueError(f"Truncated message: {e}") from e
+
+    return {
+        "id": query_id,
+        "truncated": bool(flags & FLAG_TC),
+        "rcode": flags & 0x000F,
+        "question": question,
+        "answers": sections[0],
+        "authority": sections[1],
+        "additional": sections[2],
+    }
+
+
+def format_record_data(record):
+    """
+    Record data in zone-file presentation form, as dig +short prints it
+
+    Args:
+        record (dict): Record from parse_response
+
+    Returns:
+        str: Text form
+    """
+    value = record["data"]
+    record_type = record["type"]
+    if record_type == "MX":
+        return f"{value['preference']} {value['exchange']}"
+    if record_type == "TXT":
+        return f'"{value}"'
+    if record_type == "SOA":
+        return (f"{value['mname']} {value['rname']} {value['serial']} {value['refresh']} "
+                f"{value['retry']} {value['expire']} {value['minimum']}")
+    if record_type == "SRV":
+        return f"{value['priority']} {value['weight']} {value['port']} {value['target']}"
+    if record_type == "CAA":
+        return f'{value["flags"]} {value["tag"]} "{value["value"]}"'
+    return str(value)
+
+
+def system_nameservers():
+    """
+    DNS servers configured on this machine
+
+    Returns:
+        list: Server IP addresses, possibly empty
+    """
+    servers = []
+    if platform.system() == "Windows":
+        try:
+            import winreg
+            path = r"SYSTEM\CurrentControlSet\Services\Tcpip\Parameters"
+            keys = [path]
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path + r"\Interfaces") as interfaces:
+                for index in range(winreg.QueryInfoKey(interfaces)[0]):
+                    keys.append(path + r"\Interfaces\\" + winreg.EnumKey(interfaces, index))
+            for key_path in keys:
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, key_path) as key:
+                    for value_name in ("NameServer", "DhcpNameServer"):
+                        try:
+                            value = winreg.QueryValueEx(key, value_name)[0]
+                        except OSError:
+                            continue
+                        servers.extend(value.replace(",", " ").split())
+        except OSError:
+            pass
+    else:
+        try:
+            with open("/etc/resolv.conf", encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) >= 2 and fields[0] == "nameserver":
+                        servers.append(fields[1].split("%")[0])
+        except OSError:
+            pass
+    valid = []
+    for server in servers:
+        try:
+            ipaddress.ip_address(server)
+        except ValueError:
+            continue
+        if server not in valid:
+            valid.append(server)
+    return valid
+
+
+class DNSResolver:
+    """DNS client for one server
+
+    Queries go out over one connected UDP socket that is kept open between
+    calls. Several questions can be in flight at once; answers are matched
+    to their question by message ID and echoed question. Queries carry an
+    EDNS0 OPT record so large answers fit in one datagram, and a truncated
+    answer is asked again over TCP. Servers that reject EDNS0 with FORMERR
+    are asked again without it.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, server, port=53, timeout=3.0, retries=2, edns_payload=1232):
+        """
+        Initialize resolver
+
+        Args:
+            server (str): IPv4 or IPv6 address of the DNS server
+            port (int): Server port
+            timeout (float): Seconds to wait for an answer before resending
+            retries (int): Resends over UDP before a question times out
+            edns_payload (int): Advertised UDP payload size, or 0 to disable EDNS0
+        """
+        self.server = server
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.edns_payload = edns_payload
+        self._family = socket.AF_INET6 if ipaddress.ip_address(server).version == 6 else socket.AF_INET
+        self._sock = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_server(cls, server, port=53):
+        """
+        Shared resolver of a server, so lookups reuse its socket
+
+        Args:
+            server (str): DNS server address
+            port (int): Server port
+
+        Returns:
+            DNSResolver: Resolver
+        """
+        with cls._shared_lock:
+            resolver = cls._shared.get((server, port))
+            if resolver is None:
+                resolver = cls._shared[(server, port)] = cls(server, port)
+            return resolver
+
+    def _socket(self):
+        if self._sock is None:
+            self._sock = socket.socket(self._family, socket.SOCK_DGRAM)
+            self._sock.connect((self.server, self.port))
+            self._sock.setblocking(False)
+        return self._sock
+
+    def close(self):
+        """Close the UDP socket; the next query opens a new one"""
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def query(self, name, record_type):
+        """
+        Ask one question
+
+        Args:
+            name (str): Domain name
+            record_type (str): Record type name, e.g. "A"
+
+        Returns:
+            dict: Response from parse_response
+
+        Raises:
+            TimeoutError: If the server does not answer
+            OSError: If the server cannot be reached
+        """
+        response = self.query_many([(name, record_type)])[(name, record_type)]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def query_many(self, questions, on_response=None):
+        """
+        Ask several questions at once over the shared socket
+
+        Args:
+            questions (list): (name, record_type) tuples
+            on_response (callable): Optional callback(question, response)
+                                    called as each answer arrives
+
+        Returns:
+            dict: {question: response dict or the exception it failed with}
+        """
+        with self._lock:
+            return self._query_many(list(dict.fromkeys(questions)), on_response)
+
+    def _query_many(self, questions, on_response):
+        results = {}
+        pending = {}  # {id: [question, packet, attempts, deadline, edns]}
+
+        def finish(question, response):
+            results[question] = response
+            if on_response:
+                on_response(question, response)
+
+        try:
+            sock = self._socket()
+        except OSError as e:
+            for question in questions:
+                finish(question, e)
+            return results
+
+        def send(question, edns, attempts=0):
+            query_id = _ids.randrange(65536)
+            while query_id in pending:
+                query_id = _ids.randrange(65536)
+            try:
+                packet = build_query(query_id, question[0], question[1], self.edns_payload if edns else 0)
+                sock.send(packet)
+            except (OSError, ValueError, KeyError) as e:
+                finish(question, e)
+                return
+            pending[query_id] = [question, packet, attempts, time.monotonic() + self.timeout, edns]
+
+        for question in questions:
+            send(question, edns=bool(self.edns_payload))
+
+        while pending:
+            wait = max(0.0, min(entry[3] for entry in pending.values()) - time.monotonic())
+            readable, _, _ = select.select([sock], [], [], wait)
+            if readable:
+                while True:
+                    try:
+                        data = sock.recv(65535)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    except OSError as e:
+                        # ICMP port unreachable and similar fail every open question
+                        for query_id in list(pending):
+                            finish(pending.pop(query_id)[0], e)
+                        break
+                    try:
+                        response = parse_response(data)
+                    except ValueError:
+                        continue
+                    entry = pending.get(response["id"])
+                    if entry is None or not self._matches(entry[0], response):
+                        continue  # Late answer to a resent query, or spoofed
+                    del pending[response["id"]]
+                    question, packet = entry[0], entry[1]
+                    if response["rcode"] == RCODE_FORMERR and entry[4]:
+                        send(question, edns=False)
+                    elif response["truncated"]:
+                        try:
+                            finish(question, self._query_tcp(packet))
+                        except (OSError, ValueError) as e:
+                            finish(question, e)
+                    else:
+                        finish(question, response)
+
+            now = time.monotonic()
+            for query_id, entry in list(pending.items()):
+                if entry[3] > now:
+                    continue
+                del pending[query_id]
+                if entry[2] < self.retries:
+                    send(entry[0], entry[4], entry[2] + 1)
+                else:
+                    finish(entry[0], TimeoutError(f"No answer from {self.server} for {entry[0][0]} {entry[0][1]}"))
+        return results
+
+    @staticmethod
+    def _matches(question, response):
+        """True if a response answers the question it claims to"""
+        if response["question"] is None:
+            return False
+        name, record_type = response["question"]
+        return name.lower().rstrip(".") == question[0].lower().rstrip(".") and record_type == question[1]
+
+    def _query_tcp(self, packet):
+        """
+        Ask again over TCP after a truncated UDP answer
+
+        Returns:
+            dict: Response from parse_response
+        """
+        with socket.create_connection((self.server, self.port), timeout=self.timeout) as conn:
+            conn.sendall(struct.pack("!H", len(packet)) + packet)
+            length = struct.unpack("!H", self._recv_exact(conn, 2))[0]
+            return parse_response(self._recv_exact(conn, length))
+
+    @staticmethod
+    def _recv_exact(conn, size):
+        data = b""
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Connection closed mid-message")
+            data += chunk
+        return data
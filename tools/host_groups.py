@@ -0,0 +1,236 @@
+"""
+Host Groups Module
+Groups monitored hosts by subnet or user tag and keeps per-group
+aggregates (availability, median RTT, worst p95, loss) up to date
+incrementally as samples arrive
+"""
+
+import ipaddress
+import threading
+
+from .streaming_stats import QuantileSketch
+
+
+class HostGroup:
+    """Running aggregates over the members of one group"""
+
+    # A member's p95 is re-read from its sketch every this many replies
+    P95_REFRESH = 10
+
+    def __init__(self, key):
+        """
+        Initialize group
+
+        Args:
+            key (str): Group name (subnet or tag)
+        """
+        self.key = key
+        self.members = {}  # {ip: HostData}
+        self.up = set()  # Members whose last probe was answered
+        self.success_count = 0
+        self.fail_count = 0
+        self.sketch = QuantileSketch()  # Every reply of every member
+        self._p95 = {}  # {ip: last computed p95}
+        self._worst_p95 = None
+        self._worst_dirty = False
+        self.version = 0  # Bumped on every change so the UI can skip unchanged groups
+
+    def add(self, host_data):
+        """Add a member, including the samples it already has"""
+        self.members[host_data.ip] = host_data
+        self.success_count += host_data.success_count
+        self.fail_count += host_data.fail_count
+        self.sketch.merge(host_data.stats.sketch)
+        if host_data.current_status not in ("offline", "unknown"):
+            self.up.add(host_data.ip)
+        self._update_p95(host_data)
+        self.version += 1
+
+    def remove(self, host_data):
+        """Remove a member and its samples"""
+        if self.members.pop(host_data.ip, None) is None:
+            return
+        self.success_count -= host_data.success_count
+        self.fail_count -= host_data.fail_count
+        self.sketch.merge(host_data.stats.sketch, sign=-1)
+        self.up.discard(host_data.ip)
+        if self._p95.pop(host_data.ip, None) == self._worst_p95:
+            self._worst_dirty = True
+        self.version += 1
+
+    def add_sample(self, host_data, rtt):
+        """
+        Update aggregates with one sample of a member
+
+        Args:
+            host_data (HostData): Member the sample belongs to
+            rtt (float): Round-trip time in ms, or None for a lost probe
+        """
+        if rtt is None:
+            self.fail_count += 1
+            self.up.discard(host_data.ip)
+        else:
+            self.success_count += 1
+            self.up.add(host_data.ip)
+            self.sketch.add(rtt)
+            if host_data.stats.count % self.P95_REFRESH == 1:
+                self._update_p95(host_data)
+        self.version += 1
+
+    def _update_p95(self, host_data):
+        """Refresh one member's p95 and the group maximum"""
+        value = host_data.stats.sketch.quantile(0.95)
+        old = self._p95.get(host_data.ip)
+        if value is None:
+            return
+        self._p95[host_data.ip] = value
+        if self._worst_p95 is None or value >= self._worst_p95:
+            self._worst_p95 = value
+        elif old == self._worst_p95:
+            # The worst member improved; find the new maximum on next read
+            self._worst_dirty = True
+
+    def get_availability(self):
+        """Percentage of members whose last probe was answered"""
+        return len(self.up) / len(self.members) * 100 if self.members else 0.0
+
+    def get_median_latency(self):
+        """Median RTT over all replies of all members (None if no replies)"""
+        return self.sketch.quantile(0.5)
+
+    def get_worst_p95(self):
+        """Highest member p95 latency (None if no replies)"""
+        if self._worst_dirty:
+            self._worst_p95 = max(self._p95.values(), default=None)
+            self._worst_dirty = False
+        return self._worst_p95
+
+    def get_packet_loss(self):
+        """Loss percentage over all probes of all members"""
+        total = self.success_count + self.fail_count
+        return self.fail_count / total * 100 if total else 0.0
+
+    def summary(self):
+        """
+        Get the aggregates as a dict
+
+        Returns:
+            dict: key, hosts, up, availability, median, worst_p95, loss
+        """
+        return {
+            "key": self.key,
+            "hosts": len(self.members),
+            "up": len(self.up),
+            "availability": self.get_availability(),
+            "median": self.get_median_latency(),
+            "worst_p95": self.get_worst_p95(),
+            "loss": self.get_packet_loss(),
+        }
+
+
+class HostGroups:
+    """Assigns monitored hosts to groups by subnet prefix or tag"""
+
+    UNTAGGED = "Untagged"
+
+    def __init__(self, mode="subnet", prefix=24):
+        """
+        Initialize grouping
+
+        Args:
+            mode (str): "subnet", "tag" or "none"
+            prefix (int): Subnet prefix length in subnet mode
+        """
+        self.mode = mode
+        self.prefix = prefix
+        self.tags = {}  # {ip: tag}
+        self.groups = {}  # {key: HostGroup}
+        self._host_group = {}  # {ip: key}
+        self._lock = threading.RLock()  # Samples arrive on the monitor thread
+
+    def group_key(self, host_data):
+        """
+        Get the group a host belongs to
+
+        Args:
+            host_data (HostData): Host; subnets use its probed address so
+                                  TCP/HTTP targets group with their IP
+
+        Returns:
+            str: Group key, or None when grouping is off
+        """
+        if self.mode == "none":
+            return None
+        if self.mode == "tag":
+            return self.tags.get(host_data.ip, self.UNTAGGED)
+        try:
+            return str(ipaddress.ip_network(f"{host_data.address}/{self.prefix}", strict=False))
+        except ValueError:
+            return self.UNTAGGED
+
+    def add_host(self, host_data, tag=None):
+        """
+        Add a host to its group
+
+        Args:
+            host_data (HostData): Host to add
+            tag (str): Optional tag used in tag mode
+        """
+        with self._lock:
+            if tag:
+                self.tags[host_data.ip] = tag
+            key = self.group_key(host_data)
+            if key is None:
+                return
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = HostGroup(key)
+            group.add(host_data)
+            self._host_group[host_data.ip] = key
+
+    def remove_host(self, host_data):
+        """Remove a host from its group, dropping the group when empty"""
+        with self._lock:
+            key = self._host_group.pop(host_data.ip, None)
+            group = self.groups.get(key)
+            if group is None:
+                return
+            group.remove(host_data)
+            if not group.members:
+                del self.groups[key]
+
+    def set_tag(self, host_data, tag):
+        """Change a host's tag, moving it between groups in tag mode"""
+        with self._lock:
+            self.remove_host(host_data)
+            self.tags[host_data.ip] = tag
+            self.add_host(host_data)
+
+    def set_mode(self, mode, prefix=None, hosts=()):
+        """
+        Regroup all hosts under a new mode
+
+        Args:
+            mode (str): "subnet", "tag" or "none"
+            prefix (int): Subnet prefix length (unchanged if None)
+            hosts: HostData objects to regroup
+        """
+        with self._lock:
+            self.mode = mode
+            if prefix is not None:
+                self.prefix = prefix
+            self.groups = {}
+            self._host_group = {}
+            for host_data in hosts:
+                self.add_host(host_data)
+
+    def add_sample(self, host_data, rtt):
+        """Forward a sample to the host's group"""
+        with self._lock:
+            group = self.groups.get(self._host_group.get(host_data.ip))
+            if group is not None:
+                group.add_sample(host_data, rtt)
+
+    def get_group(self, ip):
+        """Get the HostGroup of a host (None if ungrouped)"""
+        return self.groups.get(self._host_group.get(ip))
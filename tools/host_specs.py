@@ -0,0 +1,126 @@
+"""
+Host Specs Module
+Compact host specifications for the live monitor: CIDRs and address ranges
+are kept as integer ranges and only expanded one address at a time
+"""
+
+import ipaddress
+import re
+
+
+class HostRange:
+    """Inclusive range of IPv4/IPv6 addresses stored as two integers"""
+
+    def __init__(self, start, end, version=4):
+        """
+        Initialize range
+
+        Args:
+            start (int): First address as an integer
+            end (int): Last address as an integer
+            version (int): 4 or 6
+        """
+        self.start = start
+        self.end = end
+        self.version = version
+
+    @classmethod
+    def from_network(cls, network):
+        """Range of the usable hosts of a network (like network.hosts())"""
+        first = int(network.network_address)
+        last = int(network.broadcast_address)
+        if network.version == 4 and network.prefixlen < 31:
+            first, last = first + 1, last - 1
+        elif network.version == 6 and network.prefixlen < 127:
+            first += 1  # Subnet-router anycast address
+        return cls(first, last, network.version)
+
+    def __len__(self):
+        return max(0, self.end - self.start + 1)
+
+    def __iter__(self):
+        address = ipaddress.IPv4Address if self.version == 4 else ipaddress.IPv6Address
+        for value in range(self.start, self.end + 1):
+            yield str(address(value))
+
+    def __contains__(self, ip):
+        try:
+            value = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        return value.version == self.version and self.start <= int(value) <= self.end
+
+    def __repr__(self):
+        address = ipaddress.IPv4Address if self.version == 4 else ipaddress.IPv6Address
+        return f"HostRange({address(self.start)}-{address(self.end)})"
+
+
+def parse_host_specs(input_text, max_hosts=None):
+    """
+    Parse IPs, CIDRs, ranges and other targets without expanding them
+
+    Args:
+        input_text (str): Comma/space separated specs
+        max_hosts (int): Reject single specs larger than this (None for no limit)
+
+    Returns:
+        tuple: (list of HostRange or str targets, list of error messages).
+               Strings are hostnames, host:port or URLs to be resolved later.
+    """
+    specs = []
+    errors = []
+
+    for part in re.split(r'[,\s]+', input_text):
+        part = part.strip()
+        if not part:
+            continue
+
+        spec = None
+        # Check if it's a CIDR notation (e.g., 192.168.1.0/24)
+        if '/' in part and '://' not in part:
+            try:
+                spec = HostRange.from_network(ipaddress.ip_network(part, strict=False))
+            except ValueError:
+                spec = None
+
+        # Check if it's a range (e.g., 192.168.1.1-192.168.1.50 or 192.168.1.1-50)
+        if spec is None and '-' in part and '://' not in part:
+            start_ip, end_ip = (p.strip() for p in part.split('-', 1))
+            if '.' not in end_ip and ':' not in end_ip:
+                start_parts = start_ip.split('.')
+                if len(start_parts) == 4:
+                    end_ip = '.'.join(start_parts[:3]) + '.' + end_ip
+            try:
+                start = ipaddress.ip_address(start_ip)
+                end = ipaddress.ip_address(end_ip)
+                if start.version != end.version or end < start:
+                    errors.append(f"Invalid range {part}: start IP must be less than or equal to end IP")
+                    continue
+                spec = HostRange(int(start), int(end), start.version)
+            except ValueError:
+                spec = None
+
+        # Check if it's a single IP address
+        if spec is None:
+            try:
+                ip = ipaddress.ip_address(part)
+                spec = HostRange(int(ip), int(ip), ip.version)
+            except ValueError:
+                # Hostname, host:port or URL
+                specs.append(part)
+                continue
+
+        if max_hosts is not None and len(spec) > max_hosts:
+            errors.append(
+                f"{part} contains {len(spec)} hosts. "
+                f"Maximum {max_hosts} hosts allowed per input."
+            )
+            continue
+        specs.append(spec)
+
+    return specs, errors
+
+
+def count_hosts(specs):
+    """Number of targets in a list of specs"""
+    return sum(len(spec) if isinstance(spec, HostRange) else 1 for spec in specs)
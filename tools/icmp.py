@@ -0,0 +1,133 @@
+"""
+ICMP Module
+ICMP packet helpers and a shared echo socket used by the live monitor
+"""
+
+import os
+import socket
+import struct
+
+from .syn_scanner import checksum
+
+
+# ICMP message types
+ICMP_ECHO_REPLY = 0
+ICMP_DEST_UNREACH = 3
+ICMP_ECHO_REQUEST = 8
+ICMP_TIME_EXCEEDED = 11
+
+
+def build_echo_request(identifier, seq, payload=b""):
+    """
+    Build an ICMP echo request
+
+    Args:
+        identifier (int): 16-bit identifier
+        seq (int): 16-bit sequence number
+        payload (bytes): Optional payload
+
+    Returns:
+        bytes: ICMP message with valid checksum
+    """
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, identifier & 0xFFFF, seq & 0xFFFF)
+    csum = checksum(header + payload)
+    return struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, csum, identifier & 0xFFFF, seq & 0xFFFF) + payload
+
+
+def parse_icmp(packet):
+    """
+    Parse an ICMP message, with or without a leading IPv4 header
+
+    Raw sockets deliver the IP header, unprivileged datagram ICMP sockets on
+    Linux do not. The first nibble tells them apart (ICMP types are < 64).
+
+    Args:
+        packet (bytes): Received data
+
+    Returns:
+        dict: type, code, id, seq and quoted (payload of error messages),
+              or None if too short
+    """
+    offset = 0
+    if packet and packet[0] >> 4 == 4:
+        offset = (packet[0] & 0x0F) * 4
+    if len(packet) < offset + 8:
+        return None
+    icmp_type, code, _, identifier, seq = struct.unpack("!BBHHH", packet[offset:offset + 8])
+    return {
+        "type": icmp_type,
+        "code": code,
+        "id": identifier,
+        "seq": seq,
+        "quoted": packet[offset + 8:],
+    }
+
+
+class IcmpSocket:
+    """Non-blocking ICMP echo socket shared by many probes"""
+
+    def __init__(self):
+        """
+        Open a raw ICMP socket, or an unprivileged datagram ICMP socket
+
+        Raises:
+            OSError: If neither socket type is permitted
+        """
+        try:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            self.raw = True
+        except PermissionError:
+            # Linux (ping_group_range) and macOS allow this without root
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            self.raw = False
+        self.sock.setblocking(False)
+        self.identifier = os.getpid() & 0xFFFF
+
+    def fileno(self):
+        """File descriptor for select()"""
+        return self.sock.fileno()
+
+    def send_echo(self, ip, seq, payload=b""):
+        """
+        Send an echo request
+
+        Args:
+            ip (str): Destination IPv4 address
+            seq (int): Sequence number
+            payload (bytes): Optional payload
+
+        Returns:
+            bool: True if the packet was handed to the kernel
+        """
+        try:
+            self.sock.sendto(build_echo_request(self.identifier, seq, payload), (ip, 0))
+            return True
+        except (BlockingIOError, OSError):
+            return False
+
+    def recv_all(self):
+        """
+        Drain all pending ICMP messages
+
+        Returns:
+            list: (source_ip, parsed message) tuples
+        """
+        messages = []
+        while True:
+            try:
+                packet, addr = self.sock.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                break
+            parsed = parse_icmp(packet)
+            if parsed is not None:
+                messages.append((addr[0], parsed))
+        return messages
+
+    def close(self):
+        """Close the socket"""
+        try:
+            self.sock.close()
+        except OSError:
+            pass
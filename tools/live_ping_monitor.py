@@ -3,58 +3,216 @@ Live Ping Monitor Tool
 Provides continuous ping monitoring with real-time graphs
 """
 
+import select
 import threading
 import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pythonping import ping
 import socket
 
+from .icmp import IcmpSocket, ICMP_ECHO_REPLY
+from .time_series import HostTimeSeries
+from .streaming_stats import RunningStats
+from .alert_engine import AlertEngine
+from .host_groups import HostGroups
+from .service_probes import (
+    PROBE_ICMP, PROBE_TCP, PROBE_HTTP, parse_target,
+    start_tcp_connect, finish_tcp_connect, HttpProbe
+)
+
 
 class LivePingMonitor:
-    """Live ping monitor with real-time latency tracking"""
+    """Live ping monitor with real-time latency tracking
+    
+    All hosts are probed by one scheduler thread. Each interval the sends
+    are spread evenly across the interval from one shared ICMP socket, and
+    replies are matched back to hosts by source address and sequence number.
+    
+    Targets given as host:port are probed with a non-blocking TCP connect
+    on the same select loop; http(s):// URLs are timed to first byte over
+    kept-alive connections in a small worker pool. All probe types feed
+    the same statistics, alerts and store.
+    
+    Address ranges are queued as compact HostRange specs and only turned
+    into HostData as the scheduler reaches them; hostnames are resolved in
+    a background pool.
+    """
+    
+    # Most queued range addresses turned into hosts per scheduler tick
+    MATERIALIZE_PER_TICK = 2048
     
-    def __init__(self):
+    def __init__(self, interval=1.0, timeout=1.0, store=None, alerts=None):
         self.monitoring = False
         self.paused = False
-        self.hosts = {}  # {ip: HostData}
-        self.threads = []
+        self.hosts = {}  # {ip: HostData}, changed only under _hosts_lock
+        self._hosts_lock = threading.Lock()  # Hosts are added from the resolver pool too
+        self.interval = interval  # Seconds between probes of the same host
+        self.timeout = timeout  # Seconds before an unanswered probe is a loss
+        self.store = store  # Optional MonitorStore that records every sample
+        self.session_id = None
+        self.alerts = alerts if alerts is not None else AlertEngine()  # Evaluated on every sample
+        self.groups = HostGroups()  # Per-subnet/tag aggregates, updated on every sample
+        
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._icmp = None
+        self._fallback_pool = None
+        self._seq = 0
+        self._pending = {}  # {(ip, seq): (send_time, HostData)}
+        self._pending_order = deque()  # (send_time, ip, seq) in send order
+        self._tcp_pending = {}  # {socket: (send_time, HostData)}
+        self._http = HttpProbe(timeout=max(timeout, 2.0))
+        self._http_pool = None
+        self._http_in_flight = set()  # Keys of HTTP targets with a request running
+        self._fallback_in_flight = set()  # Keys of hosts with a pythonping probe running
+        self._in_flight_lock = threading.Lock()  # In-flight sets are released from pool threads
+        
+        self._specs = deque()  # [iterator over a HostRange, tag] not yet materialized
+        self._specs_lock = threading.Lock()
+        self._pending_hosts = 0  # Addresses queued in _specs
+        self._resolver = None  # Pool resolving hostnames in the background
+        self._resolving = 0
+        
+    def add_range(self, host_range, tag=None):
+        """
+        Queue an address range without creating per-host state
+        
+        Args:
+            host_range (HostRange): Addresses to monitor
+            tag (str): Optional group tag
+        """
+        with self._specs_lock:
+            self._specs.append([iter(host_range), tag])
+            self._pending_hosts += len(host_range)
+    
+    def add_targets(self, targets, tag=None):
+        """
+        Resolve hostnames, host:port and URL targets in the background and add them
+        
+        Args:
+            targets (list): Targets as accepted by add_host
+            tag (str): Optional group tag
+        """
+        if not targets:
+            return
+        with self._specs_lock:
+            if self._resolver is None:
+                self._resolver = ThreadPoolExecutor(max_workers=16)
+            self._resolving += len(targets)
+        for target in targets:
+            self._resolver.submit(self._resolve_and_add, target, tag)
+    
+    def _resolve_and_add(self, target, tag):
+        """Resolver pool task"""
+        try:
+            self.add_host(target, tag)
+        finally:
+            with self._specs_lock:
+                self._resolving -= 1
+    
+    def get_pending_count(self):
+        """Targets queued or resolving that have no HostData yet"""
+        return self._pending_hosts + self._resolving
+    
+    def _materialize(self, limit):
+        """Turn up to limit queued range addresses into hosts"""
+        added = []
+        with self._specs_lock:
+            while self._specs and len(added) < limit:
+                spec = self._specs[0]
+                for ip in spec[0]:
+                    self._pending_hosts -= 1
+                    if self._register(ip, "", PROBE_ICMP, ip, None, None, spec[1], record=False):
+                        added.append(ip)
+                    if len(added) >= limit:
+                        break
+                else:
+                    self._specs.popleft()
+        if added and self.store and self.session_id is not None:
+            # Queued only; the store's writer thread commits the host list
+            self.store.add_session_hosts(self.session_id, added)
+        return len(added)
+    
+    def add_host(self, address, tag=None):
+        """
+        Add a target to monitor, optionally tagged for grouping
+        
+        Args:
+            address (str): IP or hostname (ICMP), host:port (TCP connect)
+                           or http(s):// URL (HTTP time to first byte)
+            tag (str): Optional group tag
+            
+        Returns:
+            str: Key of the new target in self.hosts, or None if already monitored
+        """
+        target = parse_target(address)
+        host = target["host"]
         
-    def add_host(self, address):
-        """Add a host to monitor (IP or hostname)"""
         # Resolve hostname if needed
         try:
             # Try to resolve as hostname first
-            ip = socket.gethostbyname(address)
-            hostname = address if address != ip else ""
+            ip = socket.gethostbyname(host)
+            hostname = host if host != ip else ""
         except:
             # Assume it's already an IP
-            ip = address
+            ip = host
             hostname = ""
         
-        if ip not in self.hosts:
-            self.hosts[ip] = HostData(ip, hostname)
-            return ip
+        if target["probe"] == PROBE_TCP:
+            key = f"{ip}:{target['port']}"
+        elif target["probe"] == PROBE_HTTP:
+            key = target["url"]
+            hostname = ""
+        else:
+            key = ip
+        
+        if self._register(key, hostname, target["probe"], ip, target["port"], target["url"], tag):
+            return key
         return None
     
+    def _register(self, key, hostname, probe, ip, port, url, tag, record=True):
+        """Create HostData for a target unless it is already monitored"""
+        with self._hosts_lock:
+            if key in self.hosts:
+                return False
+            host_data = HostData(
+                key, hostname, recorder=self._on_sample,
+                probe=probe, address=ip, port=port, url=url
+            )
+            self.hosts[key] = host_data
+            self.groups.add_host(host_data, tag)
+        if record and self.store and self.session_id is not None:
+            self.store.add_session_hosts(self.session_id, [key])
+        return True
+    
     def remove_host(self, ip):
         """Remove a host from monitoring"""
-        if ip in self.hosts:
-            del self.hosts[ip]
+        with self._hosts_lock:
+            host_data = self.hosts.pop(ip, None)
+            if host_data is None:
+                return
+            self.groups.remove_host(host_data)
+        self.alerts.forget(ip)
+        if host_data.probe == PROBE_HTTP:
+            self._http.close(host_data.url)
     
     def start_monitoring(self):
         """Start monitoring all hosts"""
         self.monitoring = True
         self.paused = False
         
-        # Start a thread for each host
-        for ip, host_data in self.hosts.items():
-            thread = threading.Thread(
-                target=self._monitor_host,
-                args=(ip, host_data),
-                daemon=True
-            )
-            thread.start()
-            self.threads.append(thread)
+        if self._thread and self._thread.is_alive():
+            return
+        
+        if self.store and self.session_id is None:
+            with self._hosts_lock:
+                hosts = list(self.hosts)
+            self.session_id = self.store.start_session(hosts, self.interval)
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_scheduler, daemon=True)
+        self._thread.start()
     
     def pause_monitoring(self):
         """Pause monitoring"""
@@ -68,35 +226,235 @@ class LivePingMonitor:
         """Stop monitoring all hosts"""
         self.monitoring = False
         self.paused = False
-        # Wait for threads to finish
-        for thread in self.threads:
-            if thread.is_alive():
-                thread.join(timeout=2)
-        self.threads.clear()
-    
-    def _monitor_host(self, ip, host_data):
-        """Monitor a single host continuously"""
-        while self.monitoring:
-            if not self.paused:
-                try:
-                    # Ping the host
-                    response = ping(ip, timeout=1, count=1, verbose=False)
-                    
-                    if response.success():
-                        rtt = response.rtt_avg_ms
-                        host_data.add_ping_result(True, rtt)
-                    else:
-                        host_data.add_ping_result(False, None)
-                        
-                except Exception:
-                    host_data.add_ping_result(False, None)
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2)
+        self._thread = None
+        
+        if self.store and self.session_id is not None:
+            self.store.end_session(self.session_id)
+            self.session_id = None
+    
+    def _on_sample(self, ip, t, rtt):
+        """Update group aggregates, evaluate alert rules and hand the sample to the store"""
+        host_data = self.hosts.get(ip)
+        if host_data is not None:
+            self.groups.add_sample(host_data, rtt)
+        self.alerts.process(ip, t, rtt)
+        
+        # Queued only; the store writes in the background
+        session_id = self.session_id
+        if self.store and session_id is not None:
+            self.store.record(session_id, ip, t, rtt)
+    
+    def _run_scheduler(self):
+        """Scheduler loop: one tick per interval, sends spread across the tick"""
+        try:
+            self._icmp = IcmpSocket()
+        except OSError:
+            # No ICMP socket permitted - fall back to pythonping in a small pool
+            self._icmp = None
+            self._fallback_pool = ThreadPoolExecutor(max_workers=32)
+        self._http_pool = ThreadPoolExecutor(max_workers=16)
+        
+        try:
+            next_tick = time.monotonic()
+            while not self._stop_event.is_set():
+                tick_start = next_tick
+                next_tick += self.interval
+                
+                if self._specs and not self.paused:
+                    self._materialize(self.MATERIALIZE_PER_TICK)
+                
+                hosts = []
+                if not self.paused:
+                    with self._hosts_lock:
+                        hosts = list(self.hosts.values())
+                spacing = self.interval / len(hosts) if hosts else 0
+                
+                for i, host_data in enumerate(hosts):
+                    self._wait_until(tick_start + i * spacing)
+                    if self._stop_event.is_set():
+                        break
+                    self._send_probe(host_data)
+                
+                self._wait_until(next_tick)
+                
+                # Skip ticks instead of bursting if we fell behind
+                now = time.monotonic()
+                if now - next_tick > self.interval:
+                    next_tick = now
+        finally:
+            if self._icmp:
+                self._icmp.close()
+                self._icmp = None
+            if self._fallback_pool:
+                self._fallback_pool.shutdown(wait=False, cancel_futures=True)
+                self._fallback_pool = None
+            self._http_pool.shutdown(wait=False, cancel_futures=True)
+            self._http_pool = None
+            self._http.close()
+            with self._in_flight_lock:
+                self._http_in_flight.clear()
+                self._fallback_in_flight.clear()
+            for sock in self._tcp_pending:
+                sock.close()
+            self._tcp_pending.clear()
+            self._pending.clear()
+            self._pending_order.clear()
+    
+    def _send_probe(self, host_data):
+        """Send one probe for a target"""
+        if host_data.probe == PROBE_TCP:
+            self._send_tcp_probe(host_data)
+            return
+        if host_data.probe == PROBE_HTTP:
+            # Skip the tick if the previous request is still running, so a
+            # slow endpoint never gets more than one request at a time
+            if self._claim(self._http_in_flight, host_data.ip):
+                self._http_pool.submit(self._http_probe, host_data)
+            return
+        
+        if self._icmp is None:
+            # Same rule as HTTP: a host whose previous ping is still running
+            # skips the tick, so the pool queue stays bounded by the host count
+            # and results of one host are never recorded concurrently
+            if self._claim(self._fallback_in_flight, host_data.ip):
+                self._fallback_pool.submit(self._fallback_ping, host_data)
+            return
+        
+        self._seq = (self._seq + 1) & 0xFFFF
+        send_time = time.perf_counter()
+        if self._icmp.send_echo(host_data.address, self._seq):
+            self._pending[(host_data.address, self._seq)] = (send_time, host_data)
+            self._pending_order.append((send_time, host_data.address, self._seq))
+        else:
+            host_data.add_ping_result(False, None)
+    
+    def _claim(self, in_flight, key):
+        """Mark a target as having a pool probe running; False if it already has one"""
+        with self._in_flight_lock:
+            if key in in_flight:
+                return False
+            in_flight.add(key)
+            return True
+    
+    def _release(self, in_flight, key):
+        """Mark a target's pool probe as finished"""
+        with self._in_flight_lock:
+            in_flight.discard(key)
+    
+    def _send_tcp_probe(self, host_data):
+        """Start a non-blocking connect; _wait_until completes it"""
+        send_time = time.perf_counter()
+        try:
+            sock = start_tcp_connect(host_data.address, host_data.port)
+        except OSError:
+            sock = None
+        if sock is None:
+            host_data.add_ping_result(False, None)
+        else:
+            self._tcp_pending[sock] = (send_time, host_data)
+    
+    def _handle_tcp_connects(self, sockets):
+        """Record connects whose handshake finished"""
+        done_time = time.perf_counter()
+        for sock in sockets:
+            probe = self._tcp_pending.pop(sock, None)
+            if probe is None:
+                continue
+            send_time, host_data = probe
+            if finish_tcp_connect(sock):
+                host_data.add_ping_result(True, (done_time - send_time) * 1000)
+            else:
+                host_data.add_ping_result(False, None)
+    
+    def _http_probe(self, host_data):
+        """Time one HTTP request on the target's kept-alive connection"""
+        try:
+            ttfb = self._http.probe(host_data.url)
+            if ttfb is not None:
+                host_data.add_ping_result(True, ttfb)
+            else:
+                host_data.add_ping_result(False, None)
+        finally:
+            self._release(self._http_in_flight, host_data.ip)
+    
+    def _fallback_ping(self, host_data):
+        """Probe a host with pythonping (used when no ICMP socket is available)"""
+        try:
+            response = ping(host_data.address, timeout=self.timeout, count=1, verbose=False)
+            if response.success():
+                host_data.add_ping_result(True, response.rtt_avg_ms)
+            else:
+                host_data.add_ping_result(False, None)
+        except Exception:
+            host_data.add_ping_result(False, None)
+        finally:
+            self._release(self._fallback_in_flight, host_data.ip)
+    
+    def _wait_until(self, deadline):
+        """Process replies and timeouts until the deadline"""
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            remaining = deadline - now
+            self._expire_probes()
+            if remaining <= 0:
+                return
             
-            # Wait 1 second before next ping
-            time.sleep(1)
+            read_list = [self._icmp] if self._icmp is not None else []
+            write_list = list(self._tcp_pending)
+            if not read_list and not write_list:
+                self._stop_event.wait(min(remaining, 0.1))
+                continue
+            
+            readable, writable, _ = select.select(read_list, write_list, [], min(remaining, 0.1))
+            if readable:
+                self._handle_replies()
+            if writable:
+                self._handle_tcp_connects(writable)
+    
+    def _handle_replies(self):
+        """Match received echo replies to pending probes"""
+        recv_time = time.perf_counter()
+        for src_ip, message in self._icmp.recv_all():
+            if message["type"] != ICMP_ECHO_REPLY:
+                continue
+            # Raw sockets see every reply on the system; datagram sockets
+            # only get their own, with the identifier rewritten by the kernel
+            if self._icmp.raw and message["id"] != self._icmp.identifier:
+                continue
+            probe = self._pending.pop((src_ip, message["seq"]), None)
+            if probe is None:
+                continue
+            send_time, host_data = probe
+            host_data.add_ping_result(True, (recv_time - send_time) * 1000)
+    
+    def _expire_probes(self):
+        """Record losses for probes older than the timeout"""
+        now = time.perf_counter()
+        while self._pending_order and now - self._pending_order[0][0] >= self.timeout:
+            send_time, ip, seq = self._pending_order.popleft()
+            probe = self._pending.get((ip, seq))
+            if probe is not None and probe[0] == send_time:
+                del self._pending[(ip, seq)]
+                probe[1].add_ping_result(False, None)
+        
+        # Connects are kept in send order, so only the oldest need checking
+        expired = []
+        for sock, (send_time, host_data) in self._tcp_pending.items():
+            if now - send_time < self.timeout:
+                break
+            expired.append(sock)
+        for sock in expired:
+            _, host_data = self._tcp_pending.pop(sock)
+            sock.close()
+            host_data.add_ping_result(False, None)
     
     def get_all_hosts_data(self):
         """Get data for all monitored hosts"""
-        return self.hosts.copy()
+        with self._hosts_lock:
+            return self.hosts.copy()
     
     def export_data(self):
         """Export monitoring data to text format"""
@@ -105,18 +463,25 @@ class LivePingMonitor:
         lines.append("=" * 60)
         lines.append("")
         
-        for ip, host_data in self.hosts.items():
+        for ip, host_data in self.get_all_hosts_data().items():
             lines.append(f"Host: {ip}")
             if host_data.hostname:
                 lines.append(f"Hostname: {host_data.hostname}")
             lines.append(f"Status: {host_data.get_status_text()}")
             lines.append(f"Average Latency: {host_data.get_average_latency():.1f} ms")
+            lines.append(f"Min/Max Latency: {host_data.get_min_latency():.1f} / {host_data.get_max_latency():.1f} ms")
+            lines.append(f"Jitter: {host_data.get_jitter():.1f} ms")
+            percentiles = host_data.get_percentiles()
+            if percentiles[50] is not None:
+                lines.append("Percentiles: " + ", ".join(
+                    f"p{p} {value:.1f} ms" for p, value in percentiles.items()
+                ))
             lines.append(f"Packet Loss: {host_data.get_packet_loss():.1f}%")
             lines.append(f"Total Pings: {host_data.get_total_pings()}")
             lines.append("")
             
             # Add recent ping data
-            lines.append("Recent Pings (last 30):")
+            lines.append(f"Recent Pings (last {HostData.RECENT_COUNT}):")
             for i, (success, rtt) in enumerate(host_data.get_recent_pings(), 1):
                 if success:
                     lines.append(f"  {i}. {rtt:.1f} ms")
@@ -132,51 +497,100 @@ class LivePingMonitor:
 class HostData:
     """Data container for a monitored host"""
     
-    def __init__(self, ip, hostname=""):
-        self.ip = ip
+    # Latency thresholds (ms) shared by the status, the UI colors and the legend
+    LATENCY_GOOD = 200
+    LATENCY_WARNING = 500
+    
+    # Number of samples shown in graphs and recent statistics
+    RECENT_COUNT = 30
+    
+    def __init__(self, ip, hostname="", recorder=None, probe=PROBE_ICMP, address=None, port=None, url=None):
+        self.ip = ip  # Key of the target (IP, ip:port or URL)
         self.hostname = hostname
-        self.latencies = deque(maxlen=30)  # Last 30 pings
+        self.probe = probe  # "icmp", "tcp" or "http"
+        self.address = address or ip  # Resolved IP that is probed
+        self.port = port
+        self.url = url
+        self.recorder = recorder  # Optional callable(ip, time, rtt) run on every sample
+        self.series = HostTimeSeries()  # Raw samples plus 1-minute/1-hour rollups
+        self.stats = RunningStats()  # Session-wide running statistics
         self.success_count = 0
         self.fail_count = 0
-        self.current_status = "unknown"  # "online", "warning", "offline", "unknown"
+        self.current_status = "unknown"  # "online", "warning", "critical", "offline", "unknown"
         self.last_update = time.time()
+        self.version = 0  # Bumped on every result so the UI can skip unchanged hosts
     
     def add_ping_result(self, success, rtt):
         """Add a ping result"""
+        now = time.time()
         if success:
-            self.latencies.append(rtt)
+            self.series.add(now, rtt)
+            self.stats.add(rtt)
             self.success_count += 1
             
             # Determine status based on latency
-            if rtt < 50:
+            if rtt <= self.LATENCY_GOOD:
                 self.current_status = "online"
-            elif rtt < 150:
+            elif rtt <= self.LATENCY_WARNING:
                 self.current_status = "warning"
             else:
-                self.current_status = "warning"
+                self.current_status = "critical"
         else:
-            self.latencies.append(None)
+            self.series.add(now, None)
             self.fail_count += 1
             self.current_status = "offline"
         
-        self.last_update = time.time()
+        self.last_update = now
+        self.version += 1
+        if self.recorder:
+            self.recorder(self.ip, now, rtt if success else None)
     
-    def get_recent_pings(self):
+    def get_recent_pings(self, count=RECENT_COUNT):
         """Get list of (success, rtt) tuples for recent pings"""
         results = []
-        for rtt in self.latencies:
+        for _, rtt in self.series.recent(count):
             if rtt is not None:
                 results.append((True, rtt))
             else:
                 results.append((False, 0))
         return results
     
+    def get_history(self, start, end=None):
+        """
+        Get latency history for a time window (raw, 1-minute or 1-hour points)
+        
+        Args:
+            start (float): Window start (epoch seconds)
+            end (float): Window end (epoch seconds), None for now
+            
+        Returns:
+            tuple: (resolution in seconds, list of min/avg/max/loss points)
+        """
+        return self.series.query(start, end)
+    
     def get_average_latency(self):
-        """Get average latency (excluding timeouts)"""
-        valid_latencies = [rtt for rtt in self.latencies if rtt is not None]
-        if valid_latencies:
-            return sum(valid_latencies) / len(valid_latencies)
-        return 0.0
+        """Get average latency over the session (excluding timeouts)"""
+        return self.stats.mean
+    
+    def get_min_latency(self):
+        """Get minimum latency over the session (0 if no replies)"""
+        return self.stats.min or 0.0
+    
+    def get_max_latency(self):
+        """Get maximum latency over the session (0 if no replies)"""
+        return self.stats.max or 0.0
+    
+    def get_jitter(self):
+        """Get RFC 3550 interarrival jitter in ms"""
+        return self.stats.jitter
+    
+    def get_stddev(self):
+        """Get latency standard deviation in ms"""
+        return self.stats.stddev
+    
+    def get_percentiles(self, ps=(50, 95, 99)):
+        """Get latency percentiles as {percentile: ms or None}"""
+        return self.stats.percentiles(ps)
     
     def get_packet_loss(self):
         """Get packet loss percentage"""
@@ -194,6 +608,7 @@ class HostData:
         status_map = {
             "online": "Online (Good Latency)",
             "warning": "Online (High Latency)",
+            "critical": "Online (Very High Latency)",
             "offline": "Offline",
             "unknown": "Unknown"
         }
@@ -204,6 +619,7 @@ class HostData:
         color_map = {
             "online": "#00ff00",  # Green
             "warning": "#ffff00",  # Yellow
+            "critical": "#ff0000",  # Red
             "offline": "#ff0000",  # Red
             "unknown": "#808080"   # Gray
         }
@@ -0,0 +1,185 @@
+"""
+Metrics Exporter Module
+Optional Prometheus/OpenMetrics text endpoint for live monitor and scanner
+metrics, served from a background thread
+"""
+
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _escape(value):
+    """Escape a label value for the text exposition format"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    """Format a label set"""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value):
+    """Format a sample value"""
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsExporter:
+    """Serves /metrics in the Prometheus text format
+
+    Every value is read from counters that the monitor and scanners already
+    keep up to date (HostData counts, the RunningStats histogram and
+    IPv4Scanner.stats), so a scrape costs a constant amount per target and
+    never walks sample history.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, monitor=None, scanners=None, host="127.0.0.1", port=9108):
+        """
+        Initialize exporter
+
+        Args:
+            monitor (LivePingMonitor): Monitor to export (may be set later)
+            scanners (list): IPv4Scanner instances to export
+            host (str): Listen address (loopback by default)
+            port (int): Listen port (0 picks a free port)
+        """
+        self.monitor = monitor
+        self.scanners = list(scanners or [])
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def add_scanner(self, scanner):
+        """Export the metrics of another scanner"""
+        if scanner not in self.scanners:
+            self.scanners.append(scanner)
+
+    @property
+    def running(self):
+        """True while the HTTP endpoint is being served"""
+        return self._server is not None
+
+    @property
+    def url(self):
+        """URL of the metrics endpoint"""
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self):
+        """
+        Start serving in a background thread
+
+        Raises:
+            OSError: If the port cannot be bound
+        """
+        if self._server:
+            return
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", exporter.CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_port
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+    def render(self):
+        """
+        Render all metrics
+
+        Returns:
+            str: Text exposition format
+        """
+        lines = []
+        if self.monitor is not None:
+            self._render_monitor(lines)
+        if self.scanners:
+            self._render_scanners(lines)
+        return "\n".join(lines) + "\n"
+
+    def _render_monitor(self, lines):
+        """Per-target monitor metrics"""
+        hosts = list(self.monitor.hosts.values())
+
+        lines.append("# HELP nettools_monitor_up Whether the last probe of the target was answered")
+        lines.append("# TYPE nettools_monitor_up gauge")
+        for host_data in hosts:
+            up = 1 if host_data.current_status not in ("offline", "unknown") else 0
+            lines.append(f"nettools_monitor_up{_labels(target=host_data.ip, probe=host_data.probe)} {up}")
+
+        lines.append("# HELP nettools_monitor_probes_total Probes sent, by result")
+        lines.append("# TYPE nettools_monitor_probes_total counter")
+        for host_data in hosts:
+            for result, count in (("success", host_data.success_count), ("lost", host_data.fail_count)):
+                labels = _labels(target=host_data.ip, probe=host_data.probe, result=result)
+                lines.append(f"nettools_monitor_probes_total{labels} {count}")
+
+        lines.append("# HELP nettools_monitor_jitter_milliseconds RFC 3550 interarrival jitter")
+        lines.append("# TYPE nettools_monitor_jitter_milliseconds gauge")
+        for host_data in hosts:
+            labels = _labels(target=host_data.ip, probe=host_data.probe)
+            lines.append(f"nettools_monitor_jitter_milliseconds{labels} {_number(host_data.stats.jitter)}")
+
+        lines.append("# HELP nettools_monitor_rtt_milliseconds Round-trip time of answered probes")
+        lines.append("# TYPE nettools_monitor_rtt_milliseconds histogram")
+        for host_data in hosts:
+            histogram = host_data.stats.histogram
+            for bound, count in histogram.cumulative():
+                labels = _labels(target=host_data.ip, probe=host_data.probe, le=_number(bound))
+                lines.append(f"nettools_monitor_rtt_milliseconds_bucket{labels} {count}")
+            labels = _labels(target=host_data.ip, probe=host_data.probe)
+            lines.append(f"nettools_monitor_rtt_milliseconds_sum{labels} {_number(histogram.sum)}")
+            lines.append(f"nettools_monitor_rtt_milliseconds_count{labels} {histogram.count}")
+
+    def _render_scanners(self, lines):
+        """Scan duration and throughput metrics (counters summed over scanners)"""
+        totals = {}
+        last_duration = 0.0
+        last_rate = 0.0
+        for scanner in self.scanners:
+            for key, value in scanner.stats.items():
+                totals[key] = totals.get(key, 0) + value
+            last_duration = max(last_duration, scanner.stats['last_scan_duration_seconds'])
+            last_rate = max(last_rate, scanner.stats['last_scan_hosts_per_second'])
+
+        metrics = [
+            ("nettools_scan_runs_total", "counter", "Network scans run", totals.get('scans_total', 0)),
+            ("nettools_scan_hosts_total", "counter", "Hosts probed by network scans",
+             totals.get('hosts_scanned_total', 0)),
+            ("nettools_scan_hosts_online_total", "counter", "Hosts found online by network scans",
+             totals.get('hosts_online_total', 0)),
+            ("nettools_scan_duration_seconds_total", "counter", "Time spent scanning",
+             float(totals.get('scan_duration_seconds_total', 0.0))),
+            ("nettools_scan_last_duration_seconds", "gauge", "Duration of the last scan", last_duration),
+            ("nettools_scan_last_hosts_per_second", "gauge", "Throughput of the last scan", last_rate),
+        ]
+        for name, metric_type, help_text, value in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"{name} {_number(value)}")
@@ -0,0 +1,380 @@
+"""
+Monitor Store
+Append-only SQLite storage of live ping monitor sessions, written in
+batches from a background thread and replayed lazily by time window
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class MonitorStore:
+    """Persistent store of monitor samples with non-blocking writes
+
+    record() and add_session_hosts() only put work on a queue, so the probe
+    loop never waits for disk. A writer thread drains the queue and commits
+    everything it collected in one transaction every flush interval.
+    """
+
+    # Queue item tag of a host list added to a running session
+    _HOSTS = "hosts"
+
+    def __init__(self, db_path=None, flush_interval=1.0):
+        """
+        Initialize monitor store
+
+        Args:
+            db_path: Path of the SQLite database (default in ~/.nettools_history)
+            flush_interval (float): Seconds between batched commits
+        """
+        if db_path is None:
+            history_dir = Path.home() / ".nettools_history"
+            history_dir.mkdir(exist_ok=True)
+            db_path = history_dir / "monitor_sessions.db"
+        self.db_path = str(db_path)
+        self.flush_interval = flush_interval
+
+        self._queue = queue.SimpleQueue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    started REAL NOT NULL,
+                    ended REAL,
+                    interval REAL NOT NULL
+                )
+            """)
+            # rtt is NULL for a lost probe
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS samples (
+                    session_id INTEGER NOT NULL,
+                    host TEXT NOT NULL,
+                    t REAL NOT NULL,
+                    rtt REAL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_samples_session_time "
+                "ON samples (session_id, t)"
+            )
+            # Monitored hosts of each session, in the order they were added
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS session_hosts (
+                    session_id INTEGER NOT NULL,
+                    host TEXT NOT NULL,
+                    PRIMARY KEY (session_id, host)
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection for one transaction (so any thread may use the store)"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # Recording
+
+    def start_session(self, hosts, interval=1.0):
+        """
+        Start a new session
+
+        Args:
+            hosts (list): Monitored IPs
+            interval (float): Probe interval in seconds
+
+        Returns:
+            int: Session ID
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO sessions (started, interval) VALUES (?, ?)",
+                (time.time(), interval)
+            )
+            session_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT OR IGNORE INTO session_hosts (session_id, host) VALUES (?, ?)",
+                [(session_id, host) for host in hosts]
+            )
+        self._ensure_writer()
+        return session_id
+
+    def add_session_hosts(self, session_id, new_hosts):
+        """
+        Queue hosts added to a running session for writing (never blocks)
+
+        Args:
+            session_id (int): Session ID
+            new_hosts (list): Host keys; ones already in the session are ignored
+        """
+        self._queue.put((self._HOSTS, session_id, list(new_hosts)))
+
+    def end_session(self, session_id):
+        """
+        Flush pending samples and mark a session as ended
+
+        Args:
+            session_id (int): Session ID
+        """
+        self.flush()
+        with self._connect() as conn:
+            conn.execute("UPDATE sessions SET ended = ? WHERE id = ?", (time.time(), session_id))
+
+    def record(self, session_id, host, t, rtt):
+        """
+        Queue a sample for writing (never blocks)
+
+        Args:
+            session_id (int): Session ID
+            host (str): Host IP
+            t (float): Sample time (epoch seconds)
+            rtt (float): Round-trip time in ms, or None for a lost probe
+        """
+        self._queue.put((session_id, host, t, rtt))
+
+    def flush(self, timeout=5.0):
+        """
+        Wait until every queued sample has been committed
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            bool: True if everything was written
+        """
+        if self._writer is None or not self._writer.is_alive():
+            self._write_batch(self._drain())
+            return True
+        # The writer sets the marker once everything queued before it is committed
+        marker = threading.Event()
+        self._queue.put(marker)
+        return marker.wait(timeout)
+
+    def close(self):
+        """Flush pending samples and stop the writer thread"""
+        self._stop_event.set()
+        if self._writer and self._writer.is_alive():
+            self._writer.join(timeout=5)
+        self._writer = None
+        self._write_batch(self._drain())
+
+    def _ensure_writer(self):
+        """Start the writer thread if it is not running"""
+        with self._writer_lock:
+            if self._writer and self._writer.is_alive():
+                return
+            self._stop_event.clear()
+            self._writer = threading.Thread(target=self._run_writer, daemon=True)
+            self._writer.start()
+
+    def _run_writer(self):
+        """Writer loop: commit everything queued once per flush interval"""
+        while not self._stop_event.wait(self.flush_interval):
+            self._write_batch(self._drain())
+        self._write_batch(self._drain())
+
+    def _drain(self):
+        """Take all queued samples and flush markers"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _write_batch(self, batch):
+        """Commit a batch of samples and hosts in one transaction, then release flush waiters"""
+        samples = []
+        hosts = []
+        for item in batch:
+            if isinstance(item, threading.Event):
+                continue
+            if item[0] == self._HOSTS:
+                hosts.extend((item[1], host) for host in item[2])
+            else:
+                samples.append(item)
+        if samples or hosts:
+            try:
+                with self._connect() as conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO session_hosts (session_id, host) VALUES (?, ?)",
+                        hosts
+                    )
+                    conn.executemany(
+                        "INSERT INTO samples (session_id, host, t, rtt) VALUES (?, ?, ?, ?)",
+                        samples
+                    )
+            except sqlite3.Error as e:
+                print(f"Error writing monitor samples: {e}")
+        for item in batch:
+            if isinstance(item, threading.Event):
+                item.set()
+
+    # Replay
+
+    def list_sessions(self):
+        """
+        Get all recorded sessions, newest first
+
+        Returns:
+            list: Dicts with id, started, ended (last sample time if the
+                  session was not ended cleanly), interval and host_count
+                  (see session_hosts for the hosts themselves)
+        """
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT s.id, s.started, s.ended, s.interval,
+                       (SELECT MAX(t) FROM samples WHERE session_id = s.id),
+                       (SELECT COUNT(*) FROM session_hosts WHERE session_id = s.id)
+                FROM sessions s ORDER BY s.id DESC
+            """).fetchall()
+        return [
+            {
+                "id": session_id,
+                "started": started,
+                "ended": ended if ended is not None else last_sample,
+                "interval": interval,
+                "host_count": host_count,
+            }
+            for session_id, started, ended, interval, last_sample, host_count in rows
+        ]
+
+    def session_hosts(self, session_id, offset=0, limit=None):
+        """
+        Get one page of a session's hosts in the order they were added
+
+        Args:
+            session_id (int): Session ID
+            offset (int): Hosts to skip
+            limit (int): Maximum hosts returned (all if None)
+
+        Returns:
+            list: Host keys
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT host FROM session_hosts WHERE session_id = ? ORDER BY rowid LIMIT ? OFFSET ?",
+                (session_id, -1 if limit is None else limit, offset)
+            ).fetchall()
+        return [host for (host,) in rows]
+
+    def iter_samples(self, session_id, start=None, end=None, hosts=None, batch_size=5000):
+        """
+        Stream samples of a session in time order without loading them all
+
+        Args:
+            session_id (int): Session ID
+            start (float): Window start (epoch seconds), None for session start
+            end (float): Window end (epoch seconds), None for session end
+            hosts (list): Only these hosts (all if None)
+            batch_size (int): Rows fetched per round trip
+
+        Yields:
+            tuple: (host, time, rtt or None)
+        """
+        query = "SELECT host, t, rtt FROM samples WHERE session_id = ?"
+        params = [session_id]
+        if start is not None:
+            query += " AND t >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND t <= ?"
+            params.append(end)
+        if hosts:
+            query += f" AND host IN ({','.join('?' * len(hosts))})"
+            params.extend(hosts)
+        query += " ORDER BY t"
+
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def load_window(self, session_id, start, end, hosts=None):
+        """
+        Load one time window of a session grouped by host
+
+        Args:
+            session_id (int): Session ID
+            start (float): Window start (epoch seconds)
+            end (float): Window end (epoch seconds)
+            hosts (list): Only these hosts (all if None)
+
+        Returns:
+            dict: {host: [(time, rtt or None), ...]}
+        """
+        window = {}
+        for host, t, rtt in self.iter_samples(session_id, start, end, hosts):
+            window.setdefault(host, []).append((t, rtt))
+        return window
+
+    def window_summary(self, session_id, start, end, hosts, buckets):
+        """
+        Aggregate one time window per host inside SQLite
+
+        Args:
+            session_id (int): Session ID
+            start (float): Window start (epoch seconds)
+            end (float): Window end (epoch seconds)
+            hosts (list): Hosts to summarise
+            buckets (int): Number of equal time buckets the window is cut into
+
+        Returns:
+            dict: {host: {"count", "lost", "avg", "max", "buckets"}} for hosts
+                  with samples; avg and max are None if every probe was lost,
+                  buckets is a list of (index, average rtt or None if all lost)
+        """
+        if not hosts:
+            return {}
+        bucket_width = (end - start) / buckets
+        in_hosts = f"host IN ({','.join('?' * len(hosts))})"
+        params = [session_id, start, end] + list(hosts)
+        summary = {}
+        with self._connect() as conn:
+            for host, count, answered, avg, peak in conn.execute(
+                f"""SELECT host, COUNT(*), COUNT(rtt), AVG(rtt), MAX(rtt) FROM samples
+                    WHERE session_id = ? AND t >= ? AND t <= ? AND {in_hosts}
+                    GROUP BY host""",
+                params
+            ):
+                summary[host] = {"count": count, "lost": count - answered,
+                                 "avg": avg, "max": peak, "buckets": []}
+            for host, bucket, avg in conn.execute(
+                f"""SELECT host, MIN(CAST((t - ?) / ? AS INTEGER), ?) AS bucket, AVG(rtt)
+                    FROM samples
+                    WHERE session_id = ? AND t >= ? AND t <= ? AND {in_hosts}
+                    GROUP BY host, bucket ORDER BY host, bucket""",
+                [start, bucket_width, buckets - 1] + params
+            ):
+                summary[host]["buckets"].append((bucket, avg))
+        return summary
+
+    def delete_session(self, session_id):
+        """
+        Remove a session and its samples
+
+        Args:
+            session_id (int): Session ID
+        """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM samples WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_hosts WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
@@ -0,0 +1,270 @@
+"""
+Multipath Module
+Paris-style traceroute that keeps each probe's flow identifier constant and
+varies it between flows to enumerate load-balanced (ECMP) paths, with the
+MDA stopping rule bounding the number of probes per hop
+"""
+
+import math
+import select
+import socket
+import struct
+import time
+
+from .icmp import ICMP_DEST_UNREACH, ICMP_TIME_EXCEEDED
+from .traceroute_engine import METHOD_UDP, TracerouteEngine, parse_quoted
+
+
+def probes_needed(interfaces, confidence=0.95):
+    """
+    MDA stopping rule: flows to send to a hop before concluding that no
+    interface beyond those already seen exists
+
+    Args:
+        interfaces (int): Interfaces seen at the hop so far (at least 1)
+        confidence (float): Probability of having found every interface
+
+    Returns:
+        int: Number of flows that must have been probed at the hop
+    """
+    k = max(1, interfaces)
+    alpha = (1 - confidence) / (k + 1)
+    return int(math.ceil(math.log(alpha) / math.log(k / (k + 1))))
+
+
+def find_diamonds(hops):
+    """
+    Find load-balanced sections: a single hop that fans out into several
+    interfaces per hop and converges on a single hop again
+
+    Args:
+        hops (list): Hop dicts in order; "responders" lists every
+                     interface seen at a hop
+
+    Returns:
+        list: {start, end, divergence, convergence, width} dicts, where
+              start/end are the hop numbers of the divergence and
+              convergence points and width is the most interfaces at one hop
+    """
+    diamonds = []
+    divergence = None
+    width = 0
+    for hop in hops:
+        responders = hop.get("responders") or ([hop["ip"]] if hop.get("ip", "*") != "*" else [])
+        if len(responders) > 1:
+            if divergence is not None:
+                width = max(width, len(responders))
+            continue
+        if len(responders) == 1:
+            if divergence is not None and width > 1:
+                diamonds.append({
+                    "start": divergence["hop"],
+                    "end": hop["hop"],
+                    "divergence": divergence["ip"],
+                    "convergence": responders[0],
+                    "width": width,
+                })
+            divergence = {"hop": hop["hop"], "ip": responders[0]}
+            width = 1
+        # Unanswered hops neither open nor close a diamond
+    return diamonds
+
+
+class MultipathTracer(TracerouteEngine):
+    """Paris traceroute with multipath detection over UDP
+
+    A flow is one UDP destination port, kept identical for every TTL, so
+    per-flow load balancers send all of a flow's probes down the same path.
+    The TTL of a probe is carried in its payload length, which routers do
+    not hash on, and comes back in the quoted UDP length field. Flows are
+    added hop by hop until the MDA stopping rule is met for every hop or
+    max_flows is reached.
+    """
+
+    def __init__(self, max_hops=30, timeout=2.0, confidence=0.95, max_flows=64):
+        """
+        Initialize tracer
+
+        Args:
+            max_hops (int): Highest TTL probed
+            timeout (float): Seconds to wait for each round of probes
+            confidence (float): MDA confidence of having found every interface
+            max_flows (int): Upper bound on flows probed per hop
+        """
+        super().__init__(max_hops=max_hops, timeout=timeout, method=METHOD_UDP, probes=1, resolve=False)
+        self.confidence = confidence
+        self.max_flows = min(max_flows, self.PORT_RANGE)
+        self.probes_sent = 0
+
+    def _send_probe(self, ttl, dst_ip=None, flow=0):
+        """
+        Send one probe of a flow
+
+        Returns:
+            tuple: (flow, ttl) key, or None if sending failed
+        """
+        self._send.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+        try:
+            self._send.sendto(b"\x00" * ttl, (dst_ip or self._dst_ip, self.BASE_PORT + flow))
+        except OSError:
+            return None
+        self.probes_sent += 1
+        return flow, ttl
+
+    def _match_icmp(self, source, message):
+        """Match an ICMP error to the (flow, ttl) of the probe it quotes"""
+        if message["type"] not in (ICMP_TIME_EXCEEDED, ICMP_DEST_UNREACH):
+            return None
+        quoted = parse_quoted(message["quoted"])
+        if quoted is None or quoted["dst_ip"] not in self._destinations or quoted["proto"] != socket.IPPROTO_UDP:
+            return None
+        src_port, dst_port, length = struct.unpack("!HHH", quoted["head"][:6])
+        if src_port != self._src_port:
+            return None
+        key = (dst_port - self.BASE_PORT, length - 8)
+        return quoted["dst_ip"], key, message["type"] == ICMP_DEST_UNREACH and source == quoted["dst_ip"]
+
+    def _run_round(self, probes, cancel_check=None):
+        """
+        Send a set of (flow, ttl) probes at once and wait for the replies
+
+        Returns:
+            dict: {(flow, ttl): (ip, rtt_ms, from_destination)} for answered probes
+        """
+        pending = {}
+        for flow, ttl in probes:
+            key = self._send_probe(ttl, flow=flow)
+            if key is not None:
+                pending[key] = time.perf_counter()
+
+        answers = {}
+        deadline = time.perf_counter() + self.timeout
+        while pending and time.perf_counter() < deadline:
+            if cancel_check and cancel_check():
+                break
+            readable, _, _ = select.select(self._sockets(), [], [], min(0.05, max(0.0, deadline - time.perf_counter())))
+            if not readable:
+                continue
+            for _, key, source, from_destination, received in self._receive():
+                sent = pending.pop(key, None)
+                if sent is not None:
+                    answers[key] = (source, (received - sent) * 1000, from_destination)
+        return answers
+
+    def discover(self, target, cancel_check=None):
+        """
+        Enumerate the load-balanced paths to a target
+
+        Args:
+            target (str): Hostname or IPv4 address
+            cancel_check (callable): Optional callable returning True to stop early
+
+        Returns:
+            dict: target, ip, hops (with responders, flows per responder and
+                  links to the next hop), diamonds, reached, probes and duration
+
+        Raises:
+            socket.gaierror: If the target cannot be resolved
+            PermissionError: If raw sockets are not permitted
+        """
+        start = time.perf_counter()
+        dst_ip = socket.gethostbyname(target)
+        self.open(dst_ip)
+        self.probes_sent = 0
+        try:
+            seen = {}  # {ttl: {ip: [rtt, ...]}}
+            flows_probed = {}  # {ttl: flows sent}
+            paths = {}  # {flow: {ttl: ip}}
+            reached_at = None
+
+            # First round: one flow per TTL finds the path length
+            wanted = {ttl: 1 for ttl in range(1, self.max_hops + 1)}
+            while wanted and not (cancel_check and cancel_check()):
+                probes = []
+                for ttl, count in wanted.items():
+                    base = flows_probed.get(ttl, 0)
+                    # The same flow numbers at every TTL keep paths comparable
+                    probes.extend((flow, ttl) for flow in range(base, base + count))
+                    flows_probed[ttl] = base + count
+                answers = self._run_round(probes, cancel_check)
+
+                for (flow, ttl), (ip, rtt, from_destination) in answers.items():
+                    seen.setdefault(ttl, {}).setdefault(ip, []).append(rtt)
+                    paths.setdefault(flow, {})[ttl] = ip
+                    if from_destination and (reached_at is None or ttl < reached_at):
+                        reached_at = ttl
+
+                # Stopping rule: more flows only where the count seen so far requires them
+                last = reached_at or max(seen, default=0)
+                wanted = {}
+                for ttl in range(1, last + 1):
+                    if reached_at is not None and ttl == reached_at:
+                        continue  # The destination is a single interface
+                    needed = min(probes_needed(len(seen.get(ttl, ())), self.confidence), self.max_flows)
+                    if flows_probed.get(ttl, 0) < needed:
+                        wanted[ttl] = needed - flows_probed[ttl]
+
+            last = reached_at or max(seen, default=0)
+            hops = [self._make_multipath_hop(ttl, seen.get(ttl, {}), paths, ttl == reached_at, last)
+                    for ttl in range(1, last + 1)]
+        finally:
+            self.close()
+
+        return {
+            "target": target,
+            "ip": dst_ip,
+            "hops": hops,
+            "diamonds": find_diamonds(hops),
+            "reached": reached_at is not None,
+            "probes": self.probes_sent,
+            "duration": time.perf_counter() - start,
+        }
+
+    @staticmethod
+    def _make_multipath_hop(ttl, responders, paths, reached, last):
+        """Build the hop dict of one TTL from every flow's answer"""
+        rtts = [round(rtt, 3) for values in responders.values() for rtt in values]
+        ordered = sorted(responders, key=lambda ip: -len(responders[ip]))
+        # Flows keep their path, so consecutive answers of one flow are real links
+        links = sorted({
+            (path[ttl], path[ttl + 1]) for path in paths.values() if ttl in path and ttl + 1 in path
+        }) if ttl < last else []
+        return {
+            "hop": ttl,
+            "ip": ordered[0] if ordered else "*",
+            "responders": ordered,
+            "flows": {ip: len(responders[ip]) for ip in ordered},
+            "next": [list(link) for link in links],
+            "rtts": rtts,
+            "latency_ms": round(sum(rtts) / len(rtts), 2) if rtts else None,
+            "timeout": not rtts,
+            "reached": reached,
+        }
+
+    @staticmethod
+    def format_output(result):
+        """
+        Format a multipath trace, one line per hop listing every interface
+
+        Returns:
+            str: Text output
+        """
+        lines = [
+            f"Multipath trace to {result['target']} [{result['ip']}]",
+            f"{result['probes']} probes, {len(result['diamonds'])} load-balanced sections",
+            "",
+        ]
+        for hop in result["hops"]:
+            if hop["timeout"]:
+                lines.append(f"{hop['hop']:>3}  Request timed out.")
+                continue
+            latency = f"{hop['latency_ms']:.0f} ms" if hop["latency_ms"] >= 1 else "<1 ms"
+            lines.append(f"{hop['hop']:>3}  {latency:>7}  {', '.join(hop['responders'])}")
+        for diamond in result["diamonds"]:
+            lines.append(
+                f"Diamond hops {diamond['start']}-{diamond['end']}: {diamond['divergence']} -> "
+                f"{diamond['convergence']}, up to {diamond['width']} paths"
+            )
+        lines.append("")
+        lines.append("Trace complete." if result["reached"] else "Destination not reached.")
+        return "\n".join(lines) + "\n"
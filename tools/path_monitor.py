@@ -0,0 +1,202 @@
+"""
+Path Monitor Module
+Continuous MTR-style tracing: every hop is re-probed each cycle and keeps
+running loss and latency statistics
+"""
+
+import socket
+import threading
+import time
+
+from .streaming_stats import RunningStats
+from .traceroute_engine import METHOD_ICMP, TracerouteEngine
+
+
+class HopStats:
+    """Running statistics of one hop"""
+
+    def __init__(self, ttl):
+        """
+        Initialize hop
+
+        Args:
+            ttl (int): Hop number
+        """
+        self.ttl = ttl
+        self.sent = 0
+        self.received = 0
+        self.last = None
+        self.stats = RunningStats()
+        self.responders = {}  # {ip: replies}, more than one on load-balanced paths
+
+    def add(self, ip, rtt):
+        """
+        Record one probe
+
+        Args:
+            ip (str): Responding address (None if lost)
+            rtt (float): Round-trip time in ms (None if lost)
+        """
+        self.sent += 1
+        if rtt is None:
+            return
+        self.received += 1
+        self.last = rtt
+        self.stats.add(rtt)
+        self.responders[ip] = self.responders.get(ip, 0) + 1
+
+    @property
+    def loss(self):
+        """Loss percentage"""
+        return (self.sent - self.received) / self.sent * 100 if self.sent else 0.0
+
+    def summary(self):
+        """
+        Get the statistics as a dict
+
+        Returns:
+            dict: hop, ip (most frequent responder or "*"), responders,
+                  sent, received, loss, last, best, avg, worst, stdev
+        """
+        return {
+            "hop": self.ttl,
+            "ip": max(self.responders, key=self.responders.get) if self.responders else "*",
+            "responders": list(self.responders),
+            "sent": self.sent,
+            "received": self.received,
+            "loss": self.loss,
+            "last": self.last,
+            "best": self.stats.min,
+            "avg": self.stats.mean if self.received else None,
+            "worst": self.stats.max,
+            "stdev": self.stats.stddev if self.received else None,
+        }
+
+
+class PathMonitor:
+    """Re-traces a path on a schedule in a background thread
+
+    One TracerouteEngine keeps its sockets open for the whole session; each
+    cycle sends one probe per TTL up to the destination and feeds the
+    replies into per-hop HopStats. Readers only take snapshot() copies of
+    the aggregates, so the UI never touches individual samples.
+    """
+
+    def __init__(self, target, interval=1.0, max_hops=30, timeout=1.0, method=METHOD_ICMP):
+        """
+        Initialize monitor
+
+        Args:
+            target (str): Hostname or IPv4 address
+            interval (float): Seconds between cycles
+            max_hops (int): Highest TTL probed
+            timeout (float): Seconds to wait for replies (at most the interval)
+            method (str): "icmp", "udp" or "tcp"
+        """
+        self.target = target.strip()
+        self.interval = interval
+        self.engine = TracerouteEngine(
+            max_hops=max_hops, timeout=min(timeout, interval), method=method, probes=1, resolve=False
+        )
+        self.dst_ip = None
+        self.hops = {}  # {ttl: HopStats}
+        self.path_length = None  # Lowest TTL the destination answered at
+        self.cycles = 0
+        self.error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        """True while the background thread is probing"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Resolve the target and start probing in the background
+
+        Raises:
+            socket.gaierror: If the target cannot be resolved
+            PermissionError: If raw sockets are not permitted
+        """
+        if self.running:
+            return
+        self.dst_ip = socket.gethostbyname(self.target)
+        self.engine.open(self.dst_ip)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop probing and close the sockets"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.engine.timeout + 1)
+            self._thread = None
+
+    def _run(self):
+        """Probe cycles until stopped"""
+        try:
+            while not self._stop.is_set():
+                started = time.monotonic()
+                self.run_cycle()
+                self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        except OSError as e:
+            self.error = str(e)
+        finally:
+            self.engine.close()
+
+    def run_cycle(self):
+        """Probe every hop once and update its statistics"""
+        # Once the destination has answered, hops beyond it are not probed
+        max_ttl = self.path_length or self.engine.max_hops
+        hops = list(self.engine.probe_hops(max_ttl, cancel_check=self._stop.is_set))
+        if self._stop.is_set():
+            return
+        with self._lock:
+            for hop in hops:
+                stats = self.hops.get(hop["hop"])
+                if stats is None:
+                    stats = self.hops[hop["hop"]] = HopStats(hop["hop"])
+                rtt = hop["rtts"][0]
+                stats.add(hop["ip"] if rtt is not None else None, rtt)
+                if hop["reached"] and (self.path_length is None or hop["hop"] < self.path_length):
+                    self.path_length = hop["hop"]
+            self.cycles += 1
+
+    def snapshot(self):
+        """
+        Get the current per-hop statistics
+
+        Hops past the destination (or, while it has not answered, past the
+        last hop that ever replied) are left out.
+
+        Returns:
+            list: HopStats.summary() dicts ordered by hop
+        """
+        with self._lock:
+            last = self.path_length or max((ttl for ttl, stats in self.hops.items() if stats.received), default=0)
+            return [self.hops[ttl].summary() for ttl in sorted(self.hops) if ttl <= last]
+
+    def report(self):
+        """
+        Format the statistics like an mtr report
+
+        Returns:
+            str: Text report
+        """
+        lines = [
+            f"Continuous trace to {self.target} [{self.dst_ip}], {self.cycles} cycles",
+            f"{'Hop':>3}  {'Host':<18} {'Loss%':>6} {'Snt':>5} {'Last':>7} {'Avg':>7} {'Best':>7} {'Wrst':>7} {'StDev':>7}",
+        ]
+
+        def ms(value):
+            return f"{value:7.1f}" if value is not None else f"{'-':>7}"
+
+        for hop in self.snapshot():
+            lines.append(
+                f"{hop['hop']:>3}. {hop['ip']:<18} {hop['loss']:5.1f}% {hop['sent']:>5} "
+                f"{ms(hop['last'])} {ms(hop['avg'])} {ms(hop['best'])} {ms(hop['worst'])} {ms(hop['stdev'])}"
+            )
+        return "\n".join(lines) + "\n"
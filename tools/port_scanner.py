@@ -7,6 +7,10 @@ import socket
 import subprocess
 import platform
 
+from .rate_limiter import RateLimiter
+from .syn_scanner import SYNScanner
+from .udp_scanner import UDPScanner
+
 # Try to import telnetlib
 try:
     import telnetlib
@@ -18,6 +22,10 @@ except ImportError:
 class PortScanner:
     """Port scanning utility with multiple scan methods"""
     
+    # Probe budget shared by every SYN and UDP scan in the process, so
+    # concurrent scans split one rate instead of each getting their own
+    RATE_LIMITER = RateLimiter(1000)
+    
     # Common ports with their services
     COMMON_PORTS = {
         21: "FTP",
@@ -201,12 +209,21 @@ class PortScanner:
         Args:
             target (str): Target IP or hostname
             port (int): Port number
-            method (str): Scan method ("socket", "telnet", or "powershell")
+            method (str): Scan method ("socket", "syn", "udp", "telnet", or "powershell")
             timeout (float): Connection timeout in seconds
             
         Returns:
             dict: Scan result with port, status, and service
         """
+        if method == "syn":
+            results = SYNScanner(timeout=timeout, rate_limiter=PortScanner.RATE_LIMITER).scan(target, [port])
+            if results:
+                return results[0]
+            return {"port": port, "status": "Filtered", "service": "", "is_open": False}
+        
+        if method == "udp":
+            return UDPScanner(timeout=timeout, rate_limiter=PortScanner.RATE_LIMITER).scan(target, [port])[0]
+        
         if method == "telnet":
             is_open, service = PortScanner.scan_port_telnet(target, port, timeout)
         elif method == "powershell":
@@ -229,13 +246,24 @@ class PortScanner:
         Args:
             target (str): Target IP or hostname
             ports (list): List of port numbers to scan
-            method (str): Scan method ("socket", "telnet", or "powershell")
+            method (str): Scan method ("socket", "syn", "udp", "telnet", or "powershell")
             timeout (float): Connection timeout in seconds
             progress_callback (callable): Optional callback for progress updates
             
         Returns:
             list: List of open ports with their details
         """
+        if method == "syn":
+            # All ports are probed together from one raw socket
+            scanned = SYNScanner(timeout=timeout, rate_limiter=PortScanner.RATE_LIMITER).scan(
+                target, ports, progress_callback)
+            return [r for r in scanned if r["is_open"]]
+        
+        if method == "udp":
+            scanned = UDPScanner(timeout=timeout, rate_limiter=PortScanner.RATE_LIMITER).scan(
+                target, ports, progress_callback)
+            return [r for r in scanned if r["is_open"]]
+        
         results = []
         total = len(ports)
         
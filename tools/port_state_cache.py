@@ -0,0 +1,205 @@
+"""
+Port State Cache
+Persistent per-(host, port) state with last-verified timestamps, used to
+answer rescans from cache and only re-probe stale or changed ports
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class PortStateCache:
+    """SQLite-backed cross-session cache of port states"""
+
+    # Default freshness window in seconds
+    DEFAULT_FRESHNESS = 24 * 3600
+
+    def __init__(self, db_path=None, freshness=DEFAULT_FRESHNESS):
+        """
+        Initialize port state cache
+
+        Args:
+            db_path: Path of the SQLite database (default in ~/.nettools_history)
+            freshness (float): Seconds a verified state stays fresh
+        """
+        if db_path is None:
+            history_dir = Path.home() / ".nettools_history"
+            history_dir.mkdir(exist_ok=True)
+            db_path = history_dir / "port_state_cache.db"
+        self.db_path = str(db_path)
+        self.freshness = freshness
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS port_state (
+                    host TEXT NOT NULL,
+                    port INTEGER NOT NULL,
+                    protocol TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    service TEXT,
+                    last_verified REAL NOT NULL,
+                    last_changed REAL NOT NULL,
+                    method TEXT,
+                    PRIMARY KEY (host, port, protocol)
+                )
+            """)
+            # Caches created before states were tagged with their scan method
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(port_state)")]
+            if "method" not in columns:
+                conn.execute("ALTER TABLE port_state ADD COLUMN method TEXT")
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection for one transaction (so any thread may use the cache)"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_host(self, host, protocol="tcp"):
+        """
+        Get all cached states of a host
+
+        Args:
+            host (str): Target IP/hostname
+            protocol (str): "tcp" or "udp"
+
+        Returns:
+            dict: {port: {"state", "service", "last_verified", "last_changed"}}
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT port, state, service, last_verified, last_changed "
+                "FROM port_state WHERE host = ? AND protocol = ?",
+                (host, protocol)
+            ).fetchall()
+        return {
+            port: {
+                "state": state,
+                "service": service or "",
+                "last_verified": last_verified,
+                "last_changed": last_changed,
+            }
+            for port, state, service, last_verified, last_changed in rows
+        }
+
+    def plan(self, host, ports, protocol="tcp", verify_open=True, now=None):
+        """
+        Split ports into those that must be probed and those answered from cache
+
+        Ports never seen come first, then stale ones oldest first. Ports cached
+        as open are re-verified as a light pass when verify_open is set, since
+        a service going away is the change that matters most.
+
+        Args:
+            host (str): Target IP/hostname
+            ports (list): Requested ports
+            protocol (str): "tcp" or "udp"
+            verify_open (bool): Also probe fresh entries cached as open
+            now (float): Current time (defaults to time.time())
+
+        Returns:
+            tuple: (ports to probe, {port: cached entry} for the rest)
+        """
+        now = time.time() if now is None else now
+        cached = self.get_host(host, protocol)
+
+        unknown = []
+        stale = []
+        verify = []
+        fresh = {}
+        for port in dict.fromkeys(ports):
+            entry = cached.get(port)
+            if entry is None:
+                unknown.append(port)
+            elif now - entry["last_verified"] > self.freshness:
+                stale.append(port)
+            elif verify_open and entry["state"] == "Open":
+                verify.append(port)
+            else:
+                fresh[port] = entry
+
+        stale.sort(key=lambda p: cached[p]["last_verified"])
+        return unknown + stale + verify, fresh
+
+    @staticmethod
+    def _same_state(old_state, old_method, new_state, new_method):
+        """
+        Compare two states, possibly found by different scan methods
+
+        Methods do not tell non-open ports apart the same way (a connect scan
+        reports every one as "Closed", a SYN scan splits "Closed" from
+        "Filtered"), so across methods only open versus not open is compared.
+        """
+        if old_method == new_method:
+            return old_state == new_state
+        return (old_state == "Open") == (new_state == "Open")
+
+    def record(self, host, results, protocol="tcp", method=None, now=None):
+        """
+        Store probe results and report what changed
+
+        Args:
+            host (str): Target IP/hostname
+            results (list): Result dicts with "port", "status" and "service"
+            protocol (str): "tcp" or "udp"
+            method (str): Scan method that produced the results
+            now (float): Verification time (defaults to time.time())
+
+        Returns:
+            list: Deltas as {"port", "old_state", "new_state"} (old_state None if new)
+        """
+        now = time.time() if now is None else now
+        deltas = []
+
+        with self._connect() as conn:
+            previous = {
+                port: (state, old_method)
+                for port, state, old_method in conn.execute(
+                    "SELECT port, state, method FROM port_state WHERE host = ? AND protocol = ?",
+                    (host, protocol)
+                )
+            }
+
+            rows = []
+            for result in results:
+                port = result["port"]
+                state = result["status"]
+                old_state, old_method = previous.get(port, (None, None))
+                changed = old_state is None or not self._same_state(old_state, old_method, state, method)
+                if changed:
+                    deltas.append({"port": port, "old_state": old_state, "new_state": state})
+                rows.append((host, port, protocol, state, result.get("service", ""), now, now,
+                             int(changed), method))
+
+            # last_changed only moves when the state differs from the stored one
+            conn.executemany("""
+                INSERT INTO port_state (host, port, protocol, state, service, last_verified, last_changed, method)
+                VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?9)
+                ON CONFLICT (host, port, protocol) DO UPDATE SET
+                    state = excluded.state,
+                    service = excluded.service,
+                    method = excluded.method,
+                    last_verified = excluded.last_verified,
+                    last_changed = CASE WHEN ?8 THEN excluded.last_changed ELSE last_changed END
+            """, rows)
+
+        deltas.sort(key=lambda d: d["port"])
+        return deltas
+
+    def clear(self, host=None):
+        """
+        Remove cached states
+
+        Args:
+            host (str): Only clear this host (all hosts if None)
+        """
+        with self._connect() as conn:
+            if host is None:
+                conn.execute("DELETE FROM port_state")
+            else:
+                conn.execute("DELETE FROM port_state WHERE host = ?", (host,))
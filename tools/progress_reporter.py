@@ -0,0 +1,79 @@
+"""
+Progress Reporter Module
+Coalesces per-item scan progress into throttled batch updates for the UI
+"""
+
+import threading
+import time
+
+
+class ProgressReporter:
+    """Throttled progress reporter carrying aggregate counts and new open ports"""
+
+    def __init__(self, callback, total, interval=0.1, count_interval=None):
+        """
+        Initialize progress reporter
+
+        Args:
+            callback (callable): Called with a progress snapshot dict
+            total (int): Total number of items
+            interval (float): Minimum seconds between updates
+            count_interval (int): Or update every N items (default: 1% of total)
+        """
+        self.callback = callback
+        self.total = total
+        self.interval = interval
+        self.count_interval = count_interval or max(1, total // 100)
+
+        self.completed = 0
+        self.open_count = 0
+        self.current = None
+        self._new_open = []
+        self._last_time = 0
+        self._last_completed = 0
+        self._lock = threading.Lock()
+
+    def update(self, result):
+        """
+        Record one finished item (thread-safe)
+
+        Args:
+            result (dict): Scan result with at least "port" and "is_open"
+        """
+        with self._lock:
+            self.completed += 1
+            self.current = result.get("port")
+            if result.get("is_open"):
+                self.open_count += 1
+                self._new_open.append(result)
+
+            now = time.time()
+            due = (now - self._last_time >= self.interval
+                   or self.completed - self._last_completed >= self.count_interval
+                   or self.completed == self.total)
+            if not due:
+                return
+            snapshot = self._take_snapshot(now)
+        self.callback(snapshot)
+
+    def flush(self):
+        """Send any progress not yet reported"""
+        with self._lock:
+            if self.completed == self._last_completed and not self._new_open:
+                return
+            snapshot = self._take_snapshot(time.time())
+        self.callback(snapshot)
+
+    def _take_snapshot(self, now):
+        """Build the snapshot and reset the batch (caller holds the lock)"""
+        snapshot = {
+            "completed": self.completed,
+            "total": self.total,
+            "open_count": self.open_count,
+            "new_open": self._new_open,
+            "current": self.current,
+        }
+        self._new_open = []
+        self._last_time = now
+        self._last_completed = self.completed
+        return snapshot
@@ -0,0 +1,68 @@
+"""
+Rate Limiter Module
+Token bucket shared between scan engines to cap the probe rate
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate, burst=None):
+        """
+        Initialize rate limiter
+
+        Args:
+            rate (float): Tokens (probes) per second, 0 or None for unlimited
+            burst (int): Bucket size, defaults to roughly 50 ms worth of tokens
+        """
+        self.rate = rate or 0
+        self.burst = burst if burst is not None else max(1, int(self.rate * 0.05))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add tokens for the time elapsed since the last refill"""
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens without blocking
+
+        Args:
+            tokens (int): Number of tokens to take
+
+        Returns:
+            float: 0.0 if the tokens were taken, otherwise seconds to wait
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1, cancel_check=None):
+        """
+        Block until tokens are available
+
+        Args:
+            tokens (int): Number of tokens to take
+            cancel_check (callable): Optional callable returning True to give up
+
+        Returns:
+            bool: True if the tokens were taken, False if cancelled
+        """
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+            if cancel_check and cancel_check():
+                return False
+            time.sleep(min(wait, 0.05))
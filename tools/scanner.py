@@ -20,6 +20,16 @@ class IPv4Scanner:
         self.progress_callback = None
         self.complete_callback = None
         
+        # Cumulative scan metrics (read by the metrics exporter)
+        self.stats = {
+            'scans_total': 0,
+            'hosts_scanned_total': 0,
+            'hosts_online_total': 0,
+            'scan_duration_seconds_total': 0.0,
+            'last_scan_duration_seconds': 0.0,
+            'last_scan_hosts_per_second': 0.0,
+        }
+        
         # Performance settings
         self._last_progress_time = 0
         self._progress_interval = 0.15  # Minimum seconds between progress updates
@@ -83,6 +93,17 @@ class IPv4Scanner:
                 'hostname': ''
             }
     
+    def _record_scan_stats(self, start_time, completed):
+        """Add a finished (or cancelled) scan to the cumulative metrics"""
+        duration = time.perf_counter() - start_time
+        online = sum(1 for r in self.results if r.get('status') == 'Online')
+        self.stats['scans_total'] += 1
+        self.stats['hosts_scanned_total'] += completed
+        self.stats['hosts_online_total'] += online
+        self.stats['scan_duration_seconds_total'] += duration
+        self.stats['last_scan_duration_seconds'] = duration
+        self.stats['last_scan_hosts_per_second'] = completed / duration if duration > 0 else 0.0
+    
     def _should_update_progress(self, completed):
         """Determine if we should fire a progress update (throttled)"""
         current_time = time.time()
@@ -153,6 +174,8 @@ class IPv4Scanner:
         self.cancel_flag = False
         self.results = []
         self._last_progress_time = 0
+        start_time = time.perf_counter()
+        completed = 0
         
         # Set timeout based on aggression
         timeout_map = {
@@ -208,6 +231,7 @@ class IPv4Scanner:
             if self.complete_callback:
                 self.complete_callback([], f"Error: {str(e)}")
         finally:
+            self._record_scan_stats(start_time, completed)
             self.scanning = False
     
     def scan_ip_list(self, ip_list, aggression='Medium', max_workers=None, resolve_dns=True):
@@ -216,6 +240,8 @@ class IPv4Scanner:
         self.cancel_flag = False
         self.results = []
         self._last_progress_time = 0
+        start_time = time.perf_counter()
+        completed = 0
         
         # Set timeout based on aggression
         timeout_map = {
@@ -270,6 +296,7 @@ class IPv4Scanner:
             if self.complete_callback:
                 self.complete_callback([], f"Error: {str(e)}")
         finally:
+            self._record_scan_stats(start_time, completed)
             self.scanning = False
     
     def cancel_scan(self):
@@ -0,0 +1,183 @@
+"""
+Service Probes Module
+TCP-connect and HTTP(S) time-to-first-byte probes for the live monitor,
+for networks where ICMP is blocked or raw sockets are not permitted
+"""
+
+import errno
+import http.client
+import re
+import socket
+import ssl
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+# Probe types
+PROBE_ICMP = "icmp"
+PROBE_TCP = "tcp"
+PROBE_HTTP = "http"
+
+_HOST_PORT = re.compile(r'^\[?([^\[\]]+?)\]?:(\d{1,5})$')
+
+
+def parse_target(target):
+    """
+    Work out the probe type of a monitor target
+
+    Accepts plain hosts (ICMP), "host:port" or "tcp://host:port" (TCP
+    connect) and "http://..." or "https://..." URLs (HTTP TTFB).
+
+    Args:
+        target (str): Target as entered by the user
+
+    Returns:
+        dict: probe, host, port and url (url only for HTTP)
+    """
+    target = target.strip()
+    if target.lower().startswith(("http://", "https://")):
+        parts = urlsplit(target)
+        https = parts.scheme.lower() == "https"
+        return {
+            "probe": PROBE_HTTP,
+            "host": parts.hostname or "",
+            "port": parts.port or (443 if https else 80),
+            "url": target,
+        }
+
+    rest = target[6:] if target.lower().startswith("tcp://") else target
+    match = _HOST_PORT.match(rest)
+    # A bare IPv6 address also contains colons; those need brackets
+    if match and (rest.count(":") == 1 or rest.startswith("[")):
+        port = int(match.group(2))
+        if 0 < port < 65536:
+            return {"probe": PROBE_TCP, "host": match.group(1), "port": port, "url": None}
+
+    return {"probe": PROBE_ICMP, "host": target, "port": None, "url": None}
+
+
+def start_tcp_connect(ip, port):
+    """
+    Begin a non-blocking TCP connect
+
+    Args:
+        ip (str): Destination IPv4 address
+        port (int): Destination port
+
+    Returns:
+        socket.socket: Connecting socket (writable once the handshake ends),
+                       or None if the connect failed immediately
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    result = sock.connect_ex((ip, port))
+    if result not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, getattr(errno, "WSAEWOULDBLOCK", -1)):
+        sock.close()
+        return None
+    return sock
+
+
+def finish_tcp_connect(sock):
+    """
+    Complete a connect started by start_tcp_connect and close the socket
+
+    Args:
+        sock (socket.socket): Socket reported writable
+
+    Returns:
+        bool: True if the handshake succeeded
+    """
+    try:
+        return sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+    finally:
+        sock.close()
+
+
+class HttpProbe:
+    """HTTP(S) time-to-first-byte probe with one keep-alive connection per target
+
+    The connection (and its TLS session) is reused across probes, so a
+    1 Hz probe costs one request rather than a new TCP and TLS handshake.
+    A connection is only re-opened after an error or when the server closes it.
+    """
+
+    def __init__(self, timeout=2.0, verify_tls=True):
+        """
+        Initialize HTTP probe
+
+        Args:
+            timeout (float): Socket timeout per request
+            verify_tls (bool): Verify server certificates
+        """
+        self.timeout = timeout
+        self._context = ssl.create_default_context() if verify_tls else ssl._create_unverified_context()
+        self._connections = {}  # {url: HTTPConnection}
+        self._lock = threading.Lock()
+        self.connects = 0  # Connections opened, for checking reuse
+
+    def _connection(self, url, parts):
+        """Get the kept-alive connection of a target, opening it if needed"""
+        with self._lock:
+            conn = self._connections.get(url)
+            if conn is None:
+                if parts.scheme.lower() == "https":
+                    conn = http.client.HTTPSConnection(
+                        parts.hostname, parts.port or 443, timeout=self.timeout, context=self._context
+                    )
+                else:
+                    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=self.timeout)
+                self._connections[url] = conn
+                self.connects += 1
+            return conn
+
+    def probe(self, url):
+        """
+        Request a URL and time the first byte of the response
+
+        Args:
+            url (str): http:// or https:// URL
+
+        Returns:
+            float: Time to first byte in ms, or None on error or HTTP 5xx
+        """
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        # A dropped keep-alive connection is retried once on a fresh one
+        for attempt in range(2):
+            conn = self._connection(url, parts)
+            try:
+                start = time.perf_counter()
+                conn.request("GET", path, headers={"Connection": "keep-alive", "User-Agent": "NetTools-Monitor"})
+                response = conn.getresponse()
+                ttfb = (time.perf_counter() - start) * 1000
+                # The body must be consumed before the connection can be reused
+                response.read()
+                if response.will_close:
+                    self.close(url)
+                return ttfb if response.status < 500 else None
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self.close(url)
+                if attempt:
+                    return None
+            except (OSError, http.client.HTTPException):
+                self.close(url)
+                return None
+        return None
+
+    def close(self, url=None):
+        """
+        Close kept-alive connections
+
+        Args:
+            url (str): Only this target's connection (all if None)
+        """
+        with self._lock:
+            urls = [url] if url is not None else list(self._connections)
+            for key in urls:
+                conn = self._connections.pop(key, None)
+                if conn is not None:
+                    conn.close()
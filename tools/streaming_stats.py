@@ -0,0 +1,204 @@
+"""
+Streaming Statistics Module
+Constant-time running latency statistics: Welford mean/variance, RFC 3550
+jitter, min/max, a log-bucket quantile sketch for percentiles and a
+fixed-bucket histogram for metrics export
+"""
+
+import bisect
+import math
+from array import array
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in the Prometheus layout
+
+    Counts are kept per bucket and summed into cumulative "le" buckets only
+    when exported, so adding a sample is one bisect and one increment.
+    """
+
+    # Upper bounds in ms
+    DEFAULT_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        """
+        Initialize histogram
+
+        Args:
+            bounds (tuple): Ascending bucket upper bounds in ms
+        """
+        self.bounds = tuple(bounds)
+        self.counts = array('I', bytes(4 * (len(self.bounds) + 1)))  # Last is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def add(self, value):
+        """Add a sample"""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Get cumulative bucket counts
+
+        Returns:
+            list: (upper bound or math.inf, count of samples <= bound) tuples
+        """
+        result = []
+        running = 0
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+
+class QuantileSketch:
+    """Fixed-size log-bucket histogram with bounded relative error
+
+    Bucket i covers (min_value * gamma^(i-1), min_value * gamma^i], so any
+    quantile is answered within `accuracy` relative error. Updates are one
+    array increment; memory is fixed (about 3 KB at the defaults) however
+    many samples are added.
+    """
+
+    def __init__(self, accuracy=0.01, min_value=0.01, max_value=60000.0):
+        """
+        Initialize sketch
+
+        Args:
+            accuracy (float): Relative error of reported quantiles
+            min_value (float): Smallest distinguished value (ms)
+            max_value (float): Largest distinguished value (ms)
+        """
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        size = int(math.ceil(math.log(max_value / min_value) / self._log_gamma)) + 2
+        self.counts = array('I', bytes(4 * size))
+        self.count = 0
+
+    def add(self, value):
+        """Add a sample"""
+        if value <= self.min_value:
+            index = 0
+        else:
+            index = min(int(math.ceil(math.log(value / self.min_value) / self._log_gamma)),
+                        len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+
+    def merge(self, other, sign=1):
+        """
+        Add (or with sign=-1, remove) the samples of another sketch
+
+        Args:
+            other (QuantileSketch): Sketch with the same parameters
+            sign (int): 1 to merge, -1 to subtract
+        """
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += sign * count
+        self.count += sign * other.count
+
+    def _value(self, index):
+        """Representative value of a bucket (midpoint in relative terms)"""
+        if index == 0:
+            return self.min_value
+        return self.min_value * self.gamma ** index * 2 / (1 + self.gamma)
+
+    def quantiles(self, qs):
+        """
+        Get several quantiles in one pass over the buckets
+
+        Args:
+            qs (list): Quantiles in [0, 1], ascending
+
+        Returns:
+            list: Values (None if the sketch is empty)
+        """
+        if not self.count:
+            return [None] * len(qs)
+        ranks = [q * (self.count - 1) for q in qs]
+        result = []
+        seen = 0
+        i = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while i < len(ranks) and ranks[i] < seen:
+                result.append(self._value(index))
+                i += 1
+            if i == len(ranks):
+                break
+        return result
+
+    def quantile(self, q):
+        """Get one quantile (None if empty)"""
+        return self.quantiles([q])[0]
+
+
+class RunningStats:
+    """O(1)-update latency statistics over a whole session"""
+
+    def __init__(self):
+        """Initialize empty statistics"""
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # Sum of squared deviations (Welford)
+        self.min = None
+        self.max = None
+        self.jitter = 0.0
+        self._last = None
+        self.sketch = QuantileSketch()
+        self.histogram = LatencyHistogram()
+
+    def add(self, rtt):
+        """
+        Add a successful round-trip time
+
+        Args:
+            rtt (float): Round-trip time in ms
+        """
+        self.count += 1
+        delta = rtt - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (rtt - self.mean)
+
+        if self.min is None or rtt < self.min:
+            self.min = rtt
+        if self.max is None or rtt > self.max:
+            self.max = rtt
+
+        # RFC 3550 interarrival jitter, J += (|D| - J) / 16, with D the change
+        # in round-trip time between consecutive replies
+        if self._last is not None:
+            self.jitter += (abs(rtt - self._last) - self.jitter) / 16
+        self._last = rtt
+
+        self.sketch.add(rtt)
+        self.histogram.add(rtt)
+
+    @property
+    def variance(self):
+        """Sample variance (0 with fewer than two samples)"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self):
+        """Sample standard deviation"""
+        return math.sqrt(self.variance)
+
+    def percentiles(self, ps=(50, 95, 99)):
+        """
+        Get percentiles
+
+        Args:
+            ps (tuple): Percentiles in [0, 100], ascending
+
+        Returns:
+            dict: {percentile: value in ms or None}
+        """
+        values = self.sketch.quantiles([p / 100 for p in ps])
+        return dict(zip(ps, values))
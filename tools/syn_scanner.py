@@ -0,0 +1,278 @@
+"""
+SYN Scanner Module
+Half-open TCP port scanning over a raw socket (requires root/administrator)
+"""
+
+import platform
+import random
+import select
+import socket
+import struct
+import time
+from collections import deque
+
+from .rate_limiter import RateLimiter
+
+
+# TCP flag bits
+TCP_FIN = 0x01
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_ACK = 0x10
+
+
+def checksum(data):
+    """
+    Compute the 16-bit one's complement Internet checksum
+
+    Args:
+        data (bytes): Data to checksum
+
+    Returns:
+        int: Checksum value
+    """
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+
+def get_source_ip(target_ip):
+    """
+    Determine the local address the kernel would use to reach a target
+
+    Args:
+        target_ip (str): Destination IPv4 address
+
+    Returns:
+        str: Local source IPv4 address
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        # connect() on a UDP socket sends nothing, it only selects a route
+        sock.connect((target_ip, 9))
+        return sock.getsockname()[0]
+    finally:
+        sock.close()
+
+
+def build_syn_packet(src_ip, dst_ip, src_port, dst_port, seq):
+    """
+    Build a TCP SYN segment (without IP header) with a valid checksum
+
+    Args:
+        src_ip (str): Source IPv4 address (used for the pseudo header)
+        dst_ip (str): Destination IPv4 address
+        src_port (int): Source port
+        dst_port (int): Destination port
+        seq (int): Initial sequence number
+
+    Returns:
+        bytes: TCP segment ready to send on a raw IPPROTO_TCP socket
+    """
+    # MSS option (1460) so the probe looks like a normal connection attempt
+    options = struct.pack("!BBH", 2, 4, 1460)
+    offset = (5 + len(options) // 4) << 4
+    header = struct.pack(
+        "!HHIIBBHHH",
+        src_port, dst_port, seq, 0,
+        offset, TCP_SYN, 64240, 0, 0
+    )
+    pseudo = struct.pack(
+        "!4s4sBBH",
+        socket.inet_aton(src_ip), socket.inet_aton(dst_ip),
+        0, socket.IPPROTO_TCP, len(header) + len(options)
+    )
+    csum = checksum(pseudo + header + options)
+    return header[:16] + struct.pack("!H", csum) + header[18:] + options
+
+
+def parse_tcp_reply(packet):
+    """
+    Parse an IPv4 packet received on a raw TCP socket
+
+    Args:
+        packet (bytes): Raw IPv4 packet including IP header
+
+    Returns:
+        dict: src_ip, src_port, dst_port, flags and ack, or None if not TCP
+    """
+    if len(packet) < 20:
+        return None
+    version_ihl = packet[0]
+    if version_ihl >> 4 != 4 or packet[9] != socket.IPPROTO_TCP:
+        return None
+    ihl = (version_ihl & 0x0F) * 4
+    if len(packet) < ihl + 20:
+        return None
+    src_port, dst_port, _, ack, _, flags = struct.unpack("!HHIIBB", packet[ihl:ihl + 14])
+    return {
+        "src_ip": socket.inet_ntoa(packet[12:16]),
+        "src_port": src_port,
+        "dst_port": dst_port,
+        "flags": flags,
+        "ack": ack,
+    }
+
+
+class SYNScanner:
+    """Half-open (SYN) port scanner using a single raw socket"""
+
+    def __init__(self, timeout=1.0, retries=1, rate=1000, rate_limiter=None):
+        """
+        Initialize SYN scanner
+
+        Args:
+            timeout (float): Seconds to wait for a reply to each probe
+            retries (int): Number of retransmissions for unanswered probes
+            rate (int): Maximum probes per second (0 for unlimited)
+            rate_limiter (RateLimiter): Optional limiter shared with other scans
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.rate_limiter = rate_limiter or RateLimiter(rate)
+
+    @staticmethod
+    def is_available():
+        """
+        Check whether raw TCP sockets can be used on this system
+
+        Windows refuses to send TCP over raw sockets, and other systems
+        require root privileges.
+
+        Returns:
+            bool: True if SYN scanning is possible
+        """
+        if platform.system() == "Windows":
+            return False
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+            sock.close()
+            return True
+        except (PermissionError, OSError):
+            return False
+
+    def scan(self, target, ports, progress_callback=None, cancel_check=None):
+        """
+        SYN scan a list of ports on a target
+
+        Probes are sent from one raw socket and all SYN/ACK and RST replies
+        are matched by the same receive loop. Handshakes are never completed;
+        the local kernel answers SYN/ACKs with a RST.
+
+        Args:
+            target (str): Target IP or hostname
+            ports (list): List of port numbers to scan
+            progress_callback (callable): Optional callback(completed, total, result)
+            cancel_check (callable): Optional callable returning True to stop early
+
+        Returns:
+            list: One result dict per port (same model as PortScanner.scan_port)
+
+        Raises:
+            PermissionError: If the raw socket cannot be opened
+        """
+        from .port_scanner import PortScanner
+
+        dst_ip = socket.gethostbyname(target)
+        src_ip = get_source_ip(dst_ip)
+        src_port = random.randint(33000, 60999)
+        seq = random.randint(0, 0xFFFFFFFF)
+        expected_ack = (seq + 1) & 0xFFFFFFFF
+
+        total = len(ports)
+        results = {}
+        attempts = {}
+        pending = {}  # {port: send_time}
+        sent_order = deque()  # (send_time, port) in send order
+        to_send = deque(dict.fromkeys(ports))
+
+        def finish(port, status):
+            pending.pop(port, None)
+            if port in results:
+                return
+            is_open = status == "Open"
+            result = {
+                "port": port,
+                "status": status,
+                "service": PortScanner.get_service_name(port) if is_open else "",
+                "is_open": is_open
+            }
+            results[port] = result
+            if progress_callback:
+                progress_callback(len(results), total, result)
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+        try:
+            sock.setblocking(False)
+
+            while to_send or pending:
+                if cancel_check and cancel_check():
+                    break
+
+                now = time.monotonic()
+
+                # Send as many probes as the rate allows
+                send_wait = 0.0
+                while to_send:
+                    if to_send[0] in results:
+                        to_send.popleft()
+                        continue
+                    send_wait = self.rate_limiter.try_acquire()
+                    if send_wait:
+                        break
+                    port = to_send.popleft()
+                    packet = build_syn_packet(src_ip, dst_ip, src_port, port, seq)
+                    try:
+                        sock.sendto(packet, (dst_ip, 0))
+                    except BlockingIOError:
+                        to_send.appendleft(port)
+                        break
+                    attempts[port] = attempts.get(port, 0) + 1
+                    pending[port] = now
+                    sent_order.append((now, port))
+
+                # Wait for replies until the next send or the oldest deadline
+                if to_send:
+                    wait = send_wait
+                elif sent_order:
+                    wait = max(0.0, sent_order[0][0] + self.timeout - now)
+                else:
+                    wait = 0.0
+                readable, _, _ = select.select([sock], [], [], min(wait, 0.05))
+
+                if readable:
+                    while True:
+                        try:
+                            packet = sock.recv(65535)
+                        except (BlockingIOError, InterruptedError):
+                            break
+                        reply = parse_tcp_reply(packet)
+                        if (not reply or reply["src_ip"] != dst_ip
+                                or reply["dst_port"] != src_port
+                                or reply["src_port"] not in pending
+                                or reply["ack"] != expected_ack):
+                            continue
+                        flags = reply["flags"]
+                        if flags & TCP_SYN and flags & TCP_ACK:
+                            finish(reply["src_port"], "Open")
+                        elif flags & TCP_RST:
+                            finish(reply["src_port"], "Closed")
+
+                # Expire unanswered probes and schedule retransmissions
+                now = time.monotonic()
+                while sent_order and now - sent_order[0][0] >= self.timeout:
+                    sent_time, port = sent_order.popleft()
+                    if pending.get(port) != sent_time:
+                        continue
+                    if attempts[port] <= self.retries:
+                        del pending[port]
+                        to_send.append(port)
+                    else:
+                        finish(port, "Filtered")
+        finally:
+            sock.close()
+
+        return [results[port] for port in dict.fromkeys(ports) if port in results]
@@ -0,0 +1,300 @@
+"""
+Time Series Module
+Fixed-size typed ring buffers for monitored hosts, with RRD-style rollup of
+raw samples into 1-minute and 1-hour min/avg/max/loss tiers
+"""
+
+import math
+from array import array
+
+
+class RawRing:
+    """Ring buffer of raw samples: float32 RTTs, float64 times and a loss bitmap"""
+
+    def __init__(self, capacity):
+        """
+        Initialize raw ring
+
+        Args:
+            capacity (int): Maximum number of samples kept
+        """
+        self.capacity = capacity
+        self.times = array('d')
+        self.values = array('f')
+        self.loss = bytearray((capacity + 7) // 8)
+        self.head = 0  # Index of the next write once full
+        self.count = 0
+
+    def append(self, t, rtt):
+        """
+        Add a sample
+
+        Args:
+            t (float): Sample time (epoch seconds)
+            rtt (float): Round-trip time in ms, or None for a lost probe
+        """
+        if len(self.values) < self.capacity:
+            index = len(self.values)
+            self.times.append(t)
+            self.values.append(rtt if rtt is not None else 0.0)
+        else:
+            index = self.head
+            self.times[index] = t
+            self.values[index] = rtt if rtt is not None else 0.0
+            self.head = (self.head + 1) % self.capacity
+        byte, bit = divmod(index, 8)
+        if rtt is None:
+            self.loss[byte] |= 1 << bit
+        else:
+            self.loss[byte] &= ~(1 << bit) & 0xFF
+        self.count = min(self.count + 1, self.capacity)
+
+    def _index(self, i):
+        """Physical index of the i-th oldest sample"""
+        return (self.head + i) % self.capacity if self.count == self.capacity else i
+
+    def is_lost(self, index):
+        """Check the loss bit of a physical index"""
+        byte, bit = divmod(index, 8)
+        return bool(self.loss[byte] >> bit & 1)
+
+    def last(self, n):
+        """
+        Get the newest samples
+
+        Args:
+            n (int): Number of samples
+
+        Returns:
+            list: (time, rtt or None) tuples, oldest first
+        """
+        result = []
+        for i in range(max(0, self.count - n), self.count):
+            index = self._index(i)
+            rtt = None if self.is_lost(index) else self.values[index]
+            result.append((self.times[index], rtt))
+        return result
+
+    def oldest_time(self):
+        """Time of the oldest sample kept (None if empty)"""
+        return self.times[self._index(0)] if self.count else None
+
+
+class AggregateTier:
+    """Ring buffer of fixed-width min/avg/max/loss buckets"""
+
+    def __init__(self, resolution, capacity):
+        """
+        Initialize tier
+
+        Args:
+            resolution (int): Bucket width in seconds
+            capacity (int): Maximum number of buckets kept
+        """
+        self.resolution = resolution
+        self.capacity = capacity
+        self.slots = array('i')  # Bucket number (time // resolution)
+        self.mins = array('f')
+        self.avgs = array('f')
+        self.maxs = array('f')
+        self.counts = array('H')  # Probes in bucket
+        self.lost = array('H')  # Lost probes in bucket
+        self.head = 0
+        self._reset_current(None)
+
+    def _reset_current(self, slot):
+        """Start accumulating a new bucket"""
+        self._slot = slot
+        self._min = math.inf
+        self._max = -math.inf
+        self._sum = 0.0
+        self._ok = 0
+        self._lost = 0
+
+    def add(self, t, rtt):
+        """
+        Accumulate a sample, closing the current bucket when t leaves it
+
+        Args:
+            t (float): Sample time (epoch seconds)
+            rtt (float): Round-trip time in ms, or None for a lost probe
+        """
+        slot = int(t // self.resolution)
+        if self._slot is not None and slot != self._slot:
+            self.flush()
+        if self._slot is None:
+            self._slot = slot
+        if rtt is None:
+            self._lost += 1
+        else:
+            self._ok += 1
+            self._sum += rtt
+            self._min = min(self._min, rtt)
+            self._max = max(self._max, rtt)
+
+    def flush(self):
+        """Write the current bucket into the ring"""
+        if self._slot is None:
+            return
+        total = self._ok + self._lost
+        if self._ok:
+            row = (self._slot, self._min, self._sum / self._ok, self._max)
+        else:
+            row = (self._slot, math.nan, math.nan, math.nan)
+        counts = (min(total, 0xFFFF), min(self._lost, 0xFFFF))
+
+        if len(self.slots) < self.capacity:
+            self.slots.append(row[0])
+            self.mins.append(row[1])
+            self.avgs.append(row[2])
+            self.maxs.append(row[3])
+            self.counts.append(counts[0])
+            self.lost.append(counts[1])
+        else:
+            i = self.head
+            self.slots[i], self.mins[i], self.avgs[i], self.maxs[i] = row
+            self.counts[i], self.lost[i] = counts
+            self.head = (self.head + 1) % self.capacity
+        self._reset_current(None)
+
+    def _point(self, slot, low, avg, high, count, lost):
+        """Build one bucket dict (avg is NaN if every probe was lost)"""
+        lost_all = math.isnan(avg)
+        return {
+            "time": slot * self.resolution,
+            "min": None if lost_all else low,
+            "avg": None if lost_all else avg,
+            "max": None if lost_all else high,
+            "loss": (lost / count * 100) if count else 0.0,
+        }
+
+    def current(self):
+        """
+        Get the bucket still being filled
+
+        Returns:
+            dict: Same fields as buckets(), or None if no sample is pending
+        """
+        if self._slot is None:
+            return None
+        if self._ok:
+            low, avg, high = self._min, self._sum / self._ok, self._max
+        else:
+            low = avg = high = math.nan
+        return self._point(self._slot, low, avg, high, self._ok + self._lost, self._lost)
+
+    def buckets(self, start=None, end=None, include_current=True):
+        """
+        Get buckets in a time window
+
+        Args:
+            start (float): Window start (epoch seconds), None for all
+            end (float): Window end (epoch seconds), None for all
+            include_current (bool): Also return the bucket still being filled
+
+        Returns:
+            list: Dicts with time, min, avg, max (None if all lost) and loss (%)
+        """
+        def in_window(t):
+            if start is not None and t + self.resolution <= start:
+                return False
+            return end is None or t <= end
+
+        result = []
+        n = len(self.slots)
+        full = n == self.capacity
+        for i in range(n):
+            index = (self.head + i) % n if full else i
+            if not in_window(self.slots[index] * self.resolution):
+                continue
+            result.append(self._point(
+                self.slots[index], self.mins[index], self.avgs[index], self.maxs[index],
+                self.counts[index], self.lost[index]
+            ))
+        if include_current:
+            point = self.current()
+            if point is not None and in_window(point["time"]):
+                result.append(point)
+        return result
+
+    def oldest_time(self):
+        """Start time of the oldest closed bucket (None if empty)"""
+        if not self.slots:
+            return None
+        index = self.head if len(self.slots) == self.capacity else 0
+        return self.slots[index] * self.resolution
+
+
+class HostTimeSeries:
+    """Per-host latency history with bounded memory
+
+    Raw samples are kept for the last few minutes, 1-minute buckets for a
+    day and 1-hour buckets for a week (defaults). Arrays grow up to their
+    capacity and are then overwritten in place, so memory never exceeds
+    roughly 36 KB per host however long the session runs.
+    """
+
+    def __init__(self, raw_capacity=300, minute_capacity=1440, hour_capacity=168):
+        """
+        Initialize time series
+
+        Args:
+            raw_capacity (int): Raw samples kept (300 = 5 min at 1 Hz)
+            minute_capacity (int): 1-minute buckets kept (1440 = 24 h)
+            hour_capacity (int): 1-hour buckets kept (168 = 7 days)
+        """
+        self.raw = RawRing(raw_capacity)
+        self.tiers = [
+            AggregateTier(60, minute_capacity),
+            AggregateTier(3600, hour_capacity),
+        ]
+
+    def add(self, t, rtt):
+        """
+        Add a sample to the raw ring and all tiers
+
+        Args:
+            t (float): Sample time (epoch seconds)
+            rtt (float): Round-trip time in ms, or None for a lost probe
+        """
+        self.raw.append(t, rtt)
+        for tier in self.tiers:
+            tier.add(t, rtt)
+
+    def recent(self, n):
+        """Get the newest n raw samples as (time, rtt or None) tuples"""
+        return self.raw.last(n)
+
+    def query(self, start, end=None):
+        """
+        Get history for a time window at the finest resolution that covers it
+
+        Args:
+            start (float): Window start (epoch seconds)
+            end (float): Window end (epoch seconds), None for now
+
+        Returns:
+            tuple: (resolution in seconds, list of points). Raw points have
+                   min == avg == max; loss is 0 or 100. Rollup points end with
+                   the bucket still being filled.
+        """
+        oldest_raw = self.raw.oldest_time()
+        if oldest_raw is not None and oldest_raw <= start:
+            points = [
+                {"time": t, "min": rtt, "avg": rtt, "max": rtt, "loss": 100.0 if rtt is None else 0.0}
+                for t, rtt in self.raw.last(self.raw.count)
+                if t >= start and (end is None or t <= end)
+            ]
+            return 0, points
+
+        for tier in self.tiers:
+            oldest = tier.oldest_time()
+            if oldest is not None and oldest <= start:
+                return tier.resolution, tier.buckets(start, end)
+
+        # Window reaches past everything kept: use the tier reaching back furthest
+        candidates = [tier for tier in self.tiers if tier.oldest_time() is not None]
+        if not candidates:
+            return self.query(oldest_raw, end) if oldest_raw is not None else (0, [])
+        tier = min(candidates, key=lambda tier: tier.oldest_time())
+        return tier.resolution, tier.buckets(start, end)
@@ -0,0 +1,275 @@
+"""
+Trace Parser Module
+Single-pass parser for tracert, pathping, Linux traceroute and mtr output
+"""
+
+import json
+import re
+
+
+# Line patterns, tried in order; the first match decides how a line is read
+_LINE_PATTERNS = (
+    # pathping statistics: "  3   12ms     0/ 100 =  0%     0/ 100 =  0%  host [10.0.0.1]"
+    ("pathping_stats", re.compile(
+        r"^\s*(?P<hop>\d+)\s+(?P<rtt>\d+ms|---)\s+"
+        r"(?P<lost>\d+)/\s*(?P<sent>\d+)\s*=\s*(?P<pct>\d+)%\s+"
+        r"\d+/\s*\d+\s*=\s*\d+%\s+(?P<host>\S.*)$"
+    )),
+    # mtr --report: "  2.|-- 10.0.0.1   0.0%   10   5.1   5.2   5.0   5.4   0.2"
+    ("mtr_hop", re.compile(
+        r"^\s*(?P<hop>\d+)\.\s*\|--\s+(?P<host>\S+(?:\s+\(\S+\))?)\s+"
+        r"(?P<loss>[\d.]+)%?\s+(?P<sent>\d+)\s+(?P<last>[\d.]+)\s+(?P<avg>[\d.]+)\s+"
+        r"(?P<best>[\d.]+)\s+(?P<worst>[\d.]+)\s+(?P<stdev>[\d.]+)"
+    )),
+    # mtr --report, further responders of the previous hop: "    |  `|-- 10.0.0.2"
+    ("mtr_responder", re.compile(r"^\s*\|\s+`\|--\s+(?P<host>\S+(?:\s+\(\S+\))?)\s*$")),
+    # Hop lines of tracert, pathping's route section and traceroute
+    ("hop", re.compile(r"^\s*(?P<hop>\d+)\s+(?P<rest>\S.*)$")),
+    # Headers and footers, English and German Windows
+    ("target", re.compile(
+        r"^\s*(?:Tracing route to|Routenverfolgung zu|traceroute to)\s+(?P<name>[^\s\[(,]+)"
+        r"(?:\s*[\[(](?P<ip>[\d.]+)[\])])?", re.IGNORECASE
+    )),
+    ("statistics", re.compile(r"^\s*(?:Computing statistics|Berechnung der Statistiken)", re.IGNORECASE)),
+    ("complete", re.compile(r"^\s*(?:Trace complete|Ablaufverfolgung beendet)", re.IGNORECASE)),
+)
+
+# Tokens of a hop line after the hop number
+_TOKEN = re.compile(r"""
+      (?P<star>\*)
+    | (?P<rtt><?\s*\d+(?:\.\d+)?)\s*ms\b
+    | (?P<name>[^\s\[\]()]+)\s+[\[(](?P<name_ip>\d{1,3}(?:\.\d{1,3}){3})[\])]
+    | (?P<ip>\d{1,3}(?:\.\d{1,3}){3})(?![\w.])
+    | (?P<flag>![A-Za-z0-9<>]*)
+    | (?P<word>\S+)
+""", re.VERBOSE)
+
+# Host of a pathping statistics or mtr line: "name [ip]", "name (ip)" or a bare address
+_HOST = re.compile(r"^(?P<name>\S+?)\s*[\[(](?P<ip>[\d.]+)[\])]$|^(?P<ip_only>\d{1,3}(?:\.\d{1,3}){3})$")
+
+_UNREACHABLE_TEXT = re.compile(r"unreachable|nicht erreichbar", re.IGNORECASE)
+
+
+def new_hop(number, raw=""):
+    """
+    Empty hop in the shared hop model
+
+    Keys: hop (int), ip (str, "*" if nothing answered), hostname (str or
+    None), responders (list of str), rtts (list of float or None per probe),
+    latency_ms (float or None), timeout (bool), loss (float or None, %),
+    sent (int or None), flags (list of str) and raw (str).
+
+    Args:
+        number (int): Hop number
+        raw (str): Source line
+
+    Returns:
+        dict: Hop
+    """
+    return {
+        "hop": number,
+        "ip": "*",
+        "hostname": None,
+        "responders": [],
+        "rtts": [],
+        "latency_ms": None,
+        "timeout": True,
+        "loss": None,
+        "sent": None,
+        "flags": [],
+        "raw": raw,
+    }
+
+
+class TraceParser:
+    """Parser for the output of every trace tool NetTools runs
+
+    Lines can be fed one at a time while a tool is running; each hop line
+    creates or updates one hop dict. pathping's statistics section and
+    mtr's per-hop statistics update the hops of the same number in place.
+    """
+
+    def __init__(self):
+        self.hops = []
+        self.target = None
+        self.target_ip = None
+        self.complete = False
+        self.format = None
+        self._by_number = {}
+        self._in_statistics = False
+
+    @classmethod
+    def parse(cls, output):
+        """
+        Parse a complete output
+
+        Args:
+            output (str): Output of tracert, pathping, traceroute, mtr --report or mtr --json
+
+        Returns:
+            TraceParser: Parser holding hops, target, target_ip, format and complete
+        """
+        parser = cls()
+        stripped = output.lstrip() if output else ""
+        if stripped.startswith("{"):
+            parser.feed_mtr_json(stripped)
+        else:
+            for line in stripped.splitlines():
+                parser.feed(line)
+        return parser
+
+    @classmethod
+    def parse_hops(cls, output):
+        """Hops of a complete output in hop order"""
+        return cls.parse(output).hops
+
+    def feed(self, line):
+        """
+        Parse one output line
+
+        Args:
+            line (str): Line without the line break
+
+        Returns:
+            dict: The hop created or updated by the line, or None
+        """
+        for kind, pattern in _LINE_PATTERNS:
+            match = pattern.match(line)
+            if match:
+                return getattr(self, "_on_" + kind)(match, line)
+        return None
+
+    def _hop(self, number, line):
+        """Hop of a number, created on first use"""
+        hop = self._by_number.get(number)
+        if hop is None:
+            hop = self._by_number[number] = new_hop(number, line.strip())
+            self.hops.append(hop)
+            if len(self.hops) > 1 and self.hops[-2]["hop"] > number:
+                self.hops.sort(key=lambda h: h["hop"])
+        return hop
+
+    @staticmethod
+    def _add_responder(hop, ip, name=None):
+        if ip not in hop["responders"]:
+            hop["responders"].append(ip)
+        if hop["ip"] == "*":
+            hop["ip"] = ip
+            hop["hostname"] = name if name != ip else None
+        hop["timeout"] = False
+
+    def _on_hop(self, match, line):
+        number = int(match.group("hop"))
+        if number == 0 or self._in_statistics:
+            return None  # pathping's own address, or the statistics column header
+        if self.format is None:
+            self.format = "tracert"
+        hop = self._hop(number, line)
+        hop["raw"] = line.strip()
+        rest = match.group("rest")
+        words = []
+        for token in _TOKEN.finditer(rest):
+            kind = token.lastgroup
+            if kind == "star":
+                hop["rtts"].append(None)
+            elif kind == "rtt":
+                value = token.group("rtt").replace(" ", "")
+                hop["rtts"].append(1.0 if value.startswith("<") else float(value))
+            elif kind == "name_ip":  # The last group closed by "name (ip)"
+                self._add_responder(hop, token.group("name_ip"), token.group("name"))
+            elif kind == "ip":
+                self._add_responder(hop, token.group("ip"))
+            elif kind == "flag":
+                hop["flags"].append(token.group("flag"))
+            elif kind == "word":
+                words.append(token.group("word"))
+        # Remaining words are messages such as "Request timed out." or
+        # "reports: Destination host unreachable."
+        if words and _UNREACHABLE_TEXT.search(" ".join(words)):
+            hop["flags"].append("unreachable")
+        values = [rtt for rtt in hop["rtts"] if rtt is not None]
+        hop["latency_ms"] = round(sum(values) / len(values), 2) if values else None
+        return hop
+
+    def _on_pathping_stats(self, match, line):
+        self.format = "pathping"
+        hop = self._hop(int(match.group("hop")), line)
+        rtt = match.group("rtt")
+        if rtt != "---":
+            hop["latency_ms"] = float(rtt[:-2])
+        hop["sent"] = int(match.group("sent"))
+        hop["loss"] = float(match.group("pct"))
+        self._apply_host(hop, match.group("host"))
+        return hop
+
+    def _on_mtr_hop(self, match, line):
+        self.format = "mtr"
+        hop = self._hop(int(match.group("hop")), line)
+        hop["raw"] = line.strip()
+        hop["loss"] = float(match.group("loss"))
+        hop["sent"] = int(match.group("sent"))
+        if hop["loss"] < 100:
+            hop["latency_ms"] = float(match.group("avg"))
+            hop["rtts"] = [float(match.group("last"))]
+        self._apply_host(hop, match.group("host"))
+        return hop
+
+    def _on_mtr_responder(self, match, line):
+        if not self.hops:
+            return None
+        hop = self.hops[-1]
+        self._apply_host(hop, match.group("host"))
+        return hop
+
+    def _apply_host(self, hop, host):
+        """Record the host column of pathping and mtr lines"""
+        host = host.strip()
+        if host in ("???", "0.0.0.0"):
+            return
+        found = _HOST.match(host)
+        if found and found.group("ip_only"):
+            self._add_responder(hop, found.group("ip_only"))
+        elif found:
+            self._add_responder(hop, found.group("ip"), found.group("name"))
+        elif hop["hostname"] is None:
+            hop["hostname"] = host  # mtr without -n prints names only
+            hop["timeout"] = False
+
+    def _on_target(self, match, line):
+        if self.target is None:
+            self.target = match.group("name")
+            self.target_ip = match.group("ip") or None
+            if line.lstrip().lower().startswith("traceroute"):
+                self.format = "traceroute"
+        return None
+
+    def _on_statistics(self, match, line):
+        self._in_statistics = True
+        return None
+
+    def _on_complete(self, match, line):
+        self.complete = True
+        return None
+
+    def feed_mtr_json(self, text):
+        """
+        Parse the output of mtr --json
+
+        Args:
+            text (str): Complete JSON document
+
+        Raises:
+            ValueError: If the text is not mtr JSON
+        """
+        report = json.loads(text).get("report", {})
+        self.format = "mtr"
+        self.target = report.get("mtr", {}).get("dst")
+        for entry in report.get("hubs", []):
+            hop = self._hop(int(entry["count"]), json.dumps(entry))
+            hop["loss"] = float(entry.get("Loss%", 0.0))
+            hop["sent"] = int(entry.get("Snt", 0))
+            if hop["loss"] < 100:
+                hop["latency_ms"] = float(entry.get("Avg", 0.0))
+                hop["rtts"] = [float(entry.get("Last", 0.0))]
+            self._apply_host(hop, entry.get("host", "???"))
+        self.complete = True
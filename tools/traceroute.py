@@ -1,10 +1,16 @@
 """
 Traceroute Module
-Performs network path tracing using tracert or pathping
+Performs network path tracing using tracert, pathping or the built-in engine
 """
 
 import subprocess
 import platform
+import socket
+import threading
+
+from .multipath import MultipathTracer
+from .trace_parser import TraceParser
+from .traceroute_engine import TracerouteEngine
 
 
 class Traceroute:
@@ -18,11 +24,12 @@ class Traceroute:
         Args:
             target (str): Target hostname or IP address
             max_hops (int): Maximum number of hops (1-255)
-            tool (str): Tool to use ("tracert" or "pathping")
+            tool (str): Tool to use ("tracert", "pathping" or "native")
             timeout (int): Command timeout in seconds
             
         Returns:
-            dict: Results with output and success status
+            dict: Results with output and success status ("native" also
+                  returns the parsed hops)
         """
         if not target or not target.strip():
             return {
@@ -39,19 +46,18 @@ class Traceroute:
                 "error": "Invalid max_hops"
             }
         
+        if tool == "native":
+            return Traceroute.run_native(target, max_hops)
+        
         # Build command
-        if tool == "tracert":
-            cmd = ["tracert", "-h", str(max_hops), target]
-            estimated_time = "~30 seconds"
-        elif tool == "pathping":
-            cmd = ["pathping", "-h", str(max_hops), target]
-            estimated_time = "~5 minutes"
-        else:
+        cmd = Traceroute.build_command(target, max_hops, tool)
+        if cmd is None:
             return {
                 "success": False,
                 "output": f"Unknown tool: {tool}",
                 "error": "Invalid tool"
             }
+        estimated_time = "~30 seconds" if tool == "tracert" else "~5 minutes"
         
         try:
             # Run command
@@ -68,12 +74,6 @@ class Traceroute:
                 )
             else:
                 # Linux/Mac
-                if tool == "tracert":
-                    cmd = ["traceroute", "-m", str(max_hops), target]
-                else:
-                    # Pathping not available on Linux, use mtr as alternative
-                    cmd = ["mtr", "--report", "--report-cycles", "3", target]
-                
                 result = subprocess.run(
                     cmd,
                     capture_output=True,
@@ -126,6 +126,75 @@ class Traceroute:
                 "error": str(e)
             }
     
+    @staticmethod
+    def build_command(target, max_hops=30, tool="tracert"):
+        """
+        Build the command line of an external trace tool for this platform
+        
+        Args:
+            target (str): Target hostname or IP address
+            max_hops (int): Maximum number of hops
+            tool (str): "tracert" or "pathping"
+            
+        Returns:
+            list: Command arguments, or None for an unknown tool
+        """
+        if tool not in ("tracert", "pathping"):
+            return None
+        if platform.system() == "Windows":
+            return [tool, "-h", str(max_hops), target]
+        if tool == "tracert":
+            return ["traceroute", "-m", str(max_hops), target]
+        # Pathping not available on Linux, use mtr as alternative
+        return ["mtr", "--report", "--report-cycles", "3", target]
+    
+    @staticmethod
+    def run_native(target, max_hops=30, method="udp", probe_timeout=2.0, cancel_check=None):
+        """
+        Trace with the built-in parallel-TTL engine (no external binaries)
+        
+        Args:
+            target (str): Target hostname or IP address
+            max_hops (int): Maximum number of hops (1-255)
+            method (str): Probe type ("udp", "icmp" or "tcp")
+            probe_timeout (float): Seconds to wait for each probe's reply
+            cancel_check (callable): Optional callable returning True to stop early
+            
+        Returns:
+            dict: Results with tracert-style output, hops and success status
+        """
+        engine = TracerouteEngine(max_hops=max_hops, timeout=probe_timeout, method=method)
+        command = f"native {method} trace to {target}"
+        try:
+            result = engine.trace(target.strip(), cancel_check)
+        except socket.gaierror:
+            return {
+                "success": False,
+                "output": f"Unable to resolve target system name {target}.",
+                "error": "Unknown host"
+            }
+        except PermissionError:
+            return {
+                "success": False,
+                "output": "The built-in traceroute needs raw sockets.\nRun NetTools as Administrator/root.",
+                "error": "Permission denied"
+            }
+        except OSError as e:
+            return {
+                "success": False,
+                "output": f"Error executing trace:\n{str(e)}\n\nCommand: {command}",
+                "error": str(e)
+            }
+        
+        return {
+            "success": bool(result["hops"]),
+            "output": TracerouteEngine.format_output(result, max_hops),
+            "return_code": 0 if result["reached"] else 1,
+            "command": command,
+            "estimated_time": f"~{probe_timeout:.0f} seconds",
+            "hops": result["hops"]
+        }
+    
     @staticmethod
     def validate_target(target):
         """
@@ -157,35 +226,19 @@ class Traceroute:
         
         Args:
             output (str): Raw command output
-            tool (str): Tool used ("tracert" or "pathping")
+            tool (str): Tool used (the format is detected from the output)
             
         Returns:
-            list: List of hops with details
+            list: Hops in the TraceParser hop model, each also with
+                  "number" and "raw_line"
         """
         if not output:
             return []
         
-        hops = []
-        lines = output.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Skip empty lines and headers
-            if not line or line.startswith('Tracing') or line.startswith('Computing'):
-                continue
-            
-            # Try to parse hop information
-            # Format: hop_number  time1  time2  time3  hostname [ip]
-            parts = line.split()
-            
-            if len(parts) >= 2 and parts[0].isdigit():
-                hop = {
-                    'number': int(parts[0]),
-                    'raw_line': line
-                }
-                hops.append(hop)
-        
+        hops = TraceParser.parse_hops(output)
+        for hop in hops:
+            hop['number'] = hop['hop']
+            hop['raw_line'] = hop['raw']
         return hops
     
     @staticmethod
@@ -198,6 +251,9 @@ class Traceroute:
         """
         available = []
         
+        if TracerouteEngine.is_available():
+            available.extend(["native", "multipath"])
+        
         if platform.system() == "Windows":
             # Windows has tracert and pathping
             available.extend(["tracert", "pathping"])
@@ -217,3 +273,213 @@ class Traceroute:
                 pass
         
         return available
+
+
+class TraceStream:
+    """Traceroute run that yields hops as they are discovered
+
+    External tools are read line by line from a pipe and each new hop line
+    is yielded as soon as it is printed; the built-in engine yields each hop
+    as soon as all its probes are answered or timed out. The multipath tool
+    needs every flow before a hop is complete and yields its hops at the
+    end. cancel() may be called from any thread and kills the process at once.
+    """
+    
+    def __init__(self, target, max_hops=30, tool="tracert", timeout=600, on_line=None):
+        """
+        Initialize trace
+        
+        Args:
+            target (str): Target hostname or IP address
+            max_hops (int): Maximum number of hops (1-255)
+            tool (str): "tracert", "pathping", "native" or "multipath"
+            timeout (int): Seconds before an external tool is killed
+            on_line (callable): Optional callback(line) for every output line
+        """
+        self.target = target.strip()
+        self.max_hops = max_hops
+        self.tool = tool
+        self.timeout = timeout
+        self.on_line = on_line
+        self.lines = []
+        self.hops = []
+        self.command = ""
+        self.return_code = None
+        self.error = None
+        self.cancelled = False
+        self._process = None
+        self._lock = threading.Lock()
+    
+    @property
+    def output(self):
+        """Output received so far"""
+        return "\n".join(self.lines)
+    
+    @property
+    def success(self):
+        """True if the trace finished without error and produced hops"""
+        return not self.cancelled and self.error is None and bool(self.hops)
+    
+    def _emit(self, line):
+        """Record an output line"""
+        self.lines.append(line)
+        if self.on_line:
+            self.on_line(line)
+    
+    def __iter__(self):
+        """
+        Run the trace
+        
+        Yields:
+            dict: Hops in order (the TraceParser hop model)
+        """
+        if self.tool == "native":
+            yield from self._iter_native()
+        elif self.tool == "multipath":
+            yield from self._iter_multipath()
+        else:
+            yield from self._iter_process()
+    
+    def cancel(self):
+        """Stop the trace, killing the external process immediately"""
+        with self._lock:
+            self.cancelled = True
+            if self._process and self._process.poll() is None:
+                self._process.kill()
+    
+    def _iter_native(self):
+        """Hops from the built-in engine"""
+        self.command = f"native udp trace to {self.target}"
+        try:
+            dst_ip = socket.gethostbyname(self.target)
+            self._emit(f"Tracing route to {self.target} [{dst_ip}]")
+            self._emit(f"over a maximum of {self.max_hops} hops:")
+            self._emit("")
+            engine = TracerouteEngine(max_hops=self.max_hops, resolve=False)
+            for hop in engine.iter_hops(dst_ip, cancel_check=lambda: self.cancelled):
+                line = TracerouteEngine.format_hop(hop)
+                hop["raw"] = line.strip()
+                self._emit(line)
+                self.hops.append(hop)
+                yield hop
+        except socket.gaierror:
+            self.error = "Unknown host"
+            self._emit(f"Unable to resolve target system name {self.target}.")
+            return
+        except OSError as e:
+            self.error = str(e)
+            self._emit(f"Error executing trace: {e}")
+            if isinstance(e, PermissionError):
+                self._emit("The built-in traceroute needs raw sockets. Run NetTools as Administrator/root.")
+            return
+        
+        if not self.cancelled:
+            self.return_code = 0 if self.hops and self.hops[-1]["reached"] else 1
+            self._emit("")
+            self._emit("Trace complete." if self.return_code == 0 else "Destination not reached.")
+    
+    def _iter_multipath(self):
+        """Hops from a Paris-style multipath discovery, each listing all its interfaces"""
+        self.command = f"multipath udp trace to {self.target}"
+        try:
+            result = MultipathTracer(max_hops=self.max_hops).discover(
+                self.target, cancel_check=lambda: self.cancelled
+            )
+        except socket.gaierror:
+            self.error = "Unknown host"
+            self._emit(f"Unable to resolve target system name {self.target}.")
+            return
+        except OSError as e:
+            self.error = str(e)
+            self._emit(f"Error executing trace: {e}")
+            if isinstance(e, PermissionError):
+                self._emit("Multipath tracing needs raw sockets. Run NetTools as Administrator/root.")
+            return
+        if self.cancelled:
+            return
+        
+        lines = MultipathTracer.format_output(result).splitlines()
+        for line in lines[:3]:
+            self._emit(line)
+        for hop, line in zip(result["hops"], lines[3:]):
+            hop["raw"] = line.strip()
+            self._emit(line)
+            self.hops.append(hop)
+            yield hop
+        for line in lines[3 + len(result["hops"]):]:
+            self._emit(line)
+        self.return_code = 0 if result["reached"] else 1
+    
+    def _expire(self):
+        """Kill an external tool that ran past the timeout"""
+        with self._lock:
+            if self._process and self._process.poll() is None:
+                self.error = "Timeout"
+                self._process.kill()
+    
+    def _iter_process(self):
+        """Hops from an external tool, read line by line"""
+        cmd = Traceroute.build_command(self.target, self.max_hops, self.tool)
+        if cmd is None:
+            self.error = "Invalid tool"
+            self._emit(f"Unknown tool: {self.tool}")
+            return
+        self.command = ' '.join(cmd)
+        
+        kwargs = {}
+        if platform.system() == "Windows":
+            kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW if hasattr(subprocess, 'CREATE_NO_WINDOW') else 0
+            kwargs["encoding"] = 'cp850'  # Windows console encoding
+        
+        with self._lock:
+            if self.cancelled:
+                return
+            try:
+                self._process = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    bufsize=1,  # Line buffered
+                    errors='replace',
+                    shell=False,
+                    **kwargs
+                )
+            except FileNotFoundError:
+                self.error = "Command not found"
+                self._emit(f"Command not found: {cmd[0]}")
+                self._emit("This command may not be available on your system.")
+                return
+            except OSError as e:
+                self.error = str(e)
+                self._emit(f"Error executing command: {e}")
+                return
+        
+        timer = threading.Timer(self.timeout, self._expire)
+        timer.daemon = True
+        timer.start()
+        parser = TraceParser()
+        last_hop = 0
+        try:
+            for line in self._process.stdout:
+                line = line.rstrip("\r\n")
+                self._emit(line)
+                hop = parser.feed(line)
+                # Pathping's statistics section updates hops already yielded in place
+                if hop and hop['hop'] > last_hop:
+                    last_hop = hop['hop']
+                    self.hops.append(hop)
+                    yield hop
+        finally:
+            timer.cancel()
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.stdout.close()
+            self.return_code = self._process.wait()
+            # The parser's hops carry the statistics that arrived after they were yielded
+            self.hops = parser.hops
+        
+        if self.error == "Timeout":
+            self._emit(f"Command timeout ({self.timeout} seconds exceeded)")
+        elif not self.cancelled and self.return_code not in (0, 1):
+            self.error = f"Exit code {self.return_code}"
@@ -0,0 +1,467 @@
+"""
+Traceroute Engine Module
+Built-in traceroute that sends the probes for every TTL at once over raw
+sockets and matches the ICMP replies back to their TTL (requires root/administrator)
+"""
+
+import platform
+import random
+import select
+import socket
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .icmp import (
+    ICMP_DEST_UNREACH, ICMP_ECHO_REPLY, ICMP_ECHO_REQUEST, ICMP_TIME_EXCEEDED,
+    build_echo_request, parse_icmp,
+)
+from .syn_scanner import (
+    SYNScanner, TCP_ACK, TCP_RST, TCP_SYN, build_syn_packet, get_source_ip, parse_tcp_reply,
+)
+
+
+# Probe methods
+METHOD_UDP = "udp"
+METHOD_ICMP = "icmp"
+METHOD_TCP = "tcp"
+METHODS = (METHOD_UDP, METHOD_ICMP, METHOD_TCP)
+
+
+def parse_quoted(quoted):
+    """
+    Parse the original datagram quoted in an ICMP error message
+
+    Args:
+        quoted (bytes): IP header plus at least 8 bytes of the probe
+
+    Returns:
+        dict: proto, dst_ip and the first 8 bytes of the transport header
+              (head), or None if too short
+    """
+    if len(quoted) < 20 or quoted[0] >> 4 != 4:
+        return None
+    ihl = (quoted[0] & 0x0F) * 4
+    if len(quoted) < ihl + 8:
+        return None
+    return {
+        "proto": quoted[9],
+        "dst_ip": socket.inet_ntoa(quoted[16:20]),
+        "head": quoted[ihl:ihl + 8],
+    }
+
+
+class TracerouteEngine:
+    """Parallel-TTL traceroute over raw sockets
+
+    One probe (or `probes` probes) is sent for every TTL up front. Routers
+    answer with ICMP time-exceeded messages that quote the probe header, so
+    each reply is matched to its TTL by the UDP destination port, ICMP
+    sequence number or TCP sequence number. The trace ends as soon as every
+    hop up to the first one answered by the destination is known, so a whole
+    path takes about one timeout instead of one round trip per hop.
+    """
+
+    BASE_PORT = 33434  # First UDP destination port, as in classic traceroute
+    PORT_RANGE = 1024
+
+    def __init__(self, max_hops=30, timeout=2.0, method=METHOD_UDP, probes=3, port=80, resolve=True):
+        """
+        Initialize engine
+
+        Args:
+            max_hops (int): Highest TTL probed (1-255)
+            timeout (float): Seconds to wait for each probe's reply
+            method (str): "udp", "icmp" or "tcp"
+            probes (int): Probes per hop
+            port (int): Destination port of TCP probes
+            resolve (bool): Look up hostnames of responding hops
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown traceroute method: {method}")
+        self.max_hops = max_hops
+        self.timeout = timeout
+        self.method = method
+        self.probes = probes
+        self.port = port
+        self.resolve = resolve
+        self._icmp = None
+        self._send = None
+        self._dst_ip = None
+        self._destinations = set()  # Destinations whose replies are accepted
+        self._src_ips = {}  # {destination: local address}, for TCP checksums
+        self._src_port = None
+        self._identifier = random.randint(1, 0xFFFF)
+        self._seq_base = random.randint(0, 0xFFFFFFFF)
+        self._counter = 0
+
+    @staticmethod
+    def is_available(method=METHOD_UDP):
+        """
+        Check whether the engine can run with the current privileges
+
+        Returns:
+            bool: True if raw ICMP (and for TCP, raw TCP) sockets can be opened
+        """
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            sock.close()
+        except (PermissionError, OSError):
+            return False
+        return method != METHOD_TCP or SYNScanner.is_available()
+
+    def open(self, dst_ip=None):
+        """
+        Open the receive socket and the probe socket
+
+        The sockets stay open across probe_hops() calls until close().
+
+        Args:
+            dst_ip (str): Default destination IPv4 address (None when the
+                          destinations are added with add_destination())
+
+        Raises:
+            PermissionError: If raw sockets are not permitted
+        """
+        self._dst_ip = dst_ip
+        self._destinations = {dst_ip} if dst_ip else set()
+        self._icmp = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        if platform.system() == "Windows":
+            # Windows only delivers ICMP to raw sockets bound to an interface
+            self._icmp.bind((get_source_ip(dst_ip or "192.0.2.1"), 0))
+        self._icmp.setblocking(False)
+
+        if self.method == METHOD_ICMP:
+            self._send = self._icmp
+        elif self.method == METHOD_UDP:
+            self._send = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._send.bind(("", 0))
+            self._src_port = self._send.getsockname()[1]
+        else:
+            self._send = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+            self._src_port = random.randint(33000, 60999)
+        self._send.setblocking(False)
+
+    def close(self):
+        """Close the sockets"""
+        for sock in {self._icmp, self._send}:
+            if sock is not None:
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+        self._icmp = None
+        self._send = None
+
+    def add_destination(self, dst_ip):
+        """Accept replies to probes sent to another destination"""
+        self._destinations.add(dst_ip)
+
+    def remove_destination(self, dst_ip):
+        """Stop accepting replies for a destination"""
+        self._destinations.discard(dst_ip)
+        self._src_ips.pop(dst_ip, None)
+
+    def _send_probe(self, ttl, dst_ip=None):
+        """
+        Send one probe with the given TTL
+
+        Args:
+            ttl (int): Time to live
+            dst_ip (str): Destination (the default destination if None)
+
+        Returns:
+            int: Key that identifies replies to this probe, or None if sending failed
+        """
+        dst_ip = dst_ip or self._dst_ip
+        self._counter += 1
+        self._send.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+        try:
+            if self.method == METHOD_UDP:
+                key = self.BASE_PORT + self._counter % self.PORT_RANGE
+                self._send.sendto(b"\x00" * 12, (dst_ip, key))
+            elif self.method == METHOD_ICMP:
+                key = self._counter & 0xFFFF
+                self._send.sendto(build_echo_request(self._identifier, key, b"\x00" * 12), (dst_ip, 0))
+            else:
+                key = (self._seq_base + self._counter) & 0xFFFFFFFF
+                src_ip = self._src_ips.get(dst_ip)
+                if src_ip is None:
+                    src_ip = self._src_ips[dst_ip] = get_source_ip(dst_ip)
+                packet = build_syn_packet(src_ip, dst_ip, self._src_port, self.port, key)
+                self._send.sendto(packet, (dst_ip, 0))
+        except OSError:
+            return None
+        return key
+
+    def _match_icmp(self, source, message):
+        """
+        Match an ICMP message to a probe
+
+        Returns:
+            tuple: (destination, key, from_destination) or None if the
+                   message is not ours
+        """
+        if message["type"] == ICMP_ECHO_REPLY:
+            if self.method == METHOD_ICMP and message["id"] == self._identifier and source in self._destinations:
+                return source, message["seq"], True
+            return None
+        if message["type"] not in (ICMP_TIME_EXCEEDED, ICMP_DEST_UNREACH):
+            return None
+
+        quoted = parse_quoted(message["quoted"])
+        if quoted is None or quoted["dst_ip"] not in self._destinations:
+            return None
+        head = quoted["head"]
+        if self.method == METHOD_UDP and quoted["proto"] == socket.IPPROTO_UDP:
+            src_port, dst_port = struct.unpack("!HH", head[:4])
+            if src_port != self._src_port:
+                return None
+            key = dst_port
+        elif self.method == METHOD_ICMP and quoted["proto"] == socket.IPPROTO_ICMP:
+            icmp_type, _, _, identifier, seq = struct.unpack("!BBHHH", head)
+            if icmp_type != ICMP_ECHO_REQUEST or identifier != self._identifier:
+                return None
+            key = seq
+        elif self.method == METHOD_TCP and quoted["proto"] == socket.IPPROTO_TCP:
+            src_port, _, seq = struct.unpack("!HHI", head)
+            if src_port != self._src_port:
+                return None
+            key = seq
+        else:
+            return None
+        # Port unreachable (UDP) or any unreachable from the target itself ends the trace
+        dst_ip = quoted["dst_ip"]
+        return dst_ip, key, message["type"] == ICMP_DEST_UNREACH and source == dst_ip
+
+    def _receive(self):
+        """
+        Drain the sockets
+
+        Returns:
+            list: (destination, key, source_ip, from_destination, receive_time) tuples
+        """
+        replies = []
+        while True:
+            try:
+                packet, addr = self._icmp.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                break
+            now = time.perf_counter()
+            message = parse_icmp(packet)
+            match = self._match_icmp(addr[0], message) if message else None
+            if match:
+                replies.append((match[0], match[1], addr[0], match[2], now))
+
+        if self.method == METHOD_TCP:
+            while True:
+                try:
+                    packet = self._send.recv(65535)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError:
+                    break
+                now = time.perf_counter()
+                reply = parse_tcp_reply(packet)
+                if (reply and reply["src_ip"] in self._destinations and reply["dst_port"] == self._src_port
+                        and reply["flags"] & (TCP_SYN | TCP_ACK | TCP_RST)):
+                    key = (reply["ack"] - 1) & 0xFFFFFFFF
+                    replies.append((reply["src_ip"], key, reply["src_ip"], True, now))
+        return replies
+
+    def _sockets(self):
+        """Sockets to wait on"""
+        return [self._icmp, self._send] if self.method == METHOD_TCP else [self._icmp]
+
+    def iter_hops(self, target, cancel_check=None):
+        """
+        Trace a target, yielding hops in order as soon as each is complete
+
+        A hop is complete when all its probes are answered or timed out. The
+        generator stops after the first hop answered by the destination.
+
+        Args:
+            target (str): Hostname or IPv4 address
+            cancel_check (callable): Optional callable returning True to stop early
+
+        Yields:
+            dict: hop, ip ("*" if nothing answered), responders, rtts (ms or
+                  None per probe), latency_ms (average), timeout, reached
+
+        Raises:
+            socket.gaierror: If the target cannot be resolved
+            PermissionError: If raw sockets are not permitted
+        """
+        dst_ip = socket.gethostbyname(target)
+        self.open(dst_ip)
+        try:
+            yield from self.probe_hops(cancel_check=cancel_check)
+        finally:
+            self.close()
+
+    def probe_hops(self, max_ttl=None, cancel_check=None):
+        """
+        Probe every TTL once more on the open sockets (see open())
+
+        Args:
+            max_ttl (int): Highest TTL to probe (max_hops if None)
+            cancel_check (callable): Optional callable returning True to stop early
+
+        Yields:
+            dict: Hops in order, as from iter_hops()
+        """
+        max_ttl = max_ttl or self.max_hops
+        rtts = {ttl: [None] * self.probes for ttl in range(1, max_ttl + 1)}
+        ips = {ttl: [None] * self.probes for ttl in range(1, max_ttl + 1)}
+        outstanding = {ttl: self.probes for ttl in rtts}
+        pending = {}  # {key: (ttl, index, send_time)}
+        reached = set()
+
+        # Low TTLs first so near hops answer first; every probe goes out now
+        for index in range(self.probes):
+            for ttl in range(1, max_ttl + 1):
+                key = self._send_probe(ttl)
+                if key is None:
+                    outstanding[ttl] -= 1
+                else:
+                    pending[key] = (ttl, index, time.perf_counter())
+
+        next_ttl = 1
+        while True:
+            if cancel_check and cancel_check():
+                return
+            last = min(reached) if reached else max_ttl
+
+            while next_ttl <= last and not outstanding[next_ttl]:
+                yield self._make_hop(next_ttl, rtts[next_ttl], ips[next_ttl], next_ttl in reached)
+                if next_ttl == last and reached:
+                    return
+                next_ttl += 1
+            if next_ttl > last:
+                return
+
+            # Only probes up to the destination's TTL are still of interest
+            now = time.perf_counter()
+            deadline = min((sent for ttl, _, sent in pending.values() if ttl <= last), default=now)
+            wait_time = max(0.0, deadline + self.timeout - now)
+            readable, _, _ = select.select(self._sockets(), [], [], min(wait_time, 0.05))
+
+            if readable:
+                for _, key, source, from_destination, received in self._receive():
+                    probe = pending.pop(key, None)
+                    if probe is None:
+                        continue
+                    ttl, index, sent = probe
+                    rtts[ttl][index] = (received - sent) * 1000
+                    ips[ttl][index] = source
+                    outstanding[ttl] -= 1
+                    if from_destination:
+                        reached.add(ttl)
+
+            now = time.perf_counter()
+            for key in [key for key, (_, _, sent) in pending.items() if now - sent >= self.timeout]:
+                ttl, _, _ = pending.pop(key)
+                outstanding[ttl] -= 1
+
+    @staticmethod
+    def _make_hop(ttl, rtts, ips, reached):
+        """Build the hop dict of one TTL"""
+        responders = list(dict.fromkeys(ip for ip in ips if ip))
+        answered = [rtt for rtt in rtts if rtt is not None]
+        return {
+            "hop": ttl,
+            "ip": responders[0] if responders else "*",
+            "responders": responders,
+            "hostname": None,
+            "rtts": [round(rtt, 3) if rtt is not None else None for rtt in rtts],
+            "latency_ms": round(sum(answered) / len(answered), 2) if answered else None,
+            "timeout": not answered,
+            "reached": reached,
+        }
+
+    def trace(self, target, cancel_check=None):
+        """
+        Trace a target and collect all hops
+
+        Args:
+            target (str): Hostname or IPv4 address
+            cancel_check (callable): Optional callable returning True to stop early
+
+        Returns:
+            dict: target, ip, hops, reached and duration (seconds)
+        """
+        start = time.perf_counter()
+        hops = list(self.iter_hops(target, cancel_check))
+        if self.resolve:
+            self.resolve_hostnames(hops)
+        return {
+            "target": target,
+            "ip": self._dst_ip,
+            "hops": hops,
+            "reached": bool(hops and hops[-1]["reached"]),
+            "duration": time.perf_counter() - start,
+        }
+
+    @staticmethod
+    def resolve_hostnames(hops, timeout=2.0):
+        """
+        Fill in the hostname of each hop with concurrent reverse lookups
+
+        Args:
+            hops (list): Hop dicts (modified in place)
+            timeout (float): Total seconds to wait for the lookups
+        """
+        ips = list(dict.fromkeys(hop["ip"] for hop in hops if hop["ip"] != "*"))
+        if not ips:
+            return
+        executor = ThreadPoolExecutor(max_workers=min(16, len(ips)))
+        futures = {ip: executor.submit(socket.gethostbyaddr, ip) for ip in ips}
+        wait(futures.values(), timeout=timeout)
+        executor.shutdown(wait=False)
+        names = {}
+        for ip, future in futures.items():
+            if future.done() and not future.exception():
+                names[ip] = future.result()[0]
+        for hop in hops:
+            hop["hostname"] = names.get(hop["ip"])
+
+    @staticmethod
+    def format_output(result, max_hops):
+        """
+        Format a trace in the layout of Windows tracert
+
+        Args:
+            result (dict): Result of trace()
+            max_hops (int): Maximum hops shown in the header
+
+        Returns:
+            str: Text output
+        """
+        lines = [
+            f"Tracing route to {result['target']} [{result['ip']}]",
+            f"over a maximum of {max_hops} hops:",
+            "",
+        ]
+        for hop in result["hops"]:
+            lines.append(TracerouteEngine.format_hop(hop))
+        lines.append("")
+        lines.append("Trace complete." if result["reached"] else "Destination not reached.")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def format_hop(hop):
+        """Format one hop as a tracert line"""
+        times = []
+        for rtt in hop["rtts"]:
+            if rtt is None:
+                times.append("   *    ")
+            elif rtt < 1:
+                times.append("  <1 ms ")
+            else:
+                times.append(f"{rtt:>4.0f} ms ")
+        if hop["timeout"]:
+            return f"{hop['hop']:>3}  {' '.join(times)} Request timed out."
+        name = f"{hop['hostname']} [{hop['ip']}]" if hop.get("hostname") else hop["ip"]
+        return f"{hop['hop']:>3}  {' '.join(times)} {name}"
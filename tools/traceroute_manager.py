@@ -3,131 +3,443 @@ Traceroute History Manager
 Manages saved traceroute results for comparison and history tracking
 """
 
+import bisect
 import json
 from pathlib import Path
 from datetime import datetime
-import re
+
+from .asn_lookup import ASNLookup
+from .multipath import find_diamonds
+from .trace_parser import TraceParser
 
 
 class TracerouteManager:
-    """Manage saved traceroutes for comparison"""
+    """Manage saved traceroutes for comparison
+    
+    Traces are indexed by ID and by target, each target's traces in time
+    order. Every trace is checked against the previous trace of its target
+    when it is indexed, so route changes and latency shifts are recorded
+    once on arrival and the timeline of a target is a lookup.
+    """
+    
+    # End-to-end latency change that counts as a shift
+    LATENCY_SHIFT_MS = 10.0
+    # Previous traces on the same route averaged for the latency baseline
+    BASELINE_WINDOW = 5
     
     def __init__(self):
         self.history_dir = Path.home() / ".nettools"
+        # One JSON file per trace, so saving a trace never rewrites the history
+        self.traces_dir = self.history_dir / "traceroutes"
+        # Single-file history of earlier versions, migrated on first load
         self.traces_file = self.history_dir / "traceroutes.json"
-        self.max_traces = 50
+        self.max_traces = 500
         self.traces = self.load_traces()
+        self._id_base = None
+        self._id_suffix = 0
+        self._rebuild_index()
     
     def load_traces(self):
-        """Load saved traceroutes from file"""
-        if not self.history_dir.exists():
-            self.history_dir.mkdir(parents=True)
+        """Load saved traceroutes, newest first"""
+        self.traces_dir.mkdir(parents=True, exist_ok=True)
         
         if self.traces_file.exists():
             try:
                 with open(self.traces_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
+                    legacy = json.load(f)
+                for trace in legacy:
+                    self.save_trace(trace)
+                self.traces_file.unlink()
+            except (OSError, ValueError) as e:
+                print(f"Could not migrate traceroutes: {e}")
+        
+        traces = []
+        for path in self.traces_dir.glob("*.json"):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    traces.append(json.load(f))
+            except (OSError, ValueError):
                 pass
+        traces.sort(key=lambda t: (t.get("timestamp", ""), t["id"]), reverse=True)
+        for old in traces[self.max_traces:]:
+            self._delete_trace_file(old["id"])
+        return traces[:self.max_traces]
+    
+    def _trace_path(self, trace_id):
+        """File of one saved trace"""
+        return self.traces_dir / f"{trace_id}.json"
+    
+    def save_trace(self, trace):
+        """
+        Save one trace to its own file
         
-        return []
+        Args:
+            trace (dict): Trace to write (replaced atomically if it exists)
+        """
+        path = self._trace_path(trace["id"])
+        temp_path = path.with_suffix(".tmp")
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(trace, f, indent=2)
+            temp_path.replace(path)
+        except OSError as e:
+            print(f"Could not save traceroute: {e}")
     
-    def save_traces(self):
-        """Save traces to file"""
+    def _delete_trace_file(self, trace_id):
+        """Remove the file of one saved trace"""
         try:
-            with open(self.traces_file, 'w', encoding='utf-8') as f:
-                json.dump(self.traces, f, indent=2)
-        except Exception as e:
-            print(f"Could not save traceroutes: {e}")
+            self._trace_path(trace_id).unlink(missing_ok=True)
+        except OSError as e:
+            print(f"Could not delete traceroute: {e}")
+    
+    @staticmethod
+    def parse_hop_line(line):
+        """
+        Parse one line of traceroute output
+        
+        Args:
+            line (str): Output line
+            
+        Returns:
+            dict: Hop in the TraceParser hop model, or None for headers
+                  and other non-hop lines
+        """
+        return TraceParser().feed(line)
     
     def parse_traceroute_output(self, output, target):
         """Parse traceroute output into structured hop data"""
-        hops = []
-        lines = output.strip().split('\n')
+        return TraceParser.parse_hops(output)
+    
+    def start_trace(self, target):
+        """
+        Begin recording a trace whose hops arrive one at a time
         
-        for line in lines:
-            # Skip header lines and empty lines
-            if not line.strip() or 'Tracing route' in line or 'Trace complete' in line:
-                continue
-            if 'over a maximum' in line:
-                continue
+        Args:
+            target (str): Trace target
             
-            # Parse hop line - format varies by OS
-            # Windows: "  1    <1 ms    <1 ms    <1 ms  192.168.1.1"
-            # Linux:   "1  192.168.1.1 (192.168.1.1)  0.123 ms  0.456 ms  0.789 ms"
-            
-            # Try to extract hop number
-            hop_match = re.match(r'^\s*(\d+)', line)
-            if hop_match:
-                hop_num = int(hop_match.group(1))
-                
-                # Extract IP address
-                ip_match = re.search(r'(\d+\.\d+\.\d+\.\d+)', line)
-                ip_addr = ip_match.group(1) if ip_match else '*'
-                
-                # Extract latency values (look for ms values)
-                latencies = re.findall(r'([<]?\d+(?:\.\d+)?\s*ms)', line)
-                
-                # Calculate average latency
-                avg_latency = None
-                if latencies:
-                    values = []
-                    for lat in latencies:
-                        lat_clean = lat.replace('ms', '').replace('<', '').strip()
-                        try:
-                            values.append(float(lat_clean))
-                        except:
-                            pass
-                    if values:
-                        avg_latency = sum(values) / len(values)
-                
-                # Check for timeout
-                is_timeout = ip_addr == '*' or 'Request timed out' in line or '* * *' in line
-                
-                hops.append({
-                    'hop': hop_num,
-                    'ip': ip_addr,
-                    'latency_ms': round(avg_latency, 2) if avg_latency else None,
-                    'timeout': is_timeout,
-                    'raw': line.strip()
-                })
+        Returns:
+            dict: Trace in progress, to pass to add_hop and finish_trace
+        """
+        # IDs have one-second resolution; later traces in the same second get a suffix
+        base_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self._id_suffix = self._id_suffix + 1 if base_id == self._id_base else 1
+        self._id_base = base_id
+        trace_id = base_id if self._id_suffix == 1 else f"{base_id}_{self._id_suffix}"
+        while trace_id in self._by_id:
+            self._id_suffix += 1
+            trace_id = f"{base_id}_{self._id_suffix}"
+        return {
+            "id": trace_id,
+            "target": target,
+            "timestamp": datetime.now().isoformat(),
+            "success": False,
+            "hops": [],
+        }
+    
+    def add_hop(self, trace, hop):
+        """Append a streamed hop to a trace in progress"""
+        trace["hops"].append(self._saved_hop(hop))
+    
+    def sync_hops(self, trace, hops):
+        """
+        Replace a trace's recorded hops with the final state of the streamed hops
         
-        return hops
+        pathping's statistics section and mtr's per-hop statistics update
+        hops after they were streamed, so the copies add_hop made are stale
+        once the tool has finished.
+        
+        Args:
+            trace (dict): Trace from start_trace
+            hops (list): Final hop dicts, e.g. TraceStream.hops
+        """
+        trace["hops"] = [self._saved_hop(hop) for hop in hops]
     
-    def add_trace(self, target, output, success=True):
-        """Add a traceroute result"""
-        hops = self.parse_traceroute_output(output, target)
+    @staticmethod
+    def _saved_hop(hop):
+        """Copy of a hop with the fields kept in history"""
+        saved = {
+            'hop': hop['hop'],
+            'ip': hop.get('ip', '*'),
+            'latency_ms': hop.get('latency_ms'),
+            'timeout': hop.get('timeout', False),
+            'raw': hop.get('raw', '')
+        }
+        # Load-balanced hops keep every interface seen
+        if len(hop.get('responders') or ()) > 1:
+            saved['responders'] = list(hop['responders'])
+        # pathping and mtr measure loss per hop
+        if hop.get('loss') is not None:
+            saved['loss'] = hop['loss']
+        ASNLookup.default().annotate([saved])
+        return saved
+    
+    def finish_trace(self, trace, output, success=True):
+        """
+        Complete a trace in progress and save it to history
         
-        trace = {
-            "id": datetime.now().strftime("%Y%m%d_%H%M%S"),
-            "target": target,
-            "timestamp": datetime.now().isoformat(),
-            "success": success,
-            "hops": hops,
-            "raw_output": output,
-            "summary": {
-                "total_hops": len(hops),
-                "timeouts": sum(1 for h in hops if h.get('timeout')),
-                "avg_latency": round(sum(h['latency_ms'] for h in hops if h.get('latency_ms')) / max(1, sum(1 for h in hops if h.get('latency_ms'))), 2) if any(h.get('latency_ms') for h in hops) else None
-            }
+        Args:
+            trace (dict): Trace from start_trace
+            output (str): Full raw output
+            success (bool): Whether the trace succeeded
+            
+        Returns:
+            str: Trace ID
+        """
+        hops = trace["hops"]
+        latencies = [h['latency_ms'] for h in hops if h.get('latency_ms')]
+        trace["success"] = success
+        trace["raw_output"] = output
+        trace["diamonds"] = find_diamonds(hops)
+        trace["summary"] = {
+            "total_hops": len(hops),
+            "timeouts": sum(1 for h in hops if h.get('timeout')),
+            "avg_latency": round(sum(latencies) / len(latencies), 2) if latencies else None
         }
         
         self.traces.insert(0, trace)
+        self._index_trace(trace)
+        self.save_trace(trace)
+        for old in self.traces[self.max_traces:]:
+            self._unindex_trace(old)
+            self._delete_trace_file(old["id"])
+            self._save_reindexed(old["target"])
         self.traces = self.traces[:self.max_traces]
-        self.save_traces()
         return trace["id"]
     
+    def add_trace(self, target, output, success=True):
+        """Add a traceroute result"""
+        trace = self.start_trace(target)
+        for hop in self.parse_traceroute_output(output, target):
+            self.add_hop(trace, hop)
+        return self.finish_trace(trace, output, success)
+    
     def get_traces(self, target=None):
-        """Get saved traces, optionally filtered by target"""
+        """Get saved traces, newest first, optionally filtered by target"""
         if target:
-            return [t for t in self.traces if t["target"].lower() == target.lower()]
+            entry = self._by_target.get(target.lower())
+            return list(reversed(entry["traces"])) if entry else []
         return self.traces
     
+    def get_targets(self):
+        """Get every target with saved traces"""
+        return sorted(self._by_target)
+    
     def get_trace_by_id(self, trace_id):
         """Get a specific trace by ID"""
-        for trace in self.traces:
-            if trace["id"] == trace_id:
-                return trace
+        return self._by_id.get(trace_id)
+    
+    def get_timeline(self, target, start=None, end=None, changes_only=False):
+        """
+        Route and latency history of a target across all saved traces
+        
+        Args:
+            target (str): Trace target
+            start (str): Optional ISO timestamp of the earliest trace
+            end (str): Optional ISO timestamp of the latest trace
+            changes_only (bool): Only return traces where a change was detected
+            
+        Returns:
+            list: Entries oldest first with id, timestamp, route (route number,
+                  1 for the first route seen), end_latency, avg_latency,
+                  success and events (route_change and latency_shift dicts)
+        """
+        entry = self._by_target.get(target.lower())
+        if not entry:
+            return []
+        
+        first = bisect.bisect_left(entry["times"], start) if start else 0
+        last = bisect.bisect_right(entry["times"], end) if end else len(entry["times"])
+        timeline = []
+        for trace in entry["traces"][first:last]:
+            if changes_only and not trace.get("events"):
+                continue
+            timeline.append({
+                "id": trace["id"],
+                "timestamp": trace["timestamp"],
+                "route": trace.get("route"),
+                "end_latency": self._end_latency(trace),
+                "avg_latency": trace.get("summary", {}).get("avg_latency"),
+                "success": trace.get("success", False),
+                "events": trace.get("events", []),
+            })
+        return timeline
+    
+    def _rebuild_index(self):
+        """Index the loaded traces, replaying change detection oldest first"""
+        self._by_id = {}
+        self._by_target = {}
+        for trace in sorted(self.traces, key=lambda t: t.get("timestamp", "")):
+            self._index_trace(trace)
+    
+    def _index_trace(self, trace):
+        """Add a trace to the indexes and record what changed since the previous trace"""
+        self._by_id[trace["id"]] = trace
+        entry = self._by_target.setdefault(trace["target"].lower(), {
+            "traces": [], "times": [], "routes": []
+        })
+        
+        hops = self._route_hops(trace)
+        trace["route"] = self._route_number(entry["routes"], hops)
+        
+        position = bisect.bisect_right(entry["times"], trace["timestamp"])
+        previous = entry["traces"][:position]
+        trace["events"] = self._detect_changes(previous, trace, hops, entry["routes"])
+        entry["traces"].insert(position, trace)
+        entry["times"].insert(position, trace["timestamp"])
+    
+    def _unindex_trace(self, trace):
+        """Remove a trace from the indexes"""
+        self._by_id.pop(trace["id"], None)
+        key = trace["target"].lower()
+        entry = self._by_target.get(key)
+        if not entry:
+            return
+        for position, indexed in enumerate(entry["traces"]):
+            if indexed is trace:
+                del entry["traces"][position]
+                del entry["times"][position]
+                break
+        if not entry["traces"]:
+            del self._by_target[key]
+    
+    def _reindex_target(self, target):
+        """
+        Recompute route numbers and events of a target's traces, oldest first
+        
+        Needed once a trace is removed, since later traces were compared
+        against it when they were indexed.
+        
+        Args:
+            target (str): Trace target
+            
+        Returns:
+            list: Traces whose route or events changed
+        """
+        entry = self._by_target.get(target.lower())
+        if not entry:
+            return []
+        entry["routes"] = []
+        changed = []
+        for position, trace in enumerate(entry["traces"]):
+            before = (trace.get("route"), trace.get("events"))
+            hops = self._route_hops(trace)
+            trace["route"] = self._route_number(entry["routes"], hops)
+            trace["events"] = self._detect_changes(entry["traces"][:position], trace, hops, entry["routes"])
+            if (trace["route"], trace["events"]) != before:
+                changed.append(trace)
+        return changed
+    
+    def _save_reindexed(self, target):
+        """Reindex a target after a removal and save the traces that changed"""
+        for trace in self._reindex_target(target):
+            self.save_trace(trace)
+    
+    def _route_number(self, routes, hops):
+        """
+        Number a route so that a flip back to an earlier route shows as such
+        
+        Args:
+            routes (list): Distinct routes of the target so far, extended in place
+            hops (list): Route from _route_hops
+            
+        Returns:
+            int: 1-based route number, or None if no hop answered
+        """
+        if not hops:
+            return None
+        for number, known in enumerate(routes, 1):
+            if self._same_route(known, hops):
+                return number
+        routes.append(hops)
+        return len(routes)
+    
+    def _detect_changes(self, previous, trace, hops, routes):
+        """
+        Compare a trace with the traces of its target that came before it
+        
+        Args:
+            previous (list): Earlier traces of the target, oldest first
+            trace (dict): New trace with its route number set
+            hops (list): Route of the new trace from _route_hops
+            routes (list): Distinct routes of the target, by route number
+            
+        Returns:
+            list: Event dicts
+        """
+        routed = [earlier for earlier in previous if earlier.get("route") is not None]
+        if not routed or trace["route"] is None:
+            return []
+        events = []
+        
+        last = routed[-1]
+        if last.get("route") != trace["route"]:
+            # The first trace of the old route, so its silent hops do not hide what changed
+            before = routes[last["route"] - 1]
+            changed = []
+            for number in range(1, max(len(before), len(hops)) + 1):
+                hop1 = before[number - 1] if number <= len(before) else ("-", ())
+                hop2 = hops[number - 1] if number <= len(hops) else ("-", ())
+                if not self._same_hop(hop1, hop2):
+                    changed.append({"hop": number, "before": hop1[0], "after": hop2[0]})
+            events.append({
+                "type": "route_change",
+                "from_route": last.get("route"),
+                "to_route": trace["route"],
+                "hops": changed,
+            })
+            return events  # A new route has no latency baseline yet
+        
+        # Baseline: the latest traces on this route, up to the last route change
+        baseline = []
+        for earlier in reversed(routed):
+            if earlier["route"] != trace["route"] or len(baseline) == self.BASELINE_WINDOW:
+                break
+            latency = self._end_latency(earlier)
+            if latency is not None:
+                baseline.append(latency)
+        latency = self._end_latency(trace)
+        if baseline and latency is not None:
+            expected = sum(baseline) / len(baseline)
+            if abs(latency - expected) >= self.LATENCY_SHIFT_MS:
+                events.append({
+                    "type": "latency_shift",
+                    "before": round(expected, 2),
+                    "after": latency,
+                    "delta_ms": round(latency - expected, 2),
+                })
+        return events
+    
+    @staticmethod
+    def _route_hops(trace):
+        """Route of a trace as (ip, responders) per hop, without trailing timeouts"""
+        hops = [
+            (hop.get("ip", "*"), tuple(hop.get("responders") or ()))
+            for hop in sorted(trace.get("hops", []), key=lambda h: h["hop"])
+        ]
+        while hops and hops[-1][0] == "*":
+            hops.pop()
+        return hops
+    
+    @staticmethod
+    def _same_hop(hop1, hop2):
+        """True if two hops can be the same router: equal, unanswered or ECMP branches"""
+        ip1, responders1 = hop1
+        ip2, responders2 = hop2
+        if ip1 == ip2 or "*" in (ip1, ip2):
+            return True
+        return ip1 in responders2 or ip2 in responders1
+    
+    @classmethod
+    def _same_route(cls, hops1, hops2):
+        """True if two routes match hop for hop"""
+        return len(hops1) == len(hops2) and all(cls._same_hop(a, b) for a, b in zip(hops1, hops2))
+    
+    @staticmethod
+    def _end_latency(trace):
+        """Latency of the last answering hop of a trace"""
+        for hop in sorted(trace.get("hops", []), key=lambda h: h["hop"], reverse=True):
+            if not hop.get("timeout") and hop.get("latency_ms") is not None:
+                return hop["latency_ms"]
         return None
     
     def compare_traces(self, trace1_id, trace2_id):
@@ -149,19 +461,22 @@ class TracerouteManager:
                 "target": trace1["target"],
                 "timestamp": trace1["timestamp"],
                 "total_hops": len(trace1.get('hops', [])),
-                "avg_latency": trace1.get('summary', {}).get('avg_latency')
+                "avg_latency": trace1.get('summary', {}).get('avg_latency'),
+                "diamonds": trace1.get('diamonds', [])
             },
             "trace2": {
                 "id": trace2["id"],
                 "target": trace2["target"],
                 "timestamp": trace2["timestamp"],
                 "total_hops": len(trace2.get('hops', [])),
-                "avg_latency": trace2.get('summary', {}).get('avg_latency')
+                "avg_latency": trace2.get('summary', {}).get('avg_latency'),
+                "diamonds": trace2.get('diamonds', [])
             },
             "hops": [],
             "summary": {
                 "total_hops": len(all_hops),
                 "route_changes": 0,
+                "ecmp_hops": 0,
                 "latency_improved": 0,
                 "latency_degraded": 0,
                 "new_timeouts": 0,
@@ -179,10 +494,16 @@ class TracerouteManager:
             lat2 = hop2.get('latency_ms')
             to1 = hop1.get('timeout', True) if not hop1 else hop1.get('timeout', False)
             to2 = hop2.get('timeout', True) if not hop2 else hop2.get('timeout', False)
+            responders1 = hop1.get('responders') or [ip1]
+            responders2 = hop2.get('responders') or [ip2]
             
             # Determine status
             status = "unchanged"
-            if ip1 != ip2 and ip1 != '-' and ip2 != '-':
+            if ip1 != ip2 and ip1 != '-' and ip2 != '-' and (ip1 in responders2 or ip2 in responders1):
+                # Another branch of the same load-balanced hop, not a new route
+                status = "ecmp"
+                comparison["summary"]["ecmp_hops"] += 1
+            elif ip1 != ip2 and ip1 != '-' and ip2 != '-':
                 status = "route_changed"
                 comparison["summary"]["route_changes"] += 1
             elif not hop1:
@@ -212,6 +533,8 @@ class TracerouteManager:
                 "trace2_latency": lat2,
                 "trace1_timeout": to1,
                 "trace2_timeout": to2,
+                "trace1_responders": responders1 if hop1 else [],
+                "trace2_responders": responders2 if hop2 else [],
                 "latency_diff": round(lat2 - lat1, 2) if lat1 and lat2 else None,
                 "status": status
             })
@@ -220,10 +543,17 @@ class TracerouteManager:
     
     def delete_trace(self, trace_id):
         """Delete a traceroute by ID"""
+        trace = self._by_id.get(trace_id)
+        if trace is not None:
+            self._unindex_trace(trace)
         self.traces = [t for t in self.traces if t["id"] != trace_id]
-        self.save_traces()
+        self._delete_trace_file(trace_id)
+        if trace is not None:
+            self._save_reindexed(trace["target"])
     
     def clear_all_traces(self):
         """Clear all saved traceroutes"""
+        for trace in self.traces:
+            self._delete_trace_file(trace["id"])
         self.traces = []
-        self.save_traces()
+        self._rebuild_index()
@@ -0,0 +1,281 @@
+"""
+UDP Scanner Module
+UDP port probing with protocol-specific payloads
+"""
+
+import errno
+import selectors
+import socket
+import struct
+import time
+from collections import deque
+
+from .rate_limiter import RateLimiter
+
+
+def _dns_query():
+    """DNS query for the root NS records (answered by any resolver)"""
+    header = struct.pack("!HHHHHH", 0x4E54, 0x0100, 1, 0, 0, 0)
+    return header + b"\x00" + struct.pack("!HH", 2, 1)
+
+
+def _ntp_request():
+    """NTPv3 client mode request"""
+    return b"\x1b" + b"\x00" * 47
+
+
+def _snmp_get_request(community=b"public"):
+    """SNMPv1 GetRequest for sysDescr.0"""
+    oid = b"\x06\x08\x2b\x06\x01\x02\x01\x01\x01\x00"
+    varbind = b"\x30" + bytes([len(oid) + 2]) + oid + b"\x05\x00"
+    varbinds = b"\x30" + bytes([len(varbind)]) + varbind
+    pdu_body = b"\x02\x01\x01\x02\x01\x00\x02\x01\x00" + varbinds
+    pdu = b"\xa0" + bytes([len(pdu_body)]) + pdu_body
+    message = b"\x02\x01\x00\x04" + bytes([len(community)]) + community + pdu
+    return b"\x30" + bytes([len(message)]) + message
+
+
+def _netbios_status():
+    """NetBIOS NBSTAT query for the wildcard name"""
+    name = b"\x20" + b"CK" + b"A" * 30 + b"\x00"
+    return struct.pack("!HHHHHH", 0x4E54, 0x0000, 1, 0, 0, 0) + name + struct.pack("!HH", 0x21, 1)
+
+
+def _radius_access_request():
+    """Minimal RADIUS Access-Request (servers reply or log and drop)"""
+    user = b"nettools"
+    attrs = bytes([1, len(user) + 2]) + user
+    authenticator = b"\x00" * 16
+    return struct.pack("!BBH", 1, 0x4E, 20 + len(attrs)) + authenticator + attrs
+
+
+def _ssdp_search():
+    """SSDP M-SEARCH discovery request"""
+    return (b"M-SEARCH * HTTP/1.1\r\nHOST: 239.255.255.250:1900\r\n"
+            b"MAN: \"ssdp:discover\"\r\nMX: 1\r\nST: ssdp:all\r\n\r\n")
+
+
+class UDPScanner:
+    """UDP port scanner with protocol-aware probes and adaptive retransmission"""
+
+    # Common UDP ports with their services
+    COMMON_UDP_PORTS = {
+        53: "DNS",
+        67: "DHCP",
+        69: "TFTP",
+        123: "NTP",
+        137: "NetBIOS-NS",
+        161: "SNMP",
+        162: "SNMP-Trap",
+        500: "IKE",
+        514: "Syslog",
+        1812: "RADIUS",
+        1813: "RADIUS-Acct",
+        1900: "SSDP",
+        5353: "mDNS",
+    }
+
+    # Protocol-specific payloads; ports without a payload get an empty datagram
+    PAYLOADS = {
+        53: _dns_query(),
+        69: b"\x00\x01nettools\x00octet\x00",
+        123: _ntp_request(),
+        137: _netbios_status(),
+        161: _snmp_get_request(),
+        514: b"<14>nettools: udp probe",
+        1645: _radius_access_request(),
+        1812: _radius_access_request(),
+        1900: _ssdp_search(),
+        5353: _dns_query(),
+    }
+
+    def __init__(self, timeout=1.0, retries=2, max_sockets=32, rate=200, rate_limiter=None):
+        """
+        Initialize UDP scanner
+
+        Args:
+            timeout (float): Initial and maximum retransmission timeout in seconds
+            retries (int): Number of retransmissions for unanswered probes
+            max_sockets (int): Number of ports probed concurrently
+            rate (int): Maximum probes per second (0 for unlimited)
+            rate_limiter (RateLimiter): Optional limiter shared with other scans
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.max_sockets = max_sockets
+        self.rate_limiter = rate_limiter or RateLimiter(rate)
+
+        # RFC 6298 style round-trip estimate, updated from every reply
+        self._srtt = None
+        self._rttvar = None
+
+    @staticmethod
+    def get_common_ports():
+        """Get list of common UDP ports"""
+        return list(UDPScanner.COMMON_UDP_PORTS.keys())
+
+    @staticmethod
+    def get_service_name(port):
+        """Get common UDP service name for port"""
+        return UDPScanner.COMMON_UDP_PORTS.get(port, "Unknown")
+
+    @staticmethod
+    def get_payload(port):
+        """Get the probe payload for a port"""
+        return UDPScanner.PAYLOADS.get(port, b"")
+
+    def _rto(self, attempt):
+        """Retransmission timeout for the given attempt (1-based)"""
+        if self._srtt is None:
+            rto = self.timeout
+        else:
+            rto = min(self.timeout, max(0.1, self._srtt + 4 * self._rttvar))
+        return min(self.timeout * 4, rto * (2 ** (attempt - 1)))
+
+    def _update_rtt(self, sample):
+        """Feed a measured round-trip time into the estimator"""
+        if self._srtt is None:
+            self._srtt = sample
+            self._rttvar = sample / 2
+        else:
+            self._rttvar = 0.75 * self._rttvar + 0.25 * abs(self._srtt - sample)
+            self._srtt = 0.875 * self._srtt + 0.125 * sample
+
+    def _make_result(self, port, status):
+        """Build a result dict (same model as PortScanner.scan_port)"""
+        is_open = status == "Open"
+        return {
+            "port": port,
+            "status": status,
+            "service": self.get_service_name(port) if status != "Closed" else "",
+            "is_open": is_open
+        }
+
+    def scan(self, target, ports, progress_callback=None, cancel_check=None):
+        """
+        UDP scan a list of ports on a target
+
+        A bounded window of connected sockets is driven by one selector loop,
+        so no thread is needed per probe. Any reply marks a port open, an ICMP
+        port-unreachable (reported as a refused connection) marks it closed,
+        and silence after all retries is reported as "Open|Filtered".
+
+        Args:
+            target (str): Target IP or hostname
+            ports (list): List of port numbers to scan
+            progress_callback (callable): Optional callback(completed, total, result)
+            cancel_check (callable): Optional callable returning True to stop early
+
+        Returns:
+            list: One result dict per port
+        """
+        dst_ip = socket.gethostbyname(target)
+        total = len(ports)
+        results = {}
+        queue = deque(dict.fromkeys(ports))
+        selector = selectors.DefaultSelector()
+        in_flight = {}  # {sock: [port, attempt, send_time, deadline]}
+
+        def record(port, status):
+            result = self._make_result(port, status)
+            results[port] = result
+            if progress_callback:
+                progress_callback(len(results), total, result)
+
+        def finish(sock, status):
+            port = in_flight.pop(sock)[0]
+            selector.unregister(sock)
+            sock.close()
+            record(port, status)
+
+        def send(sock, probe):
+            port, attempt = probe[0], probe[1]
+            probe[2] = time.monotonic()
+            probe[3] = probe[2] + self._rto(attempt)
+            try:
+                sock.send(self.get_payload(port))
+            except (ConnectionRefusedError, ConnectionResetError):
+                finish(sock, "Closed")
+            except OSError:
+                finish(sock, "Filtered")
+
+        try:
+            while queue or in_flight:
+                if cancel_check and cancel_check():
+                    break
+
+                # Fill the window while the shared rate budget allows
+                send_wait = 0.0
+                while queue and len(in_flight) < self.max_sockets:
+                    send_wait = self.rate_limiter.try_acquire()
+                    if send_wait:
+                        break
+                    port = queue.popleft()
+                    sock = None
+                    try:
+                        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                        sock.setblocking(False)
+                        sock.connect((dst_ip, port))
+                    except OSError:
+                        # Unreachable network, broadcast address without
+                        # permission, or out of sockets: only this port fails
+                        if sock is not None:
+                            sock.close()
+                        record(port, "Filtered")
+                        continue
+                    selector.register(sock, selectors.EVENT_READ)
+                    in_flight[sock] = [port, 1, 0.0, 0.0]
+                    send(sock, in_flight[sock])
+
+                if not in_flight:
+                    if queue:
+                        time.sleep(min(send_wait, 0.05))
+                    continue
+
+                now = time.monotonic()
+                next_deadline = min(probe[3] for probe in in_flight.values())
+                wait = max(0.001, min(next_deadline - now, 0.05))
+                if queue and len(in_flight) < self.max_sockets:
+                    wait = min(wait, send_wait)
+
+                for key, _ in selector.select(wait):
+                    sock = key.fileobj
+                    if sock not in in_flight:
+                        continue
+                    try:
+                        sock.recv(4096)
+                    except (BlockingIOError, InterruptedError):
+                        continue
+                    except (ConnectionRefusedError, ConnectionResetError):
+                        finish(sock, "Closed")
+                        continue
+                    except OSError as e:
+                        # Host/network unreachable or admin prohibited
+                        if e.errno in (errno.EHOSTUNREACH, errno.ENETUNREACH, errno.EACCES):
+                            finish(sock, "Filtered")
+                        continue
+                    self._update_rtt(time.monotonic() - in_flight[sock][2])
+                    finish(sock, "Open")
+
+                # Retransmit or give up on expired probes
+                now = time.monotonic()
+                for sock, probe in list(in_flight.items()):
+                    if probe[3] > now:
+                        continue
+                    if probe[1] > self.retries:
+                        finish(sock, "Open|Filtered")
+                        continue
+                    retry_wait = self.rate_limiter.try_acquire()
+                    if retry_wait:
+                        # Out of budget: look again once a token is due
+                        probe[3] = now + retry_wait
+                    else:
+                        probe[1] += 1
+                        send(sock, probe)
+        finally:
+            for sock in list(in_flight):
+                selector.unregister(sock)
+                sock.close()
+            selector.close()
+
+        return [results[port] for port in dict.fromkeys(ports) if port in results]
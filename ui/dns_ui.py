@@ -5,12 +5,13 @@ Contains the DNS lookup tool page implementation
 
 import customtkinter as ctk
 from tkinter import messagebox
+import copy
 import threading
 import socket
 
 from design_constants import COLORS, SPACING, RADIUS, FONTS
 from ui_components import StyledCard, StyledButton, StyledEntry, SubTitle, SectionTitle, LoadingSpinner, add_tooltip_to_widget
-from tools.dns_lookup import DNSLookup
+from tools.dns_lookup import DNSLookup, ALL_RECORD_TYPES
 from tools.comparison_history import ComparisonHistory
 from tools.dnsdumpster import DNSDumpster
 from tools.mxtoolbox import MXToolbox
@@ -28,6 +29,7 @@ class DNSLookupUI:
         """
         self.app = app
         self.comparison_history = ComparisonHistory()
+        self._lookup_generation = 0  # Lookups started; answers of older ones are dropped
 
     def create_content(self, parent):
         """Create DNS Lookup page content"""
@@ -188,6 +190,16 @@ class DNSLookupUI:
         )
         lookup_btn.pack(side="left", padx=(0, SPACING['sm']))
         
+        all_records_btn = StyledButton(
+            button_frame,
+            text="📚 All Records",
+            command=self.perform_all_records_lookup,
+            size="large",
+            variant="primary"
+        )
+        all_records_btn.pack(side="left", padx=(0, SPACING['sm']))
+        add_tooltip_to_widget(all_records_btn, "Query A, AAAA, CNAME, MX, NS, TXT, SOA, SRV, CAA and PTR at once")
+        
         mxtoolbox_btn = StyledButton(
             button_frame,
             text="🔧 MXToolbox (DNS Check)",
@@ -262,6 +274,7 @@ class DNSLookupUI:
             return
         
         dns_server = self._get_selected_dns_server()
+        self._lookup_generation += 1
         
         # Validate custom DNS server if provided
         if dns_server not in ["system", "8.8.8.8", "1.1.1.1", "9.9.9.9", "208.67.222.222"]:
@@ -415,7 +428,29 @@ class DNSLookupUI:
             variant="neutral"
         )
         copy_btn.pack(side="left", padx=(10, 0))
-        
+
+        # TTL (answers from the built-in resolver carry their records)
+        if "ttl" in results:
+            ttl_frame = ctk.CTkFrame(self.dns_results_frame, fg_color="transparent")
+            ttl_frame.pack(fill="x", padx=20, pady=5)
+
+            ttl_title = ctk.CTkLabel(
+                ttl_frame,
+                text="TTL:",
+                font=ctk.CTkFont(size=12, weight="bold"),
+                width=120,
+                anchor="w"
+            )
+            ttl_title.pack(side="left")
+
+            ttl_value = ctk.CTkLabel(
+                ttl_frame,
+                text=f"{results['ttl']} s",
+                font=ctk.CTkFont(size=12),
+                anchor="w"
+            )
+            ttl_value.pack(side="left", fill="x", expand=True)
+
         # Status icon
         status_text = "✅ Success" if results["success"] else "❌ Failed"
         status_label = ctk.CTkLabel(
@@ -435,6 +470,8 @@ class DNSLookupUI:
             if "dns_server" in results:
                 all_text += f"DNS Server: {results['dns_server']}\n"
             all_text += f"Result: {result_text}\n"
+            if "ttl" in results:
+                all_text += f"TTL: {results['ttl']} s\n"
             all_text += f"Status: {status_text}\n"
             
             self.app.clipboard_clear()
@@ -467,6 +504,165 @@ class DNSLookupUI:
         add_tooltip_to_widget(compare_btn, "Compare this lookup with previous lookups")
     
 
+    def perform_all_records_lookup(self):
+        """Query every record type of the entered name at once"""
+        query = self.app.dns_query_entry.get().strip()
+        if not query:
+            messagebox.showwarning("Invalid Input", "Please enter a hostname or IP address")
+            return
+        
+        dns_server = self._get_selected_dns_server()
+        if dns_server != "system" and not DNSLookup.validate_dns_server(dns_server):
+            messagebox.showwarning("Invalid DNS Server", f"'{dns_server}' is not a valid IP address")
+            return
+        
+        # Clear previous results
+        for widget in self.dns_results_frame.winfo_children():
+            widget.destroy()
+        
+        self.dns_loading_spinner = LoadingSpinner(self.dns_results_frame, text=f"Querying all records of {query}...")
+        self.dns_loading_spinner.pack(pady=50)
+        self.dns_loading_spinner.start()
+        
+        self._lookup_generation += 1
+        lookup_thread = threading.Thread(
+            target=self.run_all_records_lookup,
+            args=(query, dns_server, self._lookup_generation),
+            daemon=True
+        )
+        lookup_thread.start()
+    
+    def run_all_records_lookup(self, query, dns_server, generation):
+        """Run the all-records lookup in background, showing answers as they arrive"""
+        def on_update(results):
+            # The lookup keeps changing its dict; the UI gets a copy
+            self.app.after(0, self.display_all_records, generation, copy.deepcopy(results))
+        
+        try:
+            results = DNSLookup.get_all_records(query, dns_server, on_update=on_update)
+        except Exception as e:
+            results = {
+                "hostname": query,
+                "dns_server": dns_server,
+                "records": {},
+                "details": {},
+                "pending": [],
+                "errors": {"all": f"Error: {e}"}
+            }
+        # Always end with the final state, even if no answer was ever merged
+        self.app.after(0, self.display_all_records, generation, results)
+    
+    def display_all_records(self, generation, results):
+        """Display the (possibly partial) answers of an all-records lookup"""
+        if generation != self._lookup_generation:
+            return  # A newer lookup has replaced this one
+        if hasattr(self, 'dns_loading_spinner'):
+            try:
+                self.dns_loading_spinner.stop()
+                self.dns_loading_spinner.destroy()
+            except:
+                pass
+        
+        for widget in self.dns_results_frame.winfo_children():
+            widget.destroy()
+        
+        pending = results.get("pending", [])
+        header_text = f"All Records: {results['hostname']}"
+        if pending:
+            header_text += f"  (waiting for {', '.join(pending)})"
+        header_label = ctk.CTkLabel(
+            self.dns_results_frame,
+            text=header_text,
+            font=ctk.CTkFont(size=16, weight="bold")
+        )
+        header_label.pack(pady=(20, 5), padx=20, anchor="w")
+        
+        server_label = ctk.CTkLabel(
+            self.dns_results_frame,
+            text=f"DNS Server: {results['dns_server']}",
+            font=ctk.CTkFont(size=12),
+            text_color=COLORS['text_secondary']
+        )
+        server_label.pack(pady=(0, 10), padx=20, anchor="w")
+        
+        lines = []
+        for record_type in ALL_RECORD_TYPES:
+            records = results["records"].get(record_type)
+            if records:
+                details = results["details"].get(record_type, [])
+                type_frame = ctk.CTkFrame(self.dns_results_frame, fg_color="transparent")
+                type_frame.pack(fill="x", padx=20, pady=2)
+                
+                type_title = ctk.CTkLabel(
+                    type_frame,
+                    text=f"{record_type}:",
+                    font=ctk.CTkFont(size=12, weight="bold"),
+                    width=80,
+                    anchor="nw"
+                )
+                type_title.pack(side="left", anchor="n")
+                
+                values = []
+                for index, text in enumerate(records):
+                    ttl = f"  (TTL {details[index]['ttl']} s)" if index < len(details) else ""
+                    values.append(text + ttl)
+                    lines.append(f"{record_type}\t{text}")
+                
+                type_value = ctk.CTkLabel(
+                    type_frame,
+                    text="\n".join(values),
+                    font=ctk.CTkFont(size=FONTS['small'], family="Courier New"),
+                    anchor="w",
+                    justify="left"
+                )
+                type_value.pack(side="left", fill="x", expand=True)
+            elif record_type in pending or record_type in results["errors"]:
+                if record_type in pending:
+                    status_text, status_color = "⏳ waiting...", COLORS['text_secondary']
+                else:
+                    status_text, status_color = f"❌ {results['errors'][record_type]}", COLORS['danger']
+                status_label = ctk.CTkLabel(
+                    self.dns_results_frame,
+                    text=f"{record_type}: {status_text}",
+                    font=ctk.CTkFont(size=FONTS['small']),
+                    text_color=status_color,
+                    anchor="w"
+                )
+                status_label.pack(fill="x", padx=20, pady=2)
+        
+        if "all" in results["errors"]:
+            error_label = ctk.CTkLabel(
+                self.dns_results_frame,
+                text=f"❌ {results['errors']['all']}",
+                font=ctk.CTkFont(size=12),
+                text_color=COLORS['danger']
+            )
+            error_label.pack(pady=10, padx=20, anchor="w")
+        elif not pending and not lines:
+            empty_label = ctk.CTkLabel(
+                self.dns_results_frame,
+                text="No records found",
+                font=ctk.CTkFont(size=12),
+                text_color=COLORS['text_secondary']
+            )
+            empty_label.pack(pady=10, padx=20, anchor="w")
+        
+        if lines and not pending:
+            def copy_records():
+                self.app.clipboard_clear()
+                self.app.clipboard_append("\n".join(lines))
+                self.app.update()
+                self.app.show_toast("All records copied to clipboard", "success")
+            
+            copy_btn = StyledButton(
+                self.dns_results_frame,
+                text="📄 Copy Records",
+                command=copy_records,
+                size="medium",
+                variant="primary"
+            )
+            copy_btn.pack(pady=(10, 20), padx=20, anchor="w")
+    
     def perform_dnsdumpster_lookup(self):
         """Perform DNSDumpster domain reconnaissance"""
         query = self.app.dns_query_entry.get().strip()
@@ -23,12 +23,23 @@ from datetime import datetime
 from design_constants import COLORS, SPACING, RADIUS, FONTS
 from ui_components import StyledCard, StyledButton, StyledEntry, ResultRow, SubTitle, SectionTitle, ContextMenu, LoadingSpinner, ProgressIndicator, add_tooltip_to_widget
 from tools.port_scanner import PortScanner
+from tools.syn_scanner import SYNScanner
+from tools.udp_scanner import UDPScanner
+from tools.progress_reporter import ProgressReporter
 from tools.comparison_history import ComparisonHistory
+from tools.port_state_cache import PortStateCache
 
 
 class PortScannerUI:
     """Port Scanner page UI implementation"""
     
+    # Freshness windows for the port state cache (seconds)
+    FRESHNESS_OPTIONS = {
+        "1 hour": 3600,
+        "24 hours": 24 * 3600,
+        "7 days": 7 * 24 * 3600,
+    }
+    
     def __init__(self, app):
         """
         Initialize Port Scanner UI
@@ -38,6 +49,7 @@ class PortScannerUI:
         """
         self.app = app
         self.comparison_history = ComparisonHistory()
+        self.port_state_cache = PortStateCache()
 
     def create_content(self, parent):
         """Create Port Scanner page content"""
@@ -160,6 +172,27 @@ class PortScannerUI:
         )
         socket_radio.pack(anchor="w", pady=2)
         
+        if SYNScanner.is_available():
+            syn_radio = ctk.CTkRadioButton(
+                method_frame,
+                text="SYN Scan (Half-open, requires root)",
+                variable=self.scan_method_var,
+                value="syn",
+                font=ctk.CTkFont(size=FONTS['small'])
+            )
+            syn_radio.pack(anchor="w", pady=2)
+            add_tooltip_to_widget(syn_radio, "Sends raw SYN packets and never completes the handshake\nNo connection per port, nothing logged by the services")
+        
+        udp_radio = ctk.CTkRadioButton(
+            method_frame,
+            text="UDP Scan (DNS, NTP, SNMP, Syslog, RADIUS, ...)",
+            variable=self.scan_method_var,
+            value="udp",
+            font=ctk.CTkFont(size=FONTS['small'])
+        )
+        udp_radio.pack(anchor="w", pady=2)
+        add_tooltip_to_widget(udp_radio, "Sends protocol-specific UDP probes\nCommon Ports mode uses well-known UDP services")
+        
         if TELNETLIB_AVAILABLE:
             telnet_radio = ctk.CTkRadioButton(
                 method_frame,
@@ -180,6 +213,29 @@ class PortScannerUI:
             )
             powershell_radio.pack(anchor="w", pady=2)
         
+        # Port state cache options
+        cache_frame = ctk.CTkFrame(input_frame, fg_color="transparent")
+        cache_frame.pack(fill="x", padx=SPACING['lg'], pady=(0, SPACING['lg']))
+        
+        self.verify_changed_check = ctk.CTkCheckBox(
+            cache_frame,
+            text="Verify changed only (answer fresh ports from cache)",
+            font=ctk.CTkFont(size=FONTS['small'])
+        )
+        self.verify_changed_check.pack(side="left")
+        add_tooltip_to_widget(self.verify_changed_check, "Probes unknown and stale ports first, re-checks ports known to be open\nand reports what changed since the last verification")
+        
+        freshness_label = ctk.CTkLabel(cache_frame, text="Fresh for:", font=ctk.CTkFont(size=FONTS['small']))
+        freshness_label.pack(side="left", padx=(SPACING['lg'], SPACING['xs']))
+        
+        self.freshness_selector = ctk.CTkOptionMenu(
+            cache_frame,
+            values=list(self.FRESHNESS_OPTIONS.keys()),
+            width=110
+        )
+        self.freshness_selector.set("24 hours")
+        self.freshness_selector.pack(side="left")
+        
         # Scan buttons
         button_frame = ctk.CTkFrame(scrollable, fg_color="transparent")
         button_frame.pack(fill="x", pady=(0, SPACING['lg']))
@@ -270,6 +326,8 @@ class PortScannerUI:
         mode = self.port_mode_var.get()
         
         if mode == "common":
+            if self.scan_method_var.get() == "udp":
+                return UDPScanner.get_common_ports()
             # Use PortScanner.get_common_ports()
             return PortScanner.get_common_ports()
         elif mode == "range":
@@ -294,6 +352,9 @@ class PortScannerUI:
             return
         
         method = self.scan_method_var.get()
+        self.port_scan_use_cache = bool(self.verify_changed_check.get())
+        self.port_state_cache.freshness = self.FRESHNESS_OPTIONS.get(
+            self.freshness_selector.get(), PortStateCache.DEFAULT_FRESHNESS)
         
         # Update UI
         self.port_scan_btn.configure(state="disabled")
@@ -327,31 +388,131 @@ class PortScannerUI:
     
     def run_port_scan(self, target, ports, method):
         """Run port scan in background"""
-        results = []
-        total_ports = len(ports)
+        protocol = "udp" if method == "udp" else "tcp"
         
-        for i, port in enumerate(ports):
+        # In verify mode only unknown, stale and open ports are probed
+        cached = {}
+        probe_ports = ports
+        if self.port_scan_use_cache:
+            try:
+                probe_ports, cached = self.port_state_cache.plan(target, ports, protocol)
+            except Exception as e:
+                print(f"Error reading port state cache: {e}")
+        
+        try:
+            if method in ("syn", "udp"):
+                scanned = self.run_batch_scan(target, probe_ports, method)
+            else:
+                scanned = self.run_connect_scan(target, probe_ports, method)
+        except OSError as e:
+            # Unresolvable target, no raw socket permission, no route...
+            self.app.after(0, self.display_port_error, target, method, e)
+            return
+        
+        deltas = []
+        try:
+            deltas = self.port_state_cache.record(target, scanned, protocol, method)
+        except Exception as e:
+            print(f"Error updating port state cache: {e}")
+        
+        scanned += [
+            {"port": port, "status": entry["state"], "service": entry["service"],
+             "is_open": entry["state"] == "Open"}
+            for port, entry in cached.items()
+        ]
+        scanned.sort(key=lambda r: r["port"])
+        
+        # UDP ports that stayed silent may still be open, so they are listed too
+        results = [
+            {"port": r["port"], "state": r["status"].upper(), "service": r["service"]}
+            for r in scanned if r["is_open"] or r["status"] == "Open|Filtered"
+        ]
+        
+        cache_info = None
+        if self.port_scan_use_cache:
+            cache_info = {
+                "probed": len(probe_ports),
+                "from_cache": len(cached),
+                "changes": [d for d in deltas if d["old_state"] is not None]
+            }
+        
+        # Update UI with results
+        self.app.after(0, self.display_port_results, target, results, self.port_scan_cancelled, cache_info)
+    
+    def run_connect_scan(self, target, ports, method):
+        """Probe ports one by one (socket, telnet or PowerShell)"""
+        scanned = []
+        reporter = self.create_progress_reporter(target, len(ports))
+        
+        for port in ports:
             if self.port_scan_cancelled:
                 break
             
-            # Update progress
-            progress = (i + 1) / total_ports
-            self.app.after(0, self.app.port_progress_bar.set, progress)
-            self.app.after(0, self.app.port_progress_label.configure, 
-                      {"text": f"Scanning {target}:{port} ({i+1}/{total_ports})..."})
-            
             # Scan port
             is_open, service = self.scan_single_port(target, port, method)
             
-            if is_open:
-                results.append({
-                    "port": port,
-                    "state": "OPEN",
-                    "service": service
-                })
+            scanned.append({
+                "port": port,
+                "status": "Open" if is_open else "Closed",
+                "service": service if is_open else "",
+                "is_open": is_open
+            })
+            reporter.update(scanned[-1])
+        
+        reporter.flush()
+        return scanned
+    
+    def create_progress_reporter(self, target, total_ports):
+        """
+        Create a throttled progress reporter for a scan
         
-        # Update UI with results
-        self.app.after(0, self.display_port_results, target, results, self.port_scan_cancelled)
+        Progress is coalesced so at most one UI callback is queued per
+        reporting interval, however many ports are scanned.
+        """
+        self.port_scan_open_seen = []
+        
+        def on_progress(snapshot):
+            self.app.after(0, self.apply_port_progress, target, snapshot)
+        
+        return ProgressReporter(on_progress, total_ports)
+    
+    def apply_port_progress(self, target, snapshot):
+        """Apply a coalesced progress snapshot in the main thread"""
+        completed = snapshot["completed"]
+        total = snapshot["total"]
+        self.port_scan_open_seen.extend(r["port"] for r in snapshot["new_open"])
+        
+        self.app.port_progress_bar.set(completed / total if total else 0)
+        
+        text = f"Scanning {target}:{snapshot['current']} ({completed}/{total})..."
+        if snapshot["open_count"]:
+            recent = ", ".join(str(p) for p in self.port_scan_open_seen[-5:])
+            text += f" | Open: {snapshot['open_count']} (latest: {recent})"
+        self.app.port_progress_label.configure(text=text)
+    
+    def run_batch_scan(self, target, ports, method):
+        """
+        Run SYN or UDP scan in background (all ports handled by one engine loop)
+        
+        Raises:
+            OSError: If the target cannot be resolved or the scan socket
+                     cannot be opened (PermissionError without raw sockets)
+        """
+        reporter = self.create_progress_reporter(target, len(ports))
+        
+        def on_progress(completed, total, result):
+            reporter.update(result)
+        
+        engine_class = UDPScanner if method == "udp" else SYNScanner
+        engine = engine_class(timeout=1, rate_limiter=PortScanner.RATE_LIMITER)
+        try:
+            return engine.scan(
+                target, ports,
+                progress_callback=on_progress,
+                cancel_check=lambda: self.port_scan_cancelled
+            )
+        finally:
+            reporter.flush()
     
     def scan_single_port(self, target, port, method):
         """Scan a single port using specified method"""
@@ -379,7 +540,31 @@ class PortScannerUI:
         """Get common service name for port - delegates to PortScanner"""
         return PortScanner.get_service_name(port)
     
-    def display_port_results(self, target, results, was_cancelled):
+    def display_port_error(self, target, method, error):
+        """Show a scan that could not run and reset the scan controls"""
+        if hasattr(self, 'loading_spinner'):
+            try:
+                self.loading_spinner.stop()
+                self.loading_spinner.destroy()
+            except:
+                pass
+        
+        for widget in self.app.port_results_frame.winfo_children():
+            widget.destroy()
+        
+        self.port_scan_btn.configure(state="normal")
+        self.app.port_cancel_btn.configure(state="disabled")
+        self.app.port_export_btn.configure(state="disabled")
+        self.port_scan_running = False
+        self.app.port_progress_label.configure(text="Scan failed")
+        
+        if isinstance(error, PermissionError):
+            message = f"{method.upper()} scan needs administrator/root privileges:\n{error}"
+        else:
+            message = f"Could not scan {target}:\n{error}"
+        messagebox.showerror("Scan Error", message)
+    
+    def display_port_results(self, target, results, was_cancelled, cache_info=None):
         """Display port scan results"""
         # Remove loading spinner
         if hasattr(self, 'loading_spinner'):
@@ -417,6 +602,14 @@ class PortScannerUI:
         
         if was_cancelled:
             self.app.port_progress_label.configure(text="Scan cancelled")
+        elif cache_info:
+            changes = cache_info["changes"]
+            text = (f"Scan complete - {cache_info['probed']} probed, "
+                    f"{cache_info['from_cache']} from cache, {len(changes)} change(s)")
+            if changes:
+                text += ": " + ", ".join(
+                    f"{d['port']} {d['old_state']}→{d['new_state']}" for d in changes[:10])
+            self.app.port_progress_label.configure(text=text)
         else:
             self.app.port_progress_label.configure(text="Scan complete")
         
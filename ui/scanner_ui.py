@@ -9,13 +9,16 @@ from tkinter import messagebox, filedialog
 import threading
 import ipaddress
 import csv
+import html
 import json
-import xml.etree.ElementTree as ET
 from pathlib import Path
 from datetime import datetime
 from uuid import uuid4
 
 from design_constants import COLORS, SPACING, RADIUS, FONTS
+from tools.asn_lookup import ASNLookup
+from tools.discovery_pipeline import DiscoveryPipeline
+from tools.port_scanner import PortScanner
 from ui_components import (
     StyledCard, StyledButton, StyledEntry, ResultRow, SubTitle, ToastNotification,
     SearchBar, SortableTable, SimpleBarChart, StatCard, ContextMenu, LoadingSpinner,
@@ -34,6 +37,8 @@ class ScannerUI:
             app: Reference to main NetToolsApp instance
         """
         self.app = app
+        self.pipeline = DiscoveryPipeline(self.app.scanner)
+        self.active_scanner = self.app.scanner
 
     def create_content(self, parent):
         """Create IPv4 Scanner page content"""
@@ -85,6 +90,22 @@ class ScannerUI:
         self.app.aggro_selector.set("Medium")
         self.app.aggro_selector.grid(row=1, column=1, padx=SPACING['md'], pady=SPACING['md'], sticky="ew")
         
+        # Chained port scan of every host found online
+        self.app.chain_portscan_check = ctk.CTkCheckBox(
+            input_card,
+            text="Port scan online hosts:",
+            font=ctk.CTkFont(size=FONTS['body'])
+        )
+        self.app.chain_portscan_check.grid(row=1, column=2, padx=SPACING['md'], pady=SPACING['md'], sticky="w")
+        add_tooltip_to_widget(self.app.chain_portscan_check, "Each host is port scanned as soon as it answers,\nwhile the sweep continues")
+        
+        self.app.chain_ports_entry = StyledEntry(
+            input_card,
+            placeholder_text="e.g., 22 or 22,80,443 or 1-1024",
+            width=200
+        )
+        self.app.chain_ports_entry.grid(row=1, column=3, padx=SPACING['md'], pady=SPACING['md'], sticky="w")
+        
         # Scan buttons (moved to separate row for better layout)
         button_frame = ctk.CTkFrame(input_card, fg_color="transparent")
         button_frame.grid(row=2, column=0, columnspan=4, padx=SPACING['md'], pady=SPACING['md'], sticky="ew")
@@ -219,7 +240,7 @@ class ScannerUI:
         header_frame.pack(fill="x", padx=SPACING['xs'], pady=SPACING['xs'])
         header_frame.pack_propagate(False)
         
-        headers = [("●", 50), ("IP Address", 180), ("Hostname/FQDN", 250), ("Status", 150), ("RTT (ms)", 100)]
+        headers = [("●", 50), ("IP Address", 180), ("Hostname/FQDN", 250), ("Status", 150), ("RTT (ms)", 100), ("Open Ports", 200)]
         for text, width in headers:
             label = ctk.CTkLabel(
                 header_frame,
@@ -355,6 +376,18 @@ class ScannerUI:
                 )
                 return
         
+        # Ports for the chained port-scan stage (optional)
+        chain_ports = []
+        if self.app.chain_portscan_check.get():
+            ports_str = self.app.chain_ports_entry.get().strip()
+            if '-' in ports_str:
+                chain_ports = PortScanner.parse_port_range(ports_str)
+            else:
+                chain_ports = PortScanner.parse_port_list(ports_str)
+            if not chain_ports:
+                messagebox.showwarning("Invalid Ports", "Please specify valid ports to scan on online hosts")
+                return
+        
         # Save to history
         self.app.history.add_cidr(cidr)
         
@@ -381,12 +414,28 @@ class ScannerUI:
         # Show scanning status
         self.app.status_label.configure(text="Starting scan...")
         
+        aggression = self.app.aggro_selector.get()
+        
+        if chain_ports:
+            # Sweep and port scan overlap in one pipeline
+            self.active_scanner = self.pipeline
+            self.pipeline.progress_callback = self.on_scan_progress
+            self.pipeline.complete_callback = self.on_scan_complete
+            self.app.scan_thread = threading.Thread(
+                target=self.pipeline.run,
+                args=(cidr, chain_ports),
+                kwargs={'aggression': aggression},
+                daemon=True
+            )
+            self.app.scan_thread.start()
+            return
+        
         # Set callbacks
+        self.active_scanner = self.app.scanner
         self.app.scanner.progress_callback = self.on_scan_progress
         self.app.scanner.complete_callback = self.on_scan_complete
         
         # Start scan in thread
-        aggression = self.app.aggro_selector.get()
         self.app.scan_thread = threading.Thread(
             target=self.app.scanner.scan_network,
             args=(cidr, aggression),
@@ -395,7 +444,7 @@ class ScannerUI:
         self.app.scan_thread.start()
     def cancel_scan(self):
         """Cancel ongoing scan"""
-        self.app.scanner.cancel_scan()
+        self.active_scanner.cancel_scan()
         self.app.status_label.configure(text="Cancelling scan...")
         self.app.cancel_scan_btn.configure(state="disabled")
     def import_ip_list(self):
@@ -593,6 +642,7 @@ gateway.home.lan
                     self.app.ip_to_row_index = {ip: idx for idx, ip in enumerate(ip_list)}
                     
                     # Set scanner callbacks (CRITICAL!)
+                    self.active_scanner = self.app.scanner
                     self.app.scanner.progress_callback = self.on_scan_progress
                     self.app.scanner.complete_callback = self.on_scan_complete
                     
@@ -673,10 +723,13 @@ gateway.home.lan
         self.app.progress_bar.set(progress)
         
         # Update status text with current progress
-        online_count = sum(1 for r in self.app.scanner.results if r.get('status') == 'Online')
+        online_count = sum(1 for r in self.active_scanner.results if r.get('status') == 'Online')
         current_ip = result['ip'] if result else "..."
         
         status_text = f"Scanning: {completed}/{total} | Online: {online_count} | Current: {current_ip}"
+        if 'open_ports' in (result or {}):
+            with_ports = sum(1 for r in self.active_scanner.results if r.get('open_ports'))
+            status_text += f" | With open ports: {with_ports}"
         self.app.status_label.configure(text=status_text)
         
         # Store results but don't render rows during scan
@@ -818,7 +871,7 @@ gateway.home.lan
         ip_label.pack(side="left", padx=SPACING['sm'])
         
         # Hostname/FQDN column (NEW)
-        hostname = result.get('hostname', '')
+        hostname = self._hostname_text(result)
         hostname_label = ctk.CTkLabel(
             row_frame,
             text=hostname if hostname else "-",
@@ -852,6 +905,18 @@ gateway.home.lan
         )
         rtt_label.pack(side="left", padx=SPACING['sm'])
         
+        # Open ports (only filled by chained port scans)
+        ports_text = self._format_open_ports(result)
+        ports_label = ctk.CTkLabel(
+            row_frame,
+            text=ports_text,
+            width=200,
+            anchor="w",
+            font=ctk.CTkFont(size=FONTS['small']),
+            text_color=COLORS["text_secondary"]
+        )
+        ports_label.pack(side="left", padx=SPACING['sm'])
+        
         # Store reference
         row_frame.result_data = result
         # Store references to labels for updating
@@ -860,6 +925,7 @@ gateway.home.lan
         row_frame.hostname_label = hostname_label
         row_frame.status_label = status_label
         row_frame.rtt_label = rtt_label
+        row_frame.ports_label = ports_label
         self.app.result_rows.append(row_frame)
         
         # Add right-click context menu (with error handling)
@@ -868,6 +934,30 @@ gateway.home.lan
         except Exception as e:
             print(f"Warning: Could not add context menu to row: {e}")
     
+    @staticmethod
+    def _hostname_text(result):
+        """Hostname of a result, followed by the owning network for public addresses"""
+        hostname = result.get('hostname', '')
+        owner = ASNLookup.describe(ASNLookup.default().lookup(result['ip']))
+        if owner:
+            return f"{hostname}  ({owner})" if hostname else owner
+        return hostname
+    
+    def _format_open_ports(self, result):
+        """Format open ports of a chained scan result for display"""
+        open_ports = result.get('open_ports')
+        if not open_ports:
+            return "-"
+        return ", ".join(str(p['port']) for p in open_ports)
+    
+    @staticmethod
+    def _export_open_ports(result):
+        """Open ports of a chained scan result for exports, e.g. "22/ssh, 80/http" """
+        return ", ".join(
+            f"{p['port']}/{p['service']}" if p.get('service') else str(p['port'])
+            for p in result.get('open_ports') or []
+        )
+    
     def _add_row_context_menu(self, row_frame, result):
         """Add right-click context menu to a result row"""
         def copy_ip():
@@ -889,6 +979,8 @@ gateway.home.lan
         
         def copy_full_info():
             info = f"IP: {result['ip']}\nHostname: {result.get('hostname', '-')}\nStatus: {result['status']}\nRTT: {result.get('rtt', '-')}"
+            if result.get('open_ports'):
+                info += f"\nOpen Ports: {self._format_open_ports(result)}"
             self.app.clipboard_clear()
             self.app.clipboard_append(info)
             self.app.update()  # Required for clipboard to work
@@ -937,7 +1029,7 @@ gateway.home.lan
         row_frame.ip_label.configure(text=result['ip'])
         
         # Update hostname
-        hostname = result.get('hostname', '')
+        hostname = self._hostname_text(result)
         row_frame.hostname_label.configure(
             text=hostname if hostname else "-",
             text_color=COLORS["text_secondary"] if hostname else ("gray70", "gray40")
@@ -952,6 +1044,7 @@ gateway.home.lan
         # Update RTT
         rtt_text = result.get('rtt', '---')
         row_frame.rtt_label.configure(text=rtt_text)
+        row_frame.ports_label.configure(text=self._format_open_ports(result))
         
         # Update stored data
         row_frame.result_data = result
@@ -1237,13 +1330,14 @@ gateway.home.lan
         """Export results as CSV"""
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
-            writer.writerow(['IP Address', 'Hostname', 'Status', 'Response Time'])
+            writer.writerow(['IP Address', 'Hostname', 'Status', 'Response Time', 'Open Ports'])
             for result in results:
                 writer.writerow([
                     result.get('ip', ''),
                     result.get('hostname', ''),
                     result.get('status', ''),
-                    result.get('rtt', '')
+                    result.get('rtt', ''),
+                    self._export_open_ports(result)
                 ])
     
     def _export_as_json(self, filepath, results):
@@ -1474,6 +1568,7 @@ gateway.home.lan
                         <th>Hostname</th>
                         <th>Status</th>
                         <th>Response Time</th>
+                        <th>Open Ports</th>
                     </tr>
                 </thead>
                 <tbody>
@@ -1483,6 +1578,7 @@ gateway.home.lan
             status_class = "online" if status == 'Online' else "offline"
             hostname = result.get('hostname', '') or '-'
             rtt = result.get('rtt', '') or '-'
+            open_ports = html.escape(self._export_open_ports(result)) or '-'
             
             html_content += f"""
                     <tr>
@@ -1496,6 +1592,7 @@ gateway.home.lan
                             </span>
                         </td>
                         <td>{rtt} {'ms' if rtt and rtt != '-' else ''}</td>
+                        <td>{open_ports}</td>
                     </tr>
 """
         
@@ -1523,11 +1620,11 @@ gateway.home.lan
             f.write("=" * 80 + "\n\n")
             f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"Total Results: {len(results)}\n\n")
-            f.write("-" * 80 + "\n")
-            f.write(f"{'IP Address':<20} {'Hostname':<30} {'Status':<10} {'RTT':<10}\n")
-            f.write("-" * 80 + "\n")
+            f.write("-" * 100 + "\n")
+            f.write(f"{'IP Address':<20} {'Hostname':<30} {'Status':<10} {'RTT':<10} {'Open Ports'}\n")
+            f.write("-" * 100 + "\n")
             for result in results:
-                f.write(f"{result.get('ip', ''):<20} {result.get('hostname', '-'):<30} {result.get('status', ''):<10} {result.get('rtt', ''):<10}\n")
+                f.write(f"{result.get('ip', ''):<20} {result.get('hostname', '-'):<30} {result.get('status', ''):<10} {result.get('rtt', ''):<10} {self._export_open_ports(result) or '-'}\n")
     
     def _export_as_xml(self, filepath, results):
         """Export results as XML"""
@@ -1544,79 +1641,19 @@ gateway.home.lan
             xml_content += f'      <hostname>{result.get("hostname", "")}</hostname>\n'
             xml_content += f'      <status>{result.get("status", "")}</status>\n'
             xml_content += f'      <response_time>{result.get("rtt", "")}</response_time>\n'
+            if result.get("open_ports"):
+                xml_content += '      <open_ports>\n'
+                for port in result["open_ports"]:
+                    service = html.escape(str(port.get("service") or ""), quote=True)
+                    xml_content += f'        <port number="{port["port"]}" service="{service}"/>\n'
+                xml_content += '      </open_ports>\n'
             xml_content += '    </host>\n'
         xml_content += '  </hosts>\n'
         xml_content += '</scan_results>\n'
         
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(xml_content)
-    def _export_scan_csv(self, filepath):
-        """Export IP scan to CSV format"""
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=['ip', 'hostname', 'status', 'rtt'])
-            writer.writeheader()
-            writer.writerows(self.app.scanner.results)
-    
-    def _export_scan_json(self, filepath):
-        """Export IP scan to JSON format"""
-        export_data = {
-            'scan_info': {
-                'cidr': self.app.cidr_entry.get(),
-                'timestamp': datetime.now().isoformat(),
-                'total_hosts': len(self.app.scanner.results),
-                'online': sum(1 for r in self.app.scanner.results if r['status'] == 'Online'),
-                'offline': sum(1 for r in self.app.scanner.results if r['status'] == 'Offline')
-            },
-            'results': self.app.scanner.results
-        }
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2)
     
-    def _export_scan_xml(self, filepath):
-        """Export IP scan to XML format"""
-        root = ET.Element('ipscan')
-        
-        # Add scan info
-        info = ET.SubElement(root, 'scan_info')
-        ET.SubElement(info, 'cidr').text = self.app.cidr_entry.get()
-        ET.SubElement(info, 'timestamp').text = datetime.now().isoformat()
-        ET.SubElement(info, 'total_hosts').text = str(len(self.app.scanner.results))
-        ET.SubElement(info, 'online').text = str(sum(1 for r in self.app.scanner.results if r['status'] == 'Online'))
-        ET.SubElement(info, 'offline').text = str(sum(1 for r in self.app.scanner.results if r['status'] == 'Offline'))
-        
-        # Add results
-        results = ET.SubElement(root, 'results')
-        for result in self.app.scanner.results:
-            host = ET.SubElement(results, 'host')
-            ET.SubElement(host, 'ip').text = result['ip']
-            ET.SubElement(host, 'hostname').text = result.get('hostname', '')
-            ET.SubElement(host, 'status').text = result['status']
-            ET.SubElement(host, 'rtt').text = str(result.get('rtt', ''))
-        
-        # Write to file
-        tree = ET.ElementTree(root)
-        ET.indent(tree, space='  ')
-        tree.write(filepath, encoding='utf-8', xml_declaration=True)
-    
-    def _export_scan_txt(self, filepath):
-        """Export IP scan to plain text format"""
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(f"IP Network Scan Results\n")
-            f.write(f"=" * 60 + "\n")
-            f.write(f"CIDR: {self.app.cidr_entry.get()}\n")
-            f.write(f"Scan Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total Hosts: {len(self.app.scanner.results)}\n")
-            f.write(f"Online: {sum(1 for r in self.app.scanner.results if r['status'] == 'Online')}\n")
-            f.write(f"Offline: {sum(1 for r in self.app.scanner.results if r['status'] == 'Offline')}\n")
-            f.write(f"=" * 60 + "\n\n")
-            
-            f.write(f"{'IP Address':<18} {'Hostname':<40} {'Status':<10} {'RTT (ms)':<15}\n")
-            f.write(f"{'-' * 18} {'-' * 40} {'-' * 10} {'-' * 15}\n")
-            
-            for result in self.app.scanner.results:
-                rtt_str = str(result.get('rtt', 'N/A'))
-                hostname_str = result.get('hostname', '-')
-                f.write(f"{result['ip']:<18} {hostname_str:<40} {result['status']:<10} {rtt_str:<15}\n")
     def save_scan_profile_dialog(self):
         """Show dialog to save current scan configuration as a profile"""
         # Get current settings
@@ -4,19 +4,33 @@ Traceroute & Pathping UI Module
 import customtkinter as ctk
 import threading
 import platform
+import socket
 from tkinter import messagebox, filedialog
 from pathlib import Path
 from datetime import datetime
 
 from design_constants import COLORS, FONTS, SPACING
 from ui_components import StyledCard, StyledButton, StyledEntry, SectionTitle, SubTitle
-from tools.traceroute import Traceroute
+from tools.asn_lookup import ASNLookup
+from tools.traceroute import TraceStream
+from tools.traceroute_engine import TracerouteEngine
+from tools.path_monitor import PathMonitor
+from tools.batch_traceroute import BatchTraceroute
+from tools.host_specs import HostRange, parse_host_specs
 from tools.traceroute_manager import TracerouteManager
 
 
 class TracerouteUI:
     """Traceroute & Pathping UI Component"""
     
+    MAX_BATCH_TARGETS = 4096
+    
+    # Columns of the continuous trace table: (heading, width)
+    MTR_COLUMNS = (
+        ("Hop", 40), ("Host", 140), ("Loss%", 60), ("Sent", 50), ("Last", 60),
+        ("Avg", 60), ("Best", 60), ("Worst", 60), ("StDev", 60)
+    )
+    
     def __init__(self, app, parent):
         """
         Initialize Traceroute UI
@@ -31,6 +45,9 @@ class TracerouteUI:
         # State tracking
         self.trace_running = False
         self.trace_process = None
+        self.path_monitor = None
+        self.topology = None  # Graph of the last batch trace, for export
+        self.batch_cancel = None  # Event of the running batch trace, set by Cancel
         self.trace_results_text = ""
         self.current_target = ""
         
@@ -127,7 +144,7 @@ class TracerouteUI:
         tracert_info.pack(side="left", padx=(10, 0))
         
         pathping_frame = ctk.CTkFrame(tool_frame, fg_color="transparent")
-        pathping_frame.pack(fill="x", padx=15, pady=(0, 15))
+        pathping_frame.pack(fill="x", padx=15, pady=(0, 5))
         
         pathping_radio = ctk.CTkRadioButton(
             pathping_frame,
@@ -146,6 +163,51 @@ class TracerouteUI:
         )
         pathping_info.pack(side="left", padx=(10, 0))
         
+        native_frame = ctk.CTkFrame(tool_frame, fg_color="transparent")
+        native_frame.pack(fill="x", padx=15, pady=(0, 5))
+        
+        native_available = TracerouteEngine.is_available()
+        native_radio = ctk.CTkRadioButton(
+            native_frame,
+            text="Built-in",
+            variable=self.trace_tool_var,
+            value="native",
+            font=ctk.CTkFont(size=12),
+            state="normal" if native_available else "disabled"
+        )
+        native_radio.pack(side="left")
+        
+        native_info = ctk.CTkLabel(
+            native_frame,
+            text="Fastest - Probes all hops at once, no external tools"
+                 + ("" if native_available else " (requires Administrator/root)"),
+            font=ctk.CTkFont(size=10),
+            text_color=COLORS["text_secondary"]
+        )
+        native_info.pack(side="left", padx=(10, 0))
+        
+        multipath_frame = ctk.CTkFrame(tool_frame, fg_color="transparent")
+        multipath_frame.pack(fill="x", padx=15, pady=(0, 15))
+        
+        multipath_radio = ctk.CTkRadioButton(
+            multipath_frame,
+            text="Multipath",
+            variable=self.trace_tool_var,
+            value="multipath",
+            font=ctk.CTkFont(size=12),
+            state="normal" if native_available else "disabled"
+        )
+        multipath_radio.pack(side="left")
+        
+        multipath_info = ctk.CTkLabel(
+            multipath_frame,
+            text="Load balancing - Finds every parallel (ECMP) path to the target"
+                 + ("" if native_available else " (requires Administrator/root)"),
+            font=ctk.CTkFont(size=10),
+            text_color=COLORS["text_secondary"]
+        )
+        multipath_info.pack(side="left", padx=(10, 0))
+        
         # Options with styled card
         options_frame = StyledCard(scrollable)
         options_frame.pack(fill="x", pady=(0, SPACING['lg']))
@@ -197,6 +259,24 @@ class TracerouteUI:
         )
         self.trace_start_btn.pack(side="left", padx=(0, SPACING['md']))
         
+        self.trace_continuous_btn = StyledButton(
+            button_frame,
+            text="📡 Continuous",
+            command=self.start_path_monitor,
+            size="medium",
+            variant="secondary"
+        )
+        self.trace_continuous_btn.pack(side="left", padx=(0, SPACING['md']))
+        
+        self.trace_batch_btn = StyledButton(
+            button_frame,
+            text="🗺 Batch",
+            command=self.start_batch_trace,
+            size="medium",
+            variant="secondary"
+        )
+        self.trace_batch_btn.pack(side="left", padx=(0, SPACING['md']))
+        
         self.trace_cancel_btn = StyledButton(
             button_frame,
             text="⏹ Cancel",
@@ -264,63 +344,377 @@ class TracerouteUI:
         
         # Update UI
         self.trace_start_btn.configure(state="disabled")
+        self.trace_continuous_btn.configure(state="disabled")
+        self.trace_batch_btn.configure(state="disabled")
         self.trace_cancel_btn.configure(state="normal")
         self.trace_export_btn.configure(state="disabled")
         self.trace_running = True
         
+        self.topology = None
+        
         # Clear previous results
         for widget in self.traceroute_results_frame.winfo_children():
             widget.destroy()
         
         # Show progress
-        tool_name = "Traceroute" if self.trace_tool_var.get() == "tracert" else "Pathping"
-        time_estimate = "~30 seconds" if self.trace_tool_var.get() == "tracert" else "~5 minutes"
+        tool_name, time_estimate = {
+            "tracert": ("Traceroute", "~30 seconds"),
+            "pathping": ("Pathping", "~5 minutes"),
+            "native": ("Built-in traceroute", "~2 seconds"),
+            "multipath": ("Multipath traceroute", "~10 seconds"),
+        }[self.trace_tool_var.get()]
         self.trace_progress_label.configure(
             text=f"⏳ Running {tool_name} to {target}... (estimated time: {time_estimate})"
         )
         
-        # Run in background thread using Traceroute module
+        # Live output area, filled line by line while the trace runs
+        self.trace_live_scroll = ctk.CTkScrollableFrame(self.traceroute_results_frame)
+        self.trace_live_scroll.pack(fill="both", expand=True, padx=15, pady=15)
+        
+        stream = TraceStream(
+            target, max_hops, self.trace_tool_var.get(), timeout=600,
+            on_line=lambda line: self.app.after(0, self.append_trace_line, stream, line)
+        )
+        self.trace_process = stream
+        self.trace_results_text = ""
+        
+        # Run in background thread, consuming hops as they are discovered
         def trace_thread():
-            tool = self.trace_tool_var.get()
-            result = Traceroute.run(target, max_hops, tool, timeout=600)
+            trace = self.trace_manager.start_trace(target)
+            for hop in stream:
+                self.trace_manager.add_hop(trace, hop)
+                # The recorded hop carries the AS annotation
+                self.app.after(0, self.show_trace_hop, stream, tool_name, trace["hops"][-1])
+            
+            if stream.cancelled:
+                return
+            
+            # Statistics sections (pathping, mtr) update hops after they were streamed
+            self.trace_manager.sync_hops(trace, stream.hops)
             
             # Store results
-            self.trace_results_text = result["output"]
+            self.trace_results_text = stream.output
             
             # Update UI in main thread
-            self.app.after(0, self.display_traceroute_results, result["output"], result["success"])
+            self.app.after(0, self.display_traceroute_results, stream.output, stream.success, trace)
         
         thread = threading.Thread(target=trace_thread, daemon=True)
         thread.start()
     
+    def append_trace_line(self, stream, line):
+        """Show one output line of the running trace"""
+        if stream is not self.trace_process or not self.trace_running:
+            return
+        if not line.strip():
+            ctk.CTkLabel(self.trace_live_scroll, text=" ", height=5).pack()
+            return
+        text_color, font_weight = self.get_line_style(line)
+        ctk.CTkLabel(
+            self.trace_live_scroll,
+            text=line,
+            font=ctk.CTkFont(size=12, weight=font_weight, family="Courier New"),
+            anchor="w",
+            justify="left",
+            text_color=text_color
+        ).pack(fill="x", pady=2)
+    
+    def show_trace_hop(self, stream, tool_name, hop):
+        """Report a newly discovered hop in the progress label"""
+        if stream is not self.trace_process or not self.trace_running:
+            return
+        where = "timed out" if hop['timeout'] else hop['ip']
+        if "asn" in hop:
+            where += f" (AS{hop['asn']} {hop['org']})"
+        self.trace_progress_label.configure(
+            text=f"⏳ Running {tool_name} to {self.current_target}... hop {hop['hop']}: {where}"
+        )
+    
     def cancel_traceroute(self):
         """Cancel running trace"""
         self.trace_running = False
+        if self.batch_cancel:
+            # Stays set, so the batch stops even if another trace starts meanwhile
+            self.batch_cancel.set()
+            self.batch_cancel = None
+        self.trace_start_btn.configure(state="normal")
+        self.trace_continuous_btn.configure(state="normal")
+        self.trace_batch_btn.configure(state="normal")
+        self.trace_cancel_btn.configure(state="disabled")
+        
+        if self.path_monitor:
+            self.stop_path_monitor()
+            return
+        
         if self.trace_process:
-            try:
-                self.trace_process.terminate()
-            except:
-                pass
+            # Kills the external process immediately
+            self.trace_process.cancel()
+        self.trace_progress_label.configure(text="Trace cancelled")
+    
+    def start_path_monitor(self):
+        """Start a continuous MTR-style trace"""
+        target = self.traceroute_target_entry.get().strip()
+        if not target:
+            messagebox.showwarning("Input Required", "Please enter a target host or IP address")
+            return
+        
+        try:
+            max_hops = int(self.traceroute_maxhops_entry.get())
+            if not 1 <= max_hops <= 255:
+                raise ValueError()
+        except:
+            messagebox.showwarning("Invalid Input", "Max hops must be between 1 and 255")
+            return
+        
+        if not TracerouteEngine.is_available("icmp"):
+            messagebox.showwarning(
+                "Administrator Required",
+                "Continuous tracing uses raw sockets.\nRun NetTools as Administrator/root."
+            )
+            return
+        
+        monitor = PathMonitor(target, interval=1.0, max_hops=max_hops)
+        try:
+            monitor.start()
+        except socket.gaierror:
+            messagebox.showerror("Unknown Host", f"Unable to resolve {target}")
+            return
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not start continuous trace:\n{e}")
+            return
+        
+        self.path_monitor = monitor
+        self.topology = None
+        self.current_target = target
+        self.trace_running = True
+        self.trace_start_btn.configure(state="disabled")
+        self.trace_continuous_btn.configure(state="disabled")
+        self.trace_batch_btn.configure(state="disabled")
+        self.trace_cancel_btn.configure(state="normal")
+        self.trace_export_btn.configure(state="disabled")
+        
+        for widget in self.traceroute_results_frame.winfo_children():
+            widget.destroy()
+        
+        # Statistics table; rows are created once per hop and updated in place
+        table = ctk.CTkFrame(self.traceroute_results_frame, fg_color="transparent")
+        table.pack(fill="both", expand=True, padx=15, pady=15)
+        for column, (text, width) in enumerate(self.MTR_COLUMNS):
+            ctk.CTkLabel(
+                table, text=text, width=width, anchor="w",
+                font=ctk.CTkFont(size=11, weight="bold")
+            ).grid(row=0, column=column, padx=3, pady=(0, 5), sticky="w")
+        self.mtr_table = table
+        self.mtr_rows = {}
+        
+        self.trace_progress_label.configure(text=f"📡 Continuous trace to {target} ({monitor.dst_ip})...")
+        self.app.after(1000, self.refresh_path_monitor, monitor)
+    
+    def start_batch_trace(self):
+        """Trace many targets at once and map their shared topology"""
+        specs, errors = parse_host_specs(self.traceroute_target_entry.get(), max_hosts=self.MAX_BATCH_TARGETS)
+        if errors:
+            messagebox.showwarning("Invalid Input", "\n".join(errors))
+            return
+        targets = []
+        for spec in specs:
+            targets.extend(spec if isinstance(spec, HostRange) else [spec])
+        if not targets:
+            messagebox.showwarning(
+                "Input Required",
+                "Enter several targets separated by commas or spaces, or a CIDR range"
+            )
+            return
+        if len(targets) > self.MAX_BATCH_TARGETS:
+            messagebox.showwarning("Too Many Targets", f"At most {self.MAX_BATCH_TARGETS} targets per batch")
+            return
         
+        try:
+            max_hops = int(self.traceroute_maxhops_entry.get())
+            if not 1 <= max_hops <= 255:
+                raise ValueError()
+        except:
+            messagebox.showwarning("Invalid Input", "Max hops must be between 1 and 255")
+            return
+        
+        if not TracerouteEngine.is_available():
+            messagebox.showwarning(
+                "Administrator Required",
+                "Batch tracing uses raw sockets.\nRun NetTools as Administrator/root."
+            )
+            return
+        
+        self.trace_start_btn.configure(state="disabled")
+        self.trace_continuous_btn.configure(state="disabled")
+        self.trace_batch_btn.configure(state="disabled")
+        self.trace_cancel_btn.configure(state="normal")
+        self.trace_export_btn.configure(state="disabled")
+        self.trace_running = True
+        self.topology = None
+        self.current_target = f"{len(targets)} targets"
+        
+        for widget in self.traceroute_results_frame.winfo_children():
+            widget.destroy()
+        self.trace_progress_label.configure(text=f"⏳ Tracing {len(targets)} targets...")
+        
+        batch = BatchTraceroute(max_hops=max_hops)
+        self.trace_process = None
+        cancel_event = threading.Event()
+        self.batch_cancel = cancel_event
+        
+        def progress(done, total, result):
+            self.app.after(0, self.show_batch_progress, batch, cancel_event, done, total)
+        
+        def batch_thread():
+            try:
+                results = batch.trace(targets, progress, cancel_check=cancel_event.is_set)
+            except OSError as e:
+                if not cancel_event.is_set():
+                    self.app.after(0, messagebox.showerror, "Error", f"Batch trace failed:\n{e}")
+                    self.app.after(0, self._fail_batch, cancel_event)
+                return
+            if not cancel_event.is_set():
+                self.app.after(0, self.display_batch_results, batch, cancel_event, targets, results)
+        
+        threading.Thread(target=batch_thread, daemon=True).start()
+    
+    def _fail_batch(self, cancel_event):
+        """Reset the controls after a failed batch unless it was already cancelled"""
+        if cancel_event is self.batch_cancel:
+            self.cancel_traceroute()
+    
+    def show_batch_progress(self, batch, cancel_event, done, total):
+        """Report batch progress"""
+        if cancel_event.is_set():
+            return
+        self.trace_progress_label.configure(
+            text=f"⏳ Traced {done}/{total} targets - {len(batch.graph.nodes) - 1} routers found"
+        )
+    
+    def display_batch_results(self, batch, cancel_event, targets, results):
+        """Show the per-target summary of a batch trace"""
+        if cancel_event.is_set():
+            return  # Cancelled after the results were queued
+        self.batch_cancel = None
+        self.trace_running = False
         self.trace_start_btn.configure(state="normal")
+        self.trace_continuous_btn.configure(state="normal")
+        self.trace_batch_btn.configure(state="normal")
         self.trace_cancel_btn.configure(state="disabled")
-        self.trace_progress_label.configure(text="Trace cancelled")
+        self.topology = batch.graph
+        
+        graph = batch.graph.to_dict()
+        reached = sum(1 for result in results.values() if result["reached"])
+        summary = (
+            f"{len(results)} targets, {reached} reached - {len(graph['nodes']) - 1} routers, "
+            f"{len(graph['edges'])} links - {batch.stats['probes_sent']} probes sent, "
+            f"{batch.stats['probes_saved']} saved by the shared hop cache"
+        )
+        lines = [summary, ""]
+        for target in targets:
+            result = results.get(target)
+            if result is None:
+                continue
+            if result["error"]:
+                lines.append(f"{target:<30} {result['error']}")
+                continue
+            last = result["hops"][-1] if result["hops"] else None
+            latency = f"{last['latency_ms']} ms" if last and last['latency_ms'] is not None else "-"
+            status = "reached" if result["reached"] else "not reached"
+            owner = ASNLookup.describe(ASNLookup.default().lookup(result["ip"]))
+            lines.append(f"{target:<30} {len(result['hops']):>3} hops  {latency:>10}  {status:<12} {owner}".rstrip())
+        self.trace_results_text = "\n".join(lines) + "\n"
+        self.trace_export_btn.configure(state="normal")
+        self.trace_progress_label.configure(text=f"✅ Batch trace complete - {summary}")
+        
+        results_scroll = ctk.CTkScrollableFrame(self.traceroute_results_frame)
+        results_scroll.pack(fill="both", expand=True, padx=15, pady=15)
+        for line in lines:
+            ctk.CTkLabel(
+                results_scroll,
+                text=line or " ",
+                font=ctk.CTkFont(size=12, family="Courier New"),
+                anchor="w",
+                justify="left",
+                text_color=COLORS["warning"] if "not reached" in line or "Unknown" in line else COLORS["text_primary"]
+            ).pack(fill="x", pady=1)
+    
+    def refresh_path_monitor(self, monitor):
+        """Show the latest per-hop statistics once a second"""
+        if monitor is not self.path_monitor:
+            return
+        
+        def ms(value):
+            return f"{value:.1f}" if value is not None else "-"
+        
+        for hop in monitor.snapshot():
+            values = (
+                str(hop['hop']), hop['ip'], f"{hop['loss']:.1f}", str(hop['sent']),
+                ms(hop['last']), ms(hop['avg']), ms(hop['best']), ms(hop['worst']), ms(hop['stdev'])
+            )
+            labels = self.mtr_rows.get(hop['hop'])
+            if labels is None:
+                labels = self.mtr_rows[hop['hop']] = [
+                    ctk.CTkLabel(
+                        self.mtr_table, text="", width=width, anchor="w",
+                        font=ctk.CTkFont(size=11, family="Courier New")
+                    )
+                    for _, width in self.MTR_COLUMNS
+                ]
+                for column, label in enumerate(labels):
+                    label.grid(row=hop['hop'], column=column, padx=3, pady=1, sticky="w")
+            
+            loss_color = COLORS["success"] if hop['loss'] == 0 else (
+                COLORS["warning"] if hop['loss'] < 50 else COLORS["danger"]
+            )
+            for column, (label, value) in enumerate(zip(labels, values)):
+                if label.cget("text") != value:
+                    label.configure(text=value)
+                if column == 2:
+                    label.configure(text_color=loss_color)
+        
+        status = f"📡 Continuous trace to {self.current_target} ({monitor.dst_ip}) - {monitor.cycles} cycles"
+        if monitor.error:
+            status += f" - error: {monitor.error}"
+        self.trace_progress_label.configure(text=status)
+        self.app.after(1000, self.refresh_path_monitor, monitor)
     
-    def display_traceroute_results(self, output, success):
-        """Display traceroute/pathping results"""
+    def stop_path_monitor(self):
+        """Stop the continuous trace and keep its report for export"""
+        monitor = self.path_monitor
+        self.path_monitor = None
+        monitor.stop()
+        self.trace_results_text = monitor.report()
+        self.trace_export_btn.configure(state="normal")
+        self.trace_progress_label.configure(
+            text=f"Continuous trace stopped after {monitor.cycles} cycles"
+        )
+    
+    def display_traceroute_results(self, output, success, trace=None):
+        """Display traceroute/pathping results
+        
+        Args:
+            output (str): Full output
+            success (bool): Whether the trace succeeded
+            trace (dict): Streamed trace from TracerouteManager.start_trace, if any
+        """
         # Clear results frame
         for widget in self.traceroute_results_frame.winfo_children():
             widget.destroy()
         
         # Update UI state
         self.trace_start_btn.configure(state="normal")
+        self.trace_continuous_btn.configure(state="normal")
+        self.trace_batch_btn.configure(state="normal")
         self.trace_cancel_btn.configure(state="disabled")
         self.trace_running = False
         
         # Save to history for comparison
         if output and len(output) > 50 and self.current_target:
             try:
-                trace_id = self.trace_manager.add_trace(self.current_target, output, success)
+                if trace is not None:
+                    trace_id = self.trace_manager.finish_trace(trace, output, success)
+                else:
+                    trace_id = self.trace_manager.add_trace(self.current_target, output, success)
                 self.app.show_toast(f"Saved to history (ID: {trace_id})", "success")
             except Exception as e:
                 print(f"Could not save trace: {e}")
@@ -348,6 +742,22 @@ class TracerouteUI:
         )
         info_label.pack(side="left")
         
+        # Networks the path crosses, from the offline ASN table
+        as_path = ASNLookup.as_path(trace["hops"]) if trace is not None else []
+        if as_path:
+            ctk.CTkLabel(
+                self.traceroute_results_frame,
+                text="AS path: " + "  →  ".join(
+                    f"AS{entry['asn']} {entry['org']} (hops {entry['first_hop']}-{entry['last_hop']})"
+                    for entry in as_path
+                ),
+                font=ctk.CTkFont(size=11),
+                text_color=COLORS["text_secondary"],
+                anchor="w",
+                justify="left",
+                wraplength=900
+            ).pack(fill="x", padx=15, pady=(0, 5))
+        
         # Create scrollable text widget for results
         results_scroll = ctk.CTkScrollableFrame(self.traceroute_results_frame)
         results_scroll.pack(fill="both", expand=True, padx=15, pady=(0, 15))
@@ -382,31 +792,7 @@ class TracerouteUI:
                 ctk.CTkLabel(results_scroll, text=" ", height=5).pack()
                 continue
             
-            # Color code different types of lines
-            text_color = COLORS["text_primary"]
-            font_weight = "normal"
-            
-            # Headers
-            if "Tracing" in line or "Computing" in line or "over a maximum" in line:
-                text_color = COLORS["primary"]
-                font_weight = "bold"
-            # Hop numbers (lines starting with numbers)
-            elif line.strip() and line.strip()[0].isdigit():
-                text_color = COLORS["text_primary"]
-            # Timeouts
-            elif "*" in line or "Request timed out" in line or "timed out" in line.lower():
-                text_color = COLORS["warning"]
-            # Errors
-            elif "error" in line.lower() or "failed" in line.lower() or "unable" in line.lower():
-                text_color = COLORS["danger"]
-                font_weight = "bold"
-            # Summary lines (pathping)
-            elif "%" in line or "Loss" in line or "Sent" in line:
-                text_color = COLORS["success"]
-            # Complete messages
-            elif "complete" in line.lower():
-                text_color = COLORS["success"]
-                font_weight = "bold"
+            text_color, font_weight = self.get_line_style(line)
             
             line_label = ctk.CTkLabel(
                 results_scroll,
@@ -418,6 +804,42 @@ class TracerouteUI:
             )
             line_label.pack(fill="x", pady=2)
     
+    @staticmethod
+    def get_line_style(line):
+        """
+        Color code an output line
+        
+        Returns:
+            tuple: (text color, font weight)
+        """
+        # Color code different types of lines
+        text_color = COLORS["text_primary"]
+        font_weight = "normal"
+        
+        # Headers
+        if "Tracing" in line or "Computing" in line or "over a maximum" in line:
+            text_color = COLORS["primary"]
+            font_weight = "bold"
+        # Hop numbers (lines starting with numbers)
+        elif line.strip() and line.strip()[0].isdigit():
+            text_color = COLORS["text_primary"]
+        # Timeouts
+        elif "*" in line or "Request timed out" in line or "timed out" in line.lower():
+            text_color = COLORS["warning"]
+        # Errors
+        elif "error" in line.lower() or "failed" in line.lower() or "unable" in line.lower():
+            text_color = COLORS["danger"]
+            font_weight = "bold"
+        # Summary lines (pathping)
+        elif "%" in line or "Loss" in line or "Sent" in line:
+            text_color = COLORS["success"]
+        # Complete messages
+        elif "complete" in line.lower():
+            text_color = COLORS["success"]
+            font_weight = "bold"
+        
+        return text_color, font_weight
+    
     def export_traceroute(self):
         """Export traceroute results"""
         if not self.trace_results_text:
@@ -428,13 +850,19 @@ class TracerouteUI:
         desktop = Path.home() / "Desktop"
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         target = self.traceroute_target_entry.get().strip().replace(".", "_")
-        tool = "tracert" if self.trace_tool_var.get() == "tracert" else "pathping"
+        tool = self.trace_tool_var.get()
         default_filename = f"{tool}_{target}_{timestamp}.txt"
         
+        # Batch traces can also be saved as a topology graph
+        filetypes = [("Text files", "*.txt"), ("All files", "*.*")]
+        if self.topology is not None:
+            default_filename = f"topology_{timestamp}.graphml"
+            filetypes = [("GraphML", "*.graphml"), ("JSON", "*.json")] + filetypes
+        
         # Ask for save location
         filepath = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            defaultextension=Path(default_filename).suffix,
+            filetypes=filetypes,
             initialdir=desktop,
             initialfile=default_filename
         )
@@ -443,6 +871,15 @@ class TracerouteUI:
             return
         
         try:
+            suffix = Path(filepath).suffix.lower()
+            if self.topology is not None and suffix in (".graphml", ".json"):
+                if suffix == ".graphml":
+                    self.topology.to_graphml(filepath)
+                else:
+                    self.topology.to_json(filepath)
+                messagebox.showinfo("Export Successful", f"Topology exported to:\n{filepath}")
+                return
+            
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(f"Traceroute/Pathping Results\n")
                 f.write(f"=" * 60 + "\n")
@@ -5,8 +5,10 @@ WHOIS Lookup UI - Query domain/IP ownership information
 import customtkinter as ctk
 import threading
 import socket
+from tkinter import filedialog
 from design_constants import COLORS, SPACING, FONTS
 from ui_components import StyledCard, StyledButton, StyledEntry, SubTitle, InfoBox
+from tools.asn_lookup import ASNLookup
 
 
 class WhoisUI:
@@ -74,6 +76,14 @@ class WhoisUI:
         )
         self.lookup_btn.pack(side="left")
         
+        self.import_asn_btn = StyledButton(
+            input_frame,
+            text="📥 Import ASN Table",
+            command=self.import_asn_table,
+            variant="secondary"
+        )
+        self.import_asn_btn.pack(side="left", padx=(10, 0))
+        
         # Results
         results_card = StyledCard(scrollable, variant="elevated")
         results_card.pack(fill="both", expand=True, pady=(0, SPACING['md']))
@@ -111,6 +121,15 @@ class WhoisUI:
     
     def _do_lookup(self, query):
         """Perform lookup in background"""
+        # IP ownership from the offline table first, so it shows even without network access
+        offline = ""
+        if self._is_ip(query):
+            owner = ASNLookup.default().lookup(query)
+            if owner:
+                offline = (f"Offline ASN table: {ASNLookup.describe(owner)}"
+                           f"{' (' + owner['country'] + ')' if owner['country'] else ''}\n"
+                           f"Range: {owner['range']}\n\n")
+                self.app.after(0, lambda: self._show_partial(offline + "Querying WHOIS server..."))
         try:
             # Determine WHOIS server
             if self._is_ip(query):
@@ -131,10 +150,10 @@ class WhoisUI:
                             result = self._query_whois(query, referral)
                         break
             
-            self.app.after(0, lambda: self._show_results(result))
+            self.app.after(0, lambda: self._show_results(offline + result))
             
         except Exception as e:
-            self.app.after(0, lambda: self._show_results(f"Error: {str(e)}"))
+            self.app.after(0, lambda: self._show_results(offline + f"Error: {str(e)}"))
         
         finally:
             self.app.after(0, lambda: self.lookup_btn.configure(state="normal", text="🔍 Lookup"))
@@ -164,6 +183,32 @@ class WhoisUI:
         except:
             return False
     
+    def import_asn_table(self):
+        """Import a prefix-to-ASN list (CSV or TSV) into the offline table"""
+        path = filedialog.askopenfilename(
+            title="Import ASN Table",
+            filetypes=[("Prefix lists", "*.csv *.tsv *.txt"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        self.import_asn_btn.configure(state="disabled", text="⏳ Importing...")
+        
+        def do_import():
+            try:
+                table = ASNLookup.update(path)
+                message, level = f"ASN table updated: {len(table):,} ranges", "success"
+            except (OSError, ValueError) as e:
+                message, level = f"Could not import ASN table: {e}", "error"
+            self.app.after(0, lambda: self.app.show_toast(message, level))
+            self.app.after(0, lambda: self.import_asn_btn.configure(state="normal", text="📥 Import ASN Table"))
+        
+        threading.Thread(target=do_import, daemon=True).start()
+    
+    def _show_partial(self, text):
+        """Show results while the lookup is still running"""
+        self.results_text.delete("1.0", "end")
+        self.results_text.insert("1.0", text)
+    
     def _show_results(self, result):
         """Display results"""
         self.results_text.delete("1.0", "end")